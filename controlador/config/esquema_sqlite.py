@@ -0,0 +1,52 @@
+# Esquema de controlador_db para el backend SQLite
+# (mismas tablas y orden de columnas que en MySQL)
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS Router (
+    id_router INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL UNIQUE,
+    ip TEXT NOT NULL UNIQUE,
+    estado TEXT NOT NULL DEFAULT 'Activo',
+    ultima_actualizacion DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_router_estado ON Router (estado);
+
+CREATE TABLE IF NOT EXISTS Enlace (
+    id_enlace INTEGER PRIMARY KEY AUTOINCREMENT,
+    router_origen INTEGER NOT NULL,
+    router_destino INTEGER NOT NULL,
+    costo REAL NOT NULL DEFAULT 1.0,
+    ancho_banda REAL,
+    estado TEXT NOT NULL DEFAULT 'Activo',
+    retardo_ms REAL,
+    FOREIGN KEY (router_origen) REFERENCES Router (id_router) ON DELETE CASCADE,
+    FOREIGN KEY (router_destino) REFERENCES Router (id_router) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_enlace_origen ON Enlace (router_origen, router_destino);
+CREATE INDEX IF NOT EXISTS idx_enlace_destino ON Enlace (router_destino);
+CREATE INDEX IF NOT EXISTS idx_enlace_estado ON Enlace (estado);
+
+CREATE TABLE IF NOT EXISTS Ruta (
+    id_ruta INTEGER PRIMARY KEY AUTOINCREMENT,
+    router_origen INTEGER NOT NULL,
+    router_destino INTEGER NOT NULL,
+    camino BLOB,
+    costo_total REAL,
+    fecha_calculo DATETIME,
+    siguiente_salto INTEGER,
+    numero_saltos INTEGER,
+    siguientes_saltos BLOB,
+    FOREIGN KEY (router_origen) REFERENCES Router (id_router) ON DELETE CASCADE,
+    FOREIGN KEY (router_destino) REFERENCES Router (id_router) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_ruta_origen_destino ON Ruta (router_origen, router_destino);
+CREATE INDEX IF NOT EXISTS idx_ruta_destino ON Ruta (router_destino);
+CREATE INDEX IF NOT EXISTS idx_ruta_fecha ON Ruta (fecha_calculo);
+
+CREATE TABLE IF NOT EXISTS Log_Controlador (
+    id_log INTEGER PRIMARY KEY AUTOINCREMENT,
+    evento TEXT NOT NULL,
+    detalle TEXT,
+    fecha_hora DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_controlador_fecha ON Log_Controlador (fecha_hora);
+"""
@@ -0,0 +1,53 @@
+# Migraciones de controlador_db para bases creadas con un esquema anterior
+# (en SQLite las columnas y claves foráneas se derivan de ESQUEMA_SQLITE)
+from controlador.model.ruta import Ruta
+from shared.utils.storage_backend import columna_faltante, tipo_distinto
+
+_TIPOS_BLOB = ('blob', 'mediumblob', 'longblob')
+
+# Pares (condición, sentencia) que MySQLBackend aplica al conectar
+MIGRACIONES_MYSQL = [
+    # Caminos empaquetados con siguiente salto y número de saltos precalculados
+    (tipo_distinto('Ruta', 'camino', _TIPOS_BLOB),
+     "ALTER TABLE Ruta MODIFY camino BLOB"),
+    (columna_faltante('Ruta', 'siguiente_salto'),
+     "ALTER TABLE Ruta ADD COLUMN siguiente_salto INT NULL"),
+    (columna_faltante('Ruta', 'numero_saltos'),
+     "ALTER TABLE Ruta ADD COLUMN numero_saltos INT NULL"),
+    # Siguientes saltos de igual costo (ECMP)
+    (columna_faltante('Ruta', 'siguientes_saltos'),
+     "ALTER TABLE Ruta ADD COLUMN siguientes_saltos BLOB NULL"),
+]
+
+
+def migrar_datos(cursor):
+    """
+    Empaqueta los caminos guardados como texto "R1->R3->R5"
+
+    Las filas anteriores a los caminos empaquetados son las que no tienen
+    numero_saltos. En MySQL el texto queda como bytes tras pasar la columna
+    a BLOB; en SQLite se sigue leyendo como texto.
+
+    Args:
+        cursor: Cursor dentro de una transacción (marcadores %s)
+    """
+    cursor.execute("SELECT id_ruta, camino FROM Ruta WHERE numero_saltos IS NULL")
+    filas = cursor.fetchall()
+
+    cambios = []
+    for id_ruta, camino in filas:
+        if isinstance(camino, (bytes, bytearray)):
+            camino = bytes(camino).decode('utf-8')
+        ruta = Ruta(camino=camino or '')
+        cambios.append((ruta.camino_empaquetado, ruta.siguiente_salto, ruta.numero_saltos, id_ruta))
+
+    if cambios:
+        cursor.executemany(
+            """
+            UPDATE Ruta
+            SET camino = %s, siguiente_salto = %s, numero_saltos = %s
+            WHERE id_ruta = %s
+            """,
+            cambios
+        )
+        print(f"✓ {len(cambios)} caminos de texto convertidos al formato empaquetado")
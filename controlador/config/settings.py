@@ -6,6 +6,22 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Backend de almacenamiento: 'mysql' (servidor, DB_CONFIG) o 'sqlite' (embebido)
+DB_BACKEND = 'mysql'
+
+# Base embebida usada con DB_BACKEND = 'sqlite'
+SQLITE_CONFIG = {
+    'ruta': 'data/controlador.db',
+    'timeout': 30,  # Segundos de espera si la base está bloqueada
+    'sentencias_cacheadas': 256,  # Sentencias preparadas por conexión
+}
+
+# Pool de conexiones a la base de datos
+DB_POOL_CONFIG = {
+    'tamano': 10,  # Conexiones abiertas como máximo
+    'timeout': 30,  # Segundos de espera por una conexión libre
+}
+
 # Configuración del controlador
 CONTROLADOR_CONFIG = {
     'nombre': 'SDN_Controller',
@@ -13,6 +29,86 @@ CONTROLADOR_CONFIG = {
     'puerto': 6633,
 }
 
+# Servidor TCP de routers
+SERVIDOR_CONFIG = {
+    'modo': 'hilos',  # 'hilos' (un hilo por conexión) o 'asyncio'
+    'workers': 32,  # Hilos para acceso a BD en modo asyncio
+    'timeout_envio': 30,  # Segundos que espera un envío a un router lento (asyncio)
+    'framing': 'binario',  # 'binario' si el router lo ofrece, o 'json' (líneas)
+    'codecs': ['msgpack', 'json'],  # Preferencia de codecs binarios
+    'compresion': True,  # zlib para cuerpos grandes (tablas de rutas)
+}
+
+# Configuración del cálculo de rutas (SPF)
+SPF_CONFIG = {
+    'procesos': None,  # None = número de CPUs disponibles
+    'umbral_paralelo': 1000,  # Orígenes a partir de los cuales se usa el pool de procesos
+    'ecmp_max_saltos': 8,  # Siguientes saltos de igual costo por destino (0 = sin límite)
+}
+
+# Next hops de respaldo (Loop-Free Alternates) enviados en ROUTE_UPDATE
+FAST_REROUTE_CONFIG = {
+    'habilitado': True,
+    'proteccion_nodo': True,  # Preferir respaldos que evitan el router del salto principal
+}
+
+# Caché LRU de consultas de rutas (calcular_ruta y ROUTE_REQUEST)
+RUTA_CACHE_CONFIG = {
+    'capacidad': 4096,  # Consultas cacheadas como máximo
+    'cache_negativo': True,  # Cachear también los pares sin camino
+}
+
+# Rutas alternativas (K caminos más cortos)
+KSP_CONFIG = {
+    'tiempo_max': 2.0,  # Segundos por consulta antes de devolver lo encontrado
+    'max_expansiones': 500000,  # Nodos expandidos por consulta
+}
+
+# Rutas con métricas de calidad de servicio (retardo y ancho de banda)
+QOS_CONFIG = {
+    'retardo_por_defecto': 1.0,  # ms asumidos para enlaces sin retardo registrado
+    'ancho_banda_por_defecto': 0.0,  # Enlaces sin ancho de banda registrado: sin garantía
+    'tiempo_max': 2.0,  # Segundos por consulta con retardo máximo antes de devolver lo encontrado
+    'max_expansiones': 500000,  # Etiquetas expandidas por consulta
+}
+
+# Centralidad de intermediación (análisis de congestión y menú de centralidad)
+CENTRALIDAD_CONFIG = {
+    'modo': 'auto',  # 'exacto', 'muestreo' o 'auto'
+    'umbral_muestreo': 2000,  # Routers a partir de los cuales 'auto' muestrea
+    'error': 0.1,  # Error absoluto máximo de la estimación por muestreo
+    'confianza': 0.95,  # Probabilidad de que la estimación cumpla el error
+    'semilla': None,  # Semilla de la selección de pivotes (None = aleatoria)
+    'procesos': None,  # None = número de CPUs disponibles
+    'umbral_paralelo': 500,  # Orígenes a partir de los cuales se usa el pool de procesos
+}
+
+# Simulación de fallos (análisis what-if N-1)
+FALLOS_CONFIG = {
+    'procesos': None,  # None = número de CPUs disponibles
+    'umbral_paralelo': 200,  # Escenarios a partir de los cuales se usa el pool de procesos
+}
+
+# Escritura por lotes de rutas
+RUTAS_CONFIG = {
+    'tamano_lote': 1000,  # Filas por INSERT multi-fila
+}
+
+# Monitoreo de la red
+MONITOR_CONFIG = {
+    'ttl_segundos': 5,  # Vigencia de la instantánea de resumen, métricas y reporte
+}
+
+# Escritura asíncrona por lotes de Log_Controlador
+LOG_ASINCRONO_CONFIG = {
+    'habilitado': True,
+    'capacidad': 10000,  # Eventos pendientes como máximo en memoria
+    'tamano_lote': 200,  # Eventos por INSERT multi-fila
+    'intervalo': 0.5,  # Segundos que espera un lote incompleto antes de escribirse
+    'politica': 'descartar',  # 'descartar' o 'bloquear' con la cola llena
+    'timeout_bloqueo': 1.0,  # Segundos de espera con la política 'bloquear'
+}
+
 # Estados válidos
 ESTADOS_ROUTER = ['Activo', 'Inactivo', 'En mantenimiento']
 ESTADOS_ENLACE = ['Activo', 'Inactivo']
@@ -8,7 +8,14 @@ from controlador.model.enlace import Enlace
 from controlador.model.ruta import Ruta
 from controlador.services.network_graph import NetworkGraph
 from controlador.services.network_monitor import NetworkMonitor
-from controlador.config.settings import ESTADOS_ROUTER, ESTADOS_ENLACE
+from controlador.services.spf_engine import SPFEngine, repartir_saltos
+from controlador.services.incremental_spf import IncrementalSPF
+from controlador.services.route_cache import RouteCache
+from controlador.services.constrained_routing import ConstrainedRouting
+from controlador.services.fast_reroute import FastReroute
+from controlador.config.settings import (
+    ESTADOS_ROUTER, ESTADOS_ENLACE, SERVIDOR_CONFIG, FAST_REROUTE_CONFIG
+)
 
 
 class ControladorPrincipal:
@@ -20,6 +27,10 @@ class ControladorPrincipal:
         self.ruta_dao = RutaDAO()
         self.log_dao = LogControladorDAO()
         self.network_graph = NetworkGraph()
+        self.spf_engine = SPFEngine(self.network_graph)
+        self.spf_incremental = IncrementalSPF()
+        self.fast_reroute = FastReroute(self.network_graph, self.spf_engine, self.spf_incremental)
+        self.rutas_cache = RouteCache()
         self.monitor = NetworkMonitor()
 
         self.tcp_server = None
@@ -59,6 +70,8 @@ class ControladorPrincipal:
         router_id = self.router_dao.crear(router)
 
         if router_id:
+            version = self._invalidar_topologia()
+            self._cambiar_router_topologia(version, router_id, estado == 'Activo')
             self.log_dao.registrar_evento(
                 "Router creado",
                 f"Router '{nombre}' creado con IP {ip}"
@@ -74,6 +87,10 @@ class ControladorPrincipal:
         """Obtiene un router por su ID"""
         return self.router_dao.obtener_por_id(id_router)
 
+    def obtener_routers(self, ids):
+        """Obtiene varios routers en una sola consulta: {id_router: Router}"""
+        return self.router_dao.obtener_por_ids(ids)
+
     def listar_routers(self, solo_activos=False):
         """
         Lista todos los routers
@@ -106,6 +123,8 @@ class ControladorPrincipal:
             print(f"✗ Router ID {id_router} no encontrado")
             return False
 
+        estaba_activo = router.es_activo()
+
         # Actualizar campos si se proporcionan
         if nombre:
             router.nombre = nombre
@@ -124,10 +143,18 @@ class ControladorPrincipal:
         router.ultima_actualizacion = datetime.now()
 
         if self.router_dao.actualizar(router):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Router actualizado",
                 f"Router ID {id_router} actualizado"
             )
+
+            # Solo un cambio de actividad afecta a las rutas
+            if router.es_activo() != estaba_activo:
+                delta = self._cambiar_router_topologia(version, id_router, router.es_activo())
+                self._aplicar_delta_rutas(delta)
+            else:
+                self._avanzar_topologia(version)
             return True
         return False
 
@@ -147,14 +174,15 @@ class ControladorPrincipal:
             return False
 
         if self.router_dao.cambiar_estado(id_router, nuevo_estado):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Estado de router cambiado",
                 f"Router ID {id_router} cambió a estado '{nuevo_estado}'"
             )
 
-            # Si el router se desactiva, recalcular rutas
-            if nuevo_estado != 'Activo':
-                self.recalcular_todas_rutas()
+            # Reparar solo las rutas afectadas por el router
+            delta = self._cambiar_router_topologia(version, id_router, nuevo_estado == 'Activo')
+            self._aplicar_delta_rutas(delta)
 
             return True
         return False
@@ -181,6 +209,7 @@ class ControladorPrincipal:
 
         # Eliminar router (los enlaces se eliminan por CASCADE)
         if self.router_dao.eliminar(id_router):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Router eliminado",
                 f"Router '{nombre}' (ID: {id_router}) eliminado"
@@ -190,8 +219,9 @@ class ControladorPrincipal:
                 f"ID: {id_router}, Nombre: {nombre}"
             )
 
-            # Recalcular rutas
-            self.recalcular_todas_rutas()
+            # Reparar las rutas que pasaban por el router
+            delta = self._cambiar_router_topologia(version, id_router, False)
+            self._aplicar_delta_rutas(delta)
             return True
         return False
 
@@ -250,6 +280,7 @@ class ControladorPrincipal:
         enlace_id = self.enlace_dao.crear(enlace)
 
         if enlace_id:
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Enlace creado",
                 f"Enlace entre R{router_origen} y R{router_destino} creado"
@@ -260,8 +291,11 @@ class ControladorPrincipal:
             )
 
             # Recalcular rutas afectadas
-            self.recalcular_rutas_router(router_origen)
-            self.recalcular_rutas_router(router_destino)
+            delta = self._cambiar_enlace_topologia(
+                version, router_origen, router_destino,
+                costo if estado == 'Activo' else None
+            )
+            self._aplicar_delta_rutas(delta)
 
         return enlace_id
 
@@ -299,6 +333,7 @@ class ControladorPrincipal:
             enlace.retardo_ms = retardo_ms
 
         if self.enlace_dao.actualizar(enlace):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Enlace actualizado",
                 f"Enlace ID {id_enlace} actualizado"
@@ -306,8 +341,13 @@ class ControladorPrincipal:
 
             # Recalcular rutas si cambió el costo o estado
             if costo is not None or estado is not None:
-                self.recalcular_rutas_router(enlace.router_origen)
-                self.recalcular_rutas_router(enlace.router_destino)
+                delta = self._cambiar_enlace_topologia(
+                    version, enlace.router_origen, enlace.router_destino,
+                    enlace.costo if enlace.es_activo() else None
+                )
+                self._aplicar_delta_rutas(delta)
+            else:
+                self._avanzar_topologia(version)
 
             return True
         return False
@@ -322,14 +362,18 @@ class ControladorPrincipal:
             return False
 
         if self.enlace_dao.cambiar_estado(id_enlace, nuevo_estado):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Estado de enlace cambiado",
                 f"Enlace ID {id_enlace} cambió a estado '{nuevo_estado}'"
             )
 
-            # Recalcular rutas
-            self.recalcular_rutas_router(enlace.router_origen)
-            self.recalcular_rutas_router(enlace.router_destino)
+            # Reparar solo las rutas afectadas por el enlace
+            delta = self._cambiar_enlace_topologia(
+                version, enlace.router_origen, enlace.router_destino,
+                enlace.costo if nuevo_estado == 'Activo' else None
+            )
+            self._aplicar_delta_rutas(delta)
 
             return True
         return False
@@ -344,6 +388,7 @@ class ControladorPrincipal:
         router_destino = enlace.router_destino
 
         if self.enlace_dao.eliminar(id_enlace):
+            version = self._invalidar_topologia()
             self.log_dao.registrar_evento(
                 "Enlace eliminado",
                 f"Enlace ID {id_enlace} eliminado"
@@ -353,44 +398,119 @@ class ControladorPrincipal:
                 f"ID: {id_enlace}"
             )
 
-            # Recalcular rutas
-            self.recalcular_rutas_router(router_origen)
-            self.recalcular_rutas_router(router_destino)
+            # Reparar solo las rutas que usaban el enlace
+            delta = self._cambiar_enlace_topologia(
+                version, router_origen, router_destino, None
+            )
+            self._aplicar_delta_rutas(delta)
 
             return True
         return False
 
     # ==================== GESTIÓN DE RUTAS ====================
 
-    def calcular_ruta(self, origen, destino, guardar=True):
-        # Calcular ruta usando NetworkX
-        camino, costo_total = self.network_graph.calcular_ruta(origen, destino)
+    @staticmethod
+    def _clave_ruta(metrica, retardo_max, ancho_banda_min):
+        """Métrica con la que se cachea una consulta de ruta"""
+        if ConstrainedRouting.es_consulta_simple(metrica, retardo_max, ancho_banda_min):
+            return 'costo'
+        return ('ruta', metrica, retardo_max, ancho_banda_min)
+
+    def calcular_ruta(self, origen, destino, guardar=True, metrica='costo',
+                      retardo_max=None, ancho_banda_min=None):
+        # Consultar primero la caché de rutas de la versión actual
+        version = self.network_graph.cache.version
+        clave = self._clave_ruta(metrica, retardo_max, ancho_banda_min)
+        encontrada, ruta = self.rutas_cache.obtener(origen, destino, clave, version)
+
+        if not encontrada:
+            camino, costo_total = self.network_graph.calcular_ruta(
+                origen, destino, metrica, retardo_max, ancho_banda_min
+            )
 
-        if camino is None:
-            print(f"✗ No existe ruta entre R{origen} y R{destino}")
-            return None
+            if camino is None:
+                print(f"✗ No existe ruta entre R{origen} y R{destino}")
+                self.rutas_cache.guardar(origen, destino, clave, version, None)
+                return None
 
-        # Crear objeto Ruta
-        camino_str = self.network_graph.formato_camino(camino)
-        ruta = Ruta(
-            router_origen=origen,
-            router_destino=destino,
-            camino=camino_str,
-            costo_total=costo_total
-        )
+            ruta = Ruta(
+                router_origen=origen,
+                router_destino=destino,
+                camino=camino,
+                costo_total=costo_total
+            )
+            self.rutas_cache.guardar(origen, destino, clave, version, ruta)
+
+        if ruta is None:
+            return None
 
         # Guardar en BD si se solicita
         if guardar:
+            # Copia: la instancia cacheada no debe recibir el id de la fila
+            ruta = Ruta(
+                router_origen=origen,
+                router_destino=destino,
+                camino=ruta.camino,
+                costo_total=ruta.costo_total,
+                siguiente_salto=ruta.siguiente_salto,
+                numero_saltos=ruta.numero_saltos
+            )
             ruta_id = self.ruta_dao.crear(ruta)
             if ruta_id:
                 ruta.id_ruta = ruta_id
                 self.log_dao.registrar_evento(
                     "Ruta calculada",
-                    f"Ruta de R{origen} a R{destino}: {camino_str} (Costo: {costo_total})"
+                    f"Ruta de R{origen} a R{destino}: {ruta.camino_texto()} (Costo: {ruta.costo_total})"
                 )
 
         return ruta
 
+    def resolver_ruta_solicitada(self, nombre_origen, ip_destino, metrica='costo',
+                                 retardo_max=None, ancho_banda_min=None):
+        """
+        Resuelve una solicitud de ruta de un router (ROUTE_REQUEST)
+
+        La respuesta se cachea por nombre de origen, IP de destino, métrica
+        y restricciones, junto con la IP del siguiente salto ya resuelta, de
+        modo que las solicitudes repetidas no consultan la base de datos
+        mientras la topología no cambie.
+
+        Args:
+            nombre_origen: Nombre del router que solicita la ruta
+            ip_destino: IP del router destino
+            metrica: 'costo', 'retardo' o 'ancho_banda'
+            retardo_max: Retardo total máximo en ms (None = sin límite)
+            ancho_banda_min: Ancho de banda mínimo de cada enlace (None = sin límite)
+
+        Returns:
+            Tupla (ruta, ip_siguiente_salto) o None si no hay ruta
+        """
+        version = self.network_graph.cache.version
+        clave = self._clave_ruta(metrica, retardo_max, ancho_banda_min)
+        encontrada, respuesta = self.rutas_cache.obtener(nombre_origen, ip_destino, clave, version)
+        if encontrada:
+            return respuesta
+
+        router_origen = self.obtener_router_por_nombre(nombre_origen)
+        router_destino = self.obtener_router_por_ip(ip_destino)
+
+        ruta = None
+        if router_origen and router_destino:
+            ruta = self.calcular_ruta(router_origen.id_router, router_destino.id_router,
+                                      guardar=False, metrica=metrica, retardo_max=retardo_max,
+                                      ancho_banda_min=ancho_banda_min)
+
+        respuesta = None
+        if ruta:
+            siguiente = self.obtener_router(ruta.siguiente_salto) if ruta.siguiente_salto else None
+            respuesta = (ruta, siguiente.ip if siguiente else None)
+
+        self.rutas_cache.guardar(nombre_origen, ip_destino, clave, version, respuesta)
+        return respuesta
+
+    def obtener_estadisticas_cache_rutas(self):
+        return self.rutas_cache.estadisticas()
+
     def obtener_ruta(self, origen, destino):
         return self.ruta_dao.obtener_por_origen_destino(origen, destino)
 
@@ -403,28 +523,22 @@ class ControladorPrincipal:
     def listar_rutas_hacia(self, destino):
         return self.ruta_dao.obtener_rutas_hacia(destino)
 
-    def calcular_rutas_alternativas(self, origen, destino, k=3):
-        return self.network_graph.calcular_rutas_alternativas(origen, destino, k)
+    def calcular_rutas_alternativas(self, origen, destino, k=3, modo='simple'):
+        return self.network_graph.calcular_rutas_alternativas(origen, destino, k, modo)
 
     def recalcular_rutas_router(self, id_router):
-        # Eliminar rutas antiguas del router
-        self.ruta_dao.eliminar_rutas_router(id_router)
+        # Un Dijkstra desde el router con los saltos de igual costo de cada destino
+        distancias, predecesores, saltos = self.spf_engine.calcular_arbol(id_router, ecmp=True)
 
-        # Calcular nuevas rutas desde este router a todos los demás
-        rutas_calculadas = self.network_graph.calcular_todas_las_rutas(id_router)
-
-        contador = 0
-        for destino, (camino, costo) in rutas_calculadas.items():
-            if camino:
-                camino_str = self.network_graph.formato_camino(camino)
-                ruta = Ruta(
-                    router_origen=id_router,
-                    router_destino=destino,
-                    camino=camino_str,
-                    costo_total=costo
-                )
-                if self.ruta_dao.crear(ruta):
-                    contador += 1
+        rutas = [
+            self._crear_ruta(id_router, destino, camino, costo, saltos[destino])
+            for destino, (camino, costo) in SPFEngine.rutas_de_arbol(
+                id_router, distancias, predecesores
+            ).items()
+        ]
+
+        # Reemplazar las rutas antiguas del router en una sola transacción
+        contador = self.ruta_dao.reemplazar_rutas_desde(id_router, rutas)
 
         print(f"✓ {contador} rutas recalculadas para router R{id_router}")
         return contador
@@ -439,26 +553,25 @@ class ControladorPrincipal:
             print("No hay suficientes routers activos para calcular rutas")
             return 0
 
-        # Limpiar todas las rutas existentes
-        for router in routers:
-            self.ruta_dao.eliminar_rutas_router(router.id_router)
-
-        # Calcular rutas para cada router
-        total_rutas = 0
-        for router in routers:
-            rutas_calculadas = self.network_graph.calcular_todas_las_rutas(router.id_router)
-
-            for destino, (camino, costo) in rutas_calculadas.items():
-                if camino:
-                    camino_str = self.network_graph.formato_camino(camino)
-                    ruta = Ruta(
-                        router_origen=router.id_router,
-                        router_destino=destino,
-                        camino=camino_str,
-                        costo_total=costo
-                    )
-                    if self.ruta_dao.crear(ruta):
-                        total_rutas += 1
+        # Calcular los árboles SPF de todos los orígenes con un Dijkstra por
+        # origen, conservando los siguientes saltos de igual costo (ECMP)
+        grafo = self.network_graph.construir_csr()
+        version = self.network_graph.version_grafo
+        arboles = self.spf_engine.calcular_arboles(adyacencia=grafo, ecmp=True)
+
+        # Estado base para el SPF incremental
+        self.spf_incremental.cargar(grafo.adyacencia(), arboles, version)
+
+        rutas = [
+            self._crear_ruta(origen, destino, camino, costo, saltos[destino])
+            for origen, (distancias, predecesores, saltos) in arboles.items()
+            for destino, (camino, costo) in SPFEngine.rutas_de_arbol(
+                origen, distancias, predecesores
+            ).items()
+        ]
+
+        # Reemplazar toda la tabla de rutas en una sola transacción
+        total_rutas = self.ruta_dao.reemplazar_todas(rutas)
 
         self.log_dao.registrar_evento(
             "Rutas recalculadas",
@@ -468,6 +581,134 @@ class ControladorPrincipal:
         print(f"✓ {total_rutas} rutas calculadas exitosamente")
         return total_rutas
 
+    def _invalidar_topologia(self):
+        """
+        Invalida las cachés que dependen de la topología tras una escritura
+
+        Returns:
+            Nueva versión de la topología
+        """
+        self.monitor.invalidar()
+        return self.network_graph.invalidar_cache()
+
+    def _cambiar_router_topologia(self, version, id_router, activo):
+        """
+        Aplica la activación o desactivación de un router al SPF incremental
+        y al índice de elementos críticos
+
+        Returns:
+            Delta de rutas del SPF incremental (o None)
+        """
+        vecinos = []
+        if activo:
+            vecinos = [(vecino, costo) for vecino, costo, _ in self.enlace_dao.obtener_vecinos(id_router)]
+
+        delta = self.spf_incremental.cambiar_router(version, id_router, activo, vecinos)
+        self._revisar_criticos(self.network_graph.biconectividad.cambiar_router(
+            version, id_router, activo, [vecino for vecino, _ in vecinos]
+        ))
+        return delta
+
+    def _cambiar_enlace_topologia(self, version, router_a, router_b, costo):
+        """
+        Aplica el alta, baja o cambio de costo de un enlace al SPF incremental
+        y al índice de elementos críticos
+
+        Returns:
+            Delta de rutas del SPF incremental (o None)
+        """
+        delta = self.spf_incremental.cambiar_enlace(version, router_a, router_b, costo)
+        self._revisar_criticos(self.network_graph.biconectividad.cambiar_enlace(
+            version, router_a, router_b, costo is not None
+        ))
+        return delta
+
+    def _avanzar_topologia(self, version):
+        """Avanza de versión los motores incrementales sin cambios de conectividad"""
+        self.spf_incremental.avanzar(version)
+        self._revisar_criticos(self.network_graph.biconectividad.avanzar(version))
+
+    def _revisar_criticos(self, reporte):
+        """
+        Informa las divisiones de la red y los nuevos elementos críticos
+
+        Args:
+            reporte: Reporte de BiconnectivityIndex o None si el índice no
+                     estaba sincronizado (en ese caso se reconstruye)
+        """
+        if reporte is None:
+            self.network_graph.obtener_indice_biconectividad()
+            return
+
+        for lado_a, lado_b in reporte['divisiones']:
+            menor = min(lado_a, lado_b, key=len)
+            print(f" La red se dividió en dos componentes de {len(lado_a)} y {len(lado_b)} routers")
+            self.monitor.registrar_cambio_topologia(
+                "red_dividida",
+                f"Componente separada: {', '.join(f'R{r}' for r in menor)}"
+            )
+
+        routers = reporte['routers_criticos']['nuevos']
+        if routers:
+            print(f" Nuevos routers críticos: {', '.join(f'R{r}' for r in routers)}")
+            self.log_dao.registrar_evento(
+                "Routers críticos",
+                f"Nuevos puntos de articulación: {routers}"
+            )
+
+        enlaces = reporte['enlaces_criticos']['nuevos']
+        if enlaces:
+            print(f" Nuevos enlaces críticos: {', '.join(f'R{a}-R{b}' for a, b in enlaces)}")
+            self.log_dao.registrar_evento(
+                "Enlaces críticos",
+                f"Nuevos puentes: {enlaces}"
+            )
+
+    def _aplicar_delta_rutas(self, delta):
+        """
+        Persiste el delta de rutas producido por el SPF incremental
+
+        Si el motor incremental no tiene un estado base sincronizado con la
+        topología, recalcula todas las rutas (lo que además lo sincroniza).
+        Los cambios se envían como delta a los routers conectados.
+
+        Args:
+            delta: Delta de IncrementalSPF o None
+
+        Returns:
+            Número de rutas modificadas o eliminadas
+        """
+        if delta is None:
+            total = self.recalcular_todas_rutas()
+        else:
+            rutas = [
+                self._crear_ruta(origen, destino, camino, costo, saltos)
+                for origen, destino, camino, costo, saltos in delta['modificadas']
+            ]
+            eliminadas = delta['eliminadas']
+
+            if rutas or eliminadas:
+                self.ruta_dao.aplicar_cambios(rutas, eliminadas)
+
+            print(f"✓ SPF incremental: {len(rutas)} rutas actualizadas, {len(eliminadas)} eliminadas")
+            total = len(rutas) + len(eliminadas)
+
+        # Propagar los cambios a los routers conectados
+        if total:
+            self.broadcast_rutas_actualizadas()
+        return total
+
+    def _crear_ruta(self, origen, destino, camino, costo, saltos=()):
+        """Crea un objeto Ruta a partir de un camino calculado y sus saltos de igual costo"""
+        siguiente = camino[1] if len(camino) > 1 else None
+        return Ruta(
+            router_origen=origen,
+            router_destino=destino,
+            camino=camino,
+            costo_total=costo,
+            siguientes_saltos=repartir_saltos(saltos, siguiente) if siguiente is not None else None
+        )
+
     # ==================== ANÁLISIS Y MONITOREO ====================
 
     def verificar_conectividad(self):
@@ -510,12 +751,12 @@ class ControladorPrincipal:
 
     # ==================== ANÁLISIS Y MONITOREO ====================
     def obtener_resumen_red(self):
-        """Obtiene un resumen del estado de la red"""
+        """Obtiene un resumen del estado de la red (instantánea compartida)"""
         return self.monitor.obtener_resumen_red()
 
-    def generar_reporte(self):
-        """Genera un reporte completo de la red"""
-        return self.monitor.generar_reporte_red()
+    def generar_reporte(self, forzar=False):
+        """Genera un reporte completo de la red (forzar = volver a consultar)"""
+        return self.monitor.generar_reporte_red(forzar)
 
     def obtener_metricas(self):
         """Obtiene métricas de rendimiento de la red"""
@@ -549,19 +790,48 @@ class ControladorPrincipal:
 
     # ==================== SERVIDOR TCP ====================
 
-    def iniciar_servidor_tcp(self, host='0.0.0.0', port=6633):
+    def iniciar_servidor_tcp(self, host='0.0.0.0', port=6633, modo=None):
+        """
+        Inicia el servidor TCP para la conexión de routers
+
+        Args:
+            host: Dirección de escucha
+            port: Puerto de escucha
+            modo: 'hilos' o 'asyncio' (None = configuración)
+
+        Returns:
+            True si el servidor se inició
+        """
         from shared.communication.tcp_server import TCPServer
+        from shared.communication.async_tcp_server import AsyncTCPServer
 
         if self.tcp_server and self.tcp_server.running:
             print(" El servidor TCP ya está en ejecución")
             return False
 
-        self.tcp_server = TCPServer(host=host, port=port, controlador=self)
+        modo = modo or SERVIDOR_CONFIG['modo']
+        opciones_framing = {
+            'framing': SERVIDOR_CONFIG['framing'],
+            'codecs': SERVIDOR_CONFIG['codecs'],
+            'compresion': SERVIDOR_CONFIG['compresion']
+        }
+
+        if modo == 'asyncio':
+            self.tcp_server = AsyncTCPServer(
+                host=host, port=port, controlador=self,
+                max_workers=SERVIDOR_CONFIG['workers'],
+                timeout_envio=SERVIDOR_CONFIG['timeout_envio'], **opciones_framing
+            )
+        elif modo == 'hilos':
+            self.tcp_server = TCPServer(host=host, port=port, controlador=self, **opciones_framing)
+        else:
+            print(f"✗ Modo de servidor inválido: {modo}. Use 'hilos' o 'asyncio'")
+            return False
 
         if self.tcp_server.start():
             self.log_dao.registrar_evento(
                 "Servidor TCP iniciado",
-                f"Servidor escuchando en {host}:{port}"
+                f"Servidor escuchando en {host}:{port} (modo {modo})"
             )
             return True
         return False
@@ -585,35 +855,88 @@ class ControladorPrincipal:
             return
 
         routers_conectados = self.obtener_routers_conectados()
-        rutas_por_router = {}
-
-        for router_nombre in routers_conectados:
-            router = self.obtener_router_por_nombre(router_nombre)
-            if router:
-                rutas = self.listar_rutas_desde(router.id_router)
-
-                rutas_data = []
-                for ruta in rutas:
-                    router_destino = self.obtener_router(ruta.router_destino)
-                    if router_destino:
-                        camino = ruta.obtener_saltos()
-                        next_hop_id = camino[1] if len(camino) > 1 else None
-
-                        if next_hop_id:
-                            next_hop_router = self.obtener_router(next_hop_id)
-
-                            rutas_data.append({
-                                'destino': router_destino.ip,
-                                'next_hop': next_hop_router.ip if next_hop_router else None,
-                                'interfaz_salida': f"eth_to_R{next_hop_id}",
-                                'costo': ruta.costo_total,
-                                'origen_info': 'Controlador'
-                            })
-
-                rutas_por_router[router_nombre] = rutas_data
-
-        self.tcp_server.broadcast_route_update(rutas_por_router)
-        print(f"✓ Rutas actualizadas enviadas a {len(rutas_por_router)} routers")
+        if not routers_conectados:
+            return
+
+        # Solo se envían los cambios respecto a la última tabla de cada router
+        tablas_por_router = self.construir_tablas_rutas(routers_conectados)
+        enviados = self.tcp_server.broadcast_route_update(tablas_por_router)
+        print(f"✓ Rutas actualizadas enviadas a {enviados} routers")
+
+    def construir_tablas_rutas(self, nombres_routers):
+        """
+        Construye la tabla de rutas que se envía a cada router
+
+        Los routers se cargan con una sola consulta para resolver las IPs
+        de destino y next hop de todas las rutas. Cada ruta incluye en
+        'next_hops' todos sus siguientes saltos de igual costo con su peso,
+        y en 'respaldo' el next hop libre de bucles al que el router conmuta
+        si caen todos ellos (None si no hay alternativa).
+
+        Args:
+            nombres_routers: Nombres de los routers
+
+        Returns:
+            Diccionario {router_nombre: {ip_destino: ruta}}
+        """
+        routers = self.router_dao.obtener_todos()
+        routers_por_id = {router.id_router: router for router in routers}
+        routers_por_nombre = {router.nombre: router for router in routers}
+
+        tablas = {}
+        for router_nombre in nombres_routers:
+            router = routers_por_nombre.get(router_nombre)
+            if not router:
+                continue
+
+            respaldos = {}
+            if FAST_REROUTE_CONFIG['habilitado']:
+                respaldos = self.fast_reroute.respaldos_desde(router.id_router)
+
+            tabla = {}
+            for ruta in self.listar_rutas_desde(router.id_router):
+                next_hop_id = ruta.siguiente_salto
+                router_destino = routers_por_id.get(ruta.router_destino)
+                next_hop_router = routers_por_id.get(next_hop_id)
+
+                if router_destino and next_hop_router:
+                    # Conjunto ECMP: cada siguiente salto con su interfaz y peso
+                    next_hops = [
+                        {
+                            'next_hop': routers_por_id[salto].ip,
+                            'interfaz_salida': f"eth_to_R{salto}",
+                            'peso': peso
+                        }
+                        for salto, peso in ruta.siguientes_saltos
+                        if salto in routers_por_id
+                    ]
+                    tabla[router_destino.ip] = {
+                        'destino': router_destino.ip,
+                        'next_hop': next_hop_router.ip,
+                        'interfaz_salida': f"eth_to_R{next_hop_id}",
+                        'costo': float(ruta.costo_total),
+                        'origen_info': 'Controlador',
+                        'next_hops': next_hops,
+                        'respaldo': self._respaldo_ruta(respaldos.get(ruta.router_destino), routers_por_id)
+                    }
+
+            tablas[router_nombre] = tabla
+
+        return tablas
+
+    @staticmethod
+    def _respaldo_ruta(respaldo, routers_por_id):
+        """Convierte un respaldo LFA (vecino, costo, protege_nodo) en su entrada de la tabla"""
+        if respaldo is None or respaldo[0] not in routers_por_id:
+            return None
+
+        vecino, costo, protege_nodo = respaldo
+        return {
+            'next_hop': routers_por_id[vecino].ip,
+            'interfaz_salida': f"eth_to_R{vecino}",
+            'costo': float(costo),
+            'protege_nodo': protege_nodo
+        }
 
     def obtener_router_por_nombre(self, nombre):
         return self.router_dao.obtener_por_nombre(nombre)
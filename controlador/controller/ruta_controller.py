@@ -1,33 +1,57 @@
 from controlador.dao.ruta_dao import RutaDAO
 from controlador.dao.router_dao import RouterDAO
 from controlador.services.network_graph import NetworkGraph
+from controlador.services.matrix_engine import MatrixEngine
 
 class RutaController:
     def __init__(self):
         self.ruta_dao = RutaDAO()
         self.router_dao = RouterDAO()
         self.network_graph = NetworkGraph()  # ← CAMBIADO
+        self.matrix_engine = MatrixEngine(self.network_graph)
 
-    def obtener_ruta_optima(self, origen, destino):
+    def obtener_ruta_optima(self, origen, destino, metrica='costo', retardo_max=None,
+                            ancho_banda_min=None):
         """
-        Obtiene la ruta óptima entre dos routers usando NetworkX
+        Obtiene la ruta óptima entre dos routers
 
         Args:
             origen: ID del router origen
             destino: ID del router destino
+            metrica: 'costo', 'retardo' o 'ancho_banda'
+            retardo_max: Retardo total máximo en ms (None = sin límite)
+            ancho_banda_min: Ancho de banda mínimo de cada enlace (None = sin límite)
 
         Returns:
             Diccionario con información de la ruta
         """
-        camino, costo = self.network_graph.calcular_ruta(origen, destino)
+        camino, costo = self.network_graph.calcular_ruta(
+            origen, destino, metrica, retardo_max, ancho_banda_min
+        )
 
         if camino is None:
             return None
 
-        # Obtener información de los routers en el camino
+        return self._armar_ruta(origen, destino, camino, costo)
+
+    def _armar_ruta(self, origen, destino, camino, costo):
+        """
+        Arma el diccionario de una ruta con la información de sus routers
+
+        Args:
+            origen: ID del router origen
+            destino: ID del router destino
+            camino: Lista de IDs de routers
+            costo: Costo total del camino
+
+        Returns:
+            Diccionario con información de la ruta
+        """
+        # Obtener información de los routers en el camino (una sola consulta)
+        routers = self.router_dao.obtener_por_ids(camino)
         routers_en_camino = []
         for router_id in camino:
-            router = self.router_dao.obtener_por_id(router_id)
+            router = routers.get(router_id)
             if router:
                 routers_en_camino.append({
                     'id': router.id_router,
@@ -45,26 +69,34 @@ class RutaController:
             'routers': routers_en_camino
         }
 
-    def obtener_rutas_alternativas(self, origen, destino, max_alternativas=3):
+    def obtener_rutas_alternativas(self, origen, destino, max_alternativas=3, modo='simple'):
         """
-        Busca rutas alternativas entre dos routers usando NetworkX
+        Busca rutas alternativas entre dos routers
 
         Args:
             origen: ID del router origen
             destino: ID del router destino
             max_alternativas: Número máximo de rutas alternativas
+            modo: 'simple', 'aristas_disjuntas' o 'nodos_disjuntos'
 
         Returns:
             Lista de rutas alternativas
         """
-        rutas_alt = self.network_graph.calcular_rutas_alternativas(origen, destino, max_alternativas)
+        rutas_alt = self.network_graph.calcular_rutas_alternativas(
+            origen, destino, max_alternativas, modo
+        )
+
+        # Los routers de todas las rutas se cargan en una sola consulta
+        routers = self.router_dao.mapa(
+            router_id for camino, _ in rutas_alt for router_id in camino
+        )
 
         resultado = []
         for i, (camino, costo) in enumerate(rutas_alt, 1):
             # Obtener información de routers
             routers_en_camino = []
             for router_id in camino:
-                router = self.router_dao.obtener_por_id(router_id)
+                router = routers.obtener(router_id)
                 if router:
                     routers_en_camino.append({
                         'id': router.id_router,
@@ -95,7 +127,15 @@ class RutaController:
         Returns:
             Diccionario con comparación
         """
-        ruta = self.obtener_ruta_optima(origen, destino)
+        # Con el motor matricial el costo y el camino salen de las matrices
+        # de todos los pares, sin ejecutar Dijkstra por consulta
+        camino, costo = self.matrix_engine.camino(origen, destino)
+        if camino is not None:
+            ruta = self._armar_ruta(origen, destino, camino, costo)
+        elif self.matrix_engine.disponible:
+            return None
+        else:
+            ruta = self.obtener_ruta_optima(origen, destino)
 
         if not ruta:
             return None
@@ -120,23 +160,26 @@ class RutaController:
             Lista con entradas de tabla de enrutamiento
         """
         rutas = self.ruta_dao.obtener_rutas_desde(id_router)
+        routers = self.router_dao.mapa(
+            router_id for ruta in rutas
+            for router_id in (ruta.router_destino, ruta.siguiente_salto)
+        )
 
         tabla = []
         for ruta in rutas:
-            # Obtener el siguiente salto (primer router después del origen)
-            camino_list = ruta.obtener_saltos()
+            # Siguiente salto precalculado (primer router después del origen)
+            siguiente_salto = ruta.siguiente_salto
 
-            if len(camino_list) > 1:
-                siguiente_salto = camino_list[1]
-                router_destino = self.router_dao.obtener_por_id(ruta.router_destino)
-                router_salto = self.router_dao.obtener_por_id(siguiente_salto)
+            if siguiente_salto is not None:
+                router_destino = routers.obtener(ruta.router_destino)
+                router_salto = routers.obtener(siguiente_salto)
 
                 if router_destino and router_salto:
                     tabla.append({
                         'destino': f"{router_destino.nombre} ({router_destino.ip})",
                         'next_hop': f"{router_salto.nombre} ({router_salto.ip})",
                         'costo': ruta.costo_total,
-                        'saltos': ruta.numero_saltos()
+                        'saltos': ruta.numero_saltos
                     })
 
         return tabla
@@ -155,21 +198,24 @@ class RutaController:
             return []
 
         # Obtener total de pares de rutas posibles
-        self.network_graph.construir_grafo()
-        num_nodos = self.network_graph.grafo.number_of_nodes()
+        num_nodos = self.network_graph.construir_csr().number_of_nodes()
         total_pares = num_nodos * (num_nodos - 1) if num_nodos > 1 else 1
 
         # Formatear resultado
+        mas_usados = list(edge_centrality.items())[:10]  # Top 10
+        routers = self.router_dao.mapa(r for enlace, _ in mas_usados for r in enlace)
+
         resultado = []
-        for (r1, r2), centralidad in list(edge_centrality.items())[:10]:  # Top 10
-            router1 = self.router_dao.obtener_por_id(r1)
-            router2 = self.router_dao.obtener_por_id(r2)
+        for (r1, r2), centralidad in mas_usados:
+            router1 = routers.obtener(r1)
+            router2 = routers.obtener(r2)
 
             if router1 and router2:
                 resultado.append({
                     'router1': router1.nombre,
                     'router2': router2.nombre,
                     'centralidad': centralidad,
+                    'uso': round(centralidad * total_pares),
                     'porcentaje': (centralidad * 100)
                 })
 
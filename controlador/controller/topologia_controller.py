@@ -1,12 +1,14 @@
 from controlador.dao.router_dao import RouterDAO
 from controlador.dao.enlace_dao import EnlaceDAO
 from controlador.services.network_graph import NetworkGraph
+from controlador.services.matrix_engine import MatrixEngine
 
 class TopologiaController:
     def __init__(self):
         self.router_dao = RouterDAO()
         self.enlace_dao = EnlaceDAO()
         self.network_graph = NetworkGraph()  # ← CAMBIADO
+        self.matrix_engine = MatrixEngine(self.network_graph)
 
     def obtener_topologia_completa(self):
         routers = self.router_dao.obtener_todos()
@@ -19,10 +21,11 @@ class TopologiaController:
 
     def obtener_vecinos_router(self, id_router):
         vecinos_data = self.enlace_dao.obtener_vecinos(id_router)
+        routers = self.router_dao.obtener_por_ids(vecino_id for vecino_id, _, _ in vecinos_data)
 
         vecinos = []
         for vecino_id, costo, enlace_id in vecinos_data:
-            router_vecino = self.router_dao.obtener_por_id(vecino_id)
+            router_vecino = routers.get(vecino_id)
             if router_vecino:
                 vecinos.append({
                     'id': vecino_id,
@@ -36,33 +39,58 @@ class TopologiaController:
 
     def obtener_matriz_adyacencia(self):
         """
-        Genera la matriz de adyacencia de la red usando NetworkX
+        Genera la matriz de adyacencia de la red
+
+        Usa el motor matricial (CSR de SciPy) si está disponible; si no,
+        la construye desde el grafo compacto.
 
         Returns:
-            Diccionario con la matriz
+            Diccionario con 'router_ids', 'indice' (ID -> posición) y
+            'matriz' (matriz[i][j] = costo directo, 0 en la diagonal, inf sin enlace)
         """
-        self.network_graph.construir_grafo()
-        grafo = self.network_graph.grafo
-
-        router_ids = list(grafo.nodes())
-
-        # Inicializar matriz con infinito
-        matriz = {}
-        for i in router_ids:
-            matriz[i] = {}
-            for j in router_ids:
-                if i == j:
-                    matriz[i][j] = 0
-                elif grafo.has_edge(i, j):
-                    matriz[i][j] = grafo[i][j]['weight']
-                else:
-                    matriz[i][j] = float('inf')
+        resultado = self.matrix_engine.matriz_adyacencia()
+        if resultado is not None:
+            ids, matriz = resultado
+            router_ids = ids.tolist()
+        else:
+            grafo = self.network_graph.construir_csr()
+            router_ids = grafo.nodes
+
+            matriz = []
+            for i in router_ids:
+                fila = [float('inf')] * len(router_ids)
+                for j, costo in grafo.adyacencia_de(i):
+                    fila[grafo.indice[j]] = costo
+                fila[grafo.indice[i]] = 0
+                matriz.append(fila)
 
         return {
             'router_ids': router_ids,
+            'indice': {router_id: i for i, router_id in enumerate(router_ids)},
             'matriz': matriz
         }
 
+    def obtener_matriz_distancias(self):
+        """
+        Calcula las matrices de distancias y siguiente salto de todos los pares
+
+        Returns:
+            Diccionario con 'router_ids', 'indice', 'distancias'
+            (costo mínimo, inf si no hay camino) y 'siguiente_salto'
+            (ID del vecino, -1 si no hay camino), o None si NumPy/SciPy
+            no están disponibles
+        """
+        matrices = self.matrix_engine.matriz_distancias()
+        if matrices is None:
+            return None
+
+        return {
+            'router_ids': matrices['ids'].tolist(),
+            'indice': matrices['indice'],
+            'distancias': matrices['distancias'],
+            'siguiente_salto': matrices['siguiente_salto']
+        }
+
     def obtener_grado_router(self, id_router):
         """
         Calcula el grado de un router (número de conexiones)
@@ -73,10 +101,9 @@ class TopologiaController:
         Returns:
             Número de enlaces del router
         """
-        self.network_graph.construir_grafo()
-        grafo = self.network_graph.grafo
+        grafo = self.network_graph.construir_csr()
 
-        if id_router in grafo.nodes:
+        if id_router in grafo:
             return grafo.degree(id_router)
         return 0
 
@@ -97,11 +124,12 @@ class TopologiaController:
             Lista de enlaces críticos con información
         """
         puentes = self.network_graph.encontrar_enlaces_criticos()
+        routers = self.router_dao.mapa(router for puente in puentes for router in puente)
 
         enlaces_criticos = []
         for (router1, router2) in puentes:
-            r1 = self.router_dao.obtener_por_id(router1)
-            r2 = self.router_dao.obtener_por_id(router2)
+            r1 = routers.obtener(router1)
+            r2 = routers.obtener(router2)
 
             if r1 and r2:
                 enlaces_criticos.append({
@@ -134,9 +162,13 @@ class TopologiaController:
 
         # Verificar enlaces con routers inactivos
         enlaces = self.enlace_dao.obtener_activos()
+        extremos = self.router_dao.mapa(
+            router for enlace in enlaces
+            for router in (enlace.router_origen, enlace.router_destino)
+        )
         for enlace in enlaces:
-            router_origen = self.router_dao.obtener_por_id(enlace.router_origen)
-            router_destino = self.router_dao.obtener_por_id(enlace.router_destino)
+            router_origen = extremos.obtener(enlace.router_origen)
+            router_destino = extremos.obtener(enlace.router_destino)
 
             if not router_origen or router_origen.estado != 'Activo':
                 errores.append(f"Enlace {enlace.id_enlace} tiene router origen inactivo")
@@ -171,4 +203,16 @@ class TopologiaController:
         Returns:
             Diccionario con métricas de centralidad
         """
-        return self.network_graph.calcular_centralidad()
\ No newline at end of file
+        return self.network_graph.calcular_centralidad()
+
+    def simular_fallos(self, combinaciones=None):
+        """
+        Simula la caída de cada enlace y cada router de la red
+
+        Args:
+            combinaciones: Fallos simultáneos adicionales (opcional)
+
+        Returns:
+            Lista de reportes por escenario, de mayor a menor impacto
+        """
+        return self.network_graph.simular_fallos(combinaciones=combinaciones)
\ No newline at end of file
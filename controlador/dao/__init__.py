@@ -2,5 +2,6 @@ from .router_dao import RouterDAO
 from .enlace_dao import EnlaceDAO
 from .ruta_dao import RutaDAO
 from .log_controlador_dao import LogControladorDAO
+from .monitor_dao import MonitorDAO
 
-__all__ = ['RouterDAO', 'EnlaceDAO', 'RutaDAO', 'LogControladorDAO']
\ No newline at end of file
+__all__ = ['RouterDAO', 'EnlaceDAO', 'RutaDAO', 'LogControladorDAO', 'MonitorDAO']
\ No newline at end of file
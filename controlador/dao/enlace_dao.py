@@ -15,12 +15,9 @@ class EnlaceDAO:
                   enlace.ancho_banda, enlace.estado, enlace.retardo_ms)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            enlace_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                enlace_id = cursor.lastrowid
             print(f"✓ Enlace creado: R{enlace.router_origen} -> R{enlace.router_destino} (ID: {enlace_id})")
             return enlace_id
         except Exception as e:
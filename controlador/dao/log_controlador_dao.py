@@ -1,12 +1,41 @@
+import threading
 from controlador.config.database import Database
+from controlador.config.settings import LOG_ASINCRONO_CONFIG
 from controlador.model.log_controlador import LogControlador
+from shared.utils.batch_writer import BatchWriter
 
 class LogControladorDAO:
-    """Clase para acceso a datos de Log_Controlador"""
+    """
+    Clase para acceso a datos de Log_Controlador
+
+    registrar_evento no escribe en el hilo que llama: encola el evento en
+    un escritor asíncrono compartido por todas las instancias, que lo
+    inserta por lotes en segundo plano. Las consultas esperan antes a que
+    se escriban los eventos pendientes.
+    """
+
+    _escritor = None
+    _lock = threading.Lock()
 
     def __init__(self):
         self.db = Database()
 
+    @classmethod
+    def _obtener_escritor(cls):
+        """Crea el escritor asíncrono compartido la primera vez que se usa"""
+        with cls._lock:
+            if cls._escritor is None:
+                cls._escritor = BatchWriter(
+                    cls()._insertar_lote,
+                    capacidad=LOG_ASINCRONO_CONFIG['capacidad'],
+                    tamano_lote=LOG_ASINCRONO_CONFIG['tamano_lote'],
+                    intervalo=LOG_ASINCRONO_CONFIG['intervalo'],
+                    politica=LOG_ASINCRONO_CONFIG['politica'],
+                    timeout_bloqueo=LOG_ASINCRONO_CONFIG['timeout_bloqueo'],
+                    nombre='logs del controlador'
+                )
+            return cls._escritor
+
     def crear(self, log):
         """
         Crea un nuevo log en la base de datos
@@ -24,30 +53,74 @@ class LogControladorDAO:
         params = (log.evento, log.detalle, log.fecha_hora)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            log_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                log_id = cursor.lastrowid
             return log_id
         except Exception as e:
             print(f"✗ Error al crear log: {e}")
             return None
 
+    def _insertar_lote(self, logs):
+        """
+        Inserta varios logs en una transacción
+
+        Args:
+            logs: Lista de objetos LogControlador
+        """
+        query = """
+            INSERT INTO Log_Controlador (evento, detalle, fecha_hora)
+            VALUES (%s, %s, %s)
+        """
+        with self.db.transaccion() as cursor:
+            # executemany agrupa los INSERT en una sentencia multi-fila
+            cursor.executemany(query, [(log.evento, log.detalle, log.fecha_hora) for log in logs])
+
     def registrar_evento(self, evento, detalle=None):
         """
         Método simplificado para registrar un evento
 
+        La fecha se toma al registrarlo; la inserción la hace el escritor
+        asíncrono (o se hace en el momento si está deshabilitado).
+
         Args:
             evento: Descripción del evento
             detalle: Detalles adicionales del evento
 
         Returns:
-            ID del log creado
+            True si el evento se encoló (o se insertó), False si se descartó
         """
         log = LogControlador(evento=evento, detalle=detalle)
-        return self.crear(log)
+        if not LOG_ASINCRONO_CONFIG['habilitado']:
+            return self.crear(log) is not None
+        return self._obtener_escritor().encolar(log)
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se escriban los eventos registrados hasta ahora
+
+        Se llama al cerrar el sistema y antes de cada consulta.
+
+        Args:
+            timeout: Segundos de espera como máximo (None = sin límite)
+
+        Returns:
+            True si no quedaron eventos pendientes
+        """
+        escritor = LogControladorDAO._escritor
+        return escritor.flush(timeout) if escritor else True
+
+    def obtener_estadisticas_escritor(self):
+        """
+        Contadores del escritor asíncrono
+
+        Returns:
+            Diccionario con 'pendientes', 'escritos', 'descartados' y 'errores'
+        """
+        escritor = LogControladorDAO._escritor
+        if escritor is None:
+            return {'pendientes': 0, 'escritos': 0, 'descartados': 0, 'errores': 0}
+        return escritor.estadisticas()
 
     def obtener_por_id(self, id_log):
         """
@@ -59,6 +132,7 @@ class LogControladorDAO:
         Returns:
             Objeto LogControlador o None
         """
+        self.flush()
         query = "SELECT * FROM Log_Controlador WHERE id_log = %s"
         result = self.db.fetch_one(query, (id_log,))
         return LogControlador.from_tuple(result)
@@ -73,6 +147,7 @@ class LogControladorDAO:
         Returns:
             Lista de objetos LogControlador
         """
+        self.flush()
         query = """
             SELECT * FROM Log_Controlador 
             ORDER BY fecha_hora DESC 
@@ -92,6 +167,7 @@ class LogControladorDAO:
         Returns:
             Lista de objetos LogControlador
         """
+        self.flush()
         query = """
             SELECT * FROM Log_Controlador 
             WHERE evento LIKE %s
@@ -112,6 +188,7 @@ class LogControladorDAO:
         Returns:
             Lista de objetos LogControlador
         """
+        self.flush()
         query = """
             SELECT * FROM Log_Controlador 
             WHERE fecha_hora BETWEEN %s AND %s
@@ -130,9 +207,10 @@ class LogControladorDAO:
         Returns:
             Lista de objetos LogControlador
         """
-        query = """
+        self.flush()
+        query = f"""
             SELECT * FROM Log_Controlador 
-            WHERE fecha_hora >= DATE_SUB(NOW(), INTERVAL %s MINUTE)
+            WHERE fecha_hora >= {self.db.backend.hace('MINUTE')}
             ORDER BY fecha_hora DESC
         """
         results = self.db.fetch_all(query, (minutos,))
@@ -161,17 +239,15 @@ class LogControladorDAO:
         Returns:
             Número de logs eliminados
         """
-        query = """
+        self.flush()
+        query = f"""
             DELETE FROM Log_Controlador 
-            WHERE fecha_hora < DATE_SUB(NOW(), INTERVAL %s DAY)
+            WHERE fecha_hora < {self.db.backend.hace('DAY')}
         """
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, (dias,))
-            connection.commit()
-            filas_eliminadas = cursor.rowcount
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, (dias,))
+                filas_eliminadas = cursor.rowcount
             print(f"✓ {filas_eliminadas} logs antiguos eliminados")
             return filas_eliminadas
         except Exception as e:
@@ -185,6 +261,7 @@ class LogControladorDAO:
         Returns:
             Número de logs
         """
+        self.flush()
         query = "SELECT COUNT(*) FROM Log_Controlador"
         result = self.db.fetch_one(query)
         return result[0] if result else 0
@@ -196,6 +273,7 @@ class LogControladorDAO:
         Returns:
             Diccionario con estadísticas
         """
+        self.flush()
         query = """
             SELECT 
                 evento,
@@ -0,0 +1,99 @@
+from controlador.config.database import Database
+from controlador.model.router import Router
+
+
+class MonitorDAO:
+    """
+    Consultas agregadas para el monitoreo de la red
+
+    Cada método resuelve en una sola consulta (GROUP BY, JOIN y funciones
+    de agregación en SQL) lo que antes requería recorrer routers y enlaces
+    uno a uno.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def obtener_conteos(self):
+        """
+        Cuenta routers y enlaces por estado, rutas, y agrega las métricas
+        de los enlaces, todo en una consulta
+
+        Returns:
+            Diccionario con 'routers' ({estado: total}), 'enlaces'
+            ({estado: total}), 'rutas' (total) y 'metricas_enlaces'
+            ({estado: (costo_promedio, costo_minimo, costo_maximo,
+            ancho_banda_promedio, retardo_promedio)})
+        """
+        query = """
+            SELECT 'Router', estado, COUNT(*), NULL, NULL, NULL, NULL, NULL
+            FROM Router
+            GROUP BY estado
+            UNION ALL
+            SELECT 'Enlace', estado, COUNT(*), AVG(costo), MIN(costo), MAX(costo),
+                   AVG(NULLIF(ancho_banda, 0)), AVG(NULLIF(retardo_ms, 0))
+            FROM Enlace
+            GROUP BY estado
+            UNION ALL
+            SELECT 'Ruta', NULL, COUNT(*), NULL, NULL, NULL, NULL, NULL
+            FROM Ruta
+        """
+        conteos = {'routers': {}, 'enlaces': {}, 'rutas': 0, 'metricas_enlaces': {}}
+
+        for tabla, estado, total, *metricas in self.db.fetch_all(query):
+            if tabla == 'Router':
+                conteos['routers'][estado] = total
+            elif tabla == 'Enlace':
+                conteos['enlaces'][estado] = total
+                conteos['metricas_enlaces'][estado] = tuple(metricas)
+            else:
+                conteos['rutas'] = total
+
+        return conteos
+
+    def obtener_routers_con_enlaces(self):
+        """
+        Obtiene todos los routers con su número de enlaces totales y activos
+
+        Returns:
+            Lista de tuplas (Router, total_enlaces, enlaces_activos)
+        """
+        # Cada enlace cuenta para sus dos extremos (una vez si es un bucle)
+        query = """
+            SELECT r.id_router, r.nombre, r.ip, r.estado, r.ultima_actualizacion,
+                   COUNT(e.id_enlace),
+                   COALESCE(SUM(CASE WHEN e.estado = 'Activo' THEN 1 ELSE 0 END), 0)
+            FROM Router r
+            LEFT JOIN (
+                SELECT router_origen AS id_router, id_enlace, estado FROM Enlace
+                UNION ALL
+                SELECT router_destino, id_enlace, estado FROM Enlace
+                WHERE router_destino <> router_origen
+            ) e ON e.id_router = r.id_router
+            GROUP BY r.id_router, r.nombre, r.ip, r.estado, r.ultima_actualizacion
+            ORDER BY r.id_router
+        """
+        return [
+            (Router.from_tuple(row[:5]), row[5], row[6])
+            for row in self.db.fetch_all(query)
+        ]
+
+    def obtener_enlaces_con_routers(self):
+        """
+        Obtiene todos los enlaces con los nombres de sus routers
+
+        Returns:
+            Lista de tuplas (id_enlace, router_origen, router_destino,
+            nombre_origen, nombre_destino, costo, ancho_banda, estado,
+            retardo_ms); los nombres son None si el router no existe
+        """
+        query = """
+            SELECT e.id_enlace, e.router_origen, e.router_destino,
+                   ro.nombre, rd.nombre,
+                   e.costo, e.ancho_banda, e.estado, e.retardo_ms
+            FROM Enlace e
+            LEFT JOIN Router ro ON ro.id_router = e.router_origen
+            LEFT JOIN Router rd ON rd.id_router = e.router_destino
+            ORDER BY e.id_enlace
+        """
+        return self.db.fetch_all(query)
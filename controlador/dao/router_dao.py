@@ -1,6 +1,59 @@
 from controlador.config.database import Database
 from controlador.model.router import Router
 
+# IDs por consulta IN (...), por debajo del límite de parámetros de SQLite
+MAX_IDS_POR_CONSULTA = 500
+
+
+class MapaRouters:
+    """
+    Mapa de identidad de routers para una operación
+
+    Resuelve IDs de routers cargando de una vez, con obtener_por_ids, todos
+    los que aún no conoce. Cada router se consulta como máximo una vez
+    durante la vida del mapa (también los IDs que no existen), y el mismo
+    ID devuelve siempre el mismo objeto. Se crea por operación y se
+    descarta al terminarla, así que no hay que invalidarlo.
+    """
+
+    def __init__(self, router_dao, ids=()):
+        self.router_dao = router_dao
+        self._routers = {}
+        self._inexistentes = set()
+        self.cargar(ids)
+
+    def cargar(self, ids):
+        """
+        Carga en una sola consulta los routers que todavía no están en el mapa
+
+        Args:
+            ids: IDs de routers (se ignoran None y repetidos)
+        """
+        pendientes = {
+            id_router for id_router in ids
+            if id_router is not None
+            and id_router not in self._routers
+            and id_router not in self._inexistentes
+        }
+        if not pendientes:
+            return
+
+        encontrados = self.router_dao.obtener_por_ids(pendientes)
+        self._routers.update(encontrados)
+        self._inexistentes.update(pendientes - encontrados.keys())
+
+    def obtener(self, id_router):
+        """
+        Obtiene un router del mapa (lo consulta si no se cargó antes)
+
+        Returns:
+            Objeto Router o None si no existe
+        """
+        if id_router not in self._routers:
+            self.cargar((id_router,))
+        return self._routers.get(id_router)
+
+
 class RouterDAO:
     def __init__(self):
         self.db = Database()
@@ -12,12 +65,9 @@ class RouterDAO:
         params = (router.nombre, router.ip, router.estado, router.ultima_actualizacion)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            router_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                router_id = cursor.lastrowid
             print(f"✓ Router '{router.nombre}' creado con ID: {router_id}")
             return router_id
         except Exception as e:
@@ -30,6 +80,41 @@ class RouterDAO:
         result = self.db.fetch_one(query, (id_router,))
         return Router.from_tuple(result)
 
+    def obtener_por_ids(self, ids):
+        """
+        Obtiene varios routers con una consulta IN (...)
+
+        Args:
+            ids: IDs de routers
+
+        Returns:
+            Diccionario {id_router: Router} con los routers existentes
+        """
+        ids = [id_router for id_router in dict.fromkeys(ids) if id_router is not None]
+        routers = {}
+
+        for inicio in range(0, len(ids), MAX_IDS_POR_CONSULTA):
+            lote = ids[inicio:inicio + MAX_IDS_POR_CONSULTA]
+            marcadores = ", ".join(["%s"] * len(lote))
+            query = f"SELECT * FROM Router WHERE id_router IN ({marcadores})"
+            for row in self.db.fetch_all(query, tuple(lote)):
+                router = Router.from_tuple(row)
+                routers[router.id_router] = router
+
+        return routers
+
+    def mapa(self, ids=()):
+        """
+        Crea un mapa de identidad para resolver routers durante una operación
+
+        Args:
+            ids: IDs a precargar en una sola consulta
+
+        Returns:
+            MapaRouters
+        """
+        return MapaRouters(self, ids)
+
     def obtener_por_nombre(self, nombre):
 
         query = "SELECT * FROM Router WHERE nombre = %s"
@@ -92,9 +177,9 @@ class RouterDAO:
         Returns:
             True si el cambio fue exitoso
         """
-        query = """
+        query = f"""
             UPDATE Router 
-            SET estado = %s, ultima_actualizacion = NOW()
+            SET estado = %s, ultima_actualizacion = {self.db.backend.ahora()}
             WHERE id_router = %s
         """
         if self.db.execute_query(query, (nuevo_estado, id_router)):
@@ -1,5 +1,9 @@
 from controlador.config.database import Database
 from controlador.model.ruta import Ruta
+from controlador.config.settings import RUTAS_CONFIG
+
+# Columnas por nombre, en el orden de Ruta.COLUMNAS
+_COLUMNAS = ", ".join(Ruta.COLUMNAS)
 
 class RutaDAO:
     """Clase para acceso a datos de Ruta"""
@@ -19,25 +23,135 @@ class RutaDAO:
         """
         query = """
             INSERT INTO Ruta (router_origen, router_destino, camino, 
-                            costo_total, fecha_calculo)
-            VALUES (%s, %s, %s, %s, %s)
+                            costo_total, fecha_calculo, siguiente_salto,
+                            numero_saltos, siguientes_saltos)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
-        params = (ruta.router_origen, ruta.router_destino, ruta.camino,
-                  ruta.costo_total, ruta.fecha_calculo)
+        params = (ruta.router_origen, ruta.router_destino, ruta.camino_empaquetado,
+                  ruta.costo_total, ruta.fecha_calculo, ruta.siguiente_salto,
+                  ruta.numero_saltos, ruta.saltos_empaquetados)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            ruta_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                ruta_id = cursor.lastrowid
             print(f"✓ Ruta creada: R{ruta.router_origen} -> R{ruta.router_destino} (ID: {ruta_id})")
             return ruta_id
         except Exception as e:
             print(f"✗ Error al crear ruta: {e}")
             return None
 
+    def _insertar_lotes(self, cursor, rutas, tamano_lote=None):
+        """
+        Inserta rutas en bloques con INSERT multi-fila (sin confirmar)
+
+        Args:
+            cursor: Cursor dentro de la transacción activa
+            rutas: Lista de objetos Ruta
+            tamano_lote: Filas por bloque (None = configuración)
+
+        Returns:
+            Número de rutas insertadas
+        """
+        tamano_lote = tamano_lote or RUTAS_CONFIG['tamano_lote']
+        query = """
+            INSERT INTO Ruta (router_origen, router_destino, camino,
+                            costo_total, fecha_calculo, siguiente_salto,
+                            numero_saltos, siguientes_saltos)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+
+        insertadas = 0
+        for inicio in range(0, len(rutas), tamano_lote):
+            lote = rutas[inicio:inicio + tamano_lote]
+            params = [
+                (ruta.router_origen, ruta.router_destino, ruta.camino_empaquetado,
+                 ruta.costo_total, ruta.fecha_calculo, ruta.siguiente_salto,
+                 ruta.numero_saltos, ruta.saltos_empaquetados)
+                for ruta in lote
+            ]
+            # executemany agrupa los INSERT en una sentencia multi-fila
+            cursor.executemany(query, params)
+            insertadas += len(lote)
+
+        return insertadas
+
+    def _reemplazar(self, query_borrado, params_borrado, rutas, tamano_lote):
+        """Borra e inserta rutas dentro de una única transacción"""
+        try:
+            with self.db.transaccion() as cursor:
+                cursor.execute(query_borrado, params_borrado)
+                insertadas = self._insertar_lotes(cursor, rutas, tamano_lote)
+            return insertadas
+        except Exception as e:
+            print(f"✗ Error al reemplazar rutas: {e}")
+            return 0
+
+    def reemplazar_todas(self, rutas, tamano_lote=None):
+        """
+        Reemplaza toda la tabla Ruta en una sola transacción
+
+        Args:
+            rutas: Lista de objetos Ruta nuevos
+            tamano_lote: Filas por INSERT multi-fila (None = configuración)
+
+        Returns:
+            Número de rutas insertadas (0 si la transacción falla)
+        """
+        insertadas = self._reemplazar("DELETE FROM Ruta", (), rutas, tamano_lote)
+        if insertadas:
+            print(f"✓ Tabla de rutas reemplazada: {insertadas} rutas")
+        return insertadas
+
+    def reemplazar_rutas_desde(self, router_origen, rutas, tamano_lote=None):
+        """
+        Reemplaza las rutas de un router origen en una sola transacción
+
+        Args:
+            router_origen: ID del router origen
+            rutas: Lista de objetos Ruta nuevos para ese origen
+            tamano_lote: Filas por INSERT multi-fila (None = configuración)
+
+        Returns:
+            Número de rutas insertadas (0 si la transacción falla)
+        """
+        insertadas = self._reemplazar(
+            "DELETE FROM Ruta WHERE router_origen = %s",
+            (router_origen,), rutas, tamano_lote
+        )
+        if insertadas:
+            print(f"✓ {insertadas} rutas reemplazadas para router R{router_origen}")
+        return insertadas
+
+    def aplicar_cambios(self, rutas, eliminadas, tamano_lote=None):
+        """
+        Aplica un delta de rutas en una sola transacción
+
+        Args:
+            rutas: Lista de objetos Ruta nuevos o modificados
+            eliminadas: Lista de pares (router_origen, router_destino) a borrar
+            tamano_lote: Filas por sentencia (None = configuración)
+
+        Returns:
+            True si la transacción se confirmó
+        """
+        tamano_lote = tamano_lote or RUTAS_CONFIG['tamano_lote']
+        query_borrado = """
+            DELETE FROM Ruta
+            WHERE router_origen = %s AND router_destino = %s
+        """
+        pares = [(r.router_origen, r.router_destino) for r in rutas] + list(eliminadas)
+
+        try:
+            with self.db.transaccion() as cursor:
+                for inicio in range(0, len(pares), tamano_lote):
+                    cursor.executemany(query_borrado, pares[inicio:inicio + tamano_lote])
+                self._insertar_lotes(cursor, rutas, tamano_lote)
+            return True
+        except Exception as e:
+            print(f"✗ Error al aplicar cambios de rutas: {e}")
+            return False
+
     def obtener_por_id(self, id_ruta):
         """
         Obtiene una ruta por su ID
@@ -48,7 +162,7 @@ class RutaDAO:
         Returns:
             Objeto Ruta o None
         """
-        query = "SELECT * FROM Ruta WHERE id_ruta = %s"
+        query = f"SELECT {_COLUMNAS} FROM Ruta WHERE id_ruta = %s"
         result = self.db.fetch_one(query, (id_ruta,))
         return Ruta.from_tuple(result)
 
@@ -59,7 +173,7 @@ class RutaDAO:
         Returns:
             Lista de objetos Ruta
         """
-        query = "SELECT * FROM Ruta ORDER BY fecha_calculo DESC"
+        query = f"SELECT {_COLUMNAS} FROM Ruta ORDER BY fecha_calculo DESC"
         results = self.db.fetch_all(query)
         return [Ruta.from_tuple(row) for row in results]
 
@@ -74,8 +188,8 @@ class RutaDAO:
         Returns:
             Objeto Ruta o None
         """
-        query = """
-            SELECT * FROM Ruta 
+        query = f"""
+            SELECT {_COLUMNAS} FROM Ruta
             WHERE router_origen = %s AND router_destino = %s
             ORDER BY fecha_calculo DESC
             LIMIT 1
@@ -93,8 +207,8 @@ class RutaDAO:
         Returns:
             Lista de objetos Ruta
         """
-        query = """
-            SELECT * FROM Ruta 
+        query = f"""
+            SELECT {_COLUMNAS} FROM Ruta
             WHERE router_origen = %s
             ORDER BY router_destino, fecha_calculo DESC
         """
@@ -111,8 +225,8 @@ class RutaDAO:
         Returns:
             Lista de objetos Ruta
         """
-        query = """
-            SELECT * FROM Ruta 
+        query = f"""
+            SELECT {_COLUMNAS} FROM Ruta
             WHERE router_destino = %s
             ORDER BY router_origen, fecha_calculo DESC
         """
@@ -132,11 +246,13 @@ class RutaDAO:
         query = """
             UPDATE Ruta 
             SET router_origen = %s, router_destino = %s, camino = %s,
-                costo_total = %s, fecha_calculo = %s
+                costo_total = %s, fecha_calculo = %s, siguiente_salto = %s,
+                numero_saltos = %s, siguientes_saltos = %s
             WHERE id_ruta = %s
         """
-        params = (ruta.router_origen, ruta.router_destino, ruta.camino,
-                  ruta.costo_total, ruta.fecha_calculo, ruta.id_ruta)
+        params = (ruta.router_origen, ruta.router_destino, ruta.camino_empaquetado,
+                  ruta.costo_total, ruta.fecha_calculo, ruta.siguiente_salto,
+                  ruta.numero_saltos, ruta.saltos_empaquetados, ruta.id_ruta)
 
         if self.db.execute_query(query, params):
             print(f"✓ Ruta ID {ruta.id_ruta} actualizada")
@@ -188,17 +304,14 @@ class RutaDAO:
         Returns:
             Número de rutas eliminadas
         """
-        query = """
+        query = f"""
             DELETE FROM Ruta 
-            WHERE fecha_calculo < DATE_SUB(NOW(), INTERVAL %s DAY)
+            WHERE fecha_calculo < {self.db.backend.hace('DAY')}
         """
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, (dias,))
-            connection.commit()
-            filas_eliminadas = cursor.rowcount
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, (dias,))
+                filas_eliminadas = cursor.rowcount
             print(f"✓ {filas_eliminadas} rutas antiguas eliminadas")
             return filas_eliminadas
         except Exception as e:
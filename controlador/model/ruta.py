@@ -1,19 +1,113 @@
+import struct
 from datetime import datetime
 
+
+def empaquetar_camino(camino):
+    """Empaqueta una lista de IDs de routers como enteros de 32 bits (little-endian)"""
+    return struct.pack(f'<{len(camino)}i', *camino)
+
+
+def desempaquetar_camino(datos):
+    """Convierte un camino empaquetado de vuelta en una lista de IDs"""
+    return list(struct.unpack(f'<{len(datos) // 4}i', datos))
+
+
+def empaquetar_saltos(saltos):
+    """Empaqueta pares (id_router, peso) como entero de 32 bits y double (little-endian)"""
+    return b''.join(struct.pack('<id', salto, peso) for salto, peso in saltos)
+
+
+def desempaquetar_saltos(datos):
+    """Convierte los siguientes saltos empaquetados en una lista de pares (id_router, peso)"""
+    return [tuple(par) for par in struct.iter_unpack('<id', datos)]
+
+
 class Ruta:
-    """Clase que representa una ruta calculada"""
+    """
+    Clase que representa una ruta calculada
+
+    El camino se guarda como lista de IDs de routers (en la BD, empaquetado
+    en un BLOB) junto con el siguiente salto y el número de saltos ya
+    calculados, de modo que la tabla de un router se arma sin recorrer el
+    camino. Las filas leídas de la BD solo desempaquetan el camino si se
+    consulta. El formato "R1->R3->R5" se genera únicamente para mostrarlo.
+
+    Con ECMP, 'siguientes_saltos' lista todos los siguientes saltos de
+    igual costo con el peso de cada uno; el del camino principal es
+    'siguiente_salto'.
+    """
+
+    # Columnas de Ruta en el orden que espera from_tuple
+    COLUMNAS = ('id_ruta', 'router_origen', 'router_destino', 'camino', 'costo_total',
+                'fecha_calculo', 'siguiente_salto', 'numero_saltos', 'siguientes_saltos')
 
     def __init__(self, id_ruta=None, router_origen=None, router_destino=None,
-                 camino=None, costo_total=0.0, fecha_calculo=None):
+                 camino=None, costo_total=0.0, fecha_calculo=None,
+                 siguiente_salto=None, numero_saltos=None, siguientes_saltos=None):
         self.id_ruta = id_ruta
         self.router_origen = router_origen
         self.router_destino = router_destino
-        self.camino = camino  # String con formato "R1->R3->R5"
+        self.camino = camino  # Lista de IDs [1, 3, 5] o camino empaquetado
         self.costo_total = costo_total
         self.fecha_calculo = fecha_calculo or datetime.now()
 
+        # Filas antiguas o rutas nuevas: se derivan del camino
+        if numero_saltos is None:
+            saltos = self.camino
+            numero_saltos = len(saltos) - 1 if saltos else 0
+            siguiente_salto = saltos[1] if len(saltos) > 1 else None
+        self.siguiente_salto = siguiente_salto
+        self.numero_saltos = numero_saltos
+
+        # Lista [(id_router, peso)]; filas antiguas: solo el salto principal
+        if isinstance(siguientes_saltos, (bytes, bytearray, memoryview)):
+            siguientes_saltos = desempaquetar_saltos(bytes(siguientes_saltos))
+        if not siguientes_saltos:
+            siguientes_saltos = [(siguiente_salto, 1.0)] if siguiente_salto is not None else []
+        self.siguientes_saltos = [(int(salto), float(peso)) for salto, peso in siguientes_saltos]
+
+    @property
+    def camino(self):
+        """Lista de IDs de routers del camino"""
+        if self._camino is None:
+            self._camino = desempaquetar_camino(self._camino_empaquetado) if self._camino_empaquetado else []
+        return self._camino
+
+    @camino.setter
+    def camino(self, valor):
+        self._camino = None
+        self._camino_empaquetado = None
+
+        if isinstance(valor, (bytes, bytearray, memoryview)):
+            self._camino_empaquetado = bytes(valor)
+        elif isinstance(valor, str):
+            # Formato de texto "R1->R3->R5" de las filas antiguas
+            self._camino = [int(r.replace('R', '')) for r in valor.split('->')] if valor else []
+        else:
+            self._camino = [int(nodo) for nodo in valor or ()]
+
+    @property
+    def camino_empaquetado(self):
+        """Camino como BLOB para la base de datos"""
+        if self._camino_empaquetado is None:
+            self._camino_empaquetado = empaquetar_camino(self._camino)
+        return self._camino_empaquetado
+
+    @property
+    def saltos_empaquetados(self):
+        """Siguientes saltos como BLOB para la base de datos"""
+        return empaquetar_saltos(self.siguientes_saltos)
+
+    def es_multicamino(self):
+        """Verifica si la ruta reparte el tráfico entre varios siguientes saltos"""
+        return len(self.siguientes_saltos) > 1
+
+    def camino_texto(self):
+        """Retorna el camino con el formato "R1->R3->R5" para mostrarlo"""
+        return "->".join(f"R{nodo}" for nodo in self.camino)
+
     def __str__(self):
-        return f"Ruta(R{self.router_origen} -> R{self.router_destino}, Camino: {self.camino}, Costo: {self.costo_total})"
+        return f"Ruta(R{self.router_origen} -> R{self.router_destino}, Camino: {self.camino_texto()}, Costo: {self.costo_total})"
 
     def __repr__(self):
         return self.__str__()
@@ -24,14 +118,17 @@ class Ruta:
             'id_ruta': self.id_ruta,
             'router_origen': self.router_origen,
             'router_destino': self.router_destino,
-            'camino': self.camino,
+            'camino': list(self.camino),
             'costo_total': self.costo_total,
-            'fecha_calculo': self.fecha_calculo
+            'fecha_calculo': self.fecha_calculo,
+            'siguiente_salto': self.siguiente_salto,
+            'numero_saltos': self.numero_saltos,
+            'siguientes_saltos': list(self.siguientes_saltos)
         }
 
     @staticmethod
     def from_tuple(data):
-        """Crea un objeto Ruta desde una tupla de BD"""
+        """Crea un objeto Ruta desde una tupla de BD con las COLUMNAS"""
         if data:
             return Ruta(
                 id_ruta=data[0],
@@ -39,17 +136,13 @@ class Ruta:
                 router_destino=data[2],
                 camino=data[3],
                 costo_total=data[4],
-                fecha_calculo=data[5]
+                fecha_calculo=data[5],
+                siguiente_salto=data[6],
+                numero_saltos=data[7],
+                siguientes_saltos=data[8]
             )
         return None
 
     def obtener_saltos(self):
         """Retorna lista de IDs de routers en el camino"""
-        if self.camino:
-            # Asume formato "R1->R3->R5"
-            return [int(r.replace('R', '')) for r in self.camino.split('->')]
-        return []
-
-    def numero_saltos(self):
-        """Retorna el número de saltos en la ruta"""
-        return len(self.obtener_saltos()) - 1
\ No newline at end of file
+        return list(self.camino)
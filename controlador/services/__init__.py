@@ -1,4 +1,16 @@
 from .network_graph import NetworkGraph
 from .network_monitor import NetworkMonitor
+from .topology_cache import TopologyCache
+from .spf_engine import SPFEngine
+from .incremental_spf import IncrementalSPF
+from .matrix_engine import MatrixEngine
+from .route_cache import RouteCache
+from .k_shortest_paths import KShortestPaths
+from .centrality_engine import CentralityEngine
+from .biconnectivity import BiconnectivityIndex
+from .csr_graph import CSRGraph
+from .constrained_routing import ConstrainedRouting
+from .fast_reroute import FastReroute
+from .failure_simulator import FailureSimulator
 
-__all__ = ['NetworkGraph', 'NetworkMonitor']
\ No newline at end of file
+__all__ = ['NetworkGraph', 'NetworkMonitor', 'TopologyCache', 'SPFEngine', 'IncrementalSPF', 'MatrixEngine', 'RouteCache', 'KShortestPaths', 'CentralityEngine', 'BiconnectivityIndex', 'CSRGraph', 'ConstrainedRouting', 'FastReroute', 'FailureSimulator']
\ No newline at end of file
@@ -0,0 +1,449 @@
+import threading
+from collections import deque
+
+
+def componentes_biconexas(adyacencia):
+    """
+    Componentes biconexas (bloques) de un grafo con el algoritmo de Tarjan
+
+    Versión iterativa con pila de aristas, sin límite de recursión.
+
+    Args:
+        adyacencia: Diccionario {nodo: iterable de vecinos}
+
+    Returns:
+        Lista de bloques; cada bloque es un conjunto de aristas frozenset({u, v})
+    """
+    descubierto = {}
+    bajo = {}
+    tiempo = 0
+    bloques = []
+
+    for raiz in adyacencia:
+        if raiz in descubierto:
+            continue
+
+        descubierto[raiz] = bajo[raiz] = tiempo
+        tiempo += 1
+        pila = [(raiz, None, iter(adyacencia[raiz]))]
+        pila_aristas = []
+
+        while pila:
+            u, padre, vecinos = pila[-1]
+            avanzo = False
+
+            for v in vecinos:
+                if v == padre:
+                    continue
+                if v not in descubierto:
+                    descubierto[v] = bajo[v] = tiempo
+                    tiempo += 1
+                    pila_aristas.append((u, v))
+                    pila.append((v, u, iter(adyacencia[v])))
+                    avanzo = True
+                    break
+                if descubierto[v] < descubierto[u]:
+                    # Arista de retroceso
+                    bajo[u] = min(bajo[u], descubierto[v])
+                    pila_aristas.append((u, v))
+
+            if avanzo:
+                continue
+
+            pila.pop()
+            if pila:
+                p = pila[-1][0]
+                bajo[p] = min(bajo[p], bajo[u])
+                if bajo[u] >= descubierto[p]:
+                    # p separa el subárbol de u: cerrar un bloque
+                    bloque = set()
+                    while True:
+                        arista = pila_aristas.pop()
+                        bloque.add(frozenset(arista))
+                        if arista == (p, u):
+                            break
+                    bloques.append(bloque)
+
+    return bloques
+
+
+class BiconnectivityIndex:
+    """
+    Índice dinámico de puntos de articulación y puentes (árbol de bloques)
+
+    Mantiene los bloques (componentes biconexas) de la topología y sus
+    componentes conexas. Un router es crítico si pertenece a dos o más
+    bloques y un enlace lo es si forma por sí solo un bloque, por lo que
+    ambas consultas son O(1). Cada cambio solo toca la parte afectada:
+
+    - Un enlace nuevo dentro de una componente fusiona los bloques del
+      camino entre sus extremos en el árbol de bloques; entre componentes
+      distintas las une con un puente.
+    - Un enlace que se quita recalcula solo su bloque; si era un puente,
+      la componente se divide y se informa la división.
+
+    Todas las instancias comparten el mismo índice (Singleton). Como el
+    SPF incremental, solo aplica cambios sobre la versión de topología
+    anterior; si no está sincronizado se debe recargar con cargar().
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Patrón Singleton para compartir el índice entre servicios"""
+        if cls._instance is None:
+            cls._instance = super(BiconnectivityIndex, cls).__new__(cls)
+            cls._instance._lock = threading.RLock()
+            cls._instance._reiniciar(None)
+        return cls._instance
+
+    def _reiniciar(self, version):
+        self.adyacencia = {}  # {nodo: set(vecinos)}
+        self.bloques = {}  # {id_bloque: set(aristas)}
+        self.nodos_bloque = {}  # {id_bloque: set(nodos)}
+        self.bloques_de = {}  # {nodo: set(id_bloque)}
+        self.bloque_de_arista = {}  # {arista: id_bloque}
+        self.componente_de = {}  # {nodo: id_componente}
+        self.componentes = {}  # {id_componente: set(nodos)}
+        self.articulaciones = set()
+        self.puentes = set()
+        self.version = version
+        self._siguiente_id = 0
+
+    def cargar(self, grafo, version):
+        """
+        Construye el índice completo a partir del grafo
+
+        Args:
+            grafo: CSRGraph (o networkx.Graph) con la topología activa
+            version: Versión de topología del grafo
+        """
+        with self._lock:
+            self._reiniciar(version)
+
+            for nodo in grafo.nodes:
+                self.adyacencia[nodo] = set(grafo.neighbors(nodo))
+                self.bloques_de[nodo] = set()
+
+            for nodo in self.adyacencia:
+                if nodo not in self.componente_de:
+                    self._registrar_componente(self._alcanzables(nodo))
+
+            for aristas in componentes_biconexas(self.adyacencia):
+                self._registrar_bloque(aristas)
+
+            self.articulaciones = {
+                nodo for nodo, bloques in self.bloques_de.items() if len(bloques) > 1
+            }
+
+    def esta_sincronizado(self, version):
+        """Indica si el índice corresponde a una versión de topología"""
+        return self.version is not None and self.version == version
+
+    def _puede_avanzar(self, version):
+        return self.version is not None and self.version == version - 1
+
+    def avanzar(self, version):
+        """
+        Avanza de versión sin cambios de conectividad
+
+        Returns:
+            Reporte vacío o None si el índice no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+            self.version = version
+            return self._reporte(set(self.articulaciones), set(self.puentes), [])
+
+    # ==================== CONSULTAS ====================
+
+    def es_router_critico(self, id_router):
+        """Indica si el router es un punto de articulación"""
+        return id_router in self.articulaciones
+
+    def es_enlace_critico(self, router_a, router_b):
+        """Indica si el enlace entre dos routers es un puente"""
+        return frozenset((router_a, router_b)) in self.puentes
+
+    def routers_criticos(self):
+        """Lista de IDs de routers que son puntos de articulación"""
+        with self._lock:
+            return sorted(self.articulaciones)
+
+    def enlaces_criticos(self):
+        """Lista de tuplas (router_a, router_b) de los puentes"""
+        with self._lock:
+            return sorted(tuple(sorted(arista)) for arista in self.puentes)
+
+    def mismo_componente(self, router_a, router_b):
+        """Indica si dos routers están conectados"""
+        componente = self.componente_de.get(router_a)
+        return componente is not None and componente == self.componente_de.get(router_b)
+
+    # ==================== CAMBIOS DE TOPOLOGÍA ====================
+
+    def cambiar_enlace(self, version, router_a, router_b, activo):
+        """
+        Aplica el alta o la baja de un enlace
+
+        Args:
+            version: Nueva versión de topología
+            router_a: ID de un extremo
+            router_b: ID del otro extremo
+            activo: True si el enlace queda activo
+
+        Returns:
+            Reporte de cambios o None si el índice no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+
+            articulaciones = set(self.articulaciones)
+            puentes = set(self.puentes)
+            divisiones = []
+
+            if router_a in self.adyacencia and router_b in self.adyacencia:
+                if activo and router_b not in self.adyacencia[router_a]:
+                    self._agregar_arista(router_a, router_b)
+                elif not activo and router_b in self.adyacencia[router_a]:
+                    division = self._quitar_arista(router_a, router_b)
+                    if division:
+                        divisiones.append(division)
+
+            self.version = version
+            return self._reporte(articulaciones, puentes, divisiones)
+
+    def cambiar_router(self, version, id_router, activo, vecinos=()):
+        """
+        Aplica la activación o desactivación de un router
+
+        Args:
+            version: Nueva versión de topología
+            id_router: ID del router
+            activo: True si el router pasa a estar activo
+            vecinos: IDs de los vecinos con enlace activo (solo al activar)
+
+        Returns:
+            Reporte de cambios o None si el índice no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+
+            articulaciones = set(self.articulaciones)
+            puentes = set(self.puentes)
+            divisiones = []
+
+            if activo and id_router not in self.adyacencia:
+                self.adyacencia[id_router] = set()
+                self.bloques_de[id_router] = set()
+                self._registrar_componente({id_router})
+                for vecino in vecinos:
+                    if vecino in self.adyacencia and vecino != id_router:
+                        self._agregar_arista(id_router, vecino)
+
+            elif not activo and id_router in self.adyacencia:
+                for vecino in list(self.adyacencia[id_router]):
+                    division = self._quitar_arista(id_router, vecino)
+                    if division:
+                        # El propio router no cuenta como parte dividida
+                        lados = [lado - {id_router} for lado in division]
+                        if all(lados):
+                            divisiones.append(lados)
+
+                del self.adyacencia[id_router]
+                del self.bloques_de[id_router]
+                componente = self.componente_de.pop(id_router)
+                del self.componentes[componente]
+
+            self.version = version
+            return self._reporte(articulaciones, puentes, divisiones)
+
+    # ==================== MANTENIMIENTO ====================
+
+    def _agregar_arista(self, a, b):
+        """Agrega un enlace y fusiona los bloques que pasan a formar un ciclo"""
+        self.adyacencia[a].add(b)
+        self.adyacencia[b].add(a)
+        arista = frozenset((a, b))
+
+        componente_a = self.componente_de[a]
+        componente_b = self.componente_de[b]
+        if componente_a != componente_b:
+            # Une dos componentes: el enlace es un puente
+            self._unir_componentes(componente_a, componente_b)
+            self._registrar_bloque({arista})
+            self._actualizar_articulaciones((a, b))
+            return
+
+        camino = self._camino_bloques(a, b)
+        aristas = {arista}
+        for id_bloque in camino:
+            aristas |= self._quitar_bloque(id_bloque)
+
+        id_bloque = self._registrar_bloque(aristas)
+        self._actualizar_articulaciones(self.nodos_bloque[id_bloque])
+
+    def _quitar_arista(self, a, b):
+        """
+        Quita un enlace y recalcula su bloque
+
+        Returns:
+            Tupla (nodos del lado de a, nodos del lado de b) si la componente
+            se dividió, o None
+        """
+        self.adyacencia[a].discard(b)
+        self.adyacencia[b].discard(a)
+        arista = frozenset((a, b))
+
+        id_bloque = self.bloque_de_arista[arista]
+        nodos = set(self.nodos_bloque[id_bloque])
+        aristas = self._quitar_bloque(id_bloque)
+        aristas.discard(arista)
+
+        division = None
+        if not aristas:
+            # Era un puente: la componente se divide
+            division = self._dividir_componente(a, b)
+        else:
+            subgrafo = {}
+            for u, v in aristas:
+                subgrafo.setdefault(u, []).append(v)
+                subgrafo.setdefault(v, []).append(u)
+            for bloque in componentes_biconexas(subgrafo):
+                self._registrar_bloque(bloque)
+
+        self._actualizar_articulaciones(nodos)
+        return division
+
+    def _camino_bloques(self, a, b):
+        """Bloques del camino entre a y b en el árbol de bloques"""
+        origenes = self.bloques_de[a]
+        for id_bloque in origenes:
+            if b in self.nodos_bloque[id_bloque]:
+                return [id_bloque]
+
+        previo = {id_bloque: None for id_bloque in origenes}
+        cola = deque(origenes)
+        while cola:
+            id_bloque = cola.popleft()
+            if b in self.nodos_bloque[id_bloque]:
+                camino = []
+                while id_bloque is not None:
+                    camino.append(id_bloque)
+                    id_bloque = previo[id_bloque]
+                return camino
+
+            # Los bloques vecinos comparten un punto de articulación
+            for nodo in self.nodos_bloque[id_bloque]:
+                if nodo not in self.articulaciones:
+                    continue
+                for siguiente in self.bloques_de[nodo]:
+                    if siguiente not in previo:
+                        previo[siguiente] = id_bloque
+                        cola.append(siguiente)
+
+        return []
+
+    def _dividir_componente(self, a, b):
+        """
+        Separa la componente de a y b tras quitar un puente
+
+        Recorre ambos lados a la vez y se detiene al agotar el menor, de
+        modo que el costo es proporcional al lado más pequeño.
+        """
+        lados = [{a}, {b}]
+        colas = [deque([a]), deque([b])]
+        menor = None
+        while menor is None:
+            for i in (0, 1):
+                if not colas[i]:
+                    menor = i
+                    break
+                nodo = colas[i].popleft()
+                for vecino in self.adyacencia[nodo]:
+                    if vecino not in lados[i]:
+                        lados[i].add(vecino)
+                        colas[i].append(vecino)
+
+        componente = self.componente_de[a]
+        self.componentes[componente] -= lados[menor]
+        self._registrar_componente(lados[menor])
+        lados[1 - menor] = self.componentes[componente]
+        return set(lados[0]), set(lados[1])
+
+    def _unir_componentes(self, componente_a, componente_b):
+        """Fusiona la componente menor en la mayor"""
+        if len(self.componentes[componente_a]) < len(self.componentes[componente_b]):
+            componente_a, componente_b = componente_b, componente_a
+        nodos = self.componentes.pop(componente_b)
+        for nodo in nodos:
+            self.componente_de[nodo] = componente_a
+        self.componentes[componente_a] |= nodos
+
+    def _registrar_componente(self, nodos):
+        id_componente = self._nuevo_id()
+        self.componentes[id_componente] = set(nodos)
+        for nodo in nodos:
+            self.componente_de[nodo] = id_componente
+
+    def _registrar_bloque(self, aristas):
+        id_bloque = self._nuevo_id()
+        nodos = set()
+        for arista in aristas:
+            nodos |= arista
+            self.bloque_de_arista[arista] = id_bloque
+        self.bloques[id_bloque] = aristas
+        self.nodos_bloque[id_bloque] = nodos
+        for nodo in nodos:
+            self.bloques_de[nodo].add(id_bloque)
+        if len(aristas) == 1:
+            self.puentes |= aristas
+        return id_bloque
+
+    def _quitar_bloque(self, id_bloque):
+        aristas = self.bloques.pop(id_bloque)
+        for nodo in self.nodos_bloque.pop(id_bloque):
+            self.bloques_de[nodo].discard(id_bloque)
+        for arista in aristas:
+            self.bloque_de_arista.pop(arista, None)
+        if len(aristas) == 1:
+            self.puentes -= aristas
+        return aristas
+
+    def _actualizar_articulaciones(self, nodos):
+        for nodo in nodos:
+            if len(self.bloques_de.get(nodo, ())) > 1:
+                self.articulaciones.add(nodo)
+            else:
+                self.articulaciones.discard(nodo)
+
+    def _alcanzables(self, origen):
+        visitados = {origen}
+        cola = deque([origen])
+        while cola:
+            for vecino in self.adyacencia[cola.popleft()]:
+                if vecino not in visitados:
+                    visitados.add(vecino)
+                    cola.append(vecino)
+        return visitados
+
+    def _nuevo_id(self):
+        self._siguiente_id += 1
+        return self._siguiente_id
+
+    def _reporte(self, articulaciones, puentes, divisiones):
+        """Diferencias de elementos críticos y componentes divididas"""
+        return {
+            'divisiones': [[sorted(lado_a), sorted(lado_b)] for lado_a, lado_b in divisiones],
+            'routers_criticos': {
+                'nuevos': sorted(self.articulaciones - articulaciones),
+                'resueltos': sorted(articulaciones - self.articulaciones)
+            },
+            'enlaces_criticos': {
+                'nuevos': sorted(tuple(sorted(a)) for a in self.puentes - puentes),
+                'resueltos': sorted(tuple(sorted(a)) for a in puentes - self.puentes)
+            }
+        }
@@ -0,0 +1,276 @@
+import heapq
+import math
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from controlador.config.settings import CENTRALIDAD_CONFIG
+
+# Adyacencia compartida con los procesos del pool (se carga una vez por proceso)
+_adyacencia_worker = None
+
+
+def acumular_desde(adyacencia, origen, nodos, aristas, cercania):
+    """
+    Paso de Brandes desde un origen: suma sus dependencias a los acumuladores
+
+    Un único Dijkstra cuenta los caminos más cortos (sigma) y la
+    acumulación hacia atrás reparte las dependencias entre nodos y
+    aristas. Las distancias del mismo paso alimentan la cercanía.
+
+    Args:
+        adyacencia: Diccionario {nodo: [(vecino, costo), ...]}
+        origen: Nodo origen
+        nodos: Diccionario {nodo: intermediación acumulada}
+        aristas: Diccionario {(u, v): intermediación acumulada}
+        cercania: Diccionario {nodo: [pivotes que lo alcanzan, suma de distancias]}
+    """
+    orden = []
+    predecesores = {origen: []}
+    sigma = {origen: 1.0}
+    distancias = {}
+    vistos = {origen: 0}
+    contador = 0
+    cola = [(0, 0, origen, origen)]
+
+    while cola:
+        distancia, _, previo, nodo = heapq.heappop(cola)
+        if nodo in distancias:
+            continue
+        if nodo != origen:
+            sigma[nodo] += sigma[previo]
+        orden.append(nodo)
+        distancias[nodo] = distancia
+
+        for vecino, costo in adyacencia[nodo]:
+            nueva = distancia + costo
+            if vecino not in distancias and (vecino not in vistos or nueva < vistos[vecino]):
+                vistos[vecino] = nueva
+                contador += 1
+                heapq.heappush(cola, (nueva, contador, nodo, vecino))
+                sigma[vecino] = 0.0
+                predecesores[vecino] = [nodo]
+            elif nueva == vistos[vecino]:
+                sigma[vecino] += sigma[nodo]
+                predecesores[vecino].append(nodo)
+
+    # Acumulación de dependencias en orden inverso de distancia
+    delta = dict.fromkeys(orden, 0.0)
+    while orden:
+        w = orden.pop()
+        coeficiente = (1.0 + delta[w]) / sigma[w]
+        for v in predecesores[w]:
+            c = sigma[v] * coeficiente
+            arista = (v, w) if (v, w) in aristas else (w, v)
+            aristas[arista] += c
+            delta[v] += c
+        if w != origen:
+            nodos[w] += delta[w]
+            acumulado = cercania[w]
+            acumulado[0] += 1
+            acumulado[1] += distancias[w]
+
+
+def _acumuladores(adyacencia):
+    """Acumuladores vacíos de nodos, aristas (orientación u < v) y cercanía"""
+    nodos = dict.fromkeys(adyacencia, 0.0)
+    aristas = {}
+    for u, vecinos in adyacencia.items():
+        for v, _ in vecinos:
+            if (v, u) not in aristas:
+                aristas[(u, v)] = 0.0
+    cercania = {nodo: [0, 0.0] for nodo in adyacencia}
+    return nodos, aristas, cercania
+
+
+def _inicializar_worker(adyacencia):
+    """Carga la adyacencia en un proceso del pool"""
+    global _adyacencia_worker
+    _adyacencia_worker = adyacencia
+
+
+def _acumular_worker(argumentos):
+    """Procesa un bloque de orígenes dentro del pool"""
+    origenes, orientacion = argumentos
+    nodos, _, cercania = _acumuladores(_adyacencia_worker)
+    aristas = dict.fromkeys(orientacion, 0.0)
+    for origen in origenes:
+        acumular_desde(_adyacencia_worker, origen, nodos, aristas, cercania)
+    return nodos, aristas, cercania
+
+
+def pivotes_necesarios(n, error, confianza):
+    """
+    Número de pivotes para estimar la intermediación normalizada
+
+    Cota de Hoeffding con unión sobre los n nodos: con esa cantidad de
+    orígenes muestreados, todos los valores quedan a menos de 'error' del
+    exacto con probabilidad 'confianza'.
+
+    Args:
+        n: Número de routers
+        error: Error absoluto máximo
+        confianza: Probabilidad de cumplir la cota (0-1)
+
+    Returns:
+        Número de pivotes (puede superar a n)
+    """
+    return math.ceil(math.log(2 * n / (1 - confianza)) / (2 * error ** 2))
+
+
+class CentralityEngine:
+    """
+    Motor de centralidad de intermediación (Brandes) para topologías grandes
+
+    En modo exacto reparte los orígenes por bloques en un pool de procesos.
+    En modo muestreado procesa solo k pivotes elegidos al azar, con k
+    derivado de una cota de error configurable. Ambos modos calculan a la
+    vez la intermediación de routers, la de enlaces y la cercanía, con la
+    misma normalización que NetworkX. Los resultados se cachean por versión
+    de topología.
+    """
+
+    def __init__(self, network_graph=None, procesos=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+        self.procesos = procesos if procesos is not None else CENTRALIDAD_CONFIG['procesos']
+        self.umbral_paralelo = CENTRALIDAD_CONFIG['umbral_paralelo']
+        self.umbral_muestreo = CENTRALIDAD_CONFIG['umbral_muestreo']
+
+        self._version = None
+        self._resultados = {}
+        self._lock = threading.Lock()
+
+    def calcular(self, modo=None, error=None, confianza=None, semilla=None):
+        """
+        Calcula las centralidades de la topología actual
+
+        Args:
+            modo: 'exacto', 'muestreo' o 'auto' (muestreo a partir de
+                  umbral_muestreo routers); None = configuración
+            error: Error absoluto máximo del muestreo (None = configuración)
+            confianza: Probabilidad de cumplir la cota (None = configuración)
+            semilla: Semilla de la selección de pivotes
+
+        Returns:
+            Diccionario con 'betweenness', 'edge_betweenness', 'closeness',
+            'exacto' y 'pivotes'
+        """
+        modo = modo or CENTRALIDAD_CONFIG['modo']
+        error = error if error is not None else CENTRALIDAD_CONFIG['error']
+        confianza = confianza if confianza is not None else CENTRALIDAD_CONFIG['confianza']
+        semilla = semilla if semilla is not None else CENTRALIDAD_CONFIG['semilla']
+
+        grafo = self.network_graph.construir_csr()
+        version = self.network_graph.version_grafo
+        clave = (modo, error, confianza, semilla)
+
+        with self._lock:
+            if version != self._version:
+                self._resultados = {}
+                self._version = version
+            if clave in self._resultados:
+                return self._resultados[clave]
+
+        adyacencia = grafo.adyacencia()
+        n = len(adyacencia)
+
+        pivotes = None
+        if modo == 'muestreo' or (modo == 'auto' and n >= self.umbral_muestreo):
+            k = pivotes_necesarios(n, error, confianza) if n > 1 else n
+            if k < n:
+                pivotes = random.Random(semilla).sample(sorted(adyacencia), k)
+
+        origenes = pivotes if pivotes is not None else list(adyacencia)
+        nodos, aristas, cercania = self._acumular(adyacencia, origenes)
+        resultado = self._normalizar(n, nodos, aristas, cercania, pivotes)
+
+        with self._lock:
+            if version == self._version:
+                self._resultados[clave] = resultado
+        return resultado
+
+    def _acumular(self, adyacencia, origenes):
+        """Ejecuta Brandes desde los orígenes, en paralelo si son muchos"""
+        procesos = self.procesos
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+
+        if procesos > 1 and len(origenes) >= self.umbral_paralelo:
+            try:
+                return self._acumular_paralelo(adyacencia, origenes, procesos)
+            except Exception as e:
+                print(f"✗ Error en el cálculo paralelo, usando modo secuencial: {e}")
+
+        nodos, aristas, cercania = _acumuladores(adyacencia)
+        for origen in origenes:
+            acumular_desde(adyacencia, origen, nodos, aristas, cercania)
+        return nodos, aristas, cercania
+
+    def _acumular_paralelo(self, adyacencia, origenes, procesos):
+        """Reparte los orígenes en bloques y suma los acumuladores parciales"""
+        nodos, aristas, cercania = _acumuladores(adyacencia)
+        orientacion = list(aristas)
+
+        # Varios bloques por proceso para equilibrar la carga
+        num_bloques = procesos * 4
+        tamano = max(1, -(-len(origenes) // num_bloques))
+        bloques = [(origenes[i:i + tamano], orientacion) for i in range(0, len(origenes), tamano)]
+
+        with ProcessPoolExecutor(max_workers=procesos,
+                                 initializer=_inicializar_worker,
+                                 initargs=(adyacencia,)) as pool:
+            for parcial_nodos, parcial_aristas, parcial_cercania in pool.map(_acumular_worker, bloques):
+                for nodo, valor in parcial_nodos.items():
+                    nodos[nodo] += valor
+                for arista, valor in parcial_aristas.items():
+                    aristas[arista] += valor
+                for nodo, (alcanzados, suma) in parcial_cercania.items():
+                    cercania[nodo][0] += alcanzados
+                    cercania[nodo][1] += suma
+
+        return nodos, aristas, cercania
+
+    @staticmethod
+    def _normalizar(n, nodos, aristas, cercania, pivotes):
+        """Escala los acumulados como NetworkX (normalized=True)"""
+        k = len(pivotes) if pivotes is not None else n
+        muestreados = set(pivotes or ())
+
+        if n > 2:
+            if pivotes is None:
+                escala = 1 / ((n - 1) * (n - 2))
+                escala_pivote = escala
+            else:
+                # Un pivote no puede contarse a sí mismo como intermedio
+                escala = 1 / (k * (n - 2))
+                escala_pivote = 1 / ((k - 1) * (n - 2)) if k > 1 else 0.0
+            betweenness = {
+                nodo: valor * (escala_pivote if nodo in muestreados else escala)
+                for nodo, valor in nodos.items()
+            }
+        else:
+            betweenness = dict.fromkeys(nodos, 0.0)
+
+        escala_aristas = 1 / (k * (n - 1)) if n > 1 else 1.0
+        edge_betweenness = {arista: valor * escala_aristas for arista, valor in aristas.items()}
+
+        # Cercanía de Wasserman-Faust; con muestreo se estima con los pivotes
+        closeness = {}
+        for nodo, (alcanzados, suma) in cercania.items():
+            otros = k - 1 if nodo in muestreados or pivotes is None else k
+            if suma > 0 and otros > 0:
+                closeness[nodo] = alcanzados * alcanzados / (otros * suma)
+            else:
+                closeness[nodo] = 0.0
+
+        return {
+            'betweenness': betweenness,
+            'edge_betweenness': edge_betweenness,
+            'closeness': closeness,
+            'exacto': pivotes is None,
+            'pivotes': k
+        }
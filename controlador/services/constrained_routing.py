@@ -0,0 +1,367 @@
+import heapq
+import math
+import threading
+from array import array
+from controlador.config.settings import QOS_CONFIG
+from controlador.services.csr_graph import SIN_PREDECESOR
+from controlador.services.k_shortest_paths import Presupuesto
+from controlador.services.route_cache import RouteCache
+
+# Métricas que puede optimizar una consulta de ruta
+METRICAS_RUTA = ['costo', 'retardo', 'ancho_banda']
+
+# Holgura relativa al comparar sumas de retardos con el máximo
+_TOLERANCIA = 1e-9
+
+
+class ConstrainedRouting:
+    """
+    Cálculo de rutas con métricas de calidad de servicio
+
+    Además del costo, una consulta puede optimizar el retardo (suma de
+    retardo_ms) o el ancho de banda (el camino más ancho: máximo cuello de
+    botella, y entre los más anchos el de menor costo), y restringirse a
+    un retardo máximo y/o a un ancho de banda mínimo.
+
+    - El ancho de banda mínimo se resuelve descartando los enlaces que no
+      lo cumplen.
+    - El camino más ancho con retardo máximo busca por bisección el mayor
+      umbral de ancho de banda que aún admite un camino dentro del retardo.
+    - El costo mínimo con retardo máximo es NP-difícil en general; se
+      resuelve de forma exacta con etiquetas (costo, retardo) guiadas por
+      A*, con las distancias de costo al destino como heurística, podando
+      las etiquetas que ya no pueden llegar dentro del retardo y las
+      dominadas. Si se agota el presupuesto se devuelve el camino de menor
+      retardo, que cumple la restricción aunque no sea el más barato.
+
+    Los enlaces sin retardo o sin ancho de banda registrado toman los
+    valores por defecto de QOS_CONFIG. Los árboles auxiliares se reutilizan
+    mientras la topología no cambie y los resultados completos se
+    memorizan en la caché de rutas por versión.
+    """
+
+    def __init__(self, network_graph=None, tiempo_max=None, max_expansiones=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+        self.tiempo_max = tiempo_max if tiempo_max is not None else QOS_CONFIG['tiempo_max']
+        self.max_expansiones = (
+            max_expansiones if max_expansiones is not None else QOS_CONFIG['max_expansiones']
+        )
+        self.rutas_cache = RouteCache()
+
+        self._version = None
+        self._grafo = None
+        self._retardos = None
+        self._anchos = None
+        self._arboles = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def es_consulta_simple(metrica='costo', retardo_max=None, ancho_banda_min=None):
+        """True si la consulta es el camino de menor costo sin restricciones"""
+        return metrica == 'costo' and retardo_max is None and ancho_banda_min is None
+
+    def calcular(self, origen, destino, metrica='costo', retardo_max=None, ancho_banda_min=None):
+        """
+        Calcula la mejor ruta entre dos routers según la métrica y restricciones
+
+        Args:
+            origen: ID del router origen
+            destino: ID del router destino
+            metrica: 'costo', 'retardo' o 'ancho_banda'
+            retardo_max: Retardo total máximo en ms (None = sin límite)
+            ancho_banda_min: Ancho de banda mínimo de cada enlace (None = sin límite)
+
+        Returns:
+            Tupla (resultado, completo): resultado es un diccionario con
+            'camino', 'costo', 'retardo' y 'ancho_banda' (cuello de botella),
+            o None si ningún camino cumple; completo es False si se agotó
+            el presupuesto y la ruta puede no ser la óptima
+        """
+        if metrica not in METRICAS_RUTA:
+            raise ValueError(f"Métrica de ruta inválida: {metrica}")
+
+        version, grafo = self._preparar()
+        i = grafo.indice.get(origen)
+        j = grafo.indice.get(destino)
+        if i is None or j is None:
+            return None, True
+        if i == j:
+            return {'camino': [origen], 'costo': 0.0, 'retardo': 0.0, 'ancho_banda': None}, True
+
+        clave = ('qos', metrica, retardo_max, ancho_banda_min)
+        encontrada, resultado = self.rutas_cache.obtener(origen, destino, clave, version)
+        if encontrada:
+            return resultado, True
+
+        umbral = ancho_banda_min if ancho_banda_min is not None else -math.inf
+        limite = retardo_max if retardo_max is not None else math.inf
+        presupuesto = Presupuesto(self.tiempo_max, self.max_expansiones)
+
+        ruta = None
+        if metrica == 'ancho_banda':
+            # El camino más ancho se reduce a una búsqueda de costo con el
+            # umbral elevado al mayor cuello de botella alcanzable
+            umbral = self._mayor_umbral(i, j, umbral, retardo_max)
+            metrica = 'costo' if umbral is not None else None
+
+        if metrica == 'retardo':
+            ruta = self._camino_del_arbol(i, j, 'retardo', umbral, limite)
+        elif metrica == 'costo':
+            if retardo_max is None:
+                ruta = self._camino_del_arbol(i, j, 'costo', umbral)
+            else:
+                ruta = self._costo_con_retardo(i, j, umbral, limite, presupuesto)
+
+        resultado = self._resultado(*ruta) if ruta is not None else None
+        completo = not presupuesto.agotado
+        if completo:
+            self.rutas_cache.guardar(origen, destino, clave, version, resultado)
+        return resultado, completo
+
+    # ---------- Estado por versión ----------
+
+    def _preparar(self):
+        """Carga el grafo de la versión actual y descarta los árboles viejos"""
+        with self._lock:
+            grafo = self.network_graph.construir_csr()
+            version = self.network_graph.version_grafo
+
+            if version != self._version or self._grafo is not grafo:
+                retardo_defecto = float(QOS_CONFIG['retardo_por_defecto'])
+                ancho_defecto = float(QOS_CONFIG['ancho_banda_por_defecto'])
+                self._retardos = array('d', (
+                    retardo_defecto if math.isnan(r) else r for r in grafo.retardos
+                ))
+                self._anchos = array('d', (
+                    ancho_defecto if math.isnan(a) else a for a in grafo.anchos_banda
+                ))
+                self._grafo = grafo
+                self._arboles = {}
+                self._version = version
+
+            return version, grafo
+
+    def _arbol(self, raiz, criterio, umbral):
+        """
+        Árbol de caminos mínimos con raíz dada sobre los enlaces con ancho
+        de banda >= umbral, cacheado por versión
+
+        Returns:
+            Tupla (distancias, predecesores, aristas_previas) indexadas por
+            nodo; como los enlaces son bidireccionales, desde cualquier nodo
+            los predecesores llevan hacia la raíz
+        """
+        clave = (raiz, criterio, umbral)
+        with self._lock:
+            arbol = self._arboles.get(clave)
+        if arbol is None:
+            pesos = self._grafo.costos if criterio == 'costo' else self._retardos
+            arbol = self._dijkstra(raiz, pesos, umbral)
+            with self._lock:
+                self._arboles[clave] = arbol
+        return arbol
+
+    # ---------- Kernels ----------
+
+    def _dijkstra(self, origen, pesos, umbral):
+        """Dijkstra sobre índices que ignora los enlaces bajo el umbral de ancho de banda"""
+        grafo = self._grafo
+        n = len(grafo.ids)
+        offsets, destinos, anchos = grafo.offsets, grafo.destinos, self._anchos
+        distancias = [math.inf] * n
+        predecesores = [SIN_PREDECESOR] * n
+        previas = [SIN_PREDECESOR] * n
+        asentados = bytearray(n)
+
+        distancias[origen] = 0.0
+        cola = [(0.0, origen)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while cola:
+            distancia, i = pop(cola)
+            if asentados[i]:
+                continue
+            asentados[i] = 1
+
+            for k in range(offsets[i], offsets[i + 1]):
+                if anchos[k] < umbral:
+                    continue
+                j = destinos[k]
+                nueva = distancia + pesos[k]
+                if nueva < distancias[j]:
+                    distancias[j] = nueva
+                    predecesores[j] = i
+                    previas[j] = k
+                    push(cola, (nueva, j))
+
+        return distancias, predecesores, previas
+
+    def _camino_del_arbol(self, origen, destino, criterio, umbral, limite_retardo=math.inf):
+        """
+        Camino mínimo según el criterio, leído del árbol con raíz en el destino
+
+        Returns:
+            Tupla (nodos, aristas) del origen al destino, o None si no hay
+            camino o excede el retardo máximo
+        """
+        distancias, predecesores, previas = self._arbol(destino, criterio, umbral)
+        if math.isinf(distancias[origen]) or distancias[origen] > limite_retardo:
+            return None
+        return self._subir(origen, destino, predecesores, previas)
+
+    @staticmethod
+    def _subir(origen, raiz, predecesores, previas):
+        """Recorre el árbol desde un nodo hasta la raíz"""
+        nodos = [origen]
+        aristas = []
+        nodo = origen
+        while nodo != raiz:
+            # La arista previa va en sentido contrario, con los mismos atributos
+            aristas.append(previas[nodo])
+            nodo = predecesores[nodo]
+            nodos.append(nodo)
+        return nodos, aristas
+
+    def _mayor_umbral(self, origen, destino, umbral, retardo_max):
+        """
+        Mayor cuello de botella alcanzable entre origen y destino
+
+        Sin límite de retardo es un Dijkstra de máximo-mínimo. Con límite,
+        la factibilidad es monótona en el umbral y se busca por bisección
+        entre los anchos de banda existentes, probando el camino de menor
+        retardo de cada umbral.
+
+        Returns:
+            Umbral de ancho de banda o None si no hay camino factible
+        """
+        if retardo_max is None:
+            return self._cuello_maximo(origen, destino, umbral)
+
+        valores = sorted({a for a in self._anchos if a >= umbral})
+
+        def factible(valor):
+            distancias, _, _ = self._arbol(destino, 'retardo', valor)
+            return distancias[origen] <= retardo_max
+
+        if not valores or not factible(valores[0]):
+            return None
+
+        izquierda, derecha = 0, len(valores) - 1
+        while izquierda < derecha:
+            medio = (izquierda + derecha + 1) // 2
+            if factible(valores[medio]):
+                izquierda = medio
+            else:
+                derecha = medio - 1
+        return valores[izquierda]
+
+    def _cuello_maximo(self, origen, destino, umbral):
+        """Dijkstra de máximo-mínimo: mayor ancho de banda mínimo de un camino"""
+        grafo = self._grafo
+        n = len(grafo.ids)
+        offsets, destinos, anchos = grafo.offsets, grafo.destinos, self._anchos
+        mejores = [-math.inf] * n
+        asentados = bytearray(n)
+
+        mejores[origen] = math.inf
+        cola = [(-math.inf, origen)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while cola:
+            negativo, i = pop(cola)
+            if asentados[i]:
+                continue
+            asentados[i] = 1
+            if i == destino:
+                return -negativo
+
+            for k in range(offsets[i], offsets[i + 1]):
+                ancho = anchos[k]
+                if ancho < umbral:
+                    continue
+                j = destinos[k]
+                cuello = min(-negativo, ancho)
+                if cuello > mejores[j]:
+                    mejores[j] = cuello
+                    push(cola, (-cuello, j))
+
+        return None
+
+    def _costo_con_retardo(self, origen, destino, umbral, limite, presupuesto):
+        """
+        Camino de costo mínimo con retardo total <= limite (etiquetas + A*)
+
+        Returns:
+            Tupla (nodos, aristas) o None si ningún camino cumple
+        """
+        cota_costo, _, _ = self._arbol(destino, 'costo', umbral)
+        cota_retardo, predecesores, previas = self._arbol(destino, 'retardo', umbral)
+        if cota_retardo[origen] > limite:
+            return None
+        # Holgura para que el redondeo de las sumas no descarte el camino límite
+        limite += _TOLERANCIA * max(1.0, limite)
+
+        grafo = self._grafo
+        offsets, destinos, costos = grafo.offsets, grafo.destinos, grafo.costos
+        retardos, anchos = self._retardos, self._anchos
+
+        # Etiquetas: nodo, arista de llegada y etiqueta padre de cada una
+        nodos_etiqueta = [origen]
+        llegadas = [SIN_PREDECESOR]
+        padres = [SIN_PREDECESOR]
+        # Menor retardo asentado por nodo: una etiqueta con más retardo y
+        # costo no menor está dominada
+        menor_retardo = [math.inf] * len(grafo.ids)
+        cola = [(cota_costo[origen], 0.0, 0.0, origen, 0)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while cola and presupuesto.consumir():
+            _, costo, retardo, i, etiqueta = pop(cola)
+            if retardo >= menor_retardo[i]:
+                continue
+            menor_retardo[i] = retardo
+
+            if i == destino:
+                nodos, aristas = [], []
+                while etiqueta:
+                    nodos.append(nodos_etiqueta[etiqueta])
+                    aristas.append(llegadas[etiqueta])
+                    etiqueta = padres[etiqueta]
+                nodos.append(origen)
+                nodos.reverse()
+                aristas.reverse()
+                return nodos, aristas
+
+            for k in range(offsets[i], offsets[i + 1]):
+                if anchos[k] < umbral:
+                    continue
+                j = destinos[k]
+                nuevo_retardo = retardo + retardos[k]
+                if nuevo_retardo >= menor_retardo[j] or nuevo_retardo + cota_retardo[j] > limite:
+                    continue
+                nuevo_costo = costo + costos[k]
+                nodos_etiqueta.append(j)
+                llegadas.append(k)
+                padres.append(etiqueta)
+                push(cola, (nuevo_costo + cota_costo[j], nuevo_costo, nuevo_retardo, j, len(llegadas) - 1))
+
+        if presupuesto.agotado:
+            # El camino de menor retardo siempre cumple la restricción
+            return self._subir(origen, destino, predecesores, previas)
+        return None
+
+    def _resultado(self, nodos, aristas):
+        """Arma el resultado de una ruta a partir de sus nodos y aristas"""
+        grafo = self._grafo
+        camino = [grafo.ids[i] for i in nodos]
+        anchos = [grafo.anchos_banda[k] for k in aristas]
+        return {
+            'camino': camino,
+            'costo': sum(grafo.costos[k] for k in aristas),
+            'retardo': sum(self._retardos[k] for k in aristas),
+            'ancho_banda': None if any(math.isnan(a) for a in anchos) else min(anchos)
+        }
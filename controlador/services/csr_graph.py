@@ -0,0 +1,537 @@
+import heapq
+import math
+from array import array
+from collections import deque
+
+# Marca de "sin predecesor" en los kernels por índice
+SIN_PREDECESOR = -1
+
+# Diferencia relativa bajo la cual dos costos de camino se consideran iguales (ECMP)
+TOLERANCIA_ECMP = 1e-9
+
+
+def _opcional(valor):
+    """Convierte None en NaN para guardarlo en un arreglo tipado"""
+    return float('nan') if valor is None else float(valor)
+
+
+def _desde_opcional(valor):
+    """Convierte NaN de vuelta en None"""
+    return None if math.isnan(valor) else valor
+
+
+class CSRGraph:
+    """
+    Grafo compacto de la red en formato CSR (Compressed Sparse Row)
+
+    Los routers se numeran de 0 a n-1 ('ids' para índice -> ID e 'indice'
+    para ID -> índice). Los vecinos del índice i ocupan las posiciones
+    offsets[i]..offsets[i + 1] de 'destinos', y los arreglos paralelos
+    'costos', 'anchos_banda', 'retardos' e 'id_enlaces' guardan los
+    atributos de cada arista dirigida. Cada enlace aparece en ambos
+    sentidos. Todo se guarda en arreglos tipados del módulo array, sin un
+    diccionario por arista, y se serializa de forma compacta al enviarse
+    a un pool de procesos.
+
+    La instancia es inmutable: un cambio de topología genera un grafo
+    nuevo. Expone un subconjunto de la interfaz de networkx.Graph (nodes,
+    neighbors, degree, has_edge, ...) y 'to_networkx' materializa el grafo
+    completo para la visualización y los análisis que lo necesitan.
+    """
+
+    def __init__(self, ids, offsets, destinos, costos, anchos_banda, retardos,
+                 id_enlaces, atributos_nodos=None):
+        self.ids = ids
+        self.indice = {router_id: i for i, router_id in enumerate(ids)}
+        self.offsets = offsets
+        self.destinos = destinos
+        self.costos = costos
+        self.anchos_banda = anchos_banda
+        self.retardos = retardos
+        self.id_enlaces = id_enlaces
+        # {id_router: {'nombre', 'ip', 'estado'}}; solo lo usa to_networkx
+        self.atributos_nodos = atributos_nodos or {}
+
+    @classmethod
+    def desde_enlaces(cls, routers, enlaces):
+        """
+        Construye el grafo a partir de los routers y enlaces activos
+
+        Los enlaces con algún extremo fuera de 'routers' se ignoran. Si dos
+        enlaces unen el mismo par, prevalece el último (como en NetworkX).
+
+        Args:
+            routers: Lista de objetos Router
+            enlaces: Lista de objetos Enlace
+
+        Returns:
+            CSRGraph construido
+        """
+        ids = array('q', sorted(router.id_router for router in routers))
+        indice = {router_id: i for i, router_id in enumerate(ids)}
+        atributos = {
+            router.id_router: {'nombre': router.nombre, 'ip': router.ip, 'estado': router.estado}
+            for router in routers
+        }
+
+        pares = {}
+        for enlace in enlaces:
+            u = indice.get(enlace.router_origen)
+            v = indice.get(enlace.router_destino)
+            if u is None or v is None or u == v:
+                continue
+            clave = (u, v) if u < v else (v, u)
+            pares.pop(clave, None)
+            pares[clave] = enlace
+
+        return cls._desde_pares(ids, pares, atributos)
+
+    @classmethod
+    def desde_networkx(cls, grafo):
+        """
+        Construye el grafo compacto a partir de un networkx.Graph
+
+        Args:
+            grafo: networkx.Graph con atributos 'weight', 'id_enlace',
+                   'ancho_banda' y 'retardo_ms' en las aristas
+
+        Returns:
+            CSRGraph construido
+        """
+        from controlador.model.enlace import Enlace
+
+        ids = array('q', sorted(grafo.nodes))
+        indice = {router_id: i for i, router_id in enumerate(ids)}
+
+        pares = {}
+        for u, v, datos in grafo.edges(data=True):
+            if u == v:
+                continue
+            i, j = indice[u], indice[v]
+            pares[(i, j) if i < j else (j, i)] = Enlace(
+                id_enlace=datos.get('id_enlace'),
+                router_origen=u,
+                router_destino=v,
+                costo=datos.get('weight', 1.0),
+                ancho_banda=datos.get('ancho_banda'),
+                retardo_ms=datos.get('retardo_ms')
+            )
+
+        atributos = {nodo: dict(datos) for nodo, datos in grafo.nodes(data=True)}
+        return cls._desde_pares(ids, pares, atributos)
+
+    @classmethod
+    def _desde_pares(cls, ids, pares, atributos):
+        """Ordena las aristas por índice de origen y rellena los arreglos"""
+        n = len(ids)
+        grados = [0] * (n + 1)
+        for u, v in pares:
+            grados[u + 1] += 1
+            grados[v + 1] += 1
+        for i in range(n):
+            grados[i + 1] += grados[i]
+
+        total = grados[n]
+        offsets = array('i', grados)
+        destinos = array('i', bytes(4 * total))
+        costos = array('d', bytes(8 * total))
+        anchos_banda = array('d', bytes(8 * total))
+        retardos = array('d', bytes(8 * total))
+        id_enlaces = array('i', bytes(4 * total))
+
+        posicion = grados[:n]
+        for (u, v), enlace in pares.items():
+            costo = float(enlace.costo)
+            ancho = _opcional(enlace.ancho_banda)
+            retardo = _opcional(enlace.retardo_ms)
+            id_enlace = enlace.id_enlace if enlace.id_enlace is not None else -1
+            for a, b in ((u, v), (v, u)):
+                k = posicion[a]
+                posicion[a] += 1
+                destinos[k] = b
+                costos[k] = costo
+                anchos_banda[k] = ancho
+                retardos[k] = retardo
+                id_enlaces[k] = id_enlace
+
+        return cls(ids, offsets, destinos, costos, anchos_banda, retardos, id_enlaces, atributos)
+
+    # ---------- Interfaz compatible con networkx.Graph ----------
+
+    @property
+    def nodes(self):
+        """IDs de los routers en orden ascendente"""
+        return list(self.ids)
+
+    @property
+    def edges(self):
+        """Enlaces como tuplas (u, v) con u < v en índice"""
+        return list(self.aristas())
+
+    def __contains__(self, router_id):
+        return router_id in self.indice
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def number_of_nodes(self):
+        return len(self.ids)
+
+    def number_of_edges(self):
+        return len(self.destinos) // 2
+
+    def neighbors(self, router_id):
+        """IDs de los vecinos de un router"""
+        i = self.indice[router_id]
+        ids = self.ids
+        return [ids[j] for j in self.destinos[self.offsets[i]:self.offsets[i + 1]]]
+
+    def degree(self, router_id):
+        """Número de enlaces de un router"""
+        i = self.indice[router_id]
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def has_edge(self, u, v):
+        return self._posicion(u, v) is not None
+
+    # ---------- Consultas ----------
+
+    def _posicion(self, u, v):
+        """Posición de la arista u -> v en los arreglos paralelos (o None)"""
+        i = self.indice.get(u)
+        j = self.indice.get(v)
+        if i is None or j is None:
+            return None
+        destinos = self.destinos
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            if destinos[k] == j:
+                return k
+        return None
+
+    def datos_arista(self, u, v):
+        """
+        Atributos de un enlace
+
+        Returns:
+            Diccionario con 'weight', 'id_enlace', 'ancho_banda' y
+            'retardo_ms', o None si no existe
+        """
+        k = self._posicion(u, v)
+        if k is None:
+            return None
+        id_enlace = self.id_enlaces[k]
+        return {
+            'weight': self.costos[k],
+            'id_enlace': id_enlace if id_enlace >= 0 else None,
+            'ancho_banda': _desde_opcional(self.anchos_banda[k]),
+            'retardo_ms': _desde_opcional(self.retardos[k])
+        }
+
+    def costo(self, u, v):
+        """Costo del enlace directo u - v (None si no existe)"""
+        k = self._posicion(u, v)
+        return self.costos[k] if k is not None else None
+
+    def aristas(self):
+        """Genera cada enlace una vez como (u, v) de IDs"""
+        ids, offsets, destinos = self.ids, self.offsets, self.destinos
+        for i in range(len(ids)):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                if i < j:
+                    yield ids[i], ids[j]
+
+    def adyacencia_de(self, router_id):
+        """Vecinos de un router con el costo de cada enlace: [(vecino, costo), ...]"""
+        i = self.indice[router_id]
+        ids, destinos, costos = self.ids, self.destinos, self.costos
+        return [(ids[destinos[k]], costos[k]) for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def adyacencia(self):
+        """
+        Lista de adyacencia con costos
+
+        Returns:
+            Diccionario {nodo: [(vecino, costo), ...]}, el mismo formato que
+            spf_engine.construir_adyacencia
+        """
+        ids, offsets, destinos, costos = self.ids, self.offsets, self.destinos, self.costos
+        return {
+            ids[i]: [(ids[destinos[k]], costos[k]) for k in range(offsets[i], offsets[i + 1])]
+            for i in range(len(ids))
+        }
+
+    def tamano_bytes(self):
+        """Memoria ocupada por los arreglos del grafo"""
+        arreglos = (self.ids, self.offsets, self.destinos, self.costos,
+                    self.anchos_banda, self.retardos, self.id_enlaces)
+        return sum(a.itemsize * len(a) for a in arreglos)
+
+    # ---------- Kernels ----------
+
+    def dijkstra_indices(self, origen, destino=None):
+        """
+        Dijkstra sobre índices
+
+        Args:
+            origen: Índice del nodo origen
+            destino: Índice en el que detenerse (None = árbol completo)
+
+        Returns:
+            Tupla (distancias, predecesores, orden): listas indexadas por
+            nodo (inf / SIN_PREDECESOR si no se alcanzó) y los índices
+            asentados en orden de distancia
+        """
+        n = len(self.ids)
+        offsets, destinos, costos = self.offsets, self.destinos, self.costos
+        distancias = [math.inf] * n
+        predecesores = [SIN_PREDECESOR] * n
+        asentados = bytearray(n)
+        orden = []
+
+        distancias[origen] = 0.0
+        cola = [(0.0, origen)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while cola:
+            distancia, i = pop(cola)
+            if asentados[i]:
+                continue
+            asentados[i] = 1
+            orden.append(i)
+            if i == destino:
+                break
+
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                nueva = distancia + costos[k]
+                if nueva < distancias[j]:
+                    distancias[j] = nueva
+                    predecesores[j] = i
+                    push(cola, (nueva, j))
+
+        return distancias, predecesores, orden
+
+    def dijkstra_ecmp_indices(self, origen):
+        """
+        Dijkstra sobre índices que conserva todos los caminos de igual costo
+
+        Cada nodo hereda los primeros saltos de todos sus predecesores de
+        igual costo; el predecesor guardado es el primero encontrado, como
+        en dijkstra_indices. Los saltos que llegan por un enlace de costo
+        cero a un nodo ya asentado se propagan a sus descendientes, de modo
+        que el resultado coincide con IncrementalSPF._saltos.
+
+        Args:
+            origen: Índice del nodo origen
+
+        Returns:
+            Tupla (distancias, predecesores, saltos, orden): como
+            dijkstra_indices, más la tupla ordenada de primeros saltos
+            (índices de vecinos del origen) de los caminos mínimos a cada nodo
+        """
+        n = len(self.ids)
+        offsets, destinos, costos = self.offsets, self.destinos, self.costos
+        distancias = [math.inf] * n
+        predecesores = [SIN_PREDECESOR] * n
+        saltos = [()] * n
+        asentados = bytearray(n)
+        orden = []
+
+        distancias[origen] = 0.0
+        cola = [(0.0, origen)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while cola:
+            distancia, i = pop(cola)
+            if asentados[i]:
+                continue
+            asentados[i] = 1
+            orden.append(i)
+
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                nueva = distancia + costos[k]
+                heredados = (j,) if i == origen else saltos[i]
+                margen = TOLERANCIA_ECMP * max(1.0, nueva)
+                if nueva < distancias[j] - margen:
+                    distancias[j] = nueva
+                    predecesores[j] = i
+                    saltos[j] = heredados
+                    push(cola, (nueva, j))
+                elif nueva <= distancias[j] + margen and heredados != saltos[j]:
+                    self._propagar_saltos(distancias, saltos, asentados, j, heredados)
+
+        return distancias, predecesores, saltos, orden
+
+    def _propagar_saltos(self, distancias, saltos, asentados, j, heredados):
+        """
+        Agrega primeros saltos a un nodo y, si ya está asentado, a los nodos
+        que alcanza por aristas de igual costo (incluido el paso por el origen
+        desde un vecino a costo cero)
+        """
+        offsets, destinos, costos = self.offsets, self.destinos, self.costos
+        pendientes = [(j, heredados)]
+        while pendientes:
+            i, heredados = pendientes.pop()
+            unidos = set(saltos[i]).union(heredados)
+            if len(unidos) == len(saltos[i]):
+                continue
+            saltos[i] = tuple(sorted(unidos))
+            if not asentados[i]:
+                continue
+
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                nueva = distancias[i] + costos[k]
+                if nueva <= distancias[j] + TOLERANCIA_ECMP * max(1.0, nueva):
+                    pendientes.append((j, saltos[i]))
+
+    def dijkstra(self, origen, ecmp=False):
+        """
+        Árbol de caminos más cortos desde un router
+
+        Args:
+            origen: ID del router origen
+            ecmp: Si True, agrega los primeros saltos de igual costo
+
+        Returns:
+            Tupla (distancias, predecesores) de IDs con los nodos alcanzables,
+            el mismo formato que spf_engine.dijkstra; con ecmp, además un
+            diccionario {destino: tupla de primeros saltos}
+        """
+        if origen not in self.indice:
+            return ({}, {}, {}) if ecmp else ({}, {})
+
+        ids = self.ids
+        if ecmp:
+            distancias, predecesores, saltos, orden = self.dijkstra_ecmp_indices(self.indice[origen])
+        else:
+            distancias, predecesores, orden = self.dijkstra_indices(self.indice[origen])
+
+        arbol = (
+            {ids[i]: distancias[i] for i in orden},
+            {ids[i]: (ids[predecesores[i]] if predecesores[i] != SIN_PREDECESOR else None)
+             for i in orden}
+        )
+        if ecmp:
+            arbol += ({ids[i]: tuple(ids[j] for j in saltos[i]) for i in orden[1:]},)
+        return arbol
+
+    def camino_mas_corto(self, origen, destino):
+        """
+        Camino más corto entre dos routers (se detiene al asentar el destino)
+
+        Returns:
+            Tupla (camino, costo) o (None, None) si no hay camino
+        """
+        i = self.indice.get(origen)
+        j = self.indice.get(destino)
+        if i is None or j is None:
+            return None, None
+
+        distancias, predecesores, _ = self.dijkstra_indices(i, j)
+        if math.isinf(distancias[j]):
+            return None, None
+
+        costo = distancias[j]
+        camino = []
+        while j != SIN_PREDECESOR:
+            camino.append(self.ids[j])
+            j = predecesores[j]
+        camino.reverse()
+        return camino, costo
+
+    def bfs(self, origen):
+        """
+        Número de saltos desde un router a cada router alcanzable
+
+        Args:
+            origen: ID del router origen
+
+        Returns:
+            Diccionario {router: saltos}
+        """
+        if origen not in self.indice:
+            return {}
+
+        offsets, destinos, ids = self.offsets, self.destinos, self.ids
+        saltos = [-1] * len(ids)
+        inicio = self.indice[origen]
+        saltos[inicio] = 0
+        cola = deque([inicio])
+
+        while cola:
+            i = cola.popleft()
+            siguiente = saltos[i] + 1
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                if saltos[j] < 0:
+                    saltos[j] = siguiente
+                    cola.append(j)
+
+        return {ids[i]: s for i, s in enumerate(saltos) if s >= 0}
+
+    def componentes_conexas(self):
+        """
+        Componentes conexas del grafo
+
+        Returns:
+            Lista de conjuntos de IDs de routers
+        """
+        offsets, destinos, ids = self.offsets, self.destinos, self.ids
+        visto = bytearray(len(ids))
+        componentes = []
+
+        for inicio in range(len(ids)):
+            if visto[inicio]:
+                continue
+            visto[inicio] = 1
+            pila = [inicio]
+            componente = set()
+            while pila:
+                i = pila.pop()
+                componente.add(ids[i])
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = destinos[k]
+                    if not visto[j]:
+                        visto[j] = 1
+                        pila.append(j)
+            componentes.append(componente)
+
+        return componentes
+
+    # ---------- Adaptador ----------
+
+    def to_networkx(self):
+        """
+        Materializa el grafo como networkx.Graph
+
+        Returns:
+            networkx.Graph con los mismos atributos de nodos y aristas que
+            construía NetworkGraph
+        """
+        import networkx as nx
+
+        grafo = nx.Graph()
+        for router_id in self.ids:
+            grafo.add_node(router_id, **self.atributos_nodos.get(router_id, {}))
+
+        ids, offsets, destinos = self.ids, self.offsets, self.destinos
+        for i in range(len(ids)):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = destinos[k]
+                if i < j:
+                    id_enlace = self.id_enlaces[k]
+                    grafo.add_edge(
+                        ids[i], ids[j],
+                        weight=self.costos[k],
+                        id_enlace=id_enlace if id_enlace >= 0 else None,
+                        ancho_banda=_desde_opcional(self.anchos_banda[k]),
+                        retardo_ms=_desde_opcional(self.retardos[k])
+                    )
+
+        return grafo
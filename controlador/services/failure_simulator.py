@@ -0,0 +1,403 @@
+import heapq
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from controlador.config.settings import FALLOS_CONFIG
+
+# Grafo y línea base compartidos con los procesos del pool (se cargan una vez por proceso)
+_grafo_worker = None
+_base_worker = None
+
+
+class LineaBase:
+    """
+    Árboles SPF de todos los orígenes sin fallos
+
+    Por cada origen guarda distancias y predecesores por índice, y el
+    árbol en preorden: el subárbol de un nodo x ocupa
+    preorden[entrada[x]:entrada[x] + tamano[x]], de modo que los destinos
+    que cuelgan de un elemento caído se obtienen con un corte. 'vecinos'
+    lista por índice los pares (vecino, costo) que recorren las
+    reparaciones.
+    """
+
+    __slots__ = ('distancias', 'predecesores', 'entrada', 'tamano', 'preorden',
+                 'alcanzados', 'sumas', 'suma_total', 'vecinos')
+
+    def __init__(self, grafo):
+        n = len(grafo.ids)
+        offsets, destinos, costos = grafo.offsets, grafo.destinos, grafo.costos
+        self.vecinos = [
+            [(destinos[k], costos[k]) for k in range(offsets[i], offsets[i + 1])]
+            for i in range(n)
+        ]
+        self.distancias = []
+        self.predecesores = []
+        self.entrada = []
+        self.tamano = []
+        self.preorden = []
+        self.alcanzados = array('i')
+        self.sumas = array('d')
+
+        for origen in range(n):
+            distancias, predecesores, orden = grafo.dijkstra_indices(origen)
+
+            # Tamaño de cada subárbol, de las hojas hacia el origen
+            tamano = [1] * n
+            for nodo in reversed(orden):
+                padre = predecesores[nodo]
+                if padre >= 0:
+                    tamano[padre] += tamano[nodo]
+
+            # Cada hijo toma el siguiente bloque libre dentro del de su padre
+            entrada = [-1] * n
+            cursor = [0] * n
+            entrada[origen] = 0
+            cursor[origen] = 1
+            for nodo in orden[1:]:
+                padre = predecesores[nodo]
+                inicio = cursor[padre]
+                entrada[nodo] = inicio
+                cursor[padre] = inicio + tamano[nodo]
+                cursor[nodo] = inicio + 1
+
+            preorden = [0] * len(orden)
+            for nodo in orden:
+                preorden[entrada[nodo]] = nodo
+
+            self.distancias.append(array('d', distancias))
+            self.predecesores.append(array('i', predecesores))
+            self.entrada.append(array('i', entrada))
+            self.tamano.append(array('i', tamano))
+            self.preorden.append(array('i', preorden))
+            self.alcanzados.append(len(orden) - 1)
+            self.sumas.append(sum(distancias[nodo] for nodo in orden))
+
+        self.suma_total = sum(self.sumas)
+
+
+def evaluar_fallo(grafo, base, nodos, aristas):
+    """
+    Mide el impacto de la caída simultánea de routers y enlaces
+
+    Solo se recalculan los orígenes cuyo árbol base usa un elemento caído,
+    y de cada uno solo el subárbol que cuelga de él: sus nodos se siembran
+    desde la frontera con el resto del árbol (cuyas distancias no cambian)
+    y se completa un Dijkstra restringido al subárbol.
+
+    Args:
+        grafo: CSRGraph de la topología base
+        base: LineaBase del grafo
+        nodos: Índices de los routers caídos
+        aristas: Pares de índices (u, v) de los enlaces caídos
+
+    Returns:
+        Diccionario con 'origenes_afectados', 'pares_afectados' (pares que
+        cambian de camino y siguen conectados), 'pares_desconectados',
+        'pares_perdidos' (pares con un router caído en un extremo),
+        'costo_adicional', 'inflacion_costo' (costo adicional relativo al
+        costo base de los pares que siguen conectados) y 'estiramiento_max'
+        (mayor cociente costo nuevo / costo base)
+    """
+    n = len(grafo.ids)
+    vecinos = base.vecinos
+    inf = math.inf
+    pop, push = heapq.heappop, heapq.heappush
+
+    # Estado por nodo: 0 = sin cambios, 1 = en el subárbol a recalcular, 2 = caído
+    estado = bytearray(n)
+    for nodo in nodos:
+        estado[nodo] = 2
+
+    # Los extremos de los enlaces caídos usan una lista de vecinos sin ellos
+    if aristas:
+        vecinos = list(vecinos)
+        for u, v in aristas:
+            vecinos[u] = [arista for arista in vecinos[u] if arista[0] != v]
+            vecinos[v] = [arista for arista in vecinos[v] if arista[0] != u]
+
+    # Pares con un router caído en algún extremo
+    perdidos = 0
+    costo_base = base.suma_total
+    for r in nodos:
+        perdidos += 2 * base.alcanzados[r]
+        costo_base -= 2 * base.sumas[r]
+        for otro in nodos:
+            distancia = base.distancias[r][otro]
+            if otro != r and distancia < inf:
+                perdidos -= 1
+                costo_base += distancia
+
+    afectados = desconectados = reencaminados = 0
+    costo_adicional = 0.0
+    estiramiento = 1.0
+    nuevas = [inf] * n
+
+    for origen in range(n):
+        if estado[origen]:
+            continue
+        distancias = base.distancias[origen]
+        predecesores = base.predecesores[origen]
+
+        raices = [r for r in nodos if distancias[r] < inf]
+        for u, v in aristas:
+            if predecesores[v] == u:
+                raices.append(v)
+            elif predecesores[u] == v:
+                raices.append(u)
+        if not raices:
+            continue
+        afectados += 1
+
+        # Destinos que colgaban de los elementos caídos
+        entrada, tamano, preorden = base.entrada[origen], base.tamano[origen], base.preorden[origen]
+        subarbol = []
+        for raiz in raices:
+            inicio = entrada[raiz]
+            for nodo in preorden[inicio:inicio + tamano[raiz]]:
+                if not estado[nodo]:
+                    estado[nodo] = 1
+                    subarbol.append(nodo)
+
+        # Semillas: mejor entrada desde la parte del árbol que no cambia
+        cola = []
+        for nodo in subarbol:
+            mejor = inf
+            for vecino, costo in vecinos[nodo]:
+                if estado[vecino]:
+                    continue
+                candidato = distancias[vecino] + costo
+                if candidato < mejor:
+                    mejor = candidato
+            if mejor < inf:
+                nuevas[nodo] = mejor
+                cola.append((mejor, nodo))
+        heapq.heapify(cola)
+
+        # Dijkstra restringido al subárbol desprendido
+        while cola:
+            distancia, nodo = pop(cola)
+            if distancia > nuevas[nodo]:
+                continue
+            for vecino, costo in vecinos[nodo]:
+                if estado[vecino] != 1:
+                    continue
+                candidato = distancia + costo
+                if candidato < nuevas[vecino]:
+                    nuevas[vecino] = candidato
+                    push(cola, (candidato, vecino))
+
+        for nodo in subarbol:
+            estado[nodo] = 0
+            anterior = distancias[nodo]
+            nueva = nuevas[nodo]
+            if nueva == inf:
+                desconectados += 1
+                costo_base -= anterior
+                continue
+            nuevas[nodo] = inf
+            reencaminados += 1
+            costo_adicional += nueva - anterior
+            if anterior > 0 and nueva / anterior > estiramiento:
+                estiramiento = nueva / anterior
+
+    return {
+        'origenes_afectados': afectados,
+        'pares_afectados': reencaminados,
+        'pares_desconectados': desconectados,
+        'pares_perdidos': perdidos,
+        'costo_adicional': costo_adicional,
+        'inflacion_costo': costo_adicional / costo_base if costo_base > 0 else 0.0,
+        'estiramiento_max': estiramiento
+    }
+
+
+def _inicializar_worker(grafo, base):
+    """Carga el grafo y la línea base en un proceso del pool"""
+    global _grafo_worker, _base_worker
+    _grafo_worker = grafo
+    _base_worker = base
+
+
+def _evaluar_worker(escenarios):
+    """Evalúa un bloque de escenarios dentro del pool"""
+    return [evaluar_fallo(_grafo_worker, _base_worker, nodos, aristas) for nodos, aristas in escenarios]
+
+
+class FailureSimulator:
+    """
+    Simulador de fallos (análisis what-if N-1)
+
+    Evalúa la caída de cada enlace y cada router por separado, y de las
+    combinaciones que se pidan, sin tocar la topología real. Los árboles
+    SPF sin fallos se calculan una vez por versión de topología y cada
+    escenario solo recalcula los subárboles que colgaban de los elementos
+    caídos. Con muchos escenarios los reparte por bloques en un pool de
+    procesos que recibe el grafo y la línea base una sola vez.
+
+    Un elemento se indica como ('router', id_router) o
+    ('enlace', router_a, router_b).
+    """
+
+    def __init__(self, network_graph=None, procesos=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+        self.procesos = procesos if procesos is not None else FALLOS_CONFIG['procesos']
+        self.umbral_paralelo = FALLOS_CONFIG['umbral_paralelo']
+
+        self._version = None
+        self._base = None
+        self._resultados = {}
+        self._lock = threading.Lock()
+
+    def obtener_linea_base(self):
+        """
+        Obtiene los árboles SPF sin fallos de la topología actual
+
+        Returns:
+            Tupla (CSRGraph, LineaBase)
+        """
+        grafo = self.network_graph.construir_csr()
+        version = self.network_graph.version_grafo
+
+        with self._lock:
+            if version == self._version and self._base is not None:
+                return grafo, self._base
+
+        base = LineaBase(grafo)
+
+        with self._lock:
+            if version != self._version:
+                self._resultados = {}
+                self._version = version
+            self._base = base
+        return grafo, base
+
+    def simular(self, enlaces=True, routers=True, combinaciones=None, procesos=None):
+        """
+        Evalúa los fallos simples de la red y las combinaciones indicadas
+
+        Args:
+            enlaces: Si True, incluye la caída de cada enlace
+            routers: Si True, incluye la caída de cada router
+            combinaciones: Lista de fallos simultáneos, cada uno una lista de
+                           elementos ('router', id) / ('enlace', a, b)
+            procesos: Número de procesos (None = configuración, 1 = secuencial)
+
+        Returns:
+            Lista de reportes (ver evaluar_fallo) con la clave 'fallo'
+            (tupla de elementos), ordenada de mayor a menor impacto
+        """
+        combinaciones = tuple(tuple(tuple(e) for e in fallo) for fallo in combinaciones or ())
+        clave = (enlaces, routers, combinaciones)
+
+        grafo, base = self.obtener_linea_base()
+        with self._lock:
+            if clave in self._resultados:
+                return self._resultados[clave]
+            version = self._version
+
+        fallos = []
+        if routers:
+            fallos.extend((('router', router_id),) for router_id in grafo.ids)
+        if enlaces:
+            fallos.extend((('enlace', u, v),) for u, v in grafo.aristas())
+        fallos.extend(combinaciones)
+
+        escenarios = []
+        validos = []
+        for fallo in fallos:
+            escenario = self._a_indices(grafo, fallo)
+            if escenario is None:
+                print(f"✗ Fallo ignorado, elemento inexistente o inactivo: {fallo}")
+                continue
+            escenarios.append(escenario)
+            validos.append(fallo)
+
+        reportes = self._evaluar(grafo, base, escenarios, procesos)
+        for fallo, reporte in zip(validos, reportes):
+            reporte['fallo'] = fallo
+
+        reportes.sort(
+            key=lambda r: (r['pares_desconectados'], r['costo_adicional'], r['estiramiento_max']),
+            reverse=True
+        )
+
+        with self._lock:
+            if version == self._version:
+                self._resultados[clave] = reportes
+        return reportes
+
+    def simular_fallo(self, *elementos):
+        """
+        Evalúa la caída simultánea de uno o más elementos
+
+        Args:
+            elementos: Elementos ('router', id) / ('enlace', a, b)
+
+        Returns:
+            Reporte del escenario o None si algún elemento no existe
+        """
+        grafo, base = self.obtener_linea_base()
+        escenario = self._a_indices(grafo, elementos)
+        if escenario is None:
+            return None
+
+        reporte = evaluar_fallo(grafo, base, *escenario)
+        reporte['fallo'] = tuple(tuple(e) for e in elementos)
+        return reporte
+
+    @staticmethod
+    def _a_indices(grafo, fallo):
+        """
+        Traduce los elementos de un fallo a índices del grafo
+
+        Returns:
+            Tupla (nodos, aristas) o None si algún elemento no existe
+        """
+        nodos, aristas = [], []
+        for elemento in fallo:
+            tipo, *ids = elemento
+            if tipo == 'router' and len(ids) == 1 and ids[0] in grafo:
+                nodos.append(grafo.indice[ids[0]])
+            elif tipo == 'enlace' and len(ids) == 2 and grafo.has_edge(*ids):
+                aristas.append((grafo.indice[ids[0]], grafo.indice[ids[1]]))
+            else:
+                return None
+        # Un elemento repetido cae una sola vez
+        return tuple(dict.fromkeys(nodos)), tuple(dict.fromkeys(aristas))
+
+    def _evaluar(self, grafo, base, escenarios, procesos=None):
+        """Evalúa los escenarios, en paralelo si son muchos"""
+        procesos = procesos if procesos is not None else self.procesos
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+
+        if procesos > 1 and len(escenarios) >= self.umbral_paralelo:
+            try:
+                return self._evaluar_paralelo(grafo, base, escenarios, procesos)
+            except Exception as e:
+                print(f"✗ Error en la simulación paralela, usando modo secuencial: {e}")
+
+        return [evaluar_fallo(grafo, base, nodos, aristas) for nodos, aristas in escenarios]
+
+    @staticmethod
+    def _evaluar_paralelo(grafo, base, escenarios, procesos):
+        """Reparte los escenarios en bloques entre un pool de procesos"""
+        # Varios bloques por proceso para equilibrar la carga
+        num_bloques = procesos * 4
+        tamano = max(1, -(-len(escenarios) // num_bloques))
+        bloques = [escenarios[i:i + tamano] for i in range(0, len(escenarios), tamano)]
+
+        reportes = []
+        with ProcessPoolExecutor(max_workers=procesos,
+                                 initializer=_inicializar_worker,
+                                 initargs=(grafo, base)) as pool:
+            for parcial in pool.map(_evaluar_worker, bloques):
+                reportes.extend(parcial)
+        return reportes
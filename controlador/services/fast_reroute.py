@@ -0,0 +1,167 @@
+import math
+import threading
+from controlador.config.settings import FAST_REROUTE_CONFIG
+from controlador.services.csr_graph import TOLERANCIA_ECMP
+
+
+def calcular_respaldo(origen, destino, distancia, vecinos, distancias, primarios,
+                      proteccion_nodo=True):
+    """
+    Elige el next hop de respaldo libre de bucles (LFA) de un destino
+
+    Un vecino n del origen s es una alternativa libre de bucles hacia d si
+    dist(n, d) < dist(n, s) + dist(s, d): al recibir el tráfico no lo
+    devuelve a s. Protege además el nodo del salto principal e si
+    dist(n, d) < dist(n, e) + dist(e, d), es decir, si tampoco pasa por e.
+
+    Args:
+        origen: ID del router que conmuta
+        destino: ID del router destino
+        distancia: Distancia del origen al destino
+        vecinos: Diccionario {vecino: costo del enlace} del origen
+        distancias: Diccionario {router: {destino: distancia}} con los
+                    árboles de los vecinos
+        primarios: IDs de los siguientes saltos principales (excluidos)
+        proteccion_nodo: Si True, prefiere las alternativas que protegen
+                         el nodo del salto principal
+
+    Returns:
+        Tupla (vecino, costo_total, protege_nodo) o None si no hay LFA
+    """
+    mejor = None
+    mejor_clave = None
+    for vecino, costo in vecinos.items():
+        if vecino in primarios:
+            continue
+
+        arbol = distancias.get(vecino, {})
+        restante = 0.0 if vecino == destino else arbol.get(destino)
+        hacia_origen = arbol.get(origen)
+        if restante is None or hacia_origen is None:
+            continue
+
+        margen = TOLERANCIA_ECMP * max(1.0, restante)
+        if restante >= hacia_origen + distancia - margen:
+            continue
+
+        # El destino no se puede proteger como nodo intermedio
+        protege = proteccion_nodo and all(
+            primario != destino
+            and restante < arbol.get(primario, math.inf)
+            + distancias.get(primario, {}).get(destino, math.inf) - margen
+            for primario in primarios
+        )
+
+        clave = (not protege, costo + restante, vecino)
+        if mejor_clave is None or clave < mejor_clave:
+            mejor = (vecino, costo + restante, protege)
+            mejor_clave = clave
+
+    return mejor
+
+
+class FastReroute:
+    """
+    Next hops de respaldo precalculados (Loop-Free Alternates)
+
+    Para cada destino de un router elige un vecino que no pertenece a sus
+    saltos principales y que lo lleva al destino sin devolver el tráfico,
+    de modo que el router conmute localmente al caer un vecino sin esperar
+    al controlador. Las distancias salen de los árboles del SPF incremental
+    si está sincronizado con la topología; si no, se calculan solo los del
+    router y sus vecinos. Los respaldos se cachean por versión de topología.
+    """
+
+    def __init__(self, network_graph=None, spf_engine=None, spf_incremental=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+        if spf_engine is None:
+            from controlador.services.spf_engine import SPFEngine
+            spf_engine = SPFEngine(network_graph)
+
+        self.network_graph = network_graph
+        self.spf_engine = spf_engine
+        self.spf_incremental = spf_incremental
+        self.proteccion_nodo = FAST_REROUTE_CONFIG['proteccion_nodo']
+
+        self._version = None
+        self._respaldos = {}
+        self._lock = threading.Lock()
+
+    def respaldos_desde(self, origen):
+        """
+        Calcula los next hops de respaldo de todos los destinos de un router
+
+        Args:
+            origen: ID del router
+
+        Returns:
+            Diccionario {destino: (vecino, costo_total, protege_nodo)} solo
+            con los destinos que tienen alternativa libre de bucles
+        """
+        grafo = self.network_graph.construir_csr()
+        version = self.network_graph.version_grafo
+
+        with self._lock:
+            if version != self._version:
+                self._respaldos = {}
+                self._version = version
+            if origen in self._respaldos:
+                return self._respaldos[origen]
+
+        if origen not in grafo:
+            return {}
+
+        vecinos = {}
+        for vecino, costo in grafo.adyacencia_de(origen):
+            if vecino != origen and costo < vecinos.get(vecino, math.inf):
+                vecinos[vecino] = costo
+
+        arboles = self._arboles(grafo, version, [origen, *vecinos])
+        if origen not in arboles:
+            return {}
+
+        distancias_origen, saltos = arboles[origen]
+        distancias = {router: arbol[0] for router, arbol in arboles.items()}
+
+        respaldos = {}
+        for destino, distancia in distancias_origen.items():
+            if destino == origen:
+                continue
+            respaldo = calcular_respaldo(
+                origen, destino, distancia, vecinos, distancias,
+                set(saltos.get(destino, ())), self.proteccion_nodo
+            )
+            if respaldo:
+                respaldos[destino] = respaldo
+
+        with self._lock:
+            if version == self._version:
+                self._respaldos[origen] = respaldos
+        return respaldos
+
+    def _arboles(self, grafo, version, routers):
+        """
+        Distancias y saltos de igual costo de varios routers
+
+        Returns:
+            Diccionario {router: (distancias, saltos)}
+        """
+        arboles = {}
+        faltantes = []
+        for router in routers:
+            arbol = self.spf_incremental.arbol_de(router, version) if self.spf_incremental else None
+            if arbol is None:
+                faltantes.append(router)
+            else:
+                arboles[router] = arbol
+
+        if faltantes:
+            calculados = self.spf_engine.calcular_arboles(
+                origenes=faltantes, adyacencia=grafo, procesos=1, ecmp=True
+            )
+            for router, (distancias, _, saltos) in calculados.items():
+                arboles[router] = (distancias, saltos)
+
+        return arboles
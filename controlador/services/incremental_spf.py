@@ -0,0 +1,512 @@
+import heapq
+import threading
+from controlador.services.csr_graph import TOLERANCIA_ECMP
+
+
+class _ArbolSPF:
+    """Árbol de caminos más cortos de un origen con sus saltos de igual costo"""
+
+    __slots__ = ('dist', 'pred', 'hijos', 'saltos')
+
+    def __init__(self, dist, pred, saltos=None):
+        self.dist = dist
+        self.pred = pred
+        self.saltos = dict(saltos) if saltos is not None else {}
+        self.hijos = {}
+        for nodo, padre in pred.items():
+            if padre is not None:
+                self.hijos.setdefault(padre, set()).add(nodo)
+
+
+class IncrementalSPF:
+    """
+    Motor SPF incremental (SPF dinámico)
+
+    Mantiene el árbol de caminos más cortos de cada origen y, ante el cambio
+    de un único enlace o router, repara solo los árboles afectados:
+
+    - Si un enlace empeora o desaparece, solo cambian los orígenes cuyo árbol
+      lo usaba; se invalida el subárbol colgante y se recalcula desde su
+      frontera con el resto del árbol.
+    - Si un enlace mejora o aparece, se propagan solo las mejoras estrictas
+      desde sus extremos.
+
+    Además mantiene, por origen y destino, los primeros saltos de igual
+    costo (ECMP): un vecino v del origen s es salto hacia d si
+    costo(s, v) + dist(v, d) = dist(s, d). Tras un cambio solo se revisan
+    los pares cuya distancia cambió, los de los vecinos de esos orígenes y
+    los de los extremos del cambio.
+
+    El resultado de cada cambio es el delta de filas de Ruta:
+    {'modificadas': [(origen, destino, camino, costo, saltos)], 'eliminadas': [(origen, destino)]}
+    """
+
+    def __init__(self):
+        self.adyacencia = {}  # {nodo: {vecino: costo}}
+        self.arboles = {}  # {origen: _ArbolSPF}
+        self.version = None
+        self._lock = threading.Lock()
+
+    def cargar(self, adyacencia, arboles, version):
+        """
+        Carga el estado base a partir de un cálculo completo
+
+        Args:
+            adyacencia: Diccionario {nodo: [(vecino, costo), ...]}
+            arboles: Diccionario {origen: (distancias, predecesores)} o
+                     {origen: (distancias, predecesores, saltos)}; sin los
+                     saltos se derivan de las distancias
+            version: Versión de topología con la que se calcularon
+        """
+        with self._lock:
+            self.adyacencia = {nodo: dict(vecinos) for nodo, vecinos in adyacencia.items()}
+            self.arboles = {origen: _ArbolSPF(*arbol) for origen, arbol in arboles.items()}
+
+            for origen, (_, _, *saltos) in arboles.items():
+                if not saltos:
+                    arbol = self.arboles[origen]
+                    arbol.saltos = {
+                        destino: self._saltos(origen, destino)
+                        for destino in arbol.dist if destino != origen
+                    }
+            self.version = version
+
+    def esta_sincronizado(self, version):
+        """Indica si el estado corresponde a una versión de topología"""
+        return self.version is not None and self.version == version
+
+    def _puede_avanzar(self, version):
+        """Solo se aplica un cambio si el estado es el de la versión anterior"""
+        return self.version is not None and self.version == version - 1
+
+    def avanzar(self, version):
+        """
+        Avanza de versión sin cambios de enrutamiento (p. ej. cambio de nombre)
+
+        Returns:
+            Delta vacío o None si el motor no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+            self.version = version
+            return self._delta_vacio()
+
+    # ==================== CAMBIOS DE TOPOLOGÍA ====================
+
+    def cambiar_enlace(self, version, router_a, router_b, costo):
+        """
+        Aplica el alta, baja o cambio de costo de un enlace
+
+        Args:
+            version: Nueva versión de topología
+            router_a: ID de un extremo
+            router_b: ID del otro extremo
+            costo: Nuevo costo o None si el enlace deja de estar activo
+
+        Returns:
+            Delta de rutas o None si el motor no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+
+            delta = self._delta_vacio()
+
+            if router_a in self.adyacencia and router_b in self.adyacencia:
+                costo = float(costo) if costo is not None else None
+                anterior = self.adyacencia[router_a].get(router_b)
+
+                if costo is None:
+                    self.adyacencia[router_a].pop(router_b, None)
+                    self.adyacencia[router_b].pop(router_a, None)
+                else:
+                    self.adyacencia[router_a][router_b] = costo
+                    self.adyacencia[router_b][router_a] = costo
+
+                if anterior != costo:
+                    empeora = costo is None or (anterior is not None and costo > anterior)
+
+                    for origen, arbol in self.arboles.items():
+                        if empeora:
+                            anteriores = self._reparar_aumento(arbol, router_a, router_b)
+                            self._acumular(delta, origen, arbol, anteriores)
+                        else:
+                            mejorados = self._reparar_disminucion(
+                                arbol, [(router_a, router_b, costo), (router_b, router_a, costo)]
+                            )
+                            self._acumular_mejoras(delta, origen, arbol, mejorados)
+
+                    self._actualizar_saltos(delta, (router_a, router_b))
+
+            self._completar_saltos(delta)
+            self.version = version
+            return delta
+
+    def cambiar_router(self, version, id_router, activo, vecinos=()):
+        """
+        Aplica la activación o desactivación de un router
+
+        Args:
+            version: Nueva versión de topología
+            id_router: ID del router
+            activo: True si el router pasa a estar activo
+            vecinos: Lista [(vecino, costo)] de enlaces activos (solo al activar)
+
+        Returns:
+            Delta de rutas o None si el motor no está sincronizado
+        """
+        with self._lock:
+            if not self._puede_avanzar(version):
+                return None
+
+            delta = self._delta_vacio()
+
+            if activo and id_router not in self.adyacencia:
+                self._activar_router(delta, id_router, vecinos)
+                self._actualizar_saltos(delta, [id_router, *self.adyacencia[id_router]])
+            elif not activo and id_router in self.adyacencia:
+                extremos = list(self.adyacencia[id_router])
+                self._desactivar_router(delta, id_router)
+                self._actualizar_saltos(delta, extremos)
+
+            self._completar_saltos(delta)
+            self.version = version
+            return delta
+
+    def _activar_router(self, delta, id_router, vecinos):
+        """Agrega un router con sus enlaces y propaga las mejoras"""
+        self.adyacencia[id_router] = {}
+        for vecino, costo in vecinos:
+            if vecino in self.adyacencia and vecino != id_router:
+                self.adyacencia[id_router][vecino] = float(costo)
+                self.adyacencia[vecino][id_router] = float(costo)
+
+        aristas = [(vecino, id_router, costo)
+                   for vecino, costo in self.adyacencia[id_router].items()]
+
+        for origen, arbol in self.arboles.items():
+            mejorados = self._reparar_disminucion(arbol, aristas)
+            self._acumular_mejoras(delta, origen, arbol, mejorados)
+
+        # Árbol completo del router nuevo
+        arbol = _ArbolSPF(*self._dijkstra(id_router))
+        self.arboles[id_router] = arbol
+        self._acumular_mejoras(delta, id_router, arbol, arbol.dist)
+
+    def _desactivar_router(self, delta, id_router):
+        """Quita un router y repara los árboles que pasaban por él"""
+        # Separar primero los subárboles colgantes del router en cada origen
+        pendientes = []
+        for origen, arbol in self.arboles.items():
+            if origen == id_router or id_router not in arbol.dist:
+                continue
+            subarbol = self._subarbol(arbol, id_router)
+            anteriores = self._separar(arbol, subarbol)
+            pendientes.append((origen, arbol, subarbol, anteriores))
+
+        # Quitar el router de la adyacencia
+        for vecino in self.adyacencia.pop(id_router):
+            self.adyacencia[vecino].pop(id_router, None)
+
+        # Recalcular los subárboles sin el router
+        for origen, arbol, subarbol, anteriores in pendientes:
+            subarbol.discard(id_router)
+            self._recalcular(arbol, subarbol)
+            self._acumular(delta, origen, arbol, anteriores)
+
+        # Las rutas con origen en el router desaparecen
+        arbol = self.arboles.pop(id_router, None)
+        if arbol:
+            for destino in arbol.dist:
+                if destino != id_router:
+                    delta['eliminadas'].append((id_router, destino))
+
+    # ==================== REPARACIÓN DE ÁRBOLES ====================
+
+    def _reparar_aumento(self, arbol, router_a, router_b):
+        """
+        Repara un árbol tras empeorar o eliminar el enlace (a, b)
+
+        Returns:
+            Diccionario {nodo: (distancia, camino)} previo de los nodos afectados
+        """
+        if arbol.pred.get(router_b) == router_a:
+            raiz = router_b
+        elif arbol.pred.get(router_a) == router_b:
+            raiz = router_a
+        else:
+            # El enlace no pertenece al árbol: nada cambia para este origen
+            return {}
+
+        subarbol = self._subarbol(arbol, raiz)
+        anteriores = self._separar(arbol, subarbol)
+        self._recalcular(arbol, subarbol)
+        return anteriores
+
+    def _reparar_disminucion(self, arbol, aristas):
+        """
+        Propaga las mejoras estrictas producidas por aristas nuevas o más baratas
+
+        Args:
+            arbol: Árbol a reparar
+            aristas: Lista [(desde, hacia, costo)]
+
+        Returns:
+            Diccionario {nodo: distancia} de los nodos mejorados
+        """
+        mejorados = {}
+        cola = []
+
+        for desde, hacia, costo in aristas:
+            if desde in arbol.dist:
+                nueva = arbol.dist[desde] + costo
+                if hacia not in arbol.dist or nueva < arbol.dist[hacia]:
+                    arbol.dist[hacia] = nueva
+                    self._fijar_predecesor(arbol, hacia, desde)
+                    mejorados[hacia] = nueva
+                    heapq.heappush(cola, (nueva, hacia))
+
+        while cola:
+            distancia, nodo = heapq.heappop(cola)
+            if distancia > arbol.dist[nodo]:
+                continue
+            for vecino, costo in self.adyacencia[nodo].items():
+                nueva = distancia + costo
+                if vecino not in arbol.dist or nueva < arbol.dist[vecino]:
+                    arbol.dist[vecino] = nueva
+                    self._fijar_predecesor(arbol, vecino, nodo)
+                    mejorados[vecino] = nueva
+                    heapq.heappush(cola, (nueva, vecino))
+
+        return mejorados
+
+    def _separar(self, arbol, subarbol):
+        """
+        Quita un subárbol del árbol guardando distancias y caminos previos
+
+        Returns:
+            Diccionario {nodo: (distancia, camino)}
+        """
+        anteriores = {nodo: (arbol.dist[nodo], self._camino(arbol, nodo)) for nodo in subarbol}
+
+        for nodo in subarbol:
+            padre = arbol.pred.pop(nodo)
+            del arbol.dist[nodo]
+            arbol.hijos.pop(nodo, None)
+            if padre is not None and padre not in subarbol:
+                arbol.hijos[padre].discard(nodo)
+
+        return anteriores
+
+    def _recalcular(self, arbol, subarbol):
+        """Dijkstra restringido a un subárbol separado, desde su frontera"""
+        tentativas = {}
+        padres = {}
+        cola = []
+
+        for nodo in subarbol:
+            for vecino, costo in self.adyacencia[nodo].items():
+                if vecino in arbol.dist:
+                    nueva = arbol.dist[vecino] + costo
+                    if nodo not in tentativas or nueva < tentativas[nodo]:
+                        tentativas[nodo] = nueva
+                        padres[nodo] = vecino
+
+        for nodo, distancia in tentativas.items():
+            heapq.heappush(cola, (distancia, nodo))
+
+        while cola:
+            distancia, nodo = heapq.heappop(cola)
+            if nodo in arbol.dist or distancia > tentativas[nodo]:
+                continue
+
+            arbol.dist[nodo] = distancia
+            self._fijar_predecesor(arbol, nodo, padres[nodo])
+
+            for vecino, costo in self.adyacencia[nodo].items():
+                if vecino in subarbol and vecino not in arbol.dist:
+                    nueva = distancia + costo
+                    if vecino not in tentativas or nueva < tentativas[vecino]:
+                        tentativas[vecino] = nueva
+                        padres[vecino] = nodo
+                        heapq.heappush(cola, (nueva, vecino))
+
+    def _dijkstra(self, origen):
+        """Dijkstra completo sobre la adyacencia actual"""
+        distancias = {origen: 0.0}
+        predecesores = {origen: None}
+        visitados = set()
+        cola = [(0.0, origen)]
+
+        while cola:
+            distancia, nodo = heapq.heappop(cola)
+            if nodo in visitados:
+                continue
+            visitados.add(nodo)
+            for vecino, costo in self.adyacencia[nodo].items():
+                nueva = distancia + costo
+                if vecino not in distancias or nueva < distancias[vecino]:
+                    distancias[vecino] = nueva
+                    predecesores[vecino] = nodo
+                    heapq.heappush(cola, (nueva, vecino))
+
+        return distancias, predecesores
+
+    # ==================== SALTOS DE IGUAL COSTO ====================
+
+    def _saltos(self, origen, destino):
+        """Vecinos del origen que inician un camino mínimo hacia el destino"""
+        objetivo = self.arboles[origen].dist.get(destino)
+        if objetivo is None or destino == origen:
+            return ()
+
+        margen = TOLERANCIA_ECMP * max(1.0, objetivo)
+        saltos = []
+        for vecino, costo in self.adyacencia[origen].items():
+            if vecino == destino:
+                restante = 0.0
+            else:
+                arbol_vecino = self.arboles.get(vecino)
+                restante = arbol_vecino.dist.get(destino) if arbol_vecino else None
+                if restante is None:
+                    continue
+            if abs(costo + restante - objetivo) <= margen:
+                saltos.append(vecino)
+        return tuple(sorted(saltos))
+
+    def _actualizar_saltos(self, delta, extremos):
+        """
+        Recalcula los saltos de igual costo de los pares que pueden cambiar
+        y agrega al delta los que cambiaron sin cambiar de camino ni costo
+
+        Args:
+            delta: Delta con los pares cuya distancia o camino ya cambió
+            extremos: Routers cuyos enlaces cambiaron (todos sus destinos se revisan)
+        """
+        cambiados = {(origen, destino) for origen, destino, *_ in delta['modificadas']}
+        cambiados.update(delta['eliminadas'])
+
+        pares = set(cambiados)
+        for origen, destino in cambiados:
+            for vecino in self.adyacencia.get(origen, ()):
+                pares.add((vecino, destino))
+        for extremo in extremos:
+            arbol = self.arboles.get(extremo)
+            if arbol:
+                pares.update((extremo, destino) for destino in arbol.dist)
+
+        for origen, destino in pares:
+            arbol = self.arboles.get(origen)
+            if arbol is None or origen == destino:
+                continue
+            if destino not in arbol.dist:
+                arbol.saltos.pop(destino, None)
+                continue
+
+            saltos = self._saltos(origen, destino)
+            if saltos != arbol.saltos.get(destino):
+                arbol.saltos[destino] = saltos
+                if (origen, destino) not in cambiados:
+                    delta['modificadas'].append(
+                        (origen, destino, self._camino(arbol, destino), arbol.dist[destino])
+                    )
+
+    def _completar_saltos(self, delta):
+        """Agrega a cada ruta modificada sus saltos de igual costo"""
+        delta['modificadas'] = [
+            (origen, destino, camino, costo, self.arboles[origen].saltos.get(destino, ()))
+            for origen, destino, camino, costo in delta['modificadas']
+        ]
+
+    # ==================== UTILIDADES ====================
+
+    @staticmethod
+    def _fijar_predecesor(arbol, nodo, padre):
+        anterior = arbol.pred.get(nodo)
+        if anterior is not None:
+            arbol.hijos[anterior].discard(nodo)
+        arbol.pred[nodo] = padre
+        if padre is not None:
+            arbol.hijos.setdefault(padre, set()).add(nodo)
+
+    @staticmethod
+    def _subarbol(arbol, raiz):
+        """Nodos del subárbol que cuelga de una raíz (incluida)"""
+        subarbol = {raiz}
+        pila = [raiz]
+        while pila:
+            nodo = pila.pop()
+            for hijo in arbol.hijos.get(nodo, ()):
+                if hijo not in subarbol:
+                    subarbol.add(hijo)
+                    pila.append(hijo)
+        return subarbol
+
+    @staticmethod
+    def _camino(arbol, destino):
+        """Camino desde el origen del árbol hasta un destino"""
+        camino = []
+        nodo = destino
+        while nodo is not None:
+            camino.append(nodo)
+            nodo = arbol.pred[nodo]
+        camino.reverse()
+        return camino
+
+    @staticmethod
+    def _delta_vacio():
+        return {'modificadas': [], 'eliminadas': []}
+
+    def _acumular(self, delta, origen, arbol, anteriores):
+        """Agrega al delta los nodos recalculados cuyo camino o costo cambió"""
+        for nodo, (distancia, camino) in anteriores.items():
+            if nodo == origen:
+                continue
+            if nodo not in arbol.dist:
+                delta['eliminadas'].append((origen, nodo))
+                continue
+            nuevo_camino = self._camino(arbol, nodo)
+            if arbol.dist[nodo] != distancia or nuevo_camino != camino:
+                delta['modificadas'].append((origen, nodo, nuevo_camino, arbol.dist[nodo]))
+
+    def _acumular_mejoras(self, delta, origen, arbol, mejorados):
+        """Agrega al delta los nodos cuya distancia mejoró (siempre cambian)"""
+        for nodo in mejorados:
+            if nodo != origen:
+                delta['modificadas'].append((origen, nodo, self._camino(arbol, nodo), arbol.dist[nodo]))
+
+    def arbol_de(self, origen, version):
+        """
+        Distancias y saltos de igual costo vigentes de un origen
+
+        Los diccionarios son los del propio motor y no deben modificarse.
+
+        Args:
+            origen: ID del router origen
+            version: Versión de topología esperada
+
+        Returns:
+            Tupla (distancias, saltos) o None si el motor no está
+            sincronizado con esa versión o no conoce el origen
+        """
+        with self._lock:
+            arbol = self.arboles.get(origen) if self.esta_sincronizado(version) else None
+            return (arbol.dist, arbol.saltos) if arbol else None
+
+    def rutas_desde(self, origen):
+        """
+        Obtiene las rutas vigentes de un origen
+
+        Returns:
+            Diccionario {destino: (camino, costo)}
+        """
+        with self._lock:
+            arbol = self.arboles.get(origen)
+            if not arbol:
+                return {}
+            return {
+                destino: (self._camino(arbol, destino), distancia)
+                for destino, distancia in arbol.dist.items()
+                if destino != origen
+            }
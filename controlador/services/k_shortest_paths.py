@@ -0,0 +1,374 @@
+import heapq
+import threading
+import time
+from controlador.config.settings import KSP_CONFIG
+from controlador.services.route_cache import RouteCache
+from controlador.services.spf_engine import dijkstra
+
+# Variantes de búsqueda de caminos alternativos
+MODOS_KSP = ['simple', 'aristas_disjuntas', 'nodos_disjuntos']
+
+
+class Presupuesto:
+    """Límite de tiempo y de expansiones de nodos para una búsqueda"""
+
+    def __init__(self, tiempo_max=None, max_expansiones=None):
+        self.limite = time.monotonic() + tiempo_max if tiempo_max else None
+        self.max_expansiones = max_expansiones
+        self.expansiones = 0
+        self.agotado = False
+
+    def consumir(self):
+        """
+        Descuenta una expansión
+
+        Returns:
+            False si se agotó el presupuesto
+        """
+        self.expansiones += 1
+        if self.max_expansiones is not None and self.expansiones > self.max_expansiones:
+            self.agotado = True
+
+        # Consultar el reloj cada 256 expansiones
+        if self.limite is not None and self.expansiones % 256 == 0:
+            if time.monotonic() > self.limite:
+                self.agotado = True
+
+        return not self.agotado
+
+
+class KShortestPaths:
+    """
+    Motor de K caminos más cortos entre dos routers
+
+    El modo 'simple' usa el algoritmo de Yen con la mejora de Lawler (cada
+    candidato solo se desvía a partir del punto donde nació). El primer
+    camino sale del árbol de caminos más cortos con raíz en el destino, y
+    las distancias de ese mismo árbol guían como heurística exacta de A*
+    las búsquedas de desvío, que así exploran muy pocos nodos.
+
+    Los modos 'aristas_disjuntas' y 'nodos_disjuntos' resuelven un flujo
+    de costo mínimo (caminos sucesivos con potenciales), que encuentra K
+    caminos disjuntos de costo total mínimo aun cuando una búsqueda voraz
+    fallaría.
+
+    Los árboles se reutilizan mientras la topología no cambie y los
+    resultados completos se memorizan en la caché de rutas por versión.
+    """
+
+    def __init__(self, network_graph=None, tiempo_max=None, max_expansiones=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+        self.tiempo_max = tiempo_max if tiempo_max is not None else KSP_CONFIG['tiempo_max']
+        self.max_expansiones = (
+            max_expansiones if max_expansiones is not None else KSP_CONFIG['max_expansiones']
+        )
+        self.rutas_cache = RouteCache()
+
+        self._version = None
+        self._adyacencia = None
+        self._costos = None
+        self._arboles = {}
+        self._lock = threading.Lock()
+
+    def calcular(self, origen, destino, k=3, modo='simple'):
+        """
+        Calcula hasta K caminos entre dos routers
+
+        Args:
+            origen: ID del router origen
+            destino: ID del router destino
+            k: Número de caminos a buscar
+            modo: 'simple', 'aristas_disjuntas' o 'nodos_disjuntos'
+
+        Returns:
+            Tupla (rutas, completo): rutas es una lista [(camino, costo), ...]
+            ordenada por costo; completo es False si se agotó el presupuesto
+        """
+        if modo not in MODOS_KSP:
+            raise ValueError(f"Modo de rutas alternativas inválido: {modo}")
+
+        version, adyacencia = self._preparar()
+        if origen not in adyacencia or destino not in adyacencia or k < 1:
+            return [], True
+        if origen == destino:
+            return [([origen], 0.0)], True
+
+        metrica = ('ksp', modo, k)
+        encontrada, rutas = self.rutas_cache.obtener(origen, destino, metrica, version)
+        if encontrada:
+            return rutas, True
+
+        presupuesto = Presupuesto(self.tiempo_max, self.max_expansiones)
+        if modo == 'simple':
+            rutas = self._yen(origen, destino, k, presupuesto)
+        else:
+            rutas = self._disjuntos(origen, destino, k, modo == 'nodos_disjuntos', presupuesto)
+
+        completo = not presupuesto.agotado
+        if completo:
+            self.rutas_cache.guardar(origen, destino, metrica, version, rutas)
+        return rutas, completo
+
+    # ---------- Estado por versión ----------
+
+    def _preparar(self):
+        """Carga la adyacencia de la versión actual y descarta los árboles viejos"""
+        with self._lock:
+            grafo = self.network_graph.construir_csr()
+            version = self.network_graph.version_grafo
+
+            if version != self._version or self._adyacencia is None:
+                self._adyacencia = grafo.adyacencia()
+                self._costos = {
+                    (u, v): costo
+                    for u, vecinos in self._adyacencia.items()
+                    for v, costo in vecinos
+                }
+                self._arboles = {}
+                self._version = version
+
+            return version, self._adyacencia
+
+    def _arbol(self, raiz):
+        """Árbol de caminos más cortos con raíz dada, cacheado por versión"""
+        with self._lock:
+            arbol = self._arboles.get(raiz)
+        if arbol is None:
+            arbol = dijkstra(self._adyacencia, raiz)
+            with self._lock:
+                self._arboles[raiz] = arbol
+        return arbol
+
+    def _costo_camino(self, camino):
+        return sum(self._costos[(u, v)] for u, v in zip(camino, camino[1:]))
+
+    # ---------- Yen ----------
+
+    def _yen(self, origen, destino, k, presupuesto):
+        """K caminos simples más cortos (Yen con la mejora de Lawler)"""
+        distancias, predecesores = self._arbol(destino)
+        if origen not in distancias:
+            return []
+
+        # En el árbol con raíz en el destino, los predecesores llevan del
+        # origen al destino
+        camino = [origen]
+        while camino[-1] != destino:
+            camino.append(predecesores[camino[-1]])
+
+        rutas = [(camino, distancias[origen])]
+        desvios = [0]  # Índice desde el que cada ruta puede desviarse
+        candidatos = []
+        vistos = {tuple(camino)}
+
+        while len(rutas) < k and not presupuesto.agotado:
+            anterior, _ = rutas[-1]
+            costo_raiz = 0.0
+
+            for i in range(desvios[-1]):
+                costo_raiz += self._costos[(anterior[i], anterior[i + 1])]
+
+            for i in range(desvios[-1], len(anterior) - 1):
+                nodo_desvio = anterior[i]
+                raiz = anterior[:i + 1]
+
+                # Aristas ya usadas por rutas con la misma raíz
+                aristas_excluidas = {
+                    (ruta[i], ruta[i + 1])
+                    for ruta, _ in rutas
+                    if len(ruta) > i + 1 and ruta[:i + 1] == raiz
+                }
+                nodos_excluidos = set(raiz[:-1])
+
+                desvio = self._a_estrella(
+                    nodo_desvio, destino, distancias,
+                    nodos_excluidos, aristas_excluidas, presupuesto
+                )
+                if desvio is not None:
+                    tramo, costo_tramo = desvio
+                    candidato = raiz[:-1] + tramo
+                    clave = tuple(candidato)
+                    if clave not in vistos:
+                        vistos.add(clave)
+                        heapq.heappush(
+                            candidatos, (costo_raiz + costo_tramo, len(candidato), candidato, i)
+                        )
+
+                if presupuesto.agotado:
+                    break
+                costo_raiz += self._costos[(anterior[i], anterior[i + 1])]
+
+            if not candidatos:
+                break
+
+            costo, _, camino, desvio = heapq.heappop(candidatos)
+            rutas.append((camino, costo))
+            desvios.append(desvio)
+
+        return rutas
+
+    def _a_estrella(self, origen, destino, heuristica, nodos_excluidos,
+                    aristas_excluidas, presupuesto):
+        """
+        Camino más corto con nodos y aristas excluidos
+
+        La heurística son las distancias exactas al destino en el grafo
+        completo; excluir elementos solo alarga los caminos, así que sigue
+        siendo admisible y consistente.
+
+        Returns:
+            Tupla (camino, costo) o None si no hay camino
+        """
+        distancias = {origen: 0.0}
+        predecesores = {origen: None}
+        cerrados = set()
+        cola = [(heuristica[origen], 0.0, origen)]
+
+        while cola:
+            _, distancia, nodo = heapq.heappop(cola)
+            if nodo in cerrados:
+                continue
+            if nodo == destino:
+                camino = [nodo]
+                while predecesores[camino[-1]] is not None:
+                    camino.append(predecesores[camino[-1]])
+                camino.reverse()
+                return camino, distancia
+
+            cerrados.add(nodo)
+            if not presupuesto.consumir():
+                return None
+
+            for vecino, costo in self._adyacencia[nodo]:
+                if vecino in nodos_excluidos or (nodo, vecino) in aristas_excluidas:
+                    continue
+                if vecino not in heuristica:
+                    continue  # No alcanza el destino
+
+                nueva = distancia + costo
+                if nueva < distancias.get(vecino, float('inf')):
+                    distancias[vecino] = nueva
+                    predecesores[vecino] = nodo
+                    heapq.heappush(cola, (nueva + heuristica[vecino], nueva, vecino))
+
+        return None
+
+    # ---------- Caminos disjuntos ----------
+
+    def _disjuntos(self, origen, destino, k, por_nodos, presupuesto):
+        """K caminos disjuntos de costo total mínimo (flujo de costo mínimo)"""
+        indice = {nodo: i for i, nodo in enumerate(self._adyacencia)}
+        n = len(indice)
+
+        # Red residual: por arco [destino, capacidad, costo, índice del inverso]
+        arcos = [[] for _ in range(2 * n if por_nodos else n)]
+        enlaces = []  # Arcos de enlaces: (u, posición en arcos[u], router u, router v)
+
+        def agregar_arco(u, v, capacidad, costo):
+            arcos[u].append([v, capacidad, costo, len(arcos[v])])
+            arcos[v].append([u, 0, -costo, len(arcos[u]) - 1])
+
+        if por_nodos:
+            # Cada router se divide en entrada (2i) y salida (2i+1) de capacidad 1
+            for nodo, i in indice.items():
+                capacidad = k if nodo in (origen, destino) else 1
+                agregar_arco(2 * i, 2 * i + 1, capacidad, 0.0)
+            for u, vecinos in self._adyacencia.items():
+                for v, costo in vecinos:
+                    salida = 2 * indice[u] + 1
+                    enlaces.append((salida, len(arcos[salida]), u, v))
+                    agregar_arco(salida, 2 * indice[v], 1, costo)
+            fuente = 2 * indice[origen] + 1
+            sumidero = 2 * indice[destino]
+        else:
+            for u, vecinos in self._adyacencia.items():
+                for v, costo in vecinos:
+                    enlaces.append((indice[u], len(arcos[indice[u]]), u, v))
+                    agregar_arco(indice[u], indice[v], 1, costo)
+            fuente = indice[origen]
+            sumidero = indice[destino]
+
+        # Caminos sucesivos: Dijkstra sobre costos reducidos con potenciales
+        potencial = [0.0] * len(arcos)
+        encontrados = 0
+        while encontrados < k:
+            distancias = [float('inf')] * len(arcos)
+            previo = [None] * len(arcos)
+            distancias[fuente] = 0.0
+            cola = [(0.0, fuente)]
+
+            while cola:
+                distancia, u = heapq.heappop(cola)
+                if distancia > distancias[u]:
+                    continue
+                if not presupuesto.consumir():
+                    break
+                for j, (v, capacidad, costo, _) in enumerate(arcos[u]):
+                    if capacidad <= 0:
+                        continue
+                    nueva = distancia + costo + potencial[u] - potencial[v]
+                    if nueva < distancias[v] - 1e-12:
+                        distancias[v] = nueva
+                        previo[v] = (u, j)
+                        heapq.heappush(cola, (nueva, v))
+
+            if presupuesto.agotado or distancias[sumidero] == float('inf'):
+                break
+
+            for v, distancia in enumerate(distancias):
+                if distancia < float('inf'):
+                    potencial[v] += distancia
+
+            # Aumentar una unidad de flujo
+            v = sumidero
+            while v != fuente:
+                u, j = previo[v]
+                arco = arcos[u][j]
+                arco[1] -= 1
+                arcos[v][arco[3]][1] += 1
+                v = u
+            encontrados += 1
+
+        # Enlaces usados por el flujo (capacidad residual agotada)
+        salidas = {}
+        for u, j, u_nodo, v_nodo in enlaces:
+            if arcos[u][j][1] == 0:
+                salidas.setdefault(u_nodo, []).append(v_nodo)
+
+        # Un flujo en ambos sentidos de un enlace se cancela
+        for u in list(salidas):
+            for v in list(salidas[u]):
+                if u in salidas.get(v, []) and v in salidas[u]:
+                    salidas[u].remove(v)
+                    salidas[v].remove(u)
+
+        rutas = []
+        for _ in range(encontrados):
+            camino = [origen]
+            while camino[-1] != destino and salidas.get(camino[-1]):
+                camino.append(salidas[camino[-1]].pop())
+            if camino[-1] != destino:
+                break
+            camino = self._sin_ciclos(camino)
+            rutas.append((camino, self._costo_camino(camino)))
+
+        rutas.sort(key=lambda ruta: (ruta[1], len(ruta[0])))
+        return rutas
+
+    @staticmethod
+    def _sin_ciclos(camino):
+        """Elimina los ciclos de costo cero que pueda dejar el flujo"""
+        posiciones = {}
+        resultado = []
+        for nodo in camino:
+            if nodo in posiciones:
+                del resultado[posiciones[nodo] + 1:]
+                posiciones = {n: i for i, n in enumerate(resultado)}
+                continue
+            posiciones[nodo] = len(resultado)
+            resultado.append(nodo)
+        return resultado
@@ -0,0 +1,200 @@
+import threading
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+except ImportError:
+    np = None
+
+# Marca de SciPy para "sin predecesor" en la matriz de predecesores
+SIN_PREDECESOR = -9999
+
+
+class MatrixEngine:
+    """
+    Motor matricial de distancias de todos los pares (NumPy/SciPy)
+
+    Construye la adyacencia ponderada como matriz dispersa CSR y calcula
+    en lote las matrices de distancias y de siguiente salto. Los routers
+    se mapean a índices de fila/columna con 'indice' (ID -> índice) y
+    'ids' (índice -> ID). Las matrices se recalculan solo cuando cambia la
+    versión de la topología, de modo que consultar el costo o el siguiente
+    salto entre dos routers es O(1).
+
+    Si NumPy o SciPy no están instalados, 'disponible' es False y los
+    métodos de consulta devuelven None.
+    """
+
+    disponible = np is not None
+
+    def __init__(self, network_graph=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+
+        # (version, ids, indice, adyacencia, distancias, siguiente); se
+        # reemplaza completo para que los lectores nunca mezclen versiones
+        self._matrices = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Versión de topología de las matrices calculadas"""
+        return self._matrices[0] if self._matrices else None
+
+    def actualizar(self, forzar=False):
+        """
+        Recalcula las matrices si la topología cambió
+
+        Args:
+            forzar: Si True, recalcula aunque la versión no haya cambiado
+
+        Returns:
+            Tupla (version, ids, indice, adyacencia, distancias, siguiente)
+            o None si NumPy/SciPy no están disponibles
+        """
+        if not self.disponible:
+            return None
+
+        with self._lock:
+            grafo = self.network_graph.construir_csr()
+            version = self.network_graph.version_grafo
+
+            if not forzar and self._matrices and self._matrices[0] == version:
+                return self._matrices
+
+            ids = np.array(grafo.ids, dtype=np.int64)
+            indice = dict(grafo.indice)
+            n = len(ids)
+
+            # El grafo compacto ya está en formato CSR (cada enlace en ambos
+            # sentidos): sus arreglos se pasan tal cual a SciPy
+            adyacencia = csr_matrix(
+                (
+                    np.array(grafo.costos, dtype=np.float64),
+                    np.array(grafo.destinos, dtype=np.int32),
+                    np.array(grafo.offsets, dtype=np.int32)
+                ),
+                shape=(n, n)
+            )
+
+            if n:
+                distancias, predecesores = csgraph_dijkstra(
+                    adyacencia, directed=False, return_predecessors=True
+                )
+                # En un grafo no dirigido, el predecesor de i en el árbol con
+                # raíz j es el siguiente salto de i hacia j
+                siguiente = predecesores.T.copy()
+                np.fill_diagonal(siguiente, np.arange(n))
+            else:
+                distancias = np.zeros((0, 0))
+                siguiente = np.zeros((0, 0), dtype=np.int32)
+
+            self._matrices = (version, ids, indice, adyacencia, distancias, siguiente)
+            return self._matrices
+
+    def matriz_adyacencia(self):
+        """
+        Matriz densa de costos directos (0 en la diagonal, inf sin enlace)
+
+        Returns:
+            Tupla (ids, matriz) o None si el motor no está disponible
+        """
+        matrices = self.actualizar()
+        if matrices is None:
+            return None
+
+        _, ids, _, adyacencia, _, _ = matrices
+        n = len(ids)
+        matriz = np.full((n, n), np.inf)
+        coo = adyacencia.tocoo()
+        matriz[coo.row, coo.col] = coo.data
+        np.fill_diagonal(matriz, 0)
+        return ids, matriz
+
+    def matriz_distancias(self):
+        """
+        Matrices de todos los pares
+
+        Returns:
+            Diccionario con 'ids', 'indice', 'distancias' y 'siguiente_salto'
+            (IDs de router, -1 si el destino es inalcanzable), o None
+        """
+        matrices = self.actualizar()
+        if matrices is None:
+            return None
+
+        _, ids, indice, _, distancias, siguiente = matrices
+        alcanzable = siguiente >= 0
+        siguiente_ids = np.where(alcanzable, ids[np.where(alcanzable, siguiente, 0)], -1)
+        return {
+            'ids': ids,
+            'indice': indice,
+            'distancias': distancias,
+            'siguiente_salto': siguiente_ids
+        }
+
+    def _indices(self, origen, destino):
+        """Matrices vigentes e índices de un par de routers (None si faltan)"""
+        matrices = self.actualizar()
+        if matrices is None:
+            return None, None, None
+
+        indice = matrices[2]
+        i = indice.get(origen)
+        j = indice.get(destino)
+        if i is None or j is None:
+            return None, None, None
+        return matrices, i, j
+
+    def distancia(self, origen, destino):
+        """
+        Costo del camino más corto entre dos routers
+
+        Returns:
+            Costo (float), inf si no hay camino o None si algún router no existe
+        """
+        matrices, i, j = self._indices(origen, destino)
+        if matrices is None:
+            return None
+        return float(matrices[4][i, j])
+
+    def siguiente_salto(self, origen, destino):
+        """
+        Siguiente salto desde origen hacia destino
+
+        Returns:
+            ID del router vecino, o None si no hay camino
+        """
+        matrices, i, j = self._indices(origen, destino)
+        if matrices is None:
+            return None
+
+        k = matrices[5][i, j]
+        return int(matrices[1][k]) if k != SIN_PREDECESOR else None
+
+    def camino(self, origen, destino):
+        """
+        Camino más corto entre dos routers siguiendo la matriz de saltos
+
+        Returns:
+            Tupla (camino, costo) o (None, None) si no hay camino
+        """
+        matrices, i, j = self._indices(origen, destino)
+        if matrices is None:
+            return None, None
+
+        _, ids, _, _, distancias, siguiente = matrices
+        costo = float(distancias[i, j])
+        if not np.isfinite(costo):
+            return None, None
+
+        camino = [origen]
+        while i != j:
+            i = siguiente[i, j]
+            camino.append(int(ids[i]))
+
+        return camino, costo
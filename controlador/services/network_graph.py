@@ -2,88 +2,167 @@ import networkx as nx
 import matplotlib.pyplot as plt
 from controlador.dao.router_dao import RouterDAO
 from controlador.dao.enlace_dao import EnlaceDAO
+from controlador.services.topology_cache import TopologyCache
+from controlador.services.csr_graph import CSRGraph
+from controlador.services.spf_engine import reconstruir_caminos
+from controlador.services.route_cache import RouteCache
+from controlador.services.k_shortest_paths import KShortestPaths
+from controlador.services.constrained_routing import ConstrainedRouting
+from controlador.services.centrality_engine import CentralityEngine
+from controlador.services.biconnectivity import BiconnectivityIndex
+from controlador.services.failure_simulator import FailureSimulator
 
 class NetworkGraph:
-    """Clase para gestionar el grafo de la red con NetworkX"""
+    """
+    Clase para gestionar el grafo de la red
+
+    Los cálculos de rutas usan el grafo compacto (CSRGraph); el grafo de
+    NetworkX se materializa bajo demanda para la visualización y los
+    análisis que lo necesitan.
+    """
 
     def __init__(self):
         self.router_dao = RouterDAO()
         self.enlace_dao = EnlaceDAO()
+        self.cache = TopologyCache()
+        self.rutas_cache = RouteCache()
+        self.ksp = KShortestPaths(self)
+        self.qos = ConstrainedRouting(self)
+        self.centralidad = CentralityEngine(self)
+        self.biconectividad = BiconnectivityIndex()
+        self.fallos = FailureSimulator(self)
+        self.csr = None
         self.grafo = nx.Graph()
+        self.version_grafo = None
+        self._version_nx = None
 
-    def construir_grafo(self):
+    def construir_csr(self, forzar=False):
         """
-        Construye el grafo de la red desde la base de datos
+        Construye el grafo compacto de la red, reutilizando la caché de topología
+
+        Solo consulta la base de datos si la versión de la topología cambió
+        desde la última construcción.
+
+        Args:
+            forzar: Si True, ignora la caché y recarga desde la base de datos
+
+        Returns:
+            CSRGraph: Grafo construido
+        """
+        version = self.cache.version
+
+        if not forzar:
+            if self.version_grafo == version and self.csr is not None:
+                return self.csr
+
+            csr = self.cache.obtener(version)
+            if csr is not None:
+                self.csr = csr
+                self.version_grafo = version
+                return self.csr
+
+        csr = self._cargar_grafo()
+        self.cache.guardar(version, csr)
+
+        self.csr = csr
+        self.version_grafo = version
+        self._version_nx = None
+        return self.csr
+
+    def construir_grafo(self, forzar=False):
+        """
+        Obtiene el grafo de la red como networkx.Graph
+
+        Se materializa a partir del grafo compacto una vez por versión de
+        topología; los cálculos de rutas deben usar construir_csr.
+
+        Args:
+            forzar: Si True, ignora la caché y recarga desde la base de datos
 
         Returns:
             networkx.Graph: Grafo construido
         """
-        # Limpiar grafo anterior
-        self.grafo.clear()
+        csr = self.construir_csr(forzar)
+        version = self.version_grafo
 
-        # Obtener routers activos
-        routers = self.router_dao.obtener_activos()
+        if self._version_nx != version:
+            grafo = self.cache.obtener_networkx(version)
+            if grafo is None:
+                grafo = csr.to_networkx()
+                self.cache.guardar_networkx(version, grafo)
+
+            self.grafo = grafo
+            self._version_nx = version
 
-        # Agregar nodos (routers)
-        for router in routers:
-            self.grafo.add_node(
-                router.id_router,
-                nombre=router.nombre,
-                ip=router.ip,
-                estado=router.estado
-            )
+        return self.grafo
+
+    def _cargar_grafo(self):
+        """
+        Carga el grafo de la red desde la base de datos
 
-        # Obtener enlaces activos
+        Returns:
+            CSRGraph: Grafo nuevo con routers y enlaces activos
+        """
+        routers = self.router_dao.obtener_activos()
         enlaces = self.enlace_dao.obtener_activos()
+        return CSRGraph.desde_enlaces(routers, enlaces)
 
-        # Agregar aristas (enlaces)
-        for enlace in enlaces:
-            if enlace.router_origen in self.grafo.nodes and enlace.router_destino in self.grafo.nodes:
-                self.grafo.add_edge(
-                    enlace.router_origen,
-                    enlace.router_destino,
-                    weight=enlace.costo,
-                    id_enlace=enlace.id_enlace,
-                    ancho_banda=enlace.ancho_banda,
-                    retardo_ms=enlace.retardo_ms
-                )
+    def invalidar_cache(self):
+        """
+        Invalida la caché de topología tras un cambio en routers o enlaces
 
-        return self.grafo
+        Returns:
+            Nueva versión de la topología
+        """
+        version = self.cache.invalidar()
+        self.rutas_cache.invalidar(version)
+        return version
 
-    def calcular_ruta(self, origen, destino):
+    def calcular_ruta(self, origen, destino, metrica='costo', retardo_max=None, ancho_banda_min=None):
         """
-        Calcula la ruta más corta entre dos routers usando Dijkstra
+        Calcula la mejor ruta entre dos routers
+
+        Sin métrica ni restricciones es el camino de menor costo (Dijkstra);
+        en otro caso la resuelve el motor de rutas con calidad de servicio.
 
         Args:
             origen: ID del router origen
             destino: ID del router destino
+            metrica: 'costo', 'retardo' o 'ancho_banda'
+            retardo_max: Retardo total máximo en ms (None = sin límite)
+            ancho_banda_min: Ancho de banda mínimo de cada enlace (None = sin límite)
 
         Returns:
             Tupla (camino, costo_total) o (None, None) si no hay ruta
         """
         # Construir grafo actualizado
-        self.construir_grafo()
+        grafo = self.construir_csr()
 
         # Verificar que origen y destino existan
-        if origen not in self.grafo.nodes or destino not in self.grafo.nodes:
+        if origen not in grafo or destino not in grafo:
             print(f"✗ Router origen ({origen}) o destino ({destino}) no existe o no está activo")
             return None, None
 
-        # Verificar que haya conectividad
-        if not nx.has_path(self.grafo, origen, destino):
-            print(f"✗ No existe ruta entre R{origen} y R{destino}")
-            return None, None
-
         try:
-            # Calcular camino más corto
-            camino = nx.shortest_path(self.grafo, origen, destino, weight='weight')
-            costo_total = nx.shortest_path_length(self.grafo, origen, destino, weight='weight')
+            if ConstrainedRouting.es_consulta_simple(metrica, retardo_max, ancho_banda_min):
+                # Un único Dijkstra (detenido al llegar al destino) obtiene camino y costo
+                camino, costo_total = grafo.camino_mas_corto(origen, destino)
+            else:
+                resultado, completo = self.qos.calcular(
+                    origen, destino, metrica, retardo_max, ancho_banda_min
+                )
+                if not completo:
+                    print("  Búsqueda con retardo máximo limitada: se usa la ruta de menor retardo")
+                camino, costo_total = (
+                    (resultado['camino'], resultado['costo']) if resultado else (None, None)
+                )
+
+            if camino is None:
+                print(f"✗ No existe ruta entre R{origen} y R{destino}")
+                return None, None
 
             return camino, costo_total
 
-        except nx.NetworkXNoPath:
-            print(f"✗ No existe ruta entre R{origen} y R{destino}")
-            return None, None
         except Exception as e:
             print(f"✗ Error al calcular ruta: {e}")
             return None, None
@@ -98,25 +177,29 @@ class NetworkGraph:
         Returns:
             Diccionario {destino: (camino, costo)}
         """
-        self.construir_grafo()
+        grafo = self.construir_csr()
 
-        if origen not in self.grafo.nodes:
+        if origen not in grafo:
             print(f"✗ Router origen ({origen}) no existe o no está activo")
             return {}
 
-        rutas = {}
+        # Un solo Dijkstra desde el origen cubre todos los destinos
+        distancias, predecesores = grafo.dijkstra(origen)
+        caminos = reconstruir_caminos(distancias, predecesores)
 
-        # Calcular rutas a todos los nodos
-        for destino in self.grafo.nodes:
+        rutas = {}
+        for destino in grafo:
             if destino == origen:
                 continue
 
-            camino, costo = self.calcular_ruta(origen, destino)
-            rutas[destino] = (camino, costo)
+            if destino in caminos:
+                rutas[destino] = (caminos[destino], distancias[destino])
+            else:
+                rutas[destino] = (None, None)
 
         return rutas
 
-    def calcular_rutas_alternativas(self, origen, destino, k=3):
+    def calcular_rutas_alternativas(self, origen, destino, k=3, modo='simple'):
         """
         Calcula K rutas alternativas entre dos routers
 
@@ -124,31 +207,17 @@ class NetworkGraph:
             origen: ID del router origen
             destino: ID del router destino
             k: Número de rutas alternativas a buscar
+            modo: 'simple', 'aristas_disjuntas' o 'nodos_disjuntos'
 
         Returns:
             Lista de tuplas [(camino1, costo1), (camino2, costo2), ...]
         """
-        self.construir_grafo()
-
-        if origen not in self.grafo.nodes or destino not in self.grafo.nodes:
-            return []
-
         try:
-            # Algoritmo de k-shortest paths
-            rutas_alternativas = []
-
-            # Obtener k caminos más cortos
-            for camino in nx.shortest_simple_paths(self.grafo, origen, destino, weight='weight'):
-                if len(rutas_alternativas) >= k:
-                    break
-
-                # Calcular costo del camino
-                costo = sum(
-                    self.grafo[camino[i]][camino[i + 1]]['weight']
-                    for i in range(len(camino) - 1)
-                )
+            rutas_alternativas, completo = self.ksp.calcular(origen, destino, k, modo)
 
-                rutas_alternativas.append((camino, costo))
+            if not completo:
+                print(f"  Búsqueda de rutas alternativas limitada: "
+                      f"{len(rutas_alternativas)} de {k} encontradas")
 
             return rutas_alternativas
 
@@ -163,9 +232,9 @@ class NetworkGraph:
         Returns:
             Diccionario con información de conectividad
         """
-        self.construir_grafo()
+        grafo = self.construir_csr()
 
-        if len(self.grafo.nodes) == 0:
+        if grafo.number_of_nodes() == 0:
             return {
                 'conectada': False,
                 'componentes': 0,
@@ -173,11 +242,11 @@ class NetworkGraph:
                 'detalles_componentes': []
             }
 
-        # Verificar si el grafo es conexo
-        conectada = nx.is_connected(self.grafo)
-
         # Obtener componentes conectadas
-        componentes = list(nx.connected_components(self.grafo))
+        componentes = grafo.componentes_conexas()
+
+        # Verificar si el grafo es conexo
+        conectada = len(componentes) == 1
 
         # Routers aislados (componentes de tamaño 1)
         routers_aislados = [list(comp)[0] for comp in componentes if len(comp) == 1]
@@ -189,6 +258,23 @@ class NetworkGraph:
             'detalles_componentes': [list(comp) for comp in componentes]
         }
 
+    def obtener_indice_biconectividad(self):
+        """
+        Obtiene el índice de puntos de articulación y puentes
+
+        El controlador lo mantiene al día con cada cambio de topología;
+        solo se reconstruye si no corresponde a la versión actual.
+
+        Returns:
+            BiconnectivityIndex sincronizado con la topología
+        """
+        grafo = self.construir_csr()
+
+        if not self.biconectividad.esta_sincronizado(self.version_grafo):
+            self.biconectividad.cargar(grafo, self.version_grafo)
+
+        return self.biconectividad
+
     def encontrar_routers_criticos(self):
         """
         Identifica routers críticos (puntos de articulación)
@@ -197,23 +283,24 @@ class NetworkGraph:
         Returns:
             Lista de IDs de routers críticos
         """
-        self.construir_grafo()
+        indice = self.obtener_indice_biconectividad()
+        grafo = self.construir_csr()
 
-        if len(self.grafo.nodes) < 2:
+        if grafo.number_of_nodes() < 2:
             return []
 
-        # NetworkX tiene función para encontrar puntos de articulación
-        puntos_articulacion = list(nx.articulation_points(self.grafo))
+        puntos_articulacion = indice.routers_criticos()
 
         # Obtener información de cada router crítico
+        routers = self.router_dao.obtener_por_ids(puntos_articulacion)
         routers_criticos = []
         for router_id in puntos_articulacion:
-            router = self.router_dao.obtener_por_id(router_id)
+            router = routers.get(router_id)
             if router:
                 routers_criticos.append({
                     'id': router.id_router,
                     'nombre': router.nombre,
-                    'grado': self.grafo.degree(router_id)
+                    'grado': grafo.degree(router_id)
                 })
 
         return routers_criticos
@@ -226,50 +313,59 @@ class NetworkGraph:
         Returns:
             Lista de tuplas (router_origen, router_destino)
         """
-        self.construir_grafo()
+        indice = self.obtener_indice_biconectividad()
 
-        if len(self.grafo.edges) == 0:
+        if self.construir_csr().number_of_edges() == 0:
             return []
 
-        # NetworkX tiene función para encontrar puentes
-        puentes = list(nx.bridges(self.grafo))
+        return indice.enlaces_criticos()
 
-        return puentes
-
-    def calcular_centralidad(self):
+    def calcular_centralidad(self, modo=None, error=None):
         """
         Calcula métricas de centralidad para cada router
 
+        Args:
+            modo: 'exacto', 'muestreo' o 'auto' (None = configuración)
+            error: Error absoluto máximo del muestreo (None = configuración)
+
         Returns:
             Diccionario con diferentes métricas de centralidad
         """
-        self.construir_grafo()
+        grafo = self.construir_csr()
+        n = grafo.number_of_nodes()
 
-        if len(self.grafo.nodes) < 2:
+        if n < 2:
             return {}
 
+        centralidad = self.centralidad.calcular(modo=modo, error=error)
+        escala = 1 / (n - 1)
+
         metricas = {
-            'degree': nx.degree_centrality(self.grafo),
-            'betweenness': nx.betweenness_centrality(self.grafo, weight='weight'),
-            'closeness': nx.closeness_centrality(self.grafo, distance='weight')
+            'degree': {nodo: grafo.degree(nodo) * escala for nodo in grafo},
+            'betweenness': centralidad['betweenness'],
+            'closeness': centralidad['closeness'],
+            'exacto': centralidad['exacto'],
+            'pivotes': centralidad['pivotes']
         }
 
         return metricas
 
-    def analizar_congestion_enlaces(self):
+    def analizar_congestion_enlaces(self, modo=None, error=None):
         """
         Analiza qué enlaces son más utilizados en las rutas
 
+        Args:
+            modo: 'exacto', 'muestreo' o 'auto' (None = configuración)
+            error: Error absoluto máximo del muestreo (None = configuración)
+
         Returns:
             Diccionario con centralidad de aristas
         """
-        self.construir_grafo()
-
-        if len(self.grafo.edges) == 0:
+        if self.construir_csr().number_of_edges() == 0:
             return {}
 
-        # Calcular betweenness centrality de aristas
-        edge_centrality = nx.edge_betweenness_centrality(self.grafo, weight='weight')
+        # Betweenness de aristas (exacta o estimada, cacheada por versión)
+        edge_centrality = self.centralidad.calcular(modo=modo, error=error)['edge_betweenness']
 
         # Ordenar por uso
         enlaces_ordenados = sorted(
@@ -280,6 +376,24 @@ class NetworkGraph:
 
         return dict(enlaces_ordenados)
 
+    def simular_fallos(self, enlaces=True, routers=True, combinaciones=None):
+        """
+        Evalúa el impacto de la caída de cada enlace y cada router (N-1)
+
+        Args:
+            enlaces: Si True, incluye la caída de cada enlace
+            routers: Si True, incluye la caída de cada router
+            combinaciones: Fallos simultáneos adicionales, cada uno una lista
+                           de elementos ('router', id) / ('enlace', a, b)
+
+        Returns:
+            Lista de reportes por escenario, de mayor a menor impacto
+        """
+        if self.construir_csr().number_of_nodes() < 2:
+            return []
+
+        return self.fallos.simular(enlaces=enlaces, routers=routers, combinaciones=combinaciones)
+
     def obtener_estadisticas_grafo(self):
         """
         Obtiene estadísticas generales del grafo
@@ -287,9 +401,11 @@ class NetworkGraph:
         Returns:
             Diccionario con estadísticas
         """
-        self.construir_grafo()
+        grafo = self.construir_csr()
+        n = grafo.number_of_nodes()
+        m = grafo.number_of_edges()
 
-        if len(self.grafo.nodes) == 0:
+        if n == 0:
             return {
                 'num_routers': 0,
                 'num_enlaces': 0,
@@ -299,15 +415,22 @@ class NetworkGraph:
             }
 
         stats = {
-            'num_routers': self.grafo.number_of_nodes(),
-            'num_enlaces': self.grafo.number_of_edges(),
-            'densidad': nx.density(self.grafo)
+            'num_routers': n,
+            'num_enlaces': m,
+            'densidad': 2 * m / (n * (n - 1)) if n > 1 else 0
         }
 
-        # Solo si el grafo es conexo
-        if nx.is_connected(self.grafo):
-            stats['diametro'] = nx.diameter(self.grafo)
-            stats['radio'] = nx.radius(self.grafo)
+        # Excentricidades en saltos con un BFS por router (solo si es conexo)
+        excentricidades = []
+        for nodo in grafo:
+            saltos = grafo.bfs(nodo)
+            if len(saltos) < n:
+                break
+            excentricidades.append(max(saltos.values()))
+
+        if len(excentricidades) == n:
+            stats['diametro'] = max(excentricidades)
+            stats['radio'] = min(excentricidades)
         else:
             stats['diametro'] = None
             stats['radio'] = None
@@ -350,13 +473,12 @@ class NetworkGraph:
 
         # Obtener información para colorear
         conectividad = self.verificar_conectividad()
-        routers_criticos = self.encontrar_routers_criticos()
-        ids_criticos = [r['id'] for r in routers_criticos]
+        indice = self.obtener_indice_biconectividad()
 
         # Colores de nodos
         colores_nodos = []
         for nodo in self.grafo.nodes:
-            if nodo in ids_criticos:
+            if indice.es_router_critico(nodo):
                 colores_nodos.append('#ff4444')  # Rojo para críticos
             else:
                 colores_nodos.append('#4CAF50')  # Verde para normales
@@ -372,9 +494,10 @@ class NetworkGraph:
         )
 
         # Etiquetas de nodos (nombres de routers)
+        routers = self.router_dao.obtener_por_ids(self.grafo.nodes)
         labels = {}
         for nodo in self.grafo.nodes:
-            router = self.router_dao.obtener_por_id(nodo)
+            router = routers.get(nodo)
             if router:
                 labels[nodo] = router.nombre
             else:
@@ -490,9 +613,10 @@ class NetworkGraph:
         )
 
         # Etiquetas
+        routers = self.router_dao.obtener_por_ids(self.grafo.nodes)
         labels = {}
         for nodo in self.grafo.nodes:
-            router = self.router_dao.obtener_por_id(nodo)
+            router = routers.get(nodo)
             labels[nodo] = router.nombre if router else f"R{nodo}"
 
         nx.draw_networkx_labels(
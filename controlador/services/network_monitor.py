@@ -1,32 +1,83 @@
+import threading
+import time
 from datetime import datetime, timedelta
-from controlador.dao.router_dao import RouterDAO
-from controlador.dao.enlace_dao import EnlaceDAO
-from controlador.dao.ruta_dao import RutaDAO
+from controlador.config.settings import MONITOR_CONFIG
+from controlador.dao.monitor_dao import MonitorDAO
 from controlador.dao.log_controlador_dao import LogControladorDAO
 
 class NetworkMonitor:
-    """Clase para monitorear el estado de la red"""
-
-    def __init__(self):
-        self.router_dao = RouterDAO()
-        self.enlace_dao = EnlaceDAO()
-        self.ruta_dao = RutaDAO()
+    """
+    Clase para monitorear el estado de la red
+
+    Los datos salen de unas pocas consultas agregadas (MonitorDAO) y se
+    guardan como instantáneas con un tiempo de vida: el resumen de la
+    pantalla principal, las métricas y el reporte completo comparten las
+    mismas consultas mientras no caduquen. Un reporte completo cuesta como
+    máximo tres consultas, sin importar el tamaño de la red.
+    """
+
+    def __init__(self, ttl=None):
+        self.monitor_dao = MonitorDAO()
         self.log_dao = LogControladorDAO()
+        self.ttl = ttl if ttl is not None else MONITOR_CONFIG['ttl_segundos']
+
+        self._instantaneas = {}  # {parte: (instante, datos)}
+        self._lock = threading.Lock()
 
-    def obtener_resumen_red(self):
+    def _instantanea(self, parte, cargar, forzar=False):
+        """
+        Obtiene una parte de la instantánea, recargándola si caducó
+
+        Args:
+            parte: Nombre de la parte ('conteos', 'routers', 'enlaces')
+            cargar: Función que consulta la base de datos
+            forzar: Si True, recarga aunque no haya caducado
+
+        Returns:
+            Datos de la parte
+        """
+        with self._lock:
+            entrada = self._instantaneas.get(parte)
+            if not forzar and entrada and time.monotonic() - entrada[0] < self.ttl:
+                return entrada[1]
+
+        datos = cargar()
+
+        with self._lock:
+            self._instantaneas[parte] = (time.monotonic(), datos)
+        return datos
+
+    def invalidar(self):
+        """Descarta la instantánea para que la próxima lectura consulte la BD"""
+        with self._lock:
+            self._instantaneas.clear()
+
+    def _conteos(self, forzar=False):
+        return self._instantanea('conteos', self.monitor_dao.obtener_conteos, forzar)
+
+    def _routers(self, forzar=False):
+        return self._instantanea('routers', self.monitor_dao.obtener_routers_con_enlaces, forzar)
+
+    def _enlaces(self, forzar=False):
+        return self._instantanea('enlaces', self.monitor_dao.obtener_enlaces_con_routers, forzar)
+
+    def obtener_resumen_red(self, forzar=False):
         """
         Obtiene un resumen del estado actual de la red
 
+        Args:
+            forzar: Si True, ignora la instantánea vigente
+
         Returns:
             Diccionario con estadísticas de la red
         """
-        total_routers = self.router_dao.contar_routers()
-        routers_activos = len(self.router_dao.obtener_activos())
+        conteos = self._conteos(forzar)
 
-        total_enlaces = self.enlace_dao.contar_enlaces()
-        enlaces_activos = len(self.enlace_dao.obtener_activos())
+        total_routers = sum(conteos['routers'].values())
+        routers_activos = conteos['routers'].get('Activo', 0)
 
-        total_rutas = self.ruta_dao.contar_rutas()
+        total_enlaces = sum(conteos['enlaces'].values())
+        enlaces_activos = conteos['enlaces'].get('Activo', 0)
 
         return {
             'total_routers': total_routers,
@@ -35,80 +86,73 @@ class NetworkMonitor:
             'total_enlaces': total_enlaces,
             'enlaces_activos': enlaces_activos,
             'enlaces_inactivos': total_enlaces - enlaces_activos,
-            'total_rutas': total_rutas,
+            'total_rutas': conteos['rutas'],
             'timestamp': datetime.now()
         }
 
-    def obtener_estado_routers(self):
+    def obtener_estado_routers(self, forzar=False):
         """
         Obtiene el estado detallado de todos los routers
 
+        Args:
+            forzar: Si True, ignora la instantánea vigente
+
         Returns:
             Lista de diccionarios con información de cada router
         """
-        routers = self.router_dao.obtener_todos()
-        estado_routers = []
-
-        for router in routers:
-            # Contar enlaces del router
-            enlaces = self.enlace_dao.obtener_por_router(router.id_router)
-            enlaces_activos = sum(1 for e in enlaces if e.es_activo())
-
-            estado_routers.append({
+        return [
+            {
                 'id': router.id_router,
                 'nombre': router.nombre,
                 'ip': router.ip,
                 'estado': router.estado,
-                'total_enlaces': len(enlaces),
+                'total_enlaces': total_enlaces,
                 'enlaces_activos': enlaces_activos,
                 'ultima_actualizacion': router.ultima_actualizacion
-            })
-
-        return estado_routers
+            }
+            for router, total_enlaces, enlaces_activos in self._routers(forzar)
+        ]
 
-    def obtener_estado_enlaces(self):
+    def obtener_estado_enlaces(self, forzar=False):
         """
         Obtiene el estado detallado de todos los enlaces
 
+        Args:
+            forzar: Si True, ignora la instantánea vigente
+
         Returns:
             Lista de diccionarios con información de cada enlace
         """
-        enlaces = self.enlace_dao.obtener_todos()
-        estado_enlaces = []
-
-        for enlace in enlaces:
-            # Obtener información de routers
-            router_origen = self.router_dao.obtener_por_id(enlace.router_origen)
-            router_destino = self.router_dao.obtener_por_id(enlace.router_destino)
-
-            estado_enlaces.append({
-                'id': enlace.id_enlace,
-                'origen': router_origen.nombre if router_origen else f"R{enlace.router_origen}",
-                'destino': router_destino.nombre if router_destino else f"R{enlace.router_destino}",
-                'costo': enlace.costo,
-                'ancho_banda': enlace.ancho_banda,
-                'estado': enlace.estado,
-                'retardo_ms': enlace.retardo_ms
-            })
-
-        return estado_enlaces
+        return [
+            {
+                'id': id_enlace,
+                'origen': nombre_origen if nombre_origen else f"R{router_origen}",
+                'destino': nombre_destino if nombre_destino else f"R{router_destino}",
+                'costo': costo,
+                'ancho_banda': ancho_banda,
+                'estado': estado,
+                'retardo_ms': retardo_ms
+            }
+            for (id_enlace, router_origen, router_destino, nombre_origen, nombre_destino,
+                 costo, ancho_banda, estado, retardo_ms) in self._enlaces(forzar)
+        ]
 
-    def detectar_routers_problematicos(self, minutos=30):
+    def detectar_routers_problematicos(self, minutos=30, forzar=False):
         """
         Detecta routers que no se han actualizado recientemente
 
         Args:
             minutos: Tiempo sin actualización para considerar problemático
+            forzar: Si True, ignora la instantánea vigente
 
         Returns:
             Lista de routers problemáticos
         """
-        routers = self.router_dao.obtener_activos()
         tiempo_limite = datetime.now() - timedelta(minutes=minutos)
 
         problematicos = []
-        for router in routers:
-            if router.ultima_actualizacion < tiempo_limite:
+        for router, _, _ in self._routers(forzar):
+            if router.es_activo() and router.ultima_actualizacion < tiempo_limite:
                 problematicos.append({
                     'id': router.id_router,
                     'nombre': router.nombre,
@@ -119,16 +163,19 @@ class NetworkMonitor:
 
         return problematicos
 
-    def obtener_metricas_rendimiento(self):
+    def obtener_metricas_rendimiento(self, forzar=False):
         """
-        Calcula métricas de rendimiento de la red
+        Calcula métricas de rendimiento de la red (enlaces activos)
+
+        Args:
+            forzar: Si True, ignora la instantánea vigente
 
         Returns:
             Diccionario con métricas
         """
-        enlaces = self.enlace_dao.obtener_activos()
+        metricas = self._conteos(forzar)['metricas_enlaces'].get('Activo')
 
-        if not enlaces:
+        if not metricas:
             return {
                 'costo_promedio': 0,
                 'costo_minimo': 0,
@@ -137,29 +184,33 @@ class NetworkMonitor:
                 'retardo_promedio': 0
             }
 
-        costos = [e.costo for e in enlaces]
-        anchos_banda = [e.ancho_banda for e in enlaces if e.ancho_banda]
-        retardos = [e.retardo_ms for e in enlaces if e.retardo_ms]
+        # AVG puede devolver Decimal (MySQL) o None si no hay valores
+        promedio, minimo, maximo, ancho_banda, retardo = (
+            float(valor) if valor is not None else 0 for valor in metricas
+        )
 
         return {
-            'costo_promedio': sum(costos) / len(costos),
-            'costo_minimo': min(costos),
-            'costo_maximo': max(costos),
-            'ancho_banda_promedio': sum(anchos_banda) / len(anchos_banda) if anchos_banda else 0,
-            'retardo_promedio': sum(retardos) / len(retardos) if retardos else 0
+            'costo_promedio': promedio,
+            'costo_minimo': minimo,
+            'costo_maximo': maximo,
+            'ancho_banda_promedio': ancho_banda,
+            'retardo_promedio': retardo
         }
 
-    def generar_reporte_red(self):
+    def generar_reporte_red(self, forzar=False):
         """
         Genera un reporte completo del estado de la red
 
+        Args:
+            forzar: Si True, vuelve a consultar todas las partes
+
         Returns:
             Diccionario con reporte completo
         """
         return {
-            'resumen': self.obtener_resumen_red(),
-            'routers': self.obtener_estado_routers(),
-            'enlaces': self.obtener_estado_enlaces(),
+            'resumen': self.obtener_resumen_red(forzar),
+            'routers': self.obtener_estado_routers(forzar),
+            'enlaces': self.obtener_estado_enlaces(forzar),
             'routers_problematicos': self.detectar_routers_problematicos(),
             'metricas': self.obtener_metricas_rendimiento()
         }
@@ -173,4 +224,5 @@ class NetworkMonitor:
             detalle: Detalles del cambio
         """
         evento = f"Cambio topología: {tipo_cambio}"
-        self.log_dao.registrar_evento(evento, detalle)
\ No newline at end of file
+        self.log_dao.registrar_evento(evento, detalle)
+        self.invalidar()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+from controlador.config.settings import RUTA_CACHE_CONFIG
+
+
+class RouteCache:
+    """
+    Caché LRU de consultas de rutas ligada a la versión de la topología
+
+    Guarda el resultado de cada consulta bajo la clave (origen, destino,
+    métrica) junto con la versión de topología con la que se calculó.
+    Cuando la topología cambia, todas las entradas se descartan de una vez.
+    Los pares sin camino también se cachean (caché negativa), para que los
+    routers que preguntan repetidamente por un destino inalcanzable no
+    disparen un cálculo por consulta.
+
+    Todas las instancias comparten la misma caché (Singleton).
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Patrón Singleton para compartir la caché entre servicios"""
+        if cls._instance is None:
+            cls._instance = super(RouteCache, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._entradas = OrderedDict()
+            cls._instance._version = None
+            cls._instance.capacidad = RUTA_CACHE_CONFIG['capacidad']
+            cls._instance.cache_negativo = RUTA_CACHE_CONFIG['cache_negativo']
+            cls._instance.aciertos = 0
+            cls._instance.fallos = 0
+            cls._instance.invalidaciones = 0
+        return cls._instance
+
+    def obtener(self, origen, destino, metrica, version):
+        """
+        Busca una ruta cacheada
+
+        Args:
+            origen: Router origen (ID o nombre)
+            destino: Router destino (ID o IP)
+            metrica: Métrica de la consulta ('costo', ...)
+            version: Versión actual de la topología
+
+        Returns:
+            Tupla (encontrada, ruta); ruta es None en un acierto negativo
+        """
+        clave = (origen, destino, metrica)
+
+        with self._lock:
+            if version != self._version:
+                self._vaciar(version)
+
+            if clave not in self._entradas:
+                self.fallos += 1
+                return False, None
+
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, self._entradas[clave][1]
+
+    def guardar(self, origen, destino, metrica, version, ruta):
+        """
+        Guarda el resultado de una consulta
+
+        Si la topología cambió mientras se calculaba la ruta, no se guarda.
+
+        Args:
+            origen: Router origen (ID o nombre)
+            destino: Router destino (ID o IP)
+            metrica: Métrica de la consulta
+            version: Versión de topología con la que se calculó la ruta
+            ruta: Ruta calculada, o None si no hay camino
+
+        Returns:
+            True si la ruta quedó cacheada
+        """
+        if ruta is None and not self.cache_negativo:
+            return False
+
+        clave = (origen, destino, metrica)
+
+        with self._lock:
+            if version != self._version:
+                return False
+
+            self._entradas[clave] = (version, ruta)
+            self._entradas.move_to_end(clave)
+
+            # Desalojar las entradas usadas hace más tiempo
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+            return True
+
+    def invalidar(self, version=None):
+        """
+        Descarta todas las entradas
+
+        Args:
+            version: Nueva versión de la topología (opcional)
+        """
+        with self._lock:
+            self._vaciar(version)
+
+    def estadisticas(self):
+        """
+        Contadores de uso de la caché
+
+        Returns:
+            Diccionario con aciertos, fallos, tasa de aciertos y ocupación
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            negativas = sum(1 for _, ruta in self._entradas.values() if ruta is None)
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'entradas': len(self._entradas),
+                'entradas_negativas': negativas,
+                'capacidad': self.capacidad,
+                'invalidaciones': self.invalidaciones,
+                'version': self._version
+            }
+
+    def _vaciar(self, version):
+        """Vacía la caché y la asocia a una nueva versión (requiere el lock)"""
+        if self._entradas:
+            self.invalidaciones += 1
+        self._entradas.clear()
+        self._version = version
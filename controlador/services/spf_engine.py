@@ -0,0 +1,372 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from controlador.config.settings import SPF_CONFIG
+from controlador.services.csr_graph import CSRGraph, TOLERANCIA_ECMP
+
+# Adyacencia compartida con los procesos del pool (se carga una vez por proceso)
+_adyacencia_worker = None
+
+
+def construir_adyacencia(grafo, peso='weight'):
+    """
+    Convierte un grafo de NetworkX en una lista de adyacencia simple
+
+    Args:
+        grafo: networkx.Graph con los enlaces activos
+        peso: Atributo de arista usado como costo
+
+    Returns:
+        Diccionario {nodo: [(vecino, costo), ...]}
+    """
+    adyacencia = {nodo: [] for nodo in grafo.nodes}
+    for u, v, datos in grafo.edges(data=True):
+        costo = float(datos.get(peso, 1.0))
+        adyacencia[u].append((v, costo))
+        adyacencia[v].append((u, costo))
+    return adyacencia
+
+
+def dijkstra(adyacencia, origen):
+    """
+    Ejecuta Dijkstra desde un origen calculando distancias y predecesores
+
+    Args:
+        adyacencia: Diccionario {nodo: [(vecino, costo), ...]}
+        origen: Nodo origen
+
+    Returns:
+        Tupla (distancias, predecesores) con los nodos alcanzables
+    """
+    distancias = {origen: 0}
+    predecesores = {origen: None}
+    visitados = set()
+    cola = [(0, origen)]
+
+    while cola:
+        distancia, nodo = heapq.heappop(cola)
+        if nodo in visitados:
+            continue
+        visitados.add(nodo)
+
+        for vecino, costo in adyacencia.get(nodo, ()):
+            nueva = distancia + costo
+            if vecino not in distancias or nueva < distancias[vecino]:
+                distancias[vecino] = nueva
+                predecesores[vecino] = nodo
+                heapq.heappush(cola, (nueva, vecino))
+
+    return distancias, predecesores
+
+
+def dijkstra_ecmp(adyacencia, origen):
+    """
+    Dijkstra que además conserva los primeros saltos de igual costo
+
+    Un salto de igual costo que llega por un enlace de costo cero a un nodo
+    ya asentado se agrega a ese nodo y a sus descendientes. El conjunto
+    resultante es el de IncrementalSPF._saltos: los vecinos v del origen
+    con costo(origen, v) + dist(v, destino) == dist(origen, destino).
+
+    Args:
+        adyacencia: Diccionario {nodo: [(vecino, costo), ...]}
+        origen: Nodo origen
+
+    Returns:
+        Tupla (distancias, predecesores, saltos); saltos es un diccionario
+        {destino: tupla ordenada de primeros saltos} sin el origen
+    """
+    distancias = {origen: 0}
+    predecesores = {origen: None}
+    saltos = {origen: ()}
+    visitados = set()
+    cola = [(0, origen)]
+
+    while cola:
+        distancia, nodo = heapq.heappop(cola)
+        if nodo in visitados:
+            continue
+        visitados.add(nodo)
+
+        for vecino, costo in adyacencia.get(nodo, ()):
+            nueva = distancia + costo
+            heredados = (vecino,) if nodo == origen else saltos[nodo]
+            margen = TOLERANCIA_ECMP * max(1.0, nueva)
+            if vecino not in distancias or nueva < distancias[vecino] - margen:
+                distancias[vecino] = nueva
+                predecesores[vecino] = nodo
+                saltos[vecino] = heredados
+                heapq.heappush(cola, (nueva, vecino))
+            elif nueva <= distancias[vecino] + margen:
+                _propagar_saltos(adyacencia, origen, distancias, saltos, visitados, vecino, heredados)
+
+    del saltos[origen]
+    return distancias, predecesores, saltos
+
+
+def _propagar_saltos(adyacencia, origen, distancias, saltos, visitados, nodo, heredados):
+    """
+    Agrega primeros saltos a un nodo y, si ya está asentado, a los nodos
+    que alcanza por enlaces de igual costo
+
+    Los saltos que llegan al origen (por un vecino a costo cero) también
+    inician un camino mínimo hacia todo lo que se alcanza desde él.
+    """
+    pendientes = [(nodo, heredados)]
+    while pendientes:
+        nodo, heredados = pendientes.pop()
+        unidos = set(saltos[nodo]).union(heredados)
+        if len(unidos) == len(saltos[nodo]):
+            continue
+        saltos[nodo] = tuple(sorted(unidos))
+        if nodo not in visitados:
+            continue
+
+        for vecino, costo in adyacencia.get(nodo, ()):
+            nueva = distancias[nodo] + costo
+            if vecino in distancias and nueva <= distancias[vecino] + TOLERANCIA_ECMP * max(1.0, nueva):
+                pendientes.append((vecino, saltos[nodo]))
+
+
+def arbol_spf(grafo, origen, ecmp=False):
+    """
+    Dijkstra desde un origen sobre un CSRGraph o una lista de adyacencia
+
+    Args:
+        grafo: CSRGraph o diccionario {nodo: [(vecino, costo), ...]}
+        origen: Nodo origen
+        ecmp: Si True, agrega los primeros saltos de igual costo
+
+    Returns:
+        Tupla (distancias, predecesores) con los nodos alcanzables; con
+        ecmp, (distancias, predecesores, saltos)
+    """
+    if isinstance(grafo, CSRGraph):
+        return grafo.dijkstra(origen, ecmp)
+    return dijkstra_ecmp(grafo, origen) if ecmp else dijkstra(grafo, origen)
+
+
+def repartir_saltos(saltos, primario=None, maximo=None):
+    """
+    Asigna pesos a un conjunto de siguientes saltos de igual costo
+
+    El tráfico se reparte en partes iguales. Si hay más saltos que el
+    máximo configurado se conservan los de menor ID, sin descartar nunca
+    el salto del camino principal.
+
+    Args:
+        saltos: IDs de los siguientes saltos
+        primario: Siguiente salto del camino principal
+        maximo: Saltos como máximo (None = configuración)
+
+    Returns:
+        Lista [(id_router, peso)] con los pesos sumando 1
+    """
+    maximo = maximo if maximo is not None else SPF_CONFIG['ecmp_max_saltos']
+    saltos = sorted(set(saltos))
+    if primario is not None and primario not in saltos:
+        saltos.insert(0, primario)
+
+    if maximo and len(saltos) > maximo:
+        otros = [salto for salto in saltos if salto != primario]
+        elegidos = set(otros[:maximo - 1] if primario is not None else otros[:maximo])
+        if primario is not None:
+            elegidos.add(primario)
+        saltos = [salto for salto in saltos if salto in elegidos]
+
+    if not saltos:
+        return []
+    peso = 1.0 / len(saltos)
+    return [(salto, peso) for salto in saltos]
+
+
+def reconstruir_caminos(distancias, predecesores):
+    """
+    Reconstruye todos los caminos de un árbol de caminos más cortos
+
+    Cada camino se construye a partir del de su predecesor: se sube por
+    los predecesores hasta un nodo con camino ya conocido y se completan
+    los de la cadena al bajar. No depende del orden de distancia, que no
+    separa a un nodo de su predecesor en enlaces de costo cero.
+
+    Args:
+        distancias: Diccionario {nodo: distancia}
+        predecesores: Diccionario {nodo: predecesor}
+
+    Returns:
+        Diccionario {destino: [origen, ..., destino]}
+    """
+    caminos = {}
+    for nodo in distancias:
+        cadena = []
+        while nodo not in caminos:
+            predecesor = predecesores[nodo]
+            if predecesor is None:
+                caminos[nodo] = [nodo]
+                break
+            cadena.append(nodo)
+            nodo = predecesor
+
+        camino = caminos[nodo]
+        for nodo in reversed(cadena):
+            camino = camino + [nodo]
+            caminos[nodo] = camino
+    return caminos
+
+
+def _inicializar_worker(adyacencia):
+    """Carga el grafo (CSRGraph o adyacencia) en un proceso del pool"""
+    global _adyacencia_worker
+    _adyacencia_worker = adyacencia
+
+
+def _calcular_arboles_worker(argumentos):
+    """Calcula los árboles SPF de un bloque de orígenes dentro del pool"""
+    origenes, ecmp = argumentos
+    return [(origen,) + arbol_spf(_adyacencia_worker, origen, ecmp) for origen in origenes]
+
+
+class SPFEngine:
+    """
+    Motor de cálculo de rutas de todos los pares
+
+    Construye el grafo una sola vez y ejecuta un Dijkstra por origen,
+    obteniendo distancias y predecesores en la misma pasada. Por defecto
+    trabaja sobre el grafo compacto (CSRGraph), que además se envía a los
+    procesos del pool sin convertirlo. Con topologías grandes reparte los
+    orígenes en un pool de procesos.
+    """
+
+    def __init__(self, network_graph=None, procesos=None):
+        if network_graph is None:
+            from controlador.services.network_graph import NetworkGraph
+            network_graph = NetworkGraph()
+
+        self.network_graph = network_graph
+        self.procesos = procesos if procesos is not None else SPF_CONFIG['procesos']
+        self.umbral_paralelo = SPF_CONFIG['umbral_paralelo']
+
+    def obtener_adyacencia(self):
+        """
+        Obtiene la lista de adyacencia de la topología actual
+
+        Returns:
+            Diccionario {nodo: [(vecino, costo), ...]}
+        """
+        return self.network_graph.construir_csr().adyacencia()
+
+    def calcular_arbol(self, origen, adyacencia=None, ecmp=False):
+        """
+        Calcula el árbol de caminos más cortos de un origen
+
+        Args:
+            origen: ID del router origen
+            adyacencia: CSRGraph o lista de adyacencia (opcional, por
+                        defecto el grafo compacto actual)
+            ecmp: Si True, agrega los primeros saltos de igual costo
+
+        Returns:
+            Tupla (distancias, predecesores) o, con ecmp,
+            (distancias, predecesores, saltos)
+        """
+        if adyacencia is None:
+            adyacencia = self.network_graph.construir_csr()
+
+        if origen not in adyacencia:
+            return ({}, {}, {}) if ecmp else ({}, {})
+
+        return arbol_spf(adyacencia, origen, ecmp)
+
+    def calcular_arboles(self, origenes=None, adyacencia=None, procesos=None, ecmp=False):
+        """
+        Calcula los árboles SPF de varios orígenes
+
+        Args:
+            origenes: IDs de routers origen (None = todos los nodos)
+            adyacencia: CSRGraph o lista de adyacencia (opcional, por
+                        defecto el grafo compacto actual)
+            procesos: Número de procesos (None = configuración, 1 = secuencial)
+            ecmp: Si True, cada árbol incluye los primeros saltos de igual costo
+
+        Returns:
+            Diccionario {origen: (distancias, predecesores)} o, con ecmp,
+            {origen: (distancias, predecesores, saltos)}
+        """
+        if adyacencia is None:
+            adyacencia = self.network_graph.construir_csr()
+
+        if origenes is None:
+            origenes = list(adyacencia)
+        else:
+            origenes = [o for o in origenes if o in adyacencia]
+
+        procesos = procesos if procesos is not None else self.procesos
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+
+        if procesos <= 1 or len(origenes) < self.umbral_paralelo:
+            return {origen: arbol_spf(adyacencia, origen, ecmp) for origen in origenes}
+
+        return self._calcular_arboles_paralelo(adyacencia, origenes, procesos, ecmp)
+
+    def _calcular_arboles_paralelo(self, adyacencia, origenes, procesos, ecmp=False):
+        """Reparte los orígenes en bloques entre un pool de procesos"""
+        # Varios bloques por proceso para equilibrar la carga
+        num_bloques = procesos * 4
+        tamano = max(1, -(-len(origenes) // num_bloques))
+        bloques = [(origenes[i:i + tamano], ecmp) for i in range(0, len(origenes), tamano)]
+
+        arboles = {}
+        try:
+            with ProcessPoolExecutor(max_workers=procesos,
+                                     initializer=_inicializar_worker,
+                                     initargs=(adyacencia,)) as pool:
+                for resultado in pool.map(_calcular_arboles_worker, bloques):
+                    for origen, *arbol in resultado:
+                        arboles[origen] = tuple(arbol)
+        except Exception as e:
+            print(f"✗ Error en el cálculo paralelo, usando modo secuencial: {e}")
+            return {origen: arbol_spf(adyacencia, origen, ecmp) for origen in origenes}
+
+        return arboles
+
+    def calcular_rutas_desde(self, origen, adyacencia=None):
+        """
+        Calcula las rutas más cortas desde un origen a todos los demás routers
+
+        Args:
+            origen: ID del router origen
+            adyacencia: Lista de adyacencia (opcional)
+
+        Returns:
+            Diccionario {destino: (camino, costo)} solo con destinos alcanzables
+        """
+        distancias, predecesores = self.calcular_arbol(origen, adyacencia)
+        return self.rutas_de_arbol(origen, distancias, predecesores)
+
+    def calcular_todas_las_rutas(self, procesos=None):
+        """
+        Calcula las rutas más cortas entre todos los pares de routers
+
+        Args:
+            procesos: Número de procesos (None = configuración, 1 = secuencial)
+
+        Returns:
+            Diccionario {origen: {destino: (camino, costo)}}
+        """
+        arboles = self.calcular_arboles(procesos=procesos)
+
+        return {
+            origen: self.rutas_de_arbol(origen, distancias, predecesores)
+            for origen, (distancias, predecesores) in arboles.items()
+        }
+
+    @staticmethod
+    def rutas_de_arbol(origen, distancias, predecesores):
+        """Convierte un árbol SPF en el diccionario {destino: (camino, costo)}"""
+        caminos = reconstruir_caminos(distancias, predecesores)
+        return {
+            destino: (camino, distancias[destino])
+            for destino, camino in caminos.items()
+            if destino != origen
+        }
@@ -0,0 +1,113 @@
+import threading
+
+
+class TopologyCache:
+    """
+    Caché en memoria de la topología de la red con número de versión
+
+    Todas las instancias de NetworkGraph comparten esta caché (Singleton).
+    Cada escritura sobre routers o enlaces incrementa la versión; las
+    lecturas reutilizan el grafo cacheado mientras la versión no cambie.
+    Se guarda el grafo compacto (CSRGraph) y, solo si algún análisis lo
+    pidió, su adaptación a networkx.Graph de la misma versión.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Patrón Singleton para compartir la caché entre servicios"""
+        if cls._instance is None:
+            cls._instance = super(TopologyCache, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._version = 0
+            cls._instance._grafo = None
+            cls._instance._version_grafo = None
+            cls._instance._grafo_nx = None
+        return cls._instance
+
+    @property
+    def version(self):
+        """Versión actual de la topología"""
+        return self._version
+
+    def invalidar(self):
+        """
+        Marca la topología como modificada
+
+        Returns:
+            Nueva versión de la topología
+        """
+        with self._lock:
+            self._version += 1
+            self._grafo = None
+            self._version_grafo = None
+            self._grafo_nx = None
+            return self._version
+
+    def obtener(self, version):
+        """
+        Obtiene el grafo cacheado para una versión
+
+        Args:
+            version: Versión de topología esperada
+
+        Returns:
+            CSRGraph o None si no está cacheado para esa versión
+        """
+        with self._lock:
+            if self._grafo is not None and self._version_grafo == version:
+                return self._grafo
+            return None
+
+    def guardar(self, version, grafo):
+        """
+        Guarda un grafo construido para una versión
+
+        Si la topología cambió mientras se construía el grafo, no se guarda.
+
+        Args:
+            version: Versión con la que se construyó el grafo
+            grafo: CSRGraph construido
+
+        Returns:
+            True si el grafo quedó cacheado
+        """
+        with self._lock:
+            if version != self._version:
+                return False
+            self._grafo = grafo
+            self._version_grafo = version
+            self._grafo_nx = None
+            return True
+
+    def obtener_networkx(self, version):
+        """
+        Obtiene la adaptación a NetworkX cacheada para una versión
+
+        Args:
+            version: Versión de topología esperada
+
+        Returns:
+            networkx.Graph o None si no se materializó para esa versión
+        """
+        with self._lock:
+            if self._grafo_nx is not None and self._version_grafo == version:
+                return self._grafo_nx
+            return None
+
+    def guardar_networkx(self, version, grafo):
+        """
+        Guarda la adaptación a NetworkX del grafo de una versión
+
+        Args:
+            version: Versión del grafo compacto del que se obtuvo
+            grafo: networkx.Graph materializado
+
+        Returns:
+            True si el grafo quedó cacheado
+        """
+        with self._lock:
+            if version != self._version or self._version_grafo != version:
+                return False
+            self._grafo_nx = grafo
+            return True
@@ -69,7 +69,8 @@ class MenuPrincipal:
             opcion = input("\n➤ Seleccione una opción: ").strip()
 
             if opcion == '1':
-                reporte = self.controlador.generar_reporte()
+                # Refresca la instantánea que comparte el resumen de la pantalla principal
+                reporte = self.controlador.generar_reporte(forzar=True)
                 print("\n" + "=" * 60)
                 print("REPORTE COMPLETO DE LA RED")
                 print("=" * 60)
@@ -1,5 +1,6 @@
 import os
 from controlador.controller.ruta_controller import RutaController
+from controlador.services.constrained_routing import METRICAS_RUTA
 
 
 class MenuRutas:
@@ -51,8 +52,24 @@ class MenuRutas:
             print(" IDs inválidos")
             return
 
+        metrica = input(f"Métrica ({'/'.join(METRICAS_RUTA)}) [costo]: ").strip() or 'costo'
+        if metrica not in METRICAS_RUTA:
+            print(" Métrica inválida")
+            return
+
+        try:
+            retardo_max = input("Retardo máximo en ms (Enter = sin límite): ").strip()
+            retardo_max = float(retardo_max) if retardo_max else None
+            ancho_banda_min = input("Ancho de banda mínimo (Enter = sin límite): ").strip()
+            ancho_banda_min = float(ancho_banda_min) if ancho_banda_min else None
+        except ValueError:
+            print(" Restricción inválida")
+            return
+
         print("\n Calculando ruta...")
-        ruta_info = self.ruta_controller.obtener_ruta_optima(origen, destino)
+        ruta_info = self.ruta_controller.obtener_ruta_optima(
+            origen, destino, metrica, retardo_max, ancho_banda_min
+        )
 
         if ruta_info:
             print("\n Ruta encontrada:")
@@ -70,7 +87,9 @@ class MenuRutas:
             # Preguntar si guardar
             guardar = input("\n¿Guardar esta ruta en la base de datos? (s/n): ").strip().lower()
             if guardar == 's':
-                ruta = self.controlador.calcular_ruta(origen, destino, guardar=True)
+                ruta = self.controlador.calcular_ruta(origen, destino, guardar=True, metrica=metrica,
+                                                      retardo_max=retardo_max,
+                                                      ancho_banda_min=ancho_banda_min)
                 if ruta:
                     print(" Ruta guardada exitosamente")
         else:
@@ -99,9 +118,9 @@ class MenuRutas:
             print(f"ID Ruta:        {ruta.id_ruta}")
             print(f"Origen:         R{ruta.router_origen} ({router_origen.nombre if router_origen else 'N/A'})")
             print(f"Destino:        R{ruta.router_destino} ({router_destino.nombre if router_destino else 'N/A'})")
-            print(f"Camino:         {ruta.camino}")
+            print(f"Camino:         {ruta.camino_texto()}")
             print(f"Costo Total:    {ruta.costo_total:.2f}")
-            print(f"Nº Saltos:      {ruta.numero_saltos()}")
+            print(f"Nº Saltos:      {ruta.numero_saltos}")
             print(f"Fecha Cálculo:  {ruta.fecha_calculo}")
         else:
             print(f"\n No existe ruta guardada entre R{origen} y R{destino}")
@@ -123,9 +142,10 @@ class MenuRutas:
         print("─" * 80)
 
         for ruta in rutas:
-            camino_corto = ruta.camino[:22] + "..." if len(ruta.camino) > 25 else ruta.camino
+            camino = ruta.camino_texto()
+            camino_corto = camino[:22] + "..." if len(camino) > 25 else camino
             print(f"{ruta.id_ruta:<6} R{ruta.router_origen:<7} R{ruta.router_destino:<7} "
-                  f"{camino_corto:<25} {ruta.costo_total:<8.2f} {ruta.numero_saltos():<8}")
+                  f"{camino_corto:<25} {ruta.costo_total:<8.2f} {ruta.numero_saltos:<8}")
 
     def ver_tabla_enrutamiento(self):
         """Ve la tabla de enrutamiento de un router"""
@@ -246,8 +266,15 @@ class MenuRutas:
             print(" Valores inválidos")
             return
 
+        print("\nTipo de rutas:")
+        print("  1. Cualquiera (default)")
+        print("  2. Sin enlaces compartidos")
+        print("  3. Sin routers intermedios compartidos")
+        modos = {'1': 'simple', '2': 'aristas_disjuntas', '3': 'nodos_disjuntos'}
+        modo = modos.get(input("Seleccione tipo: ").strip(), 'simple')
+
         print(f"\n Calculando {k} rutas alternativas...")
-        rutas_alt = self.ruta_controller.obtener_rutas_alternativas(origen, destino, k)
+        rutas_alt = self.ruta_controller.obtener_rutas_alternativas(origen, destino, k, modo)
 
         if rutas_alt:
             print(f"\n Se encontraron {len(rutas_alt)} rutas alternativas:")
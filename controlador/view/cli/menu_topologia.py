@@ -31,6 +31,8 @@ class MenuTopologia:
         print(" 12. Visualizar topología de red")
         print(" 13. Ver estadísticas de topología")
         print(" 14. Ver centralidad de routers")
+        print(" 15. Ver matriz de distancias")
+        print(" 16. Simular fallos (N-1)")
         print("  0. Volver al menú principal")
         print("─" * 60)
 
@@ -303,10 +305,10 @@ class MenuTopologia:
         print("    " + "─" * (len(router_ids) * 7))
 
         # Imprimir filas
-        for rid_i in router_ids:
+        for i, rid_i in enumerate(router_ids):
             print(f"R{rid_i:<3} ", end="")
-            for rid_j in router_ids:
-                valor = matriz[rid_i][rid_j]
+            for j in range(len(router_ids)):
+                valor = matriz[i][j]
                 if valor == 0:
                     print(f"{'0':<6}", end="")
                 elif valor == float('inf'):
@@ -315,6 +317,41 @@ class MenuTopologia:
                     print(f"{valor:<6.1f}", end="")
             print()
 
+    def ver_matriz_distancias(self):
+        """Muestra la matriz de distancias mínimas y de siguiente salto"""
+        print("\n" + "=" * 60)
+        print("MATRIZ DE DISTANCIAS (TODOS LOS PARES)")
+        print("=" * 60)
+
+        matrices = self.topo_controller.obtener_matriz_distancias()
+        if matrices is None:
+            print(" Requiere NumPy y SciPy instalados")
+            return
+
+        router_ids = matrices['router_ids']
+        distancias = matrices['distancias']
+        siguiente = matrices['siguiente_salto']
+
+        print("\n Costo mínimo / siguiente salto")
+        print("\n    ", end="")
+        for rid in router_ids:
+            print(f"R{rid:<9}", end="")
+        print()
+        print("    " + "─" * (len(router_ids) * 10))
+
+        for i, rid_i in enumerate(router_ids):
+            print(f"R{rid_i:<3} ", end="")
+            for j in range(len(router_ids)):
+                valor = distancias[i][j]
+                if i == j:
+                    celda = "-"
+                elif valor == float('inf'):
+                    celda = "∞"
+                else:
+                    celda = f"{valor:.1f}/R{siguiente[i][j]}"
+                print(f"{celda:<10}", end="")
+            print()
+
     def identificar_routers_criticos(self):
         """Identifica routers críticos en la red"""
         print("\n" + "=" * 60)
@@ -412,33 +449,89 @@ class MenuTopologia:
             print("\nNo hay suficientes routers para calcular centralidad")
             return
 
+        if not metricas.get('exacto', True):
+            print(f"\n Valores estimados por muestreo ({metricas['pivotes']} routers pivote)")
+
+        degree_sorted = sorted(metricas['degree'].items(), key=lambda x: x[1], reverse=True)
+        between_sorted = sorted(metricas['betweenness'].items(), key=lambda x: x[1], reverse=True)
+        close_sorted = sorted(metricas['closeness'].items(), key=lambda x: x[1], reverse=True)
+
+        # Nombres de los routers de las tres listas en una sola consulta
+        routers = self.controlador.obtener_routers(
+            router_id
+            for ordenados in (degree_sorted, between_sorted, close_sorted)
+            for router_id, _ in ordenados[:10]
+        )
+
         # Degree Centrality
         print("\nCentralidad de Grado (Degree Centrality):")
         print("─" * 60)
-        degree_sorted = sorted(metricas['degree'].items(), key=lambda x: x[1], reverse=True)
         for router_id, valor in degree_sorted[:10]:
-            router = self.controlador.obtener_router(router_id)
+            router = routers.get(router_id)
             nombre = router.nombre if router else f"R{router_id}"
             print(f"  {nombre:<10} {valor:.4f}")
 
         # Betweenness Centrality
         print("\n Centralidad de Intermediación (Betweenness):")
         print("─" * 60)
-        between_sorted = sorted(metricas['betweenness'].items(), key=lambda x: x[1], reverse=True)
         for router_id, valor in between_sorted[:10]:
-            router = self.controlador.obtener_router(router_id)
+            router = routers.get(router_id)
             nombre = router.nombre if router else f"R{router_id}"
             print(f"  {nombre:<10} {valor:.4f}")
 
         # Closeness Centrality
         print("\n Centralidad de Cercanía (Closeness):")
         print("─" * 60)
-        close_sorted = sorted(metricas['closeness'].items(), key=lambda x: x[1], reverse=True)
         for router_id, valor in close_sorted[:10]:
-            router = self.controlador.obtener_router(router_id)
+            router = routers.get(router_id)
             nombre = router.nombre if router else f"R{router_id}"
             print(f"  {nombre:<10} {valor:.4f}")
 
+    def simular_fallos(self):
+        """Muestra el impacto de la caída de cada enlace y cada router"""
+        print("\n" + "=" * 60)
+        print("SIMULACIÓN DE FALLOS (N-1)")
+        print("=" * 60)
+
+        print("\n⏳ Simulando la caída de cada enlace y cada router...")
+
+        reportes = self.topo_controller.simular_fallos()
+
+        if not reportes:
+            print("\nNo hay suficientes routers para simular fallos")
+            return
+
+        # Nombres de los routers de los escenarios mostrados en una sola consulta
+        mostrados = reportes[:15]
+        routers = self.controlador.obtener_routers(
+            router_id
+            for reporte in mostrados
+            for _, *ids in reporte['fallo']
+            for router_id in ids
+        )
+
+        def nombre(router_id):
+            router = routers.get(router_id)
+            return router.nombre if router else f"R{router_id}"
+
+        print(f"\n{len(reportes)} escenarios evaluados. Los de mayor impacto:")
+        print("─" * 80)
+        print(f"{'Fallo':<26} {'Desconect.':<11} {'Reencamin.':<11} {'Costo +':<10} {'Inflación':<10} {'Estiram.'}")
+        print("─" * 80)
+
+        for reporte in mostrados:
+            fallo = " + ".join(
+                nombre(ids[0]) if tipo == 'router' else f"{nombre(ids[0])}-{nombre(ids[1])}"
+                for tipo, *ids in reporte['fallo']
+            )
+            print(f"{fallo:<26} {reporte['pares_desconectados']:<11} {reporte['pares_afectados']:<11} "
+                  f"{reporte['costo_adicional']:<10.1f} {reporte['inflacion_costo']:<10.2%} "
+                  f"{reporte['estiramiento_max']:.2f}")
+
+        sin_impacto = sum(1 for r in reportes if not r['pares_desconectados'] and not r['costo_adicional'])
+        print("─" * 80)
+        print(f"Escenarios sin desconexiones ni aumento de costo: {sin_impacto}")
+
     def ejecutar(self):
         while True:
             self.limpiar_pantalla()
@@ -505,6 +598,14 @@ class MenuTopologia:
                 self.ver_centralidad_routers()
                 input("\nPresione Enter para continuar...")
 
+            elif opcion == '15':
+                self.ver_matriz_distancias()
+                input("\nPresione Enter para continuar...")
+
+            elif opcion == '16':
+                self.simular_fallos()
+                input("\nPresione Enter para continuar...")
+
             elif opcion == '0':
                 break
 
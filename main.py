@@ -30,6 +30,7 @@ def iniciar_controlador():
     print("=" * 70)
 
     from controlador.config.database import Database
+    from controlador.dao.log_controlador_dao import LogControladorDAO
     from controlador.view.cli.menu_principal import MenuPrincipal
 
     # Probar conexión
@@ -50,7 +51,8 @@ def iniciar_controlador():
     menu = MenuPrincipal()
     menu.ejecutar()
 
-    # Cerrar conexión
+    # Escribir los logs pendientes y cerrar conexión
+    LogControladorDAO().flush()
     db.disconnect()
 
 
@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from controlador.view.cli.menu_principal import MenuPrincipal
 from controlador.config.database import Database
+from controlador.dao.log_controlador_dao import LogControladorDAO
 
 
 def main():
@@ -32,7 +33,8 @@ def main():
     menu = MenuPrincipal()
     menu.ejecutar()
 
-    # Cerrar conexión al salir
+    # Escribir los logs pendientes y cerrar conexión al salir
+    LogControladorDAO().flush()
     db.disconnect()
     print("\n Sistema cerrado correctamente\n")
 
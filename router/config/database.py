@@ -1,41 +1,98 @@
-import mysql.connector
-from mysql.connector import Error
-from router.config.settings import DB_CONFIG
+from contextlib import contextmanager
+from router.config.settings import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG, DB_POOL_CONFIG
+from router.config.esquema_sqlite import ESQUEMA_SQLITE
+from router.config.migraciones import MIGRACIONES_MYSQL
+from shared.utils.connection_pool import ConnectionPool
+from shared.utils.storage_backend import crear_backend
 
 class Database:
-    """Clase para gestionar la conexión a router_db"""
+    """Clase para gestionar el pool de conexiones a router_db"""
 
     _instance = None
-    _connection = None
+    _pool = None
+    backend = None
 
     def __new__(cls):
-        """Patrón Singleton para una única conexión"""
+        """Patrón Singleton para un único pool de conexiones"""
         if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
+            instance = super(Database, cls).__new__(cls)
+            instance.backend = crear_backend(
+                DB_BACKEND,
+                SQLITE_CONFIG if DB_BACKEND == 'sqlite' else DB_CONFIG,
+                esquema_sqlite=ESQUEMA_SQLITE,
+                etiqueta='router_db',
+                migraciones_mysql=MIGRACIONES_MYSQL
+            )
+            instance._pool = ConnectionPool(
+                instance.backend.conectar,
+                tamano=DB_POOL_CONFIG['tamano'],
+                timeout=DB_POOL_CONFIG['timeout'],
+                validar=instance.backend.es_valida
+            )
+            cls._instance = instance
         return cls._instance
 
     def connect(self):
-        """Establece la conexión con la base de datos"""
+        """
+        Verifica que se puede obtener una conexión del pool
+
+        Returns:
+            Conexión validada o None si no se pudo conectar
+        """
         try:
-            if self._connection is None or not self._connection.is_connected():
-                self._connection = mysql.connector.connect(**DB_CONFIG)
-                print("✓ Conexión exitosa a router_db")
-            return self._connection
-        except Error as e:
+            with self._pool.conexion() as connection:
+                return connection
+        except self.backend.errores + (TimeoutError,) as e:
             print(f"✗ Error al conectar a router_db: {e}")
             return None
 
     def disconnect(self):
-        """Cierra la conexión con la base de datos"""
-        if self._connection and self._connection.is_connected():
-            self._connection.close()
-            print("✓ Conexión cerrada con router_db")
+        """Cierra las conexiones libres del pool"""
+        self._pool.cerrar_todas()
+        print("✓ Conexiones cerradas con router_db")
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Ejecuta un bloque dentro de una transacción
+
+        La transacción se confirma al salir del bloque y se revierte si se
+        produce una excepción, que se vuelve a lanzar. Las transacciones y
+        consultas anidadas en el mismo hilo usan la misma conexión y solo
+        la más externa confirma.
 
-    def get_connection(self):
-        """Obtiene la conexión activa"""
-        if self._connection is None or not self._connection.is_connected():
-            return self.connect()
-        return self._connection
+        Yields:
+            Cursor de la conexión (acepta marcadores %s en cualquier backend)
+        """
+        with self._pool.conexion() as connection:
+            externa = self._pool.profundidad == 1
+            if externa:
+                self.backend.iniciar_transaccion(connection)
+
+            cursor = self.backend.cursor(connection)
+            try:
+                yield cursor
+                if externa:
+                    connection.commit()
+            except Exception:
+                if externa:
+                    connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _ejecutar(self, query, params, obtener):
+        """Ejecuta una consulta con una conexión del pool"""
+        with self._pool.conexion() as connection:
+            cursor = self.backend.cursor(connection)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return obtener(cursor)
+            finally:
+                cursor.close()
 
     def execute_query(self, query, params=None):
         """
@@ -49,18 +106,9 @@ class Database:
             True si la operación fue exitosa, False en caso contrario
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            connection.commit()
-            cursor.close()
+            self._ejecutar(query, params, lambda cursor: None)
             return True
-        except Error as e:
+        except self.backend.errores + (TimeoutError,) as e:
             print(f"✗ Error al ejecutar query: {e}")
             return False
 
@@ -76,18 +124,8 @@ class Database:
             Lista de tuplas con los resultados
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            results = cursor.fetchall()
-            cursor.close()
-            return results
-        except Error as e:
+            return self._ejecutar(query, params, lambda cursor: cursor.fetchall())
+        except self.backend.errores + (TimeoutError,) as e:
             print(f"✗ Error al ejecutar query: {e}")
             return []
 
@@ -103,17 +141,7 @@ class Database:
             Tupla con el resultado o None
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            result = cursor.fetchone()
-            cursor.close()
-            return result
-        except Error as e:
+            return self._ejecutar(query, params, lambda cursor: cursor.fetchone())
+        except self.backend.errores + (TimeoutError,) as e:
             print(f"✗ Error al ejecutar query: {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Esquema de router_db para el backend SQLite
+# (mismas tablas y orden de columnas que en MySQL)
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS Vecino (
+    id_vecino INTEGER PRIMARY KEY AUTOINCREMENT,
+    router_vecino TEXT NOT NULL UNIQUE,
+    ip_vecino TEXT NOT NULL UNIQUE,
+    estado_vecino TEXT NOT NULL DEFAULT 'Down',
+    costo_enlace REAL NOT NULL DEFAULT 1.0,
+    tiempo_ultimo_hello DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_vecino_estado ON Vecino (estado_vecino);
+
+CREATE TABLE IF NOT EXISTS tb_Enrutamiento (
+    id_ruta INTEGER PRIMARY KEY AUTOINCREMENT,
+    destino TEXT NOT NULL,
+    next_hop TEXT,
+    interfaz_salida TEXT,
+    costo_total REAL NOT NULL DEFAULT 0,
+    origen_info TEXT NOT NULL DEFAULT 'Interna',
+    next_hop_respaldo TEXT,
+    interfaz_respaldo TEXT,
+    costo_respaldo REAL
+);
+CREATE INDEX IF NOT EXISTS idx_enrutamiento_destino ON tb_Enrutamiento (destino);
+CREATE INDEX IF NOT EXISTS idx_enrutamiento_next_hop ON tb_Enrutamiento (next_hop);
+CREATE INDEX IF NOT EXISTS idx_enrutamiento_origen ON tb_Enrutamiento (origen_info);
+
+CREATE TABLE IF NOT EXISTS tb_Enrutamiento_Salto (
+    id_salto INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_ruta INTEGER NOT NULL REFERENCES tb_Enrutamiento (id_ruta) ON DELETE CASCADE,
+    next_hop TEXT NOT NULL,
+    interfaz_salida TEXT,
+    peso REAL NOT NULL DEFAULT 1.0
+);
+CREATE INDEX IF NOT EXISTS idx_enrutamiento_salto_ruta ON tb_Enrutamiento_Salto (id_ruta);
+CREATE INDEX IF NOT EXISTS idx_enrutamiento_salto_next_hop ON tb_Enrutamiento_Salto (next_hop);
+
+CREATE TABLE IF NOT EXISTS Mensajes (
+    id_mensaje INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    emisor TEXT NOT NULL,
+    receptor TEXT NOT NULL,
+    contenido TEXT,
+    fecha_hora DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mensajes_emisor ON Mensajes (emisor, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_mensajes_receptor ON Mensajes (receptor, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_mensajes_tipo ON Mensajes (tipo, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_mensajes_fecha ON Mensajes (fecha_hora);
+
+CREATE TABLE IF NOT EXISTS Log_Router (
+    id_log INTEGER PRIMARY KEY AUTOINCREMENT,
+    evento TEXT NOT NULL,
+    detalle TEXT,
+    fecha_hora DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_router_fecha ON Log_Router (fecha_hora);
+"""
@@ -0,0 +1,27 @@
+# Migraciones de router_db para bases creadas con un esquema anterior
+# (en SQLite las tablas y columnas nuevas se derivan de ESQUEMA_SQLITE)
+from shared.utils.storage_backend import columna_faltante
+
+# Pares (condición, sentencia) que MySQLBackend aplica al conectar
+MIGRACIONES_MYSQL = [
+    # Siguientes saltos de igual costo (ECMP) de cada ruta
+    (None, """
+        CREATE TABLE IF NOT EXISTS tb_Enrutamiento_Salto (
+            id_salto INT AUTO_INCREMENT PRIMARY KEY,
+            id_ruta INT NOT NULL,
+            next_hop VARCHAR(50) NOT NULL,
+            interfaz_salida VARCHAR(50),
+            peso DOUBLE NOT NULL DEFAULT 1.0,
+            INDEX idx_enrutamiento_salto_ruta (id_ruta),
+            INDEX idx_enrutamiento_salto_next_hop (next_hop),
+            FOREIGN KEY (id_ruta) REFERENCES tb_Enrutamiento (id_ruta) ON DELETE CASCADE
+        )
+    """),
+    # Next hop de respaldo libre de bucles (LFA)
+    (columna_faltante('tb_Enrutamiento', 'next_hop_respaldo'),
+     "ALTER TABLE tb_Enrutamiento ADD COLUMN next_hop_respaldo VARCHAR(50) NULL"),
+    (columna_faltante('tb_Enrutamiento', 'interfaz_respaldo'),
+     "ALTER TABLE tb_Enrutamiento ADD COLUMN interfaz_respaldo VARCHAR(50) NULL"),
+    (columna_faltante('tb_Enrutamiento', 'costo_respaldo'),
+     "ALTER TABLE tb_Enrutamiento ADD COLUMN costo_respaldo DOUBLE NULL"),
+]
@@ -6,6 +6,35 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Backend de almacenamiento: 'mysql' (servidor, DB_CONFIG) o 'sqlite' (embebido)
+DB_BACKEND = 'mysql'
+
+# Base embebida usada con DB_BACKEND = 'sqlite'
+SQLITE_CONFIG = {
+    'ruta': 'data/router.db',
+    'timeout': 30,  # Segundos de espera si la base está bloqueada
+    'sentencias_cacheadas': 256,  # Sentencias preparadas por conexión
+}
+
+# Almacén de Mensajes: 'bd' (tabla Mensajes) o 'segmentos' (log binario
+# local de solo anexado, sin base de datos)
+MENSAJES_BACKEND = 'bd'
+
+# Log local de Mensajes usado con MENSAJES_BACKEND = 'segmentos'
+MENSAJES_SEGMENTOS_CONFIG = {
+    'directorio': 'data/mensajes/{router}',  # Una carpeta por router ({router} = nombre)
+    'tamano_registro': 512,  # Bytes por mensaje; el contenido se trunca a 350
+    'registros_por_segmento': 16384,  # Rotación por tamaño (8 MB por segmento)
+    'antiguedad_segmento': 3600,  # Rotación por antigüedad, en segundos
+    'segmentos_max': 32,  # Segmentos conservados; los más antiguos se borran
+}
+
+# Pool de conexiones a la base de datos
+DB_POOL_CONFIG = {
+    'tamano': 10,  # Conexiones abiertas como máximo
+    'timeout': 30,  # Segundos de espera por una conexión libre
+}
+
 # Configuración del router
 ROUTER_CONFIG = {
     'version': '1.0.0',
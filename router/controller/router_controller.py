@@ -1,7 +1,7 @@
 from datetime import datetime
 from router.dao.vecino_dao import VecinoDAO
 from router.dao.tb_enrutamiento_dao import TbEnrutamientoDAO
-from router.dao.mensaje_dao import MensajeDAO
+from router.dao.mensaje_dao import crear_mensaje_dao
 from router.dao.log_router_dao import LogRouterDAO
 from router.model.vecino import Vecino
 from router.model.tb_enrutamiento import TbEnrutamiento
@@ -18,7 +18,7 @@ class RouterController:
 
         self.vecino_dao = VecinoDAO()
         self.enrutamiento_dao = TbEnrutamientoDAO()
-        self.mensaje_dao = MensajeDAO()
+        self.mensaje_dao = crear_mensaje_dao(router_nombre)
         self.log_dao = LogRouterDAO()
 
         self.ospf = OSPFSimulator(router_id, router_nombre)
@@ -187,14 +187,42 @@ class RouterController:
             print(f"✗ Estado inválido. Debe ser uno de: {ESTADOS_VECINO}")
             return False
 
+        vecino = self.vecino_dao.obtener_por_id(id_vecino)
+
         if self.vecino_dao.cambiar_estado(id_vecino, nuevo_estado):
             self.log_dao.registrar_evento(
                 "Estado de vecino cambiado",
                 f"Vecino ID {id_vecino} cambió a estado '{nuevo_estado}'"
             )
+            if nuevo_estado == 'Down' and vecino and vecino.estado_vecino != 'Down':
+                self.conmutar_rutas_vecino(vecino.ip_vecino)
             return True
         return False
 
+    def conmutar_rutas_vecino(self, ip_vecino):
+        """
+        Deja de enviar tráfico a un vecino caído sin esperar al controlador
+
+        Las rutas lo quitan de sus saltos de igual costo o, si era el único,
+        conmutan a su next hop de respaldo; solo se eliminan las que no
+        tienen alternativa.
+
+        Args:
+            ip_vecino: IP del vecino caído
+
+        Returns:
+            Tupla (rutas_actualizadas, rutas_conmutadas, rutas_eliminadas)
+        """
+        actualizadas, conmutadas, eliminadas = self.enrutamiento_dao.retirar_next_hop(ip_vecino)
+
+        if conmutadas or eliminadas:
+            self.log_dao.registrar_evento(
+                f"Rutas retiradas de {ip_vecino}",
+                f"{len(actualizadas)} actualizadas, {len(conmutadas)} conmutadas al respaldo, "
+                f"{len(eliminadas)} eliminadas"
+            )
+        return actualizadas, conmutadas, eliminadas
+
     def eliminar_vecino(self, id_vecino):
         """
         Elimina un vecino
@@ -212,10 +240,8 @@ class RouterController:
 
         nombre = vecino.router_vecino
 
-        # Eliminar rutas que usan este vecino
-        rutas = self.enrutamiento_dao.obtener_por_next_hop(vecino.ip_vecino)
-        for ruta in rutas:
-            self.enrutamiento_dao.eliminar(ruta.id_ruta)
+        # Quitar el vecino de las rutas que lo usan (conmutan al respaldo o se eliminan)
+        self.conmutar_rutas_vecino(vecino.ip_vecino)
 
         if self.vecino_dao.eliminar(id_vecino):
             self.log_dao.registrar_evento(
@@ -400,6 +426,140 @@ class RouterController:
 
         return eliminadas
 
+    def aplicar_ruta_controlador(self, destino, next_hop, interfaz_salida, costo_total,
+                                 next_hops=None, respaldo=None):
+        """
+        Inserta o reemplaza la ruta a un destino recibida del controlador
+
+        Una ruta previa del controlador se reemplaza siempre; una ruta de otro
+        origen solo si la del controlador tiene menor costo.
+
+        Args:
+            destino: Dirección de destino
+            next_hop: Next hop del camino principal
+            interfaz_salida: Interfaz de salida
+            costo_total: Costo total
+            next_hops: Conjunto ECMP del controlador, lista de diccionarios
+                       con 'next_hop', 'interfaz_salida' y 'peso' (opcional)
+            respaldo: Next hop de respaldo libre de bucles, diccionario con
+                      'next_hop', 'interfaz_salida' y 'costo' (opcional)
+
+        Returns:
+            ID de la ruta, o None si no se aplicó
+        """
+        saltos = [
+            (salto['next_hop'], salto.get('interfaz_salida', interfaz_salida), float(salto.get('peso', 1.0)))
+            for salto in next_hops or ()
+            if salto.get('next_hop')
+        ]
+        respaldo = respaldo if respaldo and respaldo.get('next_hop') else {}
+        next_hop_respaldo = respaldo.get('next_hop')
+        interfaz_respaldo = respaldo.get('interfaz_salida')
+        costo_respaldo = respaldo.get('costo')
+        ruta = self.enrutamiento_dao.obtener_por_destino(destino)
+
+        if ruta is None:
+            ruta = TbEnrutamiento(
+                destino=destino,
+                next_hop=next_hop,
+                interfaz_salida=interfaz_salida,
+                costo_total=costo_total,
+                origen_info='Controlador',
+                siguientes_saltos=saltos,
+                next_hop_respaldo=next_hop_respaldo,
+                interfaz_respaldo=interfaz_respaldo,
+                costo_respaldo=costo_respaldo
+            )
+            return self.enrutamiento_dao.crear(ruta)
+
+        if ruta.origen_info != 'Controlador' and costo_total >= ruta.costo_total:
+            return None
+
+        nueva = TbEnrutamiento(next_hop=next_hop, interfaz_salida=interfaz_salida,
+                               siguientes_saltos=saltos)
+        if (ruta.origen_info == 'Controlador' and ruta.next_hop == next_hop
+                and ruta.interfaz_salida == interfaz_salida
+                and float(ruta.costo_total) == float(costo_total)
+                and ruta.obtener_saltos() == nueva.obtener_saltos()
+                and ruta.next_hop_respaldo == next_hop_respaldo
+                and ruta.interfaz_respaldo == interfaz_respaldo
+                and ruta.costo_respaldo == costo_respaldo):
+            # Sin cambios
+            return ruta.id_ruta
+
+        ruta.next_hop = next_hop
+        ruta.interfaz_salida = interfaz_salida
+        ruta.costo_total = costo_total
+        ruta.origen_info = 'Controlador'
+        ruta.siguientes_saltos = saltos
+        ruta.next_hop_respaldo = next_hop_respaldo
+        ruta.interfaz_respaldo = interfaz_respaldo
+        ruta.costo_respaldo = costo_respaldo
+
+        if self.enrutamiento_dao.actualizar(ruta):
+            return ruta.id_ruta
+        return None
+
+    def retirar_ruta_controlador(self, destino):
+        """
+        Elimina la ruta del controlador hacia un destino
+
+        Args:
+            destino: Dirección de destino
+
+        Returns:
+            True si se eliminó la ruta
+        """
+        ruta = self.enrutamiento_dao.obtener_por_destino(destino)
+        if not ruta or ruta.origen_info != 'Controlador':
+            return False
+        return self.enrutamiento_dao.eliminar(ruta.id_ruta)
+
+    def sincronizar_rutas_controlador(self, rutas):
+        """
+        Sincroniza las rutas del controlador con una tabla completa
+
+        Aplica cada ruta individualmente y retira solo los destinos que ya
+        no están en la tabla, sin vaciar antes las rutas existentes.
+
+        Args:
+            rutas: Lista de diccionarios con rutas del controlador
+
+        Returns:
+            Número de rutas aplicadas o retiradas
+        """
+        destinos = set()
+        contador = 0
+
+        for ruta in rutas:
+            destino = ruta.get('destino')
+            next_hop = ruta.get('next_hop')
+            if not (destino and next_hop):
+                continue
+
+            destinos.add(destino)
+            ruta_id = self.aplicar_ruta_controlador(
+                destino=destino,
+                next_hop=next_hop,
+                interfaz_salida=ruta.get('interfaz_salida', 'eth0'),
+                costo_total=ruta.get('costo', 1.0),
+                next_hops=ruta.get('next_hops'),
+                respaldo=ruta.get('respaldo')
+            )
+            if ruta_id:
+                contador += 1
+
+        for ruta in self.enrutamiento_dao.obtener_por_origen('Controlador'):
+            if ruta.destino not in destinos and self.enrutamiento_dao.eliminar(ruta.id_ruta):
+                contador += 1
+
+        self.log_dao.registrar_evento(
+            "Rutas del controlador sincronizadas",
+            f"{len(destinos)} rutas recibidas, {contador} cambios aplicados"
+        )
+
+        return contador
+
     def limpiar_tabla_enrutamiento(self):
         """
         Limpia toda la tabla de enrutamiento
@@ -1,10 +1,10 @@
 from router.dao.vecino_dao import VecinoDAO
-from router.dao.mensaje_dao import MensajeDAO
+from router.dao.mensaje_dao import crear_mensaje_dao
 
 class VecinoController:
-    def __init__(self):
+    def __init__(self, router_nombre=None):
         self.vecino_dao = VecinoDAO()
-        self.mensaje_dao = MensajeDAO()
+        self.mensaje_dao = crear_mensaje_dao(router_nombre)
 
     def obtener_estadisticas_vecinos(self):
         """
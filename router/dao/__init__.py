@@ -1,6 +1,7 @@
 from .vecino_dao import VecinoDAO
 from .tb_enrutamiento_dao import TbEnrutamientoDAO
-from .mensaje_dao import MensajeDAO
+from .mensaje_dao import MensajeDAO, crear_mensaje_dao
+from .mensaje_log_dao import MensajeLogDAO
 from .log_router_dao import LogRouterDAO
 
-__all__ = ['VecinoDAO', 'TbEnrutamientoDAO', 'MensajeDAO', 'LogRouterDAO']
\ No newline at end of file
+__all__ = ['VecinoDAO', 'TbEnrutamientoDAO', 'MensajeDAO', 'MensajeLogDAO', 'crear_mensaje_dao', 'LogRouterDAO']
\ No newline at end of file
@@ -24,12 +24,9 @@ class LogRouterDAO:
         params = (log.evento, log.detalle, log.fecha_hora)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            log_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                log_id = cursor.lastrowid
             return log_id
         except Exception as e:
             print(f" Error al crear log: {e}")
@@ -130,9 +127,9 @@ class LogRouterDAO:
         Returns:
             Lista de objetos LogRouter
         """
-        query = """
+        query = f"""
             SELECT * FROM Log_Router 
-            WHERE fecha_hora >= DATE_SUB(NOW(), INTERVAL %s MINUTE)
+            WHERE fecha_hora >= {self.db.backend.hace('MINUTE')}
             ORDER BY fecha_hora DESC
         """
         results = self.db.fetch_all(query, (minutos,))
@@ -161,17 +158,14 @@ class LogRouterDAO:
         Returns:
             Número de logs eliminados
         """
-        query = """
+        query = f"""
             DELETE FROM Log_Router 
-            WHERE fecha_hora < DATE_SUB(NOW(), INTERVAL %s DAY)
+            WHERE fecha_hora < {self.db.backend.hace('DAY')}
         """
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, (dias,))
-            connection.commit()
-            filas_eliminadas = cursor.rowcount
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, (dias,))
+                filas_eliminadas = cursor.rowcount
             print(f"✓ {filas_eliminadas} logs antiguos eliminados")
             return filas_eliminadas
         except Exception as e:
@@ -1,6 +1,27 @@
 from router.config.database import Database
+from router.config.settings import MENSAJES_BACKEND
 from router.model.mensaje import Mensaje
 
+
+def crear_mensaje_dao(router_nombre=None):
+    """
+    Crea el DAO de Mensajes del almacén configurado
+
+    Args:
+        router_nombre: Nombre del router local (necesario con 'segmentos',
+                       que guarda los mensajes en una carpeta por router)
+
+    Returns:
+        MensajeDAO ('bd') o MensajeLogDAO ('segmentos')
+    """
+    if MENSAJES_BACKEND == 'bd':
+        return MensajeDAO()
+    if MENSAJES_BACKEND == 'segmentos':
+        from router.dao.mensaje_log_dao import MensajeLogDAO
+        return MensajeLogDAO(router_nombre)
+    raise ValueError(f"Almacén de mensajes desconocido: {MENSAJES_BACKEND}")
+
+
 class MensajeDAO:
     """Clase para acceso a datos de Mensajes"""
 
@@ -25,12 +46,9 @@ class MensajeDAO:
                   mensaje.contenido, mensaje.fecha_hora)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            mensaje_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                mensaje_id = cursor.lastrowid
             return mensaje_id
         except Exception as e:
             print(f" Error al crear mensaje: {e}")
@@ -176,9 +194,9 @@ class MensajeDAO:
         Returns:
             Lista de objetos Mensaje
         """
-        query = """
+        query = f"""
             SELECT * FROM Mensajes 
-            WHERE fecha_hora >= DATE_SUB(NOW(), INTERVAL %s MINUTE)
+            WHERE fecha_hora >= {self.db.backend.hace('MINUTE')}
             ORDER BY fecha_hora DESC
         """
         results = self.db.fetch_all(query, (minutos,))
@@ -207,17 +225,14 @@ class MensajeDAO:
         Returns:
             Número de mensajes eliminados
         """
-        query = """
+        query = f"""
             DELETE FROM Mensajes 
-            WHERE fecha_hora < DATE_SUB(NOW(), INTERVAL %s DAY)
+            WHERE fecha_hora < {self.db.backend.hace('DAY')}
         """
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, (dias,))
-            connection.commit()
-            filas_eliminadas = cursor.rowcount
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, (dias,))
+                filas_eliminadas = cursor.rowcount
             print(f"✓ {filas_eliminadas} mensajes antiguos eliminados")
             return filas_eliminadas
         except Exception as e:
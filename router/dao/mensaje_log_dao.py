@@ -0,0 +1,300 @@
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from router.config.settings import MENSAJES_SEGMENTOS_CONFIG
+from router.model.mensaje import Mensaje
+from shared.utils.segment_log import CABECERA, SegmentLog
+
+# Carga de cada registro: tipo, emisor y receptor con ancho fijo, largo del
+# contenido y el contenido (hasta completar el registro)
+_CAMPOS = struct.Struct('<16s64s64sH')
+_INICIO = CABECERA.size  # Desplazamiento de la carga dentro del registro
+_TIPO = slice(0, 16)
+_EMISOR = slice(16, 80)
+_RECEPTOR = slice(80, 144)
+
+
+def _campo(texto, ancho):
+    """Codifica un texto en UTF-8 rellenado con ceros hasta su ancho"""
+    return texto.encode('utf-8')[:ancho].ljust(ancho, b'\0')
+
+
+class MensajeLogDAO:
+    """
+    Acceso a Mensajes sobre un log binario local de solo anexado
+
+    Alternativa a la tabla Mensajes para el tráfico de HELLO/LSA: cada
+    mensaje es un registro de tamaño fijo anexado a un SegmentLog, sin
+    pasar por la base de datos. Las consultas recorren el log del más
+    nuevo al más antiguo y comparan tipo, emisor y receptor directamente
+    sobre los bytes mapeados. El contenido que no cabe en el registro se
+    trunca, los mensajes no se pueden eliminar de uno en uno y la limpieza
+    borra segmentos completos. Cada router usa su propia carpeta.
+    """
+
+    _instancias = {}
+    _lock = threading.Lock()
+
+    def __new__(cls, router_nombre):
+        """
+        Patrón Singleton por router: un único escritor por carpeta de log
+
+        Raises:
+            ValueError: Si no se indica el router
+            RuntimeError: Si otro proceso ya escribe en la carpeta del router
+        """
+        if not router_nombre:
+            raise ValueError("El almacén local de mensajes necesita el nombre del router")
+
+        config = MENSAJES_SEGMENTOS_CONFIG
+        directorio = config['directorio'].format(router=re.sub(r'[^\w-]', '_', router_nombre))
+        with cls._lock:
+            if directorio not in cls._instancias:
+                instance = super(MensajeLogDAO, cls).__new__(cls)
+                instance.log = SegmentLog(
+                    directorio,
+                    tamano_registro=config['tamano_registro'],
+                    registros_por_segmento=config['registros_por_segmento'],
+                    antiguedad_segmento=config['antiguedad_segmento'],
+                    segmentos_max=config['segmentos_max']
+                )
+                instance.tamano_contenido = instance.log.tamano_carga - _CAMPOS.size
+                cls._instancias[directorio] = instance
+        return cls._instancias[directorio]
+
+    def crear(self, mensaje):
+        """
+        Anexa un mensaje al log
+
+        Args:
+            mensaje: Objeto Mensaje
+
+        Returns:
+            ID del mensaje creado o None si falla
+        """
+        contenido = (mensaje.contenido or '').encode('utf-8')[:self.tamano_contenido]
+        carga = _CAMPOS.pack(
+            _campo(mensaje.tipo, 16), _campo(mensaje.emisor, 64),
+            _campo(mensaje.receptor, 64), len(contenido)
+        ) + contenido
+
+        try:
+            return self.log.agregar(carga, mensaje.fecha_hora.timestamp())
+        except (OSError, ValueError) as e:
+            print(f" Error al crear mensaje: {e}")
+            return None
+
+    def registrar_mensaje(self, tipo, emisor, receptor, contenido):
+        """
+        Método simplificado para registrar un mensaje
+
+        Args:
+            tipo: Tipo de mensaje
+            emisor: Emisor del mensaje
+            receptor: Receptor del mensaje
+            contenido: Contenido del mensaje
+
+        Returns:
+            ID del mensaje creado
+        """
+        mensaje = Mensaje(tipo=tipo, emisor=emisor, receptor=receptor, contenido=contenido)
+        return self.crear(mensaje)
+
+    def obtener_por_id(self, id_mensaje):
+        """
+        Obtiene un mensaje por su ID
+
+        Args:
+            id_mensaje: ID del mensaje
+
+        Returns:
+            Objeto Mensaje o None
+        """
+        registro = self.log.obtener(id_mensaje)
+        return self._a_mensaje(*registro) if registro else None
+
+    def obtener_todos(self, limite=100):
+        """
+        Obtiene los mensajes más recientes
+
+        Args:
+            limite: Número máximo de mensajes
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        return self._buscar(limite=limite)
+
+    def obtener_por_tipo(self, tipo, limite=50):
+        """
+        Obtiene mensajes de un tipo específico
+
+        Args:
+            tipo: Tipo de mensaje
+            limite: Número máximo de mensajes
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        return self._buscar(self._filtro_campo(_TIPO, tipo), limite=limite)
+
+    def obtener_por_emisor(self, emisor, limite=50):
+        """
+        Obtiene mensajes de un emisor específico
+
+        Args:
+            emisor: Emisor a buscar
+            limite: Número máximo de mensajes
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        return self._buscar(self._filtro_campo(_EMISOR, emisor), limite=limite)
+
+    def obtener_por_receptor(self, receptor, limite=50):
+        """
+        Obtiene mensajes para un receptor específico
+
+        Args:
+            receptor: Receptor a buscar
+            limite: Número máximo de mensajes
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        return self._buscar(self._filtro_campo(_RECEPTOR, receptor), limite=limite)
+
+    def obtener_conversacion(self, router1, router2, limite=50):
+        """
+        Obtiene la conversación entre dos routers
+
+        Args:
+            router1: Primer router
+            router2: Segundo router
+            limite: Número máximo de mensajes
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        r1, r2 = _campo(router1, 64), _campo(router2, 64)
+
+        def filtro(mapa, desplazamiento):
+            inicio = desplazamiento + _INICIO
+            emisor = mapa[inicio + _EMISOR.start:inicio + _EMISOR.stop]
+            receptor = mapa[inicio + _RECEPTOR.start:inicio + _RECEPTOR.stop]
+            return (emisor == r1 and receptor == r2) or (emisor == r2 and receptor == r1)
+
+        return self._buscar(filtro, limite=limite)
+
+    def obtener_recientes(self, minutos=60):
+        """
+        Obtiene mensajes recientes de los últimos X minutos
+
+        Los segmentos cuyo índice de tiempo queda fuera del rango no se leen.
+
+        Args:
+            minutos: Número de minutos hacia atrás
+
+        Returns:
+            Lista de objetos Mensaje
+        """
+        return self._buscar(desde=time.time() - minutos * 60)
+
+    def eliminar(self, id_mensaje):
+        """
+        El log es de solo anexado: los mensajes no se eliminan de uno en uno
+
+        Returns:
+            False
+        """
+        print("✗ El almacén local de mensajes no permite eliminar mensajes individuales")
+        return False
+
+    def limpiar_mensajes_antiguos(self, dias=30):
+        """
+        Elimina los segmentos con mensajes más antiguos que X días
+
+        Args:
+            dias: Número de días
+
+        Returns:
+            Número de mensajes eliminados
+        """
+        try:
+            filas_eliminadas = self.log.eliminar_anteriores(time.time() - dias * 86400)
+            print(f"✓ {filas_eliminadas} mensajes antiguos eliminados")
+            return filas_eliminadas
+        except OSError as e:
+            print(f"✗ Error al limpiar mensajes antiguos: {e}")
+            return 0
+
+    def contar_mensajes(self):
+        """
+        Cuenta el total de mensajes
+
+        Returns:
+            Número de mensajes
+        """
+        return self.log.contar()
+
+    def obtener_estadisticas(self):
+        """
+        Obtiene estadísticas de mensajes
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        cantidades = Counter()
+        ultimos = {}
+        for _, marca, carga in self.log.recorrer():
+            tipo = bytes(carga[_TIPO])
+            cantidades[tipo] += 1
+            if marca > ultimos.get(tipo, marca - 1):
+                ultimos[tipo] = marca
+
+        estadisticas = {}
+        for tipo, cantidad in cantidades.most_common():
+            estadisticas[tipo.rstrip(b'\0').decode('utf-8', 'ignore')] = {
+                'cantidad': cantidad,
+                'ultimo_mensaje': datetime.fromtimestamp(ultimos[tipo])
+            }
+        return estadisticas
+
+    @staticmethod
+    def _filtro_campo(campo, valor):
+        """Filtro que compara un campo de ancho fijo sobre los bytes mapeados"""
+        buscado = _campo(valor, campo.stop - campo.start)
+        inicio = _INICIO + campo.start
+        fin = _INICIO + campo.stop
+        return lambda mapa, desplazamiento: mapa[desplazamiento + inicio:desplazamiento + fin] == buscado
+
+    def _buscar(self, filtro=None, limite=None, desde=None):
+        """
+        Mensajes del log que cumplen un filtro, ordenados del más reciente al más antiguo
+
+        El recorrido se detiene al reunir el límite, en orden de anexado.
+        """
+        mensajes = []
+        for id_mensaje, marca, carga in self.log.recorrer(filtro, desde):
+            mensajes.append(self._a_mensaje(id_mensaje, marca, carga))
+            if limite is not None and len(mensajes) >= limite:
+                break
+        mensajes.sort(key=lambda m: m.fecha_hora, reverse=True)
+        return mensajes
+
+    @staticmethod
+    def _a_mensaje(id_mensaje, marca, carga):
+        """Convierte un registro del log en un objeto Mensaje"""
+        tipo, emisor, receptor, largo = _CAMPOS.unpack_from(carga)
+        contenido = bytes(carga[_CAMPOS.size:_CAMPOS.size + largo])
+        return Mensaje(
+            id_mensaje=id_mensaje,
+            tipo=tipo.rstrip(b'\0').decode('utf-8', 'ignore'),
+            emisor=emisor.rstrip(b'\0').decode('utf-8', 'ignore'),
+            receptor=receptor.rstrip(b'\0').decode('utf-8', 'ignore'),
+            contenido=contenido.decode('utf-8', 'ignore'),
+            fecha_hora=datetime.fromtimestamp(marca)
+        )
@@ -1,10 +1,67 @@
 from router.config.database import Database
 from router.model.tb_enrutamiento import TbEnrutamiento
 
+# Máximo de IDs por consulta IN al cargar los siguientes saltos
+MAX_IDS_POR_CONSULTA = 500
+
+# Columnas por nombre: no depende del orden ni de columnas extra de la tabla
+_COLUMNAS = ", ".join(TbEnrutamiento.COLUMNAS)
+
+
 class TbEnrutamientoDAO:
+    """
+    Acceso a la tabla de enrutamiento
+
+    Los siguientes saltos de igual costo (ECMP) de cada ruta se guardan en
+    la tabla hija tb_Enrutamiento_Salto; la fila principal conserva el
+    next hop del camino principal y el next hop de respaldo.
+    """
+
     def __init__(self):
         self.db = Database()
 
+    def _guardar_saltos(self, cursor, ruta):
+        """Reemplaza los siguientes saltos de una ruta (dentro de una transacción)"""
+        cursor.execute("DELETE FROM tb_Enrutamiento_Salto WHERE id_ruta = %s", (ruta.id_ruta,))
+        saltos = ruta.obtener_saltos()
+        if saltos:
+            cursor.executemany(
+                """
+                INSERT INTO tb_Enrutamiento_Salto (id_ruta, next_hop, interfaz_salida, peso)
+                VALUES (%s, %s, %s, %s)
+                """,
+                [(ruta.id_ruta, next_hop, interfaz, peso) for next_hop, interfaz, peso in saltos]
+            )
+
+    def _con_saltos(self, filas):
+        """
+        Convierte filas de tb_Enrutamiento en objetos y carga sus siguientes
+        saltos con una consulta IN por bloque
+
+        Args:
+            filas: Tuplas de tb_Enrutamiento
+
+        Returns:
+            Lista de objetos TbEnrutamiento
+        """
+        rutas = [TbEnrutamiento.from_tuple(fila) for fila in filas]
+        por_id = {ruta.id_ruta: ruta for ruta in rutas}
+        ids = list(por_id)
+
+        for inicio in range(0, len(ids), MAX_IDS_POR_CONSULTA):
+            bloque = ids[inicio:inicio + MAX_IDS_POR_CONSULTA]
+            marcadores = ", ".join(["%s"] * len(bloque))
+            query = f"""
+                SELECT id_ruta, next_hop, interfaz_salida, peso
+                FROM tb_Enrutamiento_Salto
+                WHERE id_ruta IN ({marcadores})
+                ORDER BY id_salto
+            """
+            for id_ruta, next_hop, interfaz, peso in self.db.fetch_all(query, tuple(bloque)):
+                por_id[id_ruta].siguientes_saltos.append((next_hop, interfaz, peso))
+
+        return rutas
+
     def crear(self, ruta):
         """
         Crea una nueva entrada en la tabla de enrutamiento
@@ -17,19 +74,20 @@ class TbEnrutamientoDAO:
         """
         query = """
             INSERT INTO tb_Enrutamiento (destino, next_hop, interfaz_salida,
-                                        costo_total, origen_info)
-            VALUES (%s, %s, %s, %s, %s)
+                                        costo_total, origen_info, next_hop_respaldo,
+                                        interfaz_respaldo, costo_respaldo)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
         params = (ruta.destino, ruta.next_hop, ruta.interfaz_salida,
-                  ruta.costo_total, ruta.origen_info)
+                  ruta.costo_total, ruta.origen_info, ruta.next_hop_respaldo,
+                  ruta.interfaz_respaldo, ruta.costo_respaldo)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            ruta_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                ruta_id = cursor.lastrowid
+                ruta.id_ruta = ruta_id
+                self._guardar_saltos(cursor, ruta)
             print(f"✓ Ruta a {ruta.destino} agregada con ID: {ruta_id}")
             return ruta_id
         except Exception as e:
@@ -46,9 +104,9 @@ class TbEnrutamientoDAO:
         Returns:
             Objeto TbEnrutamiento o None
         """
-        query = "SELECT * FROM tb_Enrutamiento WHERE id_ruta = %s"
+        query = f"SELECT {_COLUMNAS} FROM tb_Enrutamiento WHERE id_ruta = %s"
         result = self.db.fetch_one(query, (id_ruta,))
-        return TbEnrutamiento.from_tuple(result)
+        return self._con_saltos([result])[0] if result else None
 
     def obtener_por_destino(self, destino):
         """
@@ -60,9 +118,9 @@ class TbEnrutamientoDAO:
         Returns:
             Objeto TbEnrutamiento o None
         """
-        query = "SELECT * FROM tb_Enrutamiento WHERE destino = %s"
+        query = f"SELECT {_COLUMNAS} FROM tb_Enrutamiento WHERE destino = %s"
         result = self.db.fetch_one(query, (destino,))
-        return TbEnrutamiento.from_tuple(result)
+        return self._con_saltos([result])[0] if result else None
 
     def obtener_todas(self):
         """
@@ -71,9 +129,9 @@ class TbEnrutamientoDAO:
         Returns:
             Lista de objetos TbEnrutamiento
         """
-        query = "SELECT * FROM tb_Enrutamiento ORDER BY costo_total"
+        query = f"SELECT {_COLUMNAS} FROM tb_Enrutamiento ORDER BY costo_total"
         results = self.db.fetch_all(query)
-        return [TbEnrutamiento.from_tuple(row) for row in results]
+        return self._con_saltos(results)
 
     def obtener_por_origen(self, origen_info):
         """
@@ -85,13 +143,14 @@ class TbEnrutamientoDAO:
         Returns:
             Lista de objetos TbEnrutamiento
         """
-        query = "SELECT * FROM tb_Enrutamiento WHERE origen_info = %s ORDER BY destino"
+        query = f"SELECT {_COLUMNAS} FROM tb_Enrutamiento WHERE origen_info = %s ORDER BY destino"
         results = self.db.fetch_all(query, (origen_info,))
-        return [TbEnrutamiento.from_tuple(row) for row in results]
+        return self._con_saltos(results)
 
     def obtener_por_next_hop(self, next_hop):
         """
-        Obtiene rutas que usan un next_hop específico
+        Obtiene rutas que usan un next_hop específico, como principal o como
+        uno de sus siguientes saltos de igual costo
 
         Args:
             next_hop: Next hop a buscar
@@ -99,9 +158,29 @@ class TbEnrutamientoDAO:
         Returns:
             Lista de objetos TbEnrutamiento
         """
-        query = "SELECT * FROM tb_Enrutamiento WHERE next_hop = %s ORDER BY destino"
-        results = self.db.fetch_all(query, (next_hop,))
-        return [TbEnrutamiento.from_tuple(row) for row in results]
+        query = f"""
+            SELECT {_COLUMNAS} FROM tb_Enrutamiento
+            WHERE next_hop = %s
+               OR id_ruta IN (SELECT id_ruta FROM tb_Enrutamiento_Salto WHERE next_hop = %s)
+            ORDER BY destino
+        """
+        results = self.db.fetch_all(query, (next_hop, next_hop))
+        return self._con_saltos(results)
+
+    def _actualizar(self, cursor, ruta):
+        """Escribe una ruta y sus siguientes saltos (dentro de una transacción)"""
+        query = """
+            UPDATE tb_Enrutamiento 
+            SET destino = %s, next_hop = %s, interfaz_salida = %s,
+                costo_total = %s, origen_info = %s, next_hop_respaldo = %s,
+                interfaz_respaldo = %s, costo_respaldo = %s
+            WHERE id_ruta = %s
+        """
+        params = (ruta.destino, ruta.next_hop, ruta.interfaz_salida,
+                  ruta.costo_total, ruta.origen_info, ruta.next_hop_respaldo,
+                  ruta.interfaz_respaldo, ruta.costo_respaldo, ruta.id_ruta)
+        cursor.execute(query, params)
+        self._guardar_saltos(cursor, ruta)
 
     def actualizar(self, ruta):
         """
@@ -113,19 +192,67 @@ class TbEnrutamientoDAO:
         Returns:
             True si la actualización fue exitosa
         """
-        query = """
-            UPDATE tb_Enrutamiento 
-            SET destino = %s, next_hop = %s, interfaz_salida = %s,
-                costo_total = %s, origen_info = %s
-            WHERE id_ruta = %s
-        """
-        params = (ruta.destino, ruta.next_hop, ruta.interfaz_salida,
-                  ruta.costo_total, ruta.origen_info, ruta.id_ruta)
-
-        if self.db.execute_query(query, params):
+        try:
+            with self.db.transaccion() as cursor:
+                self._actualizar(cursor, ruta)
             print(f"✓ Ruta ID {ruta.id_ruta} actualizada")
             return True
-        return False
+        except Exception as e:
+            print(f"✗ Error al actualizar ruta: {e}")
+            return False
+
+    def retirar_next_hop(self, next_hop):
+        """
+        Deja de usar un next hop en todas las rutas
+
+        Las rutas con otros siguientes saltos de igual costo solo pierden
+        ese salto (su peso se reparte entre los restantes); las que se
+        quedan sin salto conmutan a su next hop de respaldo, y solo se
+        eliminan las que no tienen ninguna alternativa. Las rutas que lo
+        tenían como respaldo lo pierden. Todos los cambios se aplican en
+        una sola transacción.
+
+        Args:
+            next_hop: Next hop que deja de estar disponible
+
+        Returns:
+            Tupla (rutas_actualizadas, rutas_conmutadas, rutas_eliminadas)
+            con listas de objetos TbEnrutamiento
+        """
+        query = f"""
+            SELECT {_COLUMNAS} FROM tb_Enrutamiento
+            WHERE next_hop = %s OR next_hop_respaldo = %s
+               OR id_ruta IN (SELECT id_ruta FROM tb_Enrutamiento_Salto WHERE next_hop = %s)
+            ORDER BY destino
+        """
+        rutas = self._con_saltos(self.db.fetch_all(query, (next_hop, next_hop, next_hop)))
+
+        actualizadas, conmutadas, eliminadas = [], [], []
+        for ruta in rutas:
+            if ruta.next_hop_respaldo == next_hop:
+                ruta.quitar_respaldo()
+
+            if not any(salto == next_hop for salto, _, _ in ruta.obtener_saltos()):
+                actualizadas.append(ruta)
+            elif ruta.quitar_salto(next_hop):
+                actualizadas.append(ruta)
+            elif ruta.conmutar_a_respaldo():
+                conmutadas.append(ruta)
+            else:
+                eliminadas.append(ruta)
+
+        try:
+            with self.db.transaccion() as cursor:
+                for ruta in actualizadas + conmutadas:
+                    self._actualizar(cursor, ruta)
+                for ruta in eliminadas:
+                    cursor.execute("DELETE FROM tb_Enrutamiento_Salto WHERE id_ruta = %s", (ruta.id_ruta,))
+                    cursor.execute("DELETE FROM tb_Enrutamiento WHERE id_ruta = %s", (ruta.id_ruta,))
+        except Exception as e:
+            print(f"✗ Error al retirar next hop {next_hop}: {e}")
+            return [], [], []
+
+        return actualizadas, conmutadas, eliminadas
 
     def actualizar_costo(self, id_ruta, nuevo_costo):
         """
@@ -151,11 +278,15 @@ class TbEnrutamientoDAO:
         Returns:
             True si la eliminación fue exitosa
         """
-        query = "DELETE FROM tb_Enrutamiento WHERE id_ruta = %s"
-        if self.db.execute_query(query, (id_ruta,)):
+        try:
+            with self.db.transaccion() as cursor:
+                cursor.execute("DELETE FROM tb_Enrutamiento_Salto WHERE id_ruta = %s", (id_ruta,))
+                cursor.execute("DELETE FROM tb_Enrutamiento WHERE id_ruta = %s", (id_ruta,))
             print(f"✓ Ruta ID {id_ruta} eliminada")
             return True
-        return False
+        except Exception as e:
+            print(f"✗ Error al eliminar ruta: {e}")
+            return False
 
     def eliminar_por_origen(self, origen_info):
         """
@@ -169,12 +300,16 @@ class TbEnrutamientoDAO:
         """
         query = "DELETE FROM tb_Enrutamiento WHERE origen_info = %s"
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, (origen_info,))
-            connection.commit()
-            filas_eliminadas = cursor.rowcount
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM tb_Enrutamiento_Salto
+                    WHERE id_ruta IN (SELECT id_ruta FROM tb_Enrutamiento WHERE origen_info = %s)
+                    """,
+                    (origen_info,)
+                )
+                cursor.execute(query, (origen_info,))
+                filas_eliminadas = cursor.rowcount
             print(f"✓ {filas_eliminadas} rutas de origen '{origen_info}' eliminadas")
             return filas_eliminadas
         except Exception as e:
@@ -188,11 +323,15 @@ class TbEnrutamientoDAO:
         Returns:
             True si la operación fue exitosa
         """
-        query = "DELETE FROM tb_Enrutamiento"
-        if self.db.execute_query(query):
+        try:
+            with self.db.transaccion() as cursor:
+                cursor.execute("DELETE FROM tb_Enrutamiento_Salto")
+                cursor.execute("DELETE FROM tb_Enrutamiento")
             print("✓ Tabla de enrutamiento limpiada")
             return True
-        return False
+        except Exception as e:
+            print(f"✗ Error al limpiar tabla: {e}")
+            return False
 
     def contar_rutas(self):
         """
@@ -24,12 +24,9 @@ class VecinoDAO:
                   vecino.costo_enlace, vecino.tiempo_ultimo_hello)
 
         try:
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            connection.commit()
-            vecino_id = cursor.lastrowid
-            cursor.close()
+            with self.db.transaccion() as cursor:
+                cursor.execute(query, params)
+                vecino_id = cursor.lastrowid
             print(f"✓ Vecino '{vecino.router_vecino}' agregado con ID: {vecino_id}")
             return vecino_id
         except Exception as e:
@@ -148,9 +145,9 @@ class VecinoDAO:
         Returns:
             True si la actualización fue exitosa
         """
-        query = """
+        query = f"""
             UPDATE Vecino 
-            SET tiempo_ultimo_hello = NOW()
+            SET tiempo_ultimo_hello = {self.db.backend.ahora()}
             WHERE id_vecino = %s
         """
         return self.db.execute_query(query, (id_vecino,))
@@ -166,9 +163,9 @@ class VecinoDAO:
         Returns:
             True si el cambio fue exitoso
         """
-        query = """
+        query = f"""
             UPDATE Vecino 
-            SET estado_vecino = %s, tiempo_ultimo_hello = NOW()
+            SET estado_vecino = %s, tiempo_ultimo_hello = {self.db.backend.ahora()}
             WHERE id_vecino = %s
         """
         if self.db.execute_query(query, (nuevo_estado, id_vecino)):
@@ -235,9 +232,9 @@ class VecinoDAO:
         Returns:
             Lista de vecinos caídos
         """
-        query = """
+        query = f"""
             SELECT * FROM Vecino 
-            WHERE TIMESTAMPDIFF(SECOND, tiempo_ultimo_hello, NOW()) > %s
+            WHERE {self.db.backend.segundos_desde('tiempo_ultimo_hello')} > %s
             AND estado_vecino != 'Down'
         """
         results = self.db.fetch_all(query, (timeout_segundos,))
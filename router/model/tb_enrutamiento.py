@@ -1,14 +1,38 @@
 class TbEnrutamiento:
+    """
+    Entrada de la tabla de enrutamiento
+
+    'next_hop' e 'interfaz_salida' son los del camino principal. Con ECMP,
+    'siguientes_saltos' lista todos los siguientes saltos de igual costo
+    como tuplas (next_hop, interfaz_salida, peso); vacía equivale a usar
+    solo el principal. 'next_hop_respaldo' es el next hop libre de bucles
+    precalculado por el controlador, al que se conmuta localmente si caen
+    todos los siguientes saltos.
+    """
+
+    # Columnas de tb_Enrutamiento en el orden que espera from_tuple
+    COLUMNAS = ('id_ruta', 'destino', 'next_hop', 'interfaz_salida', 'costo_total',
+                'origen_info', 'next_hop_respaldo', 'interfaz_respaldo', 'costo_respaldo')
+
     def __init__(self, id_ruta=None, destino=None, next_hop=None,
-                 interfaz_salida=None, costo_total=0.0, origen_info='Interna'):
+                 interfaz_salida=None, costo_total=0.0, origen_info='Interna',
+                 siguientes_saltos=None, next_hop_respaldo=None,
+                 interfaz_respaldo=None, costo_respaldo=None):
         self.id_ruta = id_ruta
         self.destino = destino
         self.next_hop = next_hop
         self.interfaz_salida = interfaz_salida
         self.costo_total = costo_total
         self.origen_info = origen_info
+        self.siguientes_saltos = list(siguientes_saltos or [])
+        self.next_hop_respaldo = next_hop_respaldo
+        self.interfaz_respaldo = interfaz_respaldo
+        self.costo_respaldo = costo_respaldo
 
     def __str__(self):
+        if self.es_multicamino():
+            saltos = ", ".join(salto for salto, _, _ in self.siguientes_saltos)
+            return f"Ruta({self.destino} via [{saltos}], Costo: {self.costo_total})"
         return f"Ruta({self.destino} via {self.next_hop}, Costo: {self.costo_total})"
 
     def __repr__(self):
@@ -22,12 +46,16 @@ class TbEnrutamiento:
             'next_hop': self.next_hop,
             'interfaz_salida': self.interfaz_salida,
             'costo_total': self.costo_total,
-            'origen_info': self.origen_info
+            'origen_info': self.origen_info,
+            'siguientes_saltos': self.obtener_saltos(),
+            'next_hop_respaldo': self.next_hop_respaldo,
+            'interfaz_respaldo': self.interfaz_respaldo,
+            'costo_respaldo': self.costo_respaldo
         }
 
     @staticmethod
     def from_tuple(data):
-        """Crea un objeto TbEnrutamiento desde una tupla de BD"""
+        """Crea un objeto TbEnrutamiento desde una tupla de BD con las COLUMNAS"""
         if data:
             return TbEnrutamiento(
                 id_ruta=data[0],
@@ -35,10 +63,87 @@ class TbEnrutamiento:
                 next_hop=data[2],
                 interfaz_salida=data[3],
                 costo_total=data[4],
-                origen_info=data[5]
+                origen_info=data[5],
+                next_hop_respaldo=data[6],
+                interfaz_respaldo=data[7],
+                costo_respaldo=data[8]
             )
         return None
 
+    def obtener_saltos(self):
+        """
+        Siguientes saltos efectivos de la ruta
+
+        Si el next hop principal cambió y ya no pertenece al conjunto ECMP,
+        la ruta vuelve a tener un único salto.
+
+        Returns:
+            Lista de tuplas (next_hop, interfaz_salida, peso)
+        """
+        if any(salto == self.next_hop for salto, _, _ in self.siguientes_saltos):
+            return list(self.siguientes_saltos)
+        return [(self.next_hop, self.interfaz_salida, 1.0)] if self.next_hop else []
+
+    def es_multicamino(self):
+        """Verifica si la ruta reparte el tráfico entre varios siguientes saltos"""
+        return len(self.obtener_saltos()) > 1
+
+    def quitar_salto(self, next_hop):
+        """
+        Quita un siguiente salto y reparte su peso entre los restantes
+
+        Si se quita el principal, pasa a serlo el de mayor peso restante.
+
+        Args:
+            next_hop: Next hop a quitar
+
+        Returns:
+            True si la ruta conserva al menos un siguiente salto
+        """
+        restantes = [s for s in self.obtener_saltos() if s[0] != next_hop]
+        if not restantes:
+            self.siguientes_saltos = []
+            return False
+
+        total = sum(peso for _, _, peso in restantes) or len(restantes)
+        self.siguientes_saltos = [
+            (salto, interfaz, (peso or 1.0) / total) for salto, interfaz, peso in restantes
+        ]
+        if self.next_hop == next_hop:
+            self.next_hop, self.interfaz_salida, _ = max(self.siguientes_saltos, key=lambda s: s[2])
+        return True
+
+    def tiene_respaldo(self):
+        """Verifica si la ruta tiene un next hop de respaldo"""
+        return bool(self.next_hop_respaldo)
+
+    def quitar_respaldo(self):
+        """Descarta el next hop de respaldo"""
+        self.next_hop_respaldo = None
+        self.interfaz_respaldo = None
+        self.costo_respaldo = None
+
+    def conmutar_a_respaldo(self):
+        """
+        Reemplaza los siguientes saltos por el next hop de respaldo
+
+        El respaldo pasa a ser el único salto y deja de estar disponible
+        como respaldo hasta que el controlador envíe la nueva tabla.
+
+        Returns:
+            True si la ruta tenía respaldo y pasó a usarlo
+        """
+        if not self.tiene_respaldo():
+            return False
+
+        self.next_hop = self.next_hop_respaldo
+        self.interfaz_salida = self.interfaz_respaldo
+        if self.costo_respaldo is not None:
+            self.costo_total = self.costo_respaldo
+        self.siguientes_saltos = []
+        self.quitar_respaldo()
+        return True
+
     def es_ruta_directa(self):
         """Verifica si es una ruta directa (costo 0 o muy bajo)"""
         return self.costo_total <= 1.0
@@ -2,7 +2,7 @@ import time
 import threading
 from datetime import datetime
 from router.dao.vecino_dao import VecinoDAO
-from router.dao.mensaje_dao import MensajeDAO
+from router.dao.mensaje_dao import crear_mensaje_dao
 from router.dao.log_router_dao import LogRouterDAO
 from router.config.settings import ROUTER_CONFIG
 
@@ -18,7 +18,7 @@ class HelloProtocol:
         self.router_nombre = router_nombre
         self.router_ip = router_ip  # ← GUARDAR router_ip
         self.vecino_dao = VecinoDAO()
-        self.mensaje_dao = MensajeDAO()
+        self.mensaje_dao = crear_mensaje_dao(router_nombre)
         self.log_dao = LogRouterDAO()
 
         self.hello_interval = ROUTER_CONFIG['hello_interval']
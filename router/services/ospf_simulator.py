@@ -6,7 +6,7 @@ import time
 from datetime import datetime, timedelta
 from router.dao.vecino_dao import VecinoDAO
 from router.dao.tb_enrutamiento_dao import TbEnrutamientoDAO
-from router.dao.mensaje_dao import MensajeDAO
+from router.dao.mensaje_dao import crear_mensaje_dao
 from router.dao.log_router_dao import LogRouterDAO
 from router.model.vecino import Vecino
 from router.model.mensaje import Mensaje
@@ -28,7 +28,7 @@ class OSPFSimulator:
         self.router_ip = router_ip
         self.vecino_dao = VecinoDAO()
         self.enrutamiento_dao = TbEnrutamientoDAO()
-        self.mensaje_dao = MensajeDAO()
+        self.mensaje_dao = crear_mensaje_dao(router_nombre)
         self.log_dao = LogRouterDAO()
 
         self.hello_interval = ROUTER_CONFIG['hello_interval']
@@ -128,12 +128,22 @@ class OSPFSimulator:
                 f"No se recibió HELLO en {self.dead_interval} segundos"
             )
 
-            # Eliminar rutas que usan este vecino como next_hop
-            rutas_afectadas = self.enrutamiento_dao.obtener_por_next_hop(vecino.ip_vecino)
-            for ruta in rutas_afectadas:
-                self.enrutamiento_dao.eliminar(ruta.id_ruta)
+            # Quitar el vecino de las rutas; sin otro salto de igual costo se
+            # conmuta al respaldo precalculado y, sin respaldo, se eliminan
+            actualizadas, conmutadas, eliminadas = self.enrutamiento_dao.retirar_next_hop(vecino.ip_vecino)
+            for ruta in actualizadas:
+                print(f"✓ Ruta a {ruta.destino} continúa por {len(ruta.obtener_saltos())} salto(s) (vecino caído)")
+            for ruta in conmutadas:
+                print(f"✓ Ruta a {ruta.destino} conmutada al respaldo {ruta.next_hop} (vecino caído)")
+            for ruta in eliminadas:
                 print(f"✗ Ruta a {ruta.destino} eliminada (vecino caído)")
 
+            if conmutadas:
+                self.log_dao.registrar_evento(
+                    f"Conmutación a respaldo por caída de {vecino.router_vecino}",
+                    f"{len(conmutadas)} rutas conmutadas, {len(eliminadas)} eliminadas"
+                )
+
         return vecinos_caidos
 
     def enviar_lsa(self, tipo_lsa, contenido):
@@ -113,6 +113,15 @@ class MenuEnrutamiento:
         print(f"{'Costo Total:':<25} {ruta.costo_total}")
         print(f"{'Origen de Info:':<25} {ruta.origen_info}")
 
+        if ruta.es_multicamino():
+            print("\nSiguientes saltos de igual costo (ECMP):")
+            for next_hop, interfaz, peso in ruta.obtener_saltos():
+                print(f"  {next_hop:<18} {interfaz or '-':<15} peso {peso:.2f}")
+
+        if ruta.tiene_respaldo():
+            costo = ruta.costo_respaldo if ruta.costo_respaldo is not None else '-'
+            print(f"{'Respaldo (LFA):':<25} {ruta.next_hop_respaldo} ({ruta.interfaz_respaldo or '-'}, costo {costo})")
+
     def actualizar_ruta(self):
         """Actualiza una ruta"""
         print("\n" + "=" * 60)
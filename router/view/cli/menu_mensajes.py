@@ -171,8 +171,8 @@ class MenuMensajes:
         print("ESTADÍSTICAS DE MENSAJES")
         print("=" * 60)
 
-        from router.dao.mensaje_dao import MensajeDAO
-        mensaje_dao = MensajeDAO()
+        from router.dao.mensaje_dao import crear_mensaje_dao
+        mensaje_dao = crear_mensaje_dao(self.router_controller.router_nombre)
 
         total = mensaje_dao.contar_mensajes()
         stats = mensaje_dao.obtener_estadisticas()
@@ -186,7 +186,7 @@ class MenuPrincipal:
 
             elif opcion == '2':
                 from router.controller.vecino_controller import VecinoController
-                vecino_ctrl = VecinoController()
+                vecino_ctrl = VecinoController(self.router_nombre)
                 stats = vecino_ctrl.obtener_estadisticas_vecinos()
 
                 print("\n" + "=" * 60)
@@ -223,7 +223,7 @@ class MenuPrincipal:
 
             elif opcion == '4':
                 from router.controller.vecino_controller import VecinoController
-                vecino_ctrl = VecinoController()
+                vecino_ctrl = VecinoController(self.router_nombre)
                 problematicos = vecino_ctrl.obtener_vecinos_problematicos(30)
 
                 print("\n" + "=" * 60)
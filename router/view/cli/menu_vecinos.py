@@ -214,7 +214,7 @@ class MenuVecinos:
         print("=" * 60)
 
         from router.controller.vecino_controller import VecinoController
-        vecino_ctrl = VecinoController()
+        vecino_ctrl = VecinoController(self.router_controller.router_nombre)
 
         problemas = vecino_ctrl.obtener_vecinos_con_problemas(40)
 
@@ -1,5 +1,8 @@
 from .tcp_protocol import Message, MessageType, MessageFactory
 from .tcp_server import TCPServer
 from .tcp_client import TCPClient
+from .frame_codec import FrameCodec
+from .frame_reader import FrameReader
+from .async_tcp_server import AsyncTCPServer
 
-__all__ = ['Message', 'MessageType', 'MessageFactory', 'TCPServer', 'TCPClient']
\ No newline at end of file
+__all__ = ['Message', 'MessageType', 'MessageFactory', 'TCPServer', 'TCPClient', 'AsyncTCPServer', 'FrameCodec', 'FrameReader']
\ No newline at end of file
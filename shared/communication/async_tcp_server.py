@@ -0,0 +1,248 @@
+import asyncio
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeout
+from shared.communication.tcp_protocol import MessageType
+from shared.communication.frame_reader import FrameReader
+from shared.communication.tcp_server import TCPServer
+
+
+class _ConexionAsync:
+    """
+    Adaptador de un StreamWriter con la interfaz de socket usada por TCPServer
+
+    Permite que los manejadores de mensajes, que se ejecutan en el pool de
+    hilos, escriban en la conexión a través del event loop. sendall espera
+    a que el buffer de escritura se vacíe (drain), de modo que un router
+    lento frena a quien le envía en vez de acumular datos en memoria.
+    """
+
+    def __init__(self, loop, writer, timeout=30):
+        self.loop = loop
+        self.writer = writer
+        self.timeout = timeout
+
+    def sendall(self, data):
+        """
+        Envía los datos desde el event loop y espera a que se vacíe el buffer
+
+        Raises:
+            ConnectionError: Si la conexión está cerrada
+            TimeoutError: Si el router no lee los datos dentro del timeout
+        """
+        if self.writer.is_closing():
+            raise ConnectionError("Conexión cerrada")
+
+        try:
+            en_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            en_loop = False
+        if en_loop:
+            # Respuestas atendidas en el propio loop (heartbeat): no se puede
+            # bloquear el loop esperando el drain
+            self.writer.write(data)
+            return
+
+        futuro = asyncio.run_coroutine_threadsafe(self._escribir(data), self.loop)
+        try:
+            futuro.result(self.timeout)
+        except FuturoTimeout:
+            futuro.cancel()
+            # El frame quedó a medio enviar: la conexión ya no es utilizable
+            self.close()
+            raise TimeoutError(f"El router no leyó los datos en {self.timeout} s")
+
+    async def _escribir(self, data):
+        """Escribe en la conexión respetando el control de flujo"""
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def close(self):
+        """Cierra la conexión desde el event loop"""
+        self.loop.call_soon_threadsafe(self.writer.close)
+
+    def cipher(self):
+        """Información del cifrado SSL de la conexión"""
+        ssl_object = self.writer.get_extra_info('ssl_object')
+        return ssl_object.cipher() if ssl_object else None
+
+
+class AsyncTCPServer(TCPServer):
+    """
+    Servidor TCP con SSL basado en asyncio
+
+    Atiende todas las conexiones en un único event loop que corre en un
+    hilo en segundo plano. Los mensajes que acceden a la base de datos se
+    procesan en un pool de hilos acotado con los mismos manejadores que
+    TCPServer, por lo que la semántica de los mensajes no cambia.
+    """
+
+    def __init__(self, host='0.0.0.0', port=6633, controlador=None,
+                 max_workers=32, backlog=1024, timeout_envio=30, **kwargs):
+        super().__init__(host=host, port=port, controlador=controlador, **kwargs)
+
+        self.max_workers = max_workers
+        self.backlog = backlog
+        self.timeout_envio = timeout_envio  # Segundos de espera del drain por envío
+
+        self.loop = None
+        self.executor = None
+        self.server = None
+
+    def start(self):
+        """Inicia el servidor asyncio con SSL en un hilo en segundo plano"""
+        try:
+            # Configurar SSL
+            if not self._setup_ssl_context():
+                return False
+
+            self.loop = asyncio.new_event_loop()
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='tcp-dao'
+            )
+
+            self.server_thread = threading.Thread(target=self._ejecutar_loop, daemon=True)
+            self.server_thread.start()
+
+            self.running = True
+
+            # Esperar a que el socket quede escuchando
+            futuro = asyncio.run_coroutine_threadsafe(self._iniciar_servidor(), self.loop)
+            futuro.result(timeout=10)
+
+            print(f"✓ Servidor TCP asyncio con SSL/TLS iniciado en {self.host}:{self.port}")
+            print(f" Cifrado: Habilitado (TLS), workers de BD: {self.max_workers}")
+
+            # Iniciar thread de heartbeat
+            self.heartbeat_thread = threading.Thread(target=self._heartbeat_monitor, daemon=True)
+            self.heartbeat_thread.start()
+
+            return True
+
+        except Exception as e:
+            print(f"✗ Error al iniciar servidor TCP asyncio: {e}")
+            self.running = False
+            self._detener_loop()
+            return False
+
+    def stop(self):
+        """Detiene el servidor asyncio"""
+        print(" Deteniendo servidor TCP...")
+        self.running = False
+
+        # Cerrar todas las conexiones de clientes
+        with self.clients_lock:
+            for router_nombre, (conexion, _) in self.clients.items():
+                try:
+                    conexion.close()
+                except Exception:
+                    pass
+            self.clients.clear()
+
+        self._detener_loop()
+
+        print("✓ Servidor TCP detenido")
+
+    def _ejecutar_loop(self):
+        """Hilo que ejecuta el event loop del servidor"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _iniciar_servidor(self):
+        """Abre el socket de escucha en el event loop"""
+        self.server = await asyncio.start_server(
+            self._handle_client_async,
+            self.host,
+            self.port,
+            ssl=self.ssl_context,
+            backlog=self.backlog
+        )
+
+    async def _cerrar_servidor(self):
+        """Cierra el socket de escucha"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def _detener_loop(self):
+        """Cierra el servidor, detiene el event loop y libera el pool"""
+        if self.loop and self.loop.is_running():
+            try:
+                futuro = asyncio.run_coroutine_threadsafe(self._cerrar_servidor(), self.loop)
+                futuro.result(timeout=5)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+        if self.server_thread:
+            self.server_thread.join(timeout=5)
+
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    async def _handle_client_async(self, reader, writer):
+        """Corrutina que atiende una conexión de router"""
+        address = writer.get_extra_info('peername')
+        conexion = _ConexionAsync(self.loop, writer, self.timeout_envio)
+        router_nombre = None
+        frame_reader = FrameReader()
+
+        cipher = conexion.cipher()
+        if cipher:
+            print(f" Nueva conexión SSL desde {address}")
+            print(f"   Cifrado: {cipher[0]}, Versión: {cipher[1]}, Bits: {cipher[2]}")
+        else:
+            print(f" Nueva conexión desde {address}")
+
+        try:
+            while self.running:
+                data = await reader.read(65536)
+
+                if not data:
+                    # Conexión cerrada por el cliente
+                    break
+
+                # Procesar mensajes completos (frames binarios o líneas JSON)
+                for message in frame_reader.feed(data):
+                    try:
+                        if message.msg_type == MessageType.HEARTBEAT:
+                            # No accede a la BD, se responde desde el loop
+                            router_nombre = self._process_message(message, conexion)
+                        else:
+                            router_nombre = await self.loop.run_in_executor(
+                                self.executor, self._process_message, message, conexion
+                            )
+                    except Exception as e:
+                        print(f"✗ Error al procesar mensaje: {e}")
+
+        except ssl.SSLError as e:
+            print(f"✗ Error SSL en conexión con {address}: {e}")
+        except Exception as e:
+            print(f"✗ Error en conexión con {address}: {e}")
+
+        finally:
+            # Limpiar conexión
+            self.frame_codecs.pop(conexion, None)
+            if router_nombre:
+                with self.clients_lock:
+                    if router_nombre in self.clients:
+                        del self.clients[router_nombre]
+                with self.tablas_lock:
+                    self.tablas_enviadas.pop(router_nombre, None)
+                    self.envio_locks.pop(router_nombre, None)
+                print(f" Router {router_nombre} desconectado")
+
+                # Actualizar estado en BD
+                if self.controlador and self.running:
+                    try:
+                        await self.loop.run_in_executor(
+                            self.executor,
+                            self.controlador.cambiar_estado_router_por_nombre,
+                            router_nombre,
+                            'Inactivo'
+                        )
+                    except Exception as e:
+                        print(f"✗ Error al actualizar estado de {router_nombre}: {e}")
+
+            writer.close()
@@ -0,0 +1,215 @@
+import json
+import struct
+import time
+import zlib
+from datetime import datetime
+from shared.communication.tcp_protocol import Message, MessageType
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Versión del formato de frame binario
+FRAME_VERSION = 1
+
+# Primer byte de todo frame binario; nunca inicia una línea JSON
+FRAME_MAGIC = 0xDA
+
+# Cabecera: magic, versión, tipo de mensaje, flags, longitud del cuerpo
+FRAME_HEADER = struct.Struct('!BBBBI')
+
+# Tamaño máximo aceptado para el cuerpo de un frame
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Flags: bit 0 = cuerpo comprimido con zlib, bits 1-3 = codec
+FLAG_ZLIB = 0x01
+CODEC_SHIFT = 1
+CODEC_MASK = 0x07
+
+# Código de un byte por tipo de mensaje (agregar tipos nuevos al final)
+MESSAGE_TYPE_CODES = {
+    MessageType.REGISTER: 1,
+    MessageType.REGISTER_ACK: 2,
+    MessageType.HEARTBEAT: 3,
+    MessageType.HEARTBEAT_ACK: 4,
+    MessageType.DISCONNECT: 5,
+    MessageType.NEIGHBOR_UPDATE: 6,
+    MessageType.LINK_STATE: 7,
+    MessageType.TOPOLOGY_UPDATE: 8,
+    MessageType.ROUTE_UPDATE: 9,
+    MessageType.ROUTE_REQUEST: 10,
+    MessageType.ROUTE_RESPONSE: 11,
+    MessageType.ERROR: 12,
+    MessageType.NACK: 13,
+    MessageType.ROUTE_RESYNC: 14,
+}
+MESSAGE_TYPES_BY_CODE = {code: msg_type for msg_type, code in MESSAGE_TYPE_CODES.items()}
+
+
+def _json_encode(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _json_decode(data):
+    return json.loads(bytes(data).decode('utf-8'))
+
+
+# Codecs de cuerpo: nombre -> (id, codificar, decodificar)
+CODECS = {
+    'json': (0, _json_encode, _json_decode),
+}
+
+if msgpack is not None:
+    CODECS['msgpack'] = (
+        1,
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False)
+    )
+
+CODECS_BY_ID = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
+
+# Orden de preferencia al negociar
+CODEC_PREFERENCE = ['msgpack', 'json']
+
+
+def available_codecs():
+    """
+    Codecs disponibles en este proceso, por orden de preferencia
+
+    Returns:
+        Lista de nombres de codec
+    """
+    return [name for name in CODEC_PREFERENCE if name in CODECS]
+
+
+def framing_offer(compress=True):
+    """
+    Capacidades de framing que un router anuncia en REGISTER
+
+    Args:
+        compress: Si acepta cuerpos comprimidos con zlib
+
+    Returns:
+        Diccionario para el payload de REGISTER
+    """
+    return {
+        'version': FRAME_VERSION,
+        'codecs': available_codecs(),
+        'compresion': compress
+    }
+
+
+def negotiate_framing(offer, preference=None, compress=True):
+    """
+    Elige el framing de una conexión a partir de la oferta del router
+
+    Args:
+        offer: Diccionario 'framing' recibido en REGISTER (o None)
+        preference: Codecs aceptados por el servidor en orden de preferencia
+        compress: Si el servidor permite compresión
+
+    Returns:
+        Diccionario para el payload de REGISTER_ACK; modo 'json' si no hay acuerdo
+    """
+    if not offer or offer.get('version') != FRAME_VERSION:
+        return {'modo': 'json'}
+
+    ofrecidos = offer.get('codecs', [])
+    for name in preference or available_codecs():
+        if name in CODECS and name in ofrecidos:
+            return {
+                'modo': 'binario',
+                'version': FRAME_VERSION,
+                'codec': name,
+                'compresion': bool(compress and offer.get('compresion'))
+            }
+
+    return {'modo': 'json'}
+
+
+class FrameCodec:
+    """
+    Codifica mensajes en frames binarios con prefijo de longitud
+
+    El frame lleva una cabecera fija (magic, versión, tipo, flags y
+    longitud) seguida del cuerpo codificado con el codec elegido. Los
+    cuerpos grandes, como las tablas de rutas, se comprimen con zlib.
+    """
+
+    def __init__(self, codec='json', compress=False, compress_threshold=1024):
+        if codec not in CODECS:
+            raise ValueError(f"Codec no disponible: {codec}")
+
+        self.codec = codec
+        self.codec_id, self._encode, _ = CODECS[codec]
+        self.compress = compress
+        self.compress_threshold = compress_threshold
+
+    @staticmethod
+    def from_negotiation(framing):
+        """
+        Crea el codec acordado en REGISTER_ACK
+
+        Args:
+            framing: Diccionario devuelto por negotiate_framing
+
+        Returns:
+            FrameCodec, o None si se mantiene el modo de líneas JSON
+        """
+        if not framing or framing.get('modo') != 'binario':
+            return None
+        return FrameCodec(framing['codec'], framing.get('compresion', False))
+
+    def encode(self, message):
+        """
+        Convierte un mensaje en un frame binario
+
+        Args:
+            message: Objeto Message
+
+        Returns:
+            Bytes del frame
+        """
+        body = self._encode([message.sender, message.receiver, message.payload, time.time()])
+
+        flags = self.codec_id << CODEC_SHIFT
+        if self.compress and len(body) >= self.compress_threshold:
+            body = zlib.compress(body, 1)
+            flags |= FLAG_ZLIB
+
+        header = FRAME_HEADER.pack(
+            FRAME_MAGIC, FRAME_VERSION, MESSAGE_TYPE_CODES[message.msg_type], flags, len(body)
+        )
+        return header + body
+
+    @staticmethod
+    def decode(type_code, flags, body):
+        """
+        Reconstruye un mensaje a partir del cuerpo de un frame
+
+        Args:
+            type_code: Código del tipo de mensaje
+            flags: Flags de la cabecera
+            body: Cuerpo del frame (bytes o memoryview)
+
+        Returns:
+            Objeto Message
+        """
+        try:
+            msg_type = MESSAGE_TYPES_BY_CODE[type_code]
+            codec = CODECS_BY_ID[(flags >> CODEC_SHIFT) & CODEC_MASK]
+        except KeyError as e:
+            raise ValueError(f"Frame con tipo o codec desconocido: {e}")
+
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+
+        try:
+            sender, receiver, payload, timestamp = CODECS[codec][2](body)
+        except Exception as e:
+            raise ValueError(f"Error al deserializar frame: {e}")
+
+        message = Message(msg_type, sender, receiver, payload)
+        message.timestamp = datetime.fromtimestamp(timestamp).isoformat()
+        return message
@@ -0,0 +1,175 @@
+from shared.communication.tcp_protocol import Message
+from shared.communication.frame_codec import (
+    FrameCodec, FRAME_HEADER, FRAME_MAGIC, FRAME_VERSION, MAX_FRAME_SIZE
+)
+
+
+class FrameReader:
+    """
+    Lector incremental de mensajes sobre un flujo de bytes
+
+    Recibe directamente en un bytearray reutilizable con recv_into y
+    localiza los delimitadores de línea o las cabeceras de frame sobre el
+    propio buffer, sin construir cadenas intermedias. Solo se copian los
+    bytes de cada mensaje completo al decodificarlo, por lo que un carácter
+    UTF-8 partido entre dos recepciones no rompe el flujo.
+
+    Acepta en el mismo flujo frames binarios y líneas JSON terminadas en
+    '\\n'. Puede leer de un socket (messages) o recibir bytes de otro
+    transporte, como un StreamReader de asyncio (feed).
+    """
+
+    def __init__(self, sock=None, buffer_size=65536, max_frame_size=MAX_FRAME_SIZE):
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+
+        self._buffer = bytearray(buffer_size)
+        self._start = 0  # Primer byte sin procesar
+        self._end = 0  # Fin de los datos recibidos
+        self._scan = 0  # Posición hasta la que ya se buscó '\n'
+
+    def recv(self):
+        """
+        Recibe del socket directamente sobre el espacio libre del buffer
+
+        Returns:
+            Número de bytes recibidos (0 = conexión cerrada)
+        """
+        self._reserve(1)
+        with memoryview(self._buffer) as view, view[self._end:] as free:
+            received = self.sock.recv_into(free)
+        self._end += received
+        return received
+
+    def messages(self):
+        """
+        Generador de mensajes leídos del socket
+
+        Termina cuando el otro extremo cierra la conexión. Los errores de
+        socket se propagan al llamador.
+
+        Yields:
+            Objetos Message completos
+        """
+        while True:
+            yield from self.pending()
+            if self.recv() == 0:
+                return
+
+    def feed(self, data):
+        """
+        Agrega bytes recibidos por otro medio y extrae los mensajes completos
+
+        Args:
+            data: Bytes recibidos
+
+        Returns:
+            Lista de objetos Message
+        """
+        size = len(data)
+        self._reserve(size)
+        self._buffer[self._end:self._end + size] = data
+        self._end += size
+        return list(self.pending())
+
+    def pending(self):
+        """
+        Generador de los mensajes completos que ya están en el buffer
+
+        Los mensajes mal formados se descartan; un error de framing
+        (versión o longitud inválidas) lanza ValueError porque el flujo ya
+        no se puede resincronizar.
+
+        Yields:
+            Objetos Message
+        """
+        while self._start < self._end:
+            if self._buffer[self._start] == FRAME_MAGIC:
+                message, complete = self._read_frame()
+            else:
+                message, complete = self._read_line()
+
+            if not complete:
+                break
+            if message is not None:
+                yield message
+
+        if self._start == self._end:
+            # Buffer vacío: volver al inicio sin mover datos
+            self._start = self._end = self._scan = 0
+
+    def _read_frame(self):
+        """Decodifica un frame binario si está completo en el buffer"""
+        start = self._start
+        if self._end - start < FRAME_HEADER.size:
+            return None, False
+
+        _, version, type_code, flags, length = FRAME_HEADER.unpack_from(self._buffer, start)
+        if version != FRAME_VERSION:
+            raise ValueError(f"Versión de frame no soportada: {version}")
+        if length > self.max_frame_size:
+            raise ValueError(f"Frame demasiado grande: {length} bytes")
+
+        body_start = start + FRAME_HEADER.size
+        end = body_start + length
+        if end > self._end:
+            # Asegurar espacio para el resto del frame
+            self._reserve(end - self._end)
+            return None, False
+
+        self._start = self._scan = end
+        try:
+            with memoryview(self._buffer) as view, view[body_start:end] as body:
+                return FrameCodec.decode(type_code, flags, body), True
+        except Exception as e:
+            print(f"✗ Error al procesar frame: {e}")
+            return None, True
+
+    def _read_line(self):
+        """Decodifica una línea JSON si está completa en el buffer"""
+        start = self._start
+        index = self._buffer.find(b'\n', max(self._scan, start), self._end)
+        if index < 0:
+            if self._end - start > self.max_frame_size:
+                raise ValueError(f"Línea demasiado larga: {self._end - start} bytes")
+            self._scan = self._end
+            return None, False
+
+        self._start = self._scan = index + 1
+
+        line = self._buffer[start:index]
+        if not line.strip():
+            return None, True
+
+        try:
+            return Message.from_bytes(line), True
+        except Exception as e:
+            print(f"✗ Error al procesar mensaje: {e}")
+            return None, True
+
+    def _reserve(self, size):
+        """
+        Garantiza espacio libre al final del buffer
+
+        Primero descarta los bytes ya procesados moviendo los pendientes al
+        inicio; si no alcanza, duplica el tamaño del buffer.
+
+        Args:
+            size: Bytes libres necesarios
+        """
+        if self._end + size <= len(self._buffer):
+            return
+
+        pending = self._end - self._start
+        if self._start:
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._scan = max(0, self._scan - self._start)
+            self._start = 0
+            self._end = pending
+
+        required = pending + size
+        if required > len(self._buffer):
+            capacity = len(self._buffer)
+            while capacity < required:
+                capacity *= 2
+            self._buffer.extend(bytes(capacity - len(self._buffer)))
@@ -3,12 +3,14 @@ import ssl
 import threading
 import time
 import os
-from datetime import datetime
-from shared.communication.tcp_protocol import Message, MessageType, MessageFactory
+from shared.communication.tcp_protocol import MessageType, MessageFactory
+from shared.communication.frame_codec import FrameCodec, framing_offer
+from shared.communication.frame_reader import FrameReader
 
 class TCPClient:
     def __init__(self, router_id, router_nombre, router_ip,
-                 controller_host='localhost', controller_port=6633, router_controller=None):
+                 controller_host='localhost', controller_port=6633, router_controller=None,
+                 framing='binario'):
 
         self.router_id = router_id
         self.router_nombre = router_nombre
@@ -17,12 +19,20 @@ class TCPClient:
         self.controller_port = controller_port
         self.router_controller = router_controller
 
+        # Formato de envío: 'binario' se ofrece en REGISTER, 'json' no ofrece nada
+        self.framing = framing
+        self.frame_codec = None
+
         self.socket = None
         self.ssl_socket = None
         self.ssl_context = None
         self.connected = False
         self.running = False
 
+        # Secuencia de la última tabla de rutas aplicada
+        self.secuencia_rutas = None
+        self.resync_pendiente = False
+
         # Threads
         self.receive_thread = None
         self.heartbeat_thread = None
@@ -80,6 +90,13 @@ class TCPClient:
             self.connected = True
             self.running = True
 
+            # El controlador envía la tabla completa tras cada registro
+            self.secuencia_rutas = None
+            self.resync_pendiente = False
+
+            # Hasta recibir REGISTER_ACK se envían líneas JSON
+            self.frame_codec = None
+
             # Obtener información del cifrado
             cipher = self.ssl_socket.cipher()
             if cipher:
@@ -148,7 +165,8 @@ class TCPClient:
         message = MessageFactory.create_register(
             self.router_id,
             self.router_nombre,
-            self.router_ip
+            self.router_ip,
+            framing_offer() if self.framing == 'binario' else None
         )
         self._send_message(message)
         print(f"📤 Mensaje de registro enviado (cifrado)")
@@ -161,7 +179,8 @@ class TCPClient:
 
         try:
             # SSL cifra automáticamente
-            self.ssl_socket.sendall(message.to_bytes())
+            data = self.frame_codec.encode(message) if self.frame_codec else message.to_bytes()
+            self.ssl_socket.sendall(data)
             return True
         except ssl.SSLError as e:
             print(f"✗ Error SSL al enviar mensaje: {e}")
@@ -174,43 +193,31 @@ class TCPClient:
 
     def _receive_messages(self):
         """Thread que recibe mensajes del controlador (descifrados automáticamente)"""
-        buffer = ""
-
-        while self.running and self.connected:
-            try:
-                # Recibir datos (SSL descifra automáticamente)
-                data = self.ssl_socket.recv(4096)
-
-                if not data:
-                    # Conexión cerrada por el servidor
-                    print(" Conexión cerrada por el controlador")
-                    self.connected = False
-                    break
+        reader = FrameReader(self.ssl_socket)
 
-                # Agregar al buffer
-                buffer += data.decode('utf-8')
-
-                # Procesar mensajes completos (delimitados por \n)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-
-                    if line.strip():
-                        try:
-                            message = Message.from_json(line)
-                            self._process_message(message)
-                        except Exception as e:
-                            print(f"✗ Error al procesar mensaje: {e}")
+        try:
+            # Recibir mensajes completos (SSL descifra automáticamente)
+            for message in reader.messages():
+                if not (self.running and self.connected):
+                    return
+
+                try:
+                    self._process_message(message)
+                except Exception as e:
+                    print(f"✗ Error al procesar mensaje: {e}")
+
+            # Conexión cerrada por el servidor
+            print(" Conexión cerrada por el controlador")
+            self.connected = False
 
-            except ssl.SSLError as e:
-                if self.running:
-                    print(f"✗ Error SSL al recibir mensajes: {e}")
-                    self.connected = False
-                break
-            except Exception as e:
-                if self.running:
-                    print(f"✗ Error al recibir mensajes: {e}")
-                    self.connected = False
-                break
+        except ssl.SSLError as e:
+            if self.running:
+                print(f"✗ Error SSL al recibir mensajes: {e}")
+                self.connected = False
+        except Exception as e:
+            if self.running:
+                print(f"✗ Error al recibir mensajes: {e}")
+                self.connected = False
 
     def _process_message(self, message):
         print(f"📨 Mensaje recibido (descifrado): {message}")
@@ -251,40 +258,90 @@ class TCPClient:
 
         if success:
             print(f"✓ Registro exitoso: {msg}")
+
+            # Cambiar al framing acordado por el controlador
+            self.frame_codec = FrameCodec.from_negotiation(payload.get('framing'))
+            if self.frame_codec:
+                print(f" Framing binario activo: codec {self.frame_codec.codec}")
         else:
             print(f"✗ Registro fallido: {msg}")
             self.connected = False
 
     def _handle_route_update(self, message):
+        """
+        Aplica una actualización de rutas del controlador
 
-        rutas = message.payload.get('rutas', [])
-
-        print(f" Actualización de rutas recibida (cifrada): {len(rutas)} rutas")
-
-        if self.router_controller:
-            # Limpiar rutas del controlador existentes
-            self.router_controller.limpiar_rutas_por_origen('Controlador')
-
-            # Agregar nuevas rutas
-            contador = 0
-            for ruta in rutas:
-                destino = ruta.get('destino')
-                next_hop = ruta.get('next_hop')
-                interfaz = ruta.get('interfaz_salida', 'eth0')
-                costo = ruta.get('costo', 1.0)
-
-                if destino and next_hop:
-                    ruta_id = self.router_controller.agregar_ruta(
-                        destino=destino,
-                        next_hop=next_hop,
-                        interfaz_salida=interfaz,
-                        costo_total=costo,
-                        origen_info='Controlador'
-                    )
-                    if ruta_id:
+        Las tablas completas se sincronizan ruta a ruta con la tabla local.
+        Los deltas solo se aplican si parten de la última secuencia aplicada;
+        si no, se solicita la tabla completa.
+        """
+        payload = message.payload
+        modo = payload.get('modo', 'completo')
+        secuencia = payload.get('secuencia')
+
+        if modo == 'delta':
+            secuencia_base = payload.get('secuencia_base')
+
+            if self.resync_pendiente:
+                # Se espera la tabla completa ya solicitada
+                return
+
+            if secuencia_base != self.secuencia_rutas:
+                print(f" Secuencia de rutas desincronizada (local: {self.secuencia_rutas}, "
+                      f"base: {secuencia_base}). Solicitando tabla completa...")
+                self.resync_pendiente = True
+                self._send_message(
+                    MessageFactory.create_route_resync(self.router_nombre, self.secuencia_rutas)
+                )
+                return
+
+            agregar = payload.get('agregar', [])
+            modificar = payload.get('modificar', [])
+            retirar = payload.get('retirar', [])
+
+            print(f" Delta de rutas recibido (cifrado) #{secuencia}: {len(agregar)} nuevas, "
+                  f"{len(modificar)} modificadas, {len(retirar)} retiradas")
+
+            if self.router_controller:
+                contador = 0
+                for ruta in agregar + modificar:
+                    if self._aplicar_ruta(ruta):
+                        contador += 1
+                for destino in retirar:
+                    if self.router_controller.retirar_ruta_controlador(destino):
                         contador += 1
 
-            print(f"✓ {contador} rutas actualizadas en la tabla de enrutamiento")
+                print(f"✓ {contador} cambios aplicados en la tabla de enrutamiento")
+
+        else:
+            rutas = payload.get('rutas', [])
+
+            print(f" Tabla de rutas recibida (cifrada) #{secuencia}: {len(rutas)} rutas")
+
+            if self.router_controller:
+                contador = self.router_controller.sincronizar_rutas_controlador(rutas)
+                print(f"✓ {contador} cambios aplicados en la tabla de enrutamiento")
+
+            self.resync_pendiente = False
+
+        self.secuencia_rutas = secuencia
+
+    def _aplicar_ruta(self, ruta):
+        """Aplica una ruta recibida del controlador"""
+        destino = ruta.get('destino')
+        next_hop = ruta.get('next_hop')
+
+        if not (destino and next_hop):
+            return False
+
+        return self.router_controller.aplicar_ruta_controlador(
+            destino=destino,
+            next_hop=next_hop,
+            interfaz_salida=ruta.get('interfaz_salida', 'eth0'),
+            costo_total=ruta.get('costo', 1.0),
+            next_hops=ruta.get('next_hops'),
+            respaldo=ruta.get('respaldo')
+        ) is not None
 
     def _handle_route_response(self, message):
         """Maneja respuesta de ruta solicitada"""
@@ -321,9 +378,11 @@ class TCPClient:
         self._send_message(message)
         print(f" Actualización de vecinos enviada (cifrada): {len(vecinos_data)} vecinos")
 
-    def request_route(self, destino):
+    def request_route(self, destino, metrica=None, retardo_max=None, ancho_banda_min=None):
 
-        message = MessageFactory.create_route_request(self.router_nombre, destino)
+        message = MessageFactory.create_route_request(
+            self.router_nombre, destino, metrica, retardo_max, ancho_banda_min
+        )
         self._send_message(message)
         print(f" Solicitud de ruta enviada (cifrada) para destino: {destino}")
 
@@ -19,6 +19,7 @@ class MessageType(Enum):
     ROUTE_UPDATE = "ROUTE_UPDATE"  # Controlador envía rutas
     ROUTE_REQUEST = "ROUTE_REQUEST"  # Router solicita ruta
     ROUTE_RESPONSE = "ROUTE_RESPONSE"  # Respuesta con ruta
+    ROUTE_RESYNC = "ROUTE_RESYNC"  # Router solicita la tabla completa
 
     # Mensajes de error
     ERROR = "ERROR"  # Mensaje de error
@@ -118,30 +119,46 @@ class MessageFactory:
     """Fábrica para crear mensajes comunes"""
 
     @staticmethod
-    def create_register(router_id, router_nombre, router_ip):
-        """Crea mensaje de registro de router"""
+    def create_register(router_id, router_nombre, router_ip, framing=None):
+        """
+        Crea mensaje de registro de router
+
+        Args:
+            router_id: ID del router
+            router_nombre: Nombre del router
+            router_ip: IP del router
+            framing: Capacidades de framing binario ofrecidas (opcional)
+        """
+        payload = {
+            'router_id': router_id,
+            'router_nombre': router_nombre,
+            'router_ip': router_ip
+        }
+        if framing:
+            payload['framing'] = framing
+
         return Message(
             msg_type=MessageType.REGISTER,
             sender=router_nombre,
             receiver="CONTROLLER",
-            payload={
-                'router_id': router_id,
-                'router_nombre': router_nombre,
-                'router_ip': router_ip
-            }
+            payload=payload
         )
 
     @staticmethod
-    def create_register_ack(router_nombre, success=True, message=""):
-        """Crea confirmación de registro"""
+    def create_register_ack(router_nombre, success=True, message="", framing=None):
+        """Crea confirmación de registro con el framing acordado"""
+        payload = {
+            'success': success,
+            'message': message
+        }
+        if framing:
+            payload['framing'] = framing
+
         return Message(
             msg_type=MessageType.REGISTER_ACK,
             sender="CONTROLLER",
             receiver=router_nombre,
-            payload={
-                'success': success,
-                'message': message
-            }
+            payload=payload
         )
 
     @staticmethod
@@ -183,35 +200,103 @@ class MessageFactory:
         )
 
     @staticmethod
-    def create_route_update(router_nombre, rutas):
+    def create_route_update(router_nombre, rutas, secuencia=0):
         """
-        Crea mensaje con actualización de rutas
+        Crea mensaje con la tabla completa de rutas
+
+        Cada ruta lleva 'destino', 'next_hop' (camino principal),
+        'interfaz_salida', 'costo', 'origen_info', 'next_hops': el conjunto
+        ECMP como lista de {'next_hop', 'interfaz_salida', 'peso'}, y
+        'respaldo': el next hop libre de bucles precalculado
+        ({'next_hop', 'interfaz_salida', 'costo', 'protege_nodo'} o None).
 
         Args:
             router_nombre: Nombre del router destino
             rutas: Lista de diccionarios con rutas
+            secuencia: Número de secuencia de la tabla
         """
         return Message(
             msg_type=MessageType.ROUTE_UPDATE,
             sender="CONTROLLER",
             receiver=router_nombre,
             payload={
+                'modo': 'completo',
+                'secuencia': secuencia,
                 'rutas': rutas
             }
         )
 
     @staticmethod
-    def create_route_request(router_nombre, destino):
-        """Crea solicitud de ruta"""
+    def create_route_delta(router_nombre, secuencia_base, secuencia,
+                           agregar, modificar, retirar):
+        """
+        Crea mensaje con los cambios de rutas respecto a la última tabla enviada
+
+        Args:
+            router_nombre: Nombre del router destino
+            secuencia_base: Secuencia de la tabla sobre la que se aplica
+            secuencia: Secuencia resultante tras aplicar los cambios
+            agregar: Lista de diccionarios con rutas nuevas
+            modificar: Lista de diccionarios con rutas modificadas
+            retirar: Lista de destinos a eliminar
+        """
         return Message(
-            msg_type=MessageType.ROUTE_REQUEST,
+            msg_type=MessageType.ROUTE_UPDATE,
+            sender="CONTROLLER",
+            receiver=router_nombre,
+            payload={
+                'modo': 'delta',
+                'secuencia_base': secuencia_base,
+                'secuencia': secuencia,
+                'agregar': agregar,
+                'modificar': modificar,
+                'retirar': retirar
+            }
+        )
+
+    @staticmethod
+    def create_route_resync(router_nombre, secuencia=None):
+        """
+        Crea solicitud de tabla completa de rutas
+
+        Args:
+            router_nombre: Nombre del router
+            secuencia: Última secuencia aplicada por el router (None = ninguna)
+        """
+        return Message(
+            msg_type=MessageType.ROUTE_RESYNC,
             sender=router_nombre,
             receiver="CONTROLLER",
             payload={
-                'destino': destino
+                'secuencia': secuencia
             }
         )
 
+    @staticmethod
+    def create_route_request(router_nombre, destino, metrica=None, retardo_max=None,
+                             ancho_banda_min=None):
+        """
+        Crea solicitud de ruta
+
+        La métrica ('costo', 'retardo' o 'ancho_banda') y las restricciones
+        solo se incluyen si se indican; sin ellas el controlador responde
+        con la ruta de menor costo.
+        """
+        payload = {'destino': destino}
+        if metrica is not None:
+            payload['metrica'] = metrica
+        if retardo_max is not None:
+            payload['retardo_max'] = retardo_max
+        if ancho_banda_min is not None:
+            payload['ancho_banda_min'] = ancho_banda_min
+
+        return Message(
+            msg_type=MessageType.ROUTE_REQUEST,
+            sender=router_nombre,
+            receiver="CONTROLLER",
+            payload=payload
+        )
+
     @staticmethod
     def create_route_response(router_nombre, ruta_info):
         """Crea respuesta con ruta"""
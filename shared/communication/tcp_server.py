@@ -3,21 +3,37 @@ import ssl
 import threading
 import time
 import os
-from datetime import datetime
-from shared.communication.tcp_protocol import Message, MessageType, MessageFactory
+from shared.communication.tcp_protocol import MessageType, MessageFactory
+from shared.communication.frame_codec import FrameCodec, negotiate_framing
+from shared.communication.frame_reader import FrameReader
 
 class TCPServer:
-    def __init__(self, host='0.0.0.0', port=6633, controlador=None):
+    def __init__(self, host='0.0.0.0', port=6633, controlador=None,
+                 framing='json', codecs=None, compresion=True):
         self.host = host
         self.port = port
         self.controlador = controlador
 
+        # Formato de envío: 'json' (líneas) o 'binario' si el router lo ofrece
+        self.framing = framing
+        self.codecs = codecs
+        self.compresion = compresion
+        self.frame_codecs = {}  # {socket: FrameCodec}
+
         self.server_socket = None
         self.ssl_context = None
         self.running = False
         self.clients = {}  # {router_nombre: (socket, thread)}
         self.clients_lock = threading.Lock()
 
+        # Última tabla de rutas enviada a cada router
+        self.tablas_enviadas = {}  # {router_nombre: (secuencia, {destino: ruta})}
+        self.tablas_lock = threading.Lock()
+
+        # Un lock de envío por router: ordena las secuencias de cada conexión
+        # sin que un router lento frene los envíos a los demás
+        self.envio_locks = {}  # {router_nombre: Lock}
+
         # Thread para el servidor principal
         self.server_thread = None
 
@@ -156,32 +172,19 @@ class TCPServer:
 
     def _handle_client(self, client_socket, address):
         router_nombre = None
-        buffer = ""
+        reader = FrameReader(client_socket)
 
         try:
-            while self.running:
-                # Recibir datos cifrados (SSL los descifra automáticamente)
-                data = client_socket.recv(4096)
-
-                if not data:
-                    # Conexión cerrada por el cliente
+            # Recibir mensajes completos (SSL los descifra automáticamente);
+            # el generador termina cuando el cliente cierra la conexión
+            for message in reader.messages():
+                if not self.running:
                     break
 
-                # Agregar al buffer
-                buffer += data.decode('utf-8')
-
-                # Procesar mensajes completos (delimitados por \n)
-                while '\n' in buffer:
-                    # Extraer mensaje
-                    line, buffer = buffer.split('\n', 1)
-
-                    if line.strip():
-                        # Procesar mensaje
-                        try:
-                            message = Message.from_json(line)
-                            router_nombre = self._process_message(message, client_socket)
-                        except Exception as e:
-                            print(f"✗ Error al procesar mensaje: {e}")
+                try:
+                    router_nombre = self._process_message(message, client_socket)
+                except Exception as e:
+                    print(f"✗ Error al procesar mensaje: {e}")
 
         except ssl.SSLError as e:
             print(f"✗ Error SSL en conexión con {address}: {e}")
@@ -190,10 +193,14 @@ class TCPServer:
 
         finally:
             # Limpiar conexión
+            self.frame_codecs.pop(client_socket, None)
             if router_nombre:
                 with self.clients_lock:
                     if router_nombre in self.clients:
                         del self.clients[router_nombre]
+                with self.tablas_lock:
+                    self.tablas_enviadas.pop(router_nombre, None)
+                    self.envio_locks.pop(router_nombre, None)
                 print(f" Router {router_nombre} desconectado")
 
                 # Actualizar estado en BD
@@ -229,6 +236,10 @@ class TCPServer:
             # Solicitud de ruta
             self._handle_route_request(message, client_socket)
 
+        elif message.msg_type == MessageType.ROUTE_RESYNC:
+            # Secuencia de rutas desincronizada
+            self._handle_route_resync(message, client_socket)
+
         elif message.msg_type == MessageType.DISCONNECT:
             # Desconexión
             print(f" Router {router_nombre} solicitó desconexión")
@@ -249,6 +260,7 @@ class TCPServer:
 
         success = False
         msg = ""
+        framing = None
 
         try:
             if self.controlador:
@@ -273,6 +285,12 @@ class TCPServer:
 
                 success = True
 
+                # Acordar el formato de los mensajes enviados al router
+                framing = self._negotiate_framing(payload.get('framing'))
+                frame_codec = FrameCodec.from_negotiation(framing)
+                if frame_codec:
+                    self.frame_codecs[client_socket] = frame_codec
+
                 # Guardar conexión
                 with self.clients_lock:
                     self.clients[router_nombre] = (client_socket, threading.current_thread())
@@ -285,11 +303,22 @@ class TCPServer:
             print(f"✗ {msg}")
 
         # Enviar confirmación (cifrada automáticamente por SSL)
-        ack = MessageFactory.create_register_ack(router_nombre, success, msg)
+        ack = MessageFactory.create_register_ack(router_nombre, success, msg, framing)
         self._send_message(client_socket, ack)
 
         return router_nombre
 
+    def _negotiate_framing(self, offer):
+        """Elige el framing de la conexión según la oferta del router"""
+        if self.framing != 'binario':
+            return {'modo': 'json'}
+
+        framing = negotiate_framing(offer, self.codecs, self.compresion)
+        if framing['modo'] == 'binario':
+            print(f" Framing binario acordado: codec {framing['codec']}, "
+                  f"compresión {'sí' if framing['compresion'] else 'no'}")
+        return framing
+
     def _handle_heartbeat(self, message, client_socket):
         router_nombre = message.sender
 
@@ -317,31 +346,43 @@ class TCPServer:
 
         router_nombre = message.sender
         destino = message.payload.get('destino')
+        metrica = message.payload.get('metrica') or 'costo'
+        retardo_max = message.payload.get('retardo_max')
+        ancho_banda_min = message.payload.get('ancho_banda_min')
 
-        print(f" Solicitud de ruta desde {router_nombre} hacia {destino}")
+        print(f" Solicitud de ruta desde {router_nombre} hacia {destino} (métrica: {metrica})")
 
         if self.controlador:
-            # Calcular ruta
-            router_origen = self.controlador.obtener_router_por_nombre(router_nombre)
-            router_destino = self.controlador.obtener_router_por_ip(destino)
-
-            if router_origen and router_destino:
-                ruta = self.controlador.calcular_ruta(
-                    router_origen.id_router,
-                    router_destino.id_router,
-                    guardar=False
-                )
+            # Calcular ruta (cacheada por versión de topología con la IP
+            # del siguiente salto, sin consultar la BD en un acierto)
+            respuesta = self.controlador.resolver_ruta_solicitada(
+                router_nombre, destino, metrica, retardo_max, ancho_banda_min
+            )
+
+            if respuesta:
+                ruta, next_hop = respuesta
+                ruta_info = {
+                    'destino': destino,
+                    'next_hop': next_hop,
+                    'costo': ruta.costo_total,
+                    'camino': ruta.camino_texto(),
+                    'metrica': metrica
+                }
+
+                response = MessageFactory.create_route_response(router_nombre, ruta_info)
+                self._send_message(client_socket, response)
+
+    def _handle_route_resync(self, message, client_socket):
+        """Reenvía la tabla completa a un router con la secuencia desincronizada"""
+        router_nombre = message.sender
+        secuencia = message.payload.get('secuencia')
 
-                if ruta:
-                    ruta_info = {
-                        'destino': destino,
-                        'next_hop': None,  # Calcular next hop
-                        'costo': ruta.costo_total,
-                        'camino': ruta.camino
-                    }
+        print(f" {router_nombre} solicita resincronización de rutas (secuencia: {secuencia})")
 
-                    response = MessageFactory.create_route_response(router_nombre, ruta_info)
-                    self._send_message(client_socket, response)
+        if self.controlador:
+            tablas = self.controlador.construir_tablas_rutas([router_nombre])
+            self.enviar_tabla_rutas(router_nombre, tablas.get(router_nombre, {}),
+                                    client_socket, completa=True)
 
     def _send_initial_routes(self, router_id, client_socket):
         """Envía rutas iniciales a un router recién conectado"""
@@ -354,39 +395,16 @@ class TCPServer:
             if not router:
                 return
 
-            # Calcular o obtener rutas para este router
-            rutas = self.controlador.listar_rutas_desde(router_id)
+            tabla = self.controlador.construir_tablas_rutas([router.nombre]).get(router.nombre, {})
 
-            if not rutas:
+            if not tabla:
                 # No hay rutas, calcularlas
                 self.controlador.recalcular_rutas_router(router_id)
-                rutas = self.controlador.listar_rutas_desde(router_id)
-
-            # Convertir rutas a formato para envío
-            rutas_data = []
-            for ruta in rutas:
-                router_destino = self.controlador.obtener_router(ruta.router_destino)
-                if router_destino:
-                    # Obtener next hop (primer salto después del origen)
-                    camino = ruta.obtener_saltos()
-                    next_hop_id = camino[1] if len(camino) > 1 else None
-
-                    if next_hop_id:
-                        next_hop_router = self.controlador.obtener_router(next_hop_id)
-
-                        rutas_data.append({
-                            'destino': router_destino.ip,
-                            'next_hop': next_hop_router.ip if next_hop_router else None,
-                            'interfaz_salida': f"eth_to_R{next_hop_id}",
-                            'costo': ruta.costo_total,
-                            'origen_info': 'Controlador'
-                        })
-
-            # Enviar mensaje con rutas (cifrado automáticamente por SSL)
-            if rutas_data:
-                message = MessageFactory.create_route_update(router.nombre, rutas_data)
-                self._send_message(client_socket, message)
-                print(f"✓ {len(rutas_data)} rutas enviadas a {router.nombre} (cifradas)")
+                tabla = self.controlador.construir_tablas_rutas([router.nombre]).get(router.nombre, {})
+
+            # Un router que se registra parte siempre de la tabla completa
+            self.enviar_tabla_rutas(router.nombre, tabla, client_socket, completa=True)
+            print(f"✓ {len(tabla)} rutas enviadas a {router.nombre} (cifradas)")
 
         except Exception as e:
             print(f"✗ Error al enviar rutas iniciales: {e}")
@@ -394,18 +412,96 @@ class TCPServer:
     def _send_message(self, client_socket, message):
         try:
             # SSL cifra automáticamente
-            client_socket.sendall(message.to_bytes())
+            frame_codec = self.frame_codecs.get(client_socket)
+            data = frame_codec.encode(message) if frame_codec else message.to_bytes()
+            client_socket.sendall(data)
         except Exception as e:
             print(f"✗ Error al enviar mensaje: {e}")
 
-    def broadcast_route_update(self, rutas_por_router):
+    def enviar_tabla_rutas(self, router_nombre, tabla, client_socket=None, completa=False):
+        """
+        Envía a un router los cambios de su tabla de rutas
+
+        Compara con la última tabla enviada y solo manda las rutas agregadas,
+        modificadas y retiradas. La tabla completa se envía si el router no
+        tiene una tabla previa o si se solicita explícitamente. El cálculo y
+        el envío se serializan con el lock de ese router; el lock global
+        solo protege el acceso a las tablas enviadas.
+
+        Args:
+            router_nombre: Nombre del router
+            tabla: Diccionario {destino: ruta} con la tabla actual
+            client_socket: Socket del router (None = buscar entre los conectados)
+            completa: Forzar el envío de la tabla completa
+
+        Returns:
+            True si se envió un mensaje
+        """
+        if client_socket is None:
+            with self.clients_lock:
+                cliente = self.clients.get(router_nombre)
+            if not cliente:
+                return False
+            client_socket = cliente[0]
+
+        with self.tablas_lock:
+            envio_lock = self.envio_locks.setdefault(router_nombre, threading.Lock())
+
+        with envio_lock:
+            with self.tablas_lock:
+                anterior = self.tablas_enviadas.get(router_nombre)
+
+            if completa or anterior is None:
+                secuencia = anterior[0] + 1 if anterior else 1
+                message = MessageFactory.create_route_update(
+                    router_nombre, list(tabla.values()), secuencia
+                )
+            else:
+                secuencia_base, tabla_anterior = anterior
+                agregar = [ruta for destino, ruta in tabla.items() if destino not in tabla_anterior]
+                modificar = [
+                    ruta for destino, ruta in tabla.items()
+                    if destino in tabla_anterior and tabla_anterior[destino] != ruta
+                ]
+                retirar = [destino for destino in tabla_anterior if destino not in tabla]
+
+                if not (agregar or modificar or retirar):
+                    return False
+
+                secuencia = secuencia_base + 1
+                message = MessageFactory.create_route_delta(
+                    router_nombre, secuencia_base, secuencia, agregar, modificar, retirar
+                )
+
+            with self.tablas_lock:
+                self.tablas_enviadas[router_nombre] = (secuencia, tabla)
+            # Bajo el lock del router: sus secuencias salen en orden
+            self._send_message(client_socket, message)
+
+        return True
 
+    def broadcast_route_update(self, tablas_por_router):
+        """
+        Envía a cada router conectado los cambios de su tabla de rutas
+
+        Args:
+            tablas_por_router: Diccionario {router_nombre: {destino: ruta}}
+
+        Returns:
+            Número de routers a los que se envió una actualización
+        """
         with self.clients_lock:
-            for router_nombre, (client_socket, _) in self.clients.items():
-                if router_nombre in rutas_por_router:
-                    rutas = rutas_por_router[router_nombre]
-                    message = MessageFactory.create_route_update(router_nombre, rutas)
-                    self._send_message(client_socket, message)
+            clientes = [
+                (router_nombre, client_socket)
+                for router_nombre, (client_socket, _) in self.clients.items()
+                if router_nombre in tablas_por_router
+            ]
+
+        enviados = 0
+        for router_nombre, client_socket in clientes:
+            if self.enviar_tabla_rutas(router_nombre, tablas_por_router[router_nombre], client_socket):
+                enviados += 1
+        return enviados
 
     def _heartbeat_monitor(self):
         """Thread que monitorea heartbeats"""
@@ -0,0 +1,6 @@
+from .connection_pool import ConnectionPool
+from .batch_writer import BatchWriter
+from .segment_log import SegmentLog
+from .storage_backend import MySQLBackend, SQLiteBackend, crear_backend, columna_faltante, tipo_distinto
+
+__all__ = ['ConnectionPool', 'BatchWriter', 'SegmentLog', 'MySQLBackend', 'SQLiteBackend', 'crear_backend', 'columna_faltante', 'tipo_distinto']
\ No newline at end of file
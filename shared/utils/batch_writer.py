@@ -0,0 +1,193 @@
+import atexit
+import queue
+import threading
+import time
+
+# Políticas cuando la cola está llena
+POLITICAS_COLA = ['descartar', 'bloquear']
+
+# Marca que pide al hilo escritor vaciar la cola sin esperar al intervalo
+_VACIAR = object()
+
+
+class BatchWriter:
+    """
+    Escritor asíncrono por lotes
+
+    Los elementos se encolan en una cola acotada en memoria y un hilo en
+    segundo plano los entrega a la función de escritura en lotes, cuando
+    el lote alcanza su tamaño o cuando pasa el intervalo desde el primer
+    elemento pendiente. Si la cola está llena, la política 'descartar'
+    pierde el elemento y 'bloquear' espera un hueco hasta un timeout (y
+    luego lo descarta). flush() espera a que se escriba todo lo encolado
+    antes de la llamada; al terminar el intérprete se vacía la cola.
+    """
+
+    def __init__(self, escribir, capacidad=10000, tamano_lote=200, intervalo=0.5,
+                 politica='descartar', timeout_bloqueo=1.0, nombre='escritor'):
+        """
+        Inicializa el escritor e inicia su hilo
+
+        Args:
+            escribir: Función que recibe una lista de elementos y los persiste
+            capacidad: Elementos pendientes como máximo
+            tamano_lote: Elementos por escritura como máximo
+            intervalo: Segundos que espera un lote incompleto antes de escribirse
+            politica: 'descartar' o 'bloquear' cuando la cola está llena
+            timeout_bloqueo: Segundos de espera con la política 'bloquear'
+            nombre: Nombre del hilo y de los mensajes
+        """
+        if politica not in POLITICAS_COLA:
+            raise ValueError(f"Política de cola inválida: {politica}")
+
+        self.escribir = escribir
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self.timeout_bloqueo = timeout_bloqueo
+        self.nombre = nombre
+
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._estado = threading.Condition()
+        self._encolados = 0
+        self._procesados = 0
+        self._escritos = 0
+        self._descartados = 0
+        self._errores = 0
+        self._avisado = False
+        self._activo = True
+
+        self._hilo = threading.Thread(target=self._ejecutar, name=nombre, daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def encolar(self, elemento):
+        """
+        Encola un elemento sin escribir en el hilo que llama
+
+        Returns:
+            True si se encoló, False si se descartó por cola llena o cerrada
+        """
+        if not self._activo:
+            return False
+
+        with self._estado:
+            self._encolados += 1
+
+        try:
+            if self.politica == 'bloquear':
+                self._cola.put(elemento, timeout=self.timeout_bloqueo)
+            else:
+                self._cola.put_nowait(elemento)
+        except queue.Full:
+            with self._estado:
+                self._procesados += 1
+                self._descartados += 1
+                avisar = not self._avisado
+                self._avisado = True
+                self._estado.notify_all()
+            if avisar:
+                print(f"✗ Cola de {self.nombre} llena, se descartan elementos")
+            return False
+
+        self._avisado = False
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se escriba todo lo encolado hasta este momento
+
+        Args:
+            timeout: Segundos de espera como máximo (None = sin límite)
+
+        Returns:
+            True si no quedaron elementos pendientes
+        """
+        with self._estado:
+            objetivo = self._encolados
+            if self._procesados >= objetivo:
+                return True
+
+        if not self._hilo.is_alive():
+            return False
+
+        # La marca hace que el hilo escriba el lote actual sin esperar al
+        # intervalo; con la cola llena no hace falta (los lotes se completan
+        # por tamaño) y esperar un hueco ignoraría el timeout
+        try:
+            self._cola.put_nowait(_VACIAR)
+        except queue.Full:
+            pass
+        with self._estado:
+            return self._estado.wait_for(lambda: self._procesados >= objetivo, timeout)
+
+    def cerrar(self, timeout=5.0):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if not self._activo:
+            return
+        self.flush(timeout)
+        self._activo = False
+        try:
+            self._cola.put(None, timeout=timeout)
+        except queue.Full:
+            print(f"✗ {self.nombre} no terminó de escribir, se descartan los pendientes")
+            return
+        self._hilo.join(timeout)
+
+    def estadisticas(self):
+        """
+        Contadores del escritor
+
+        Returns:
+            Diccionario con 'pendientes', 'escritos', 'descartados' y 'errores'
+        """
+        with self._estado:
+            return {
+                'pendientes': self._encolados - self._procesados,
+                'escritos': self._escritos,
+                'descartados': self._descartados,
+                'errores': self._errores
+            }
+
+    def _ejecutar(self):
+        """Bucle del hilo escritor: arma lotes por tamaño o por tiempo"""
+        while True:
+            elemento = self._cola.get()
+            if elemento is None:
+                return
+
+            lote = []
+            if elemento is not _VACIAR:
+                lote.append(elemento)
+                limite = time.monotonic() + self.intervalo
+                while len(lote) < self.tamano_lote:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        elemento = self._cola.get(timeout=restante)
+                    except queue.Empty:
+                        break
+                    if elemento is None or elemento is _VACIAR:
+                        break
+                    lote.append(elemento)
+
+            if lote:
+                self._escribir(lote)
+            if elemento is None:
+                return
+
+    def _escribir(self, lote):
+        """Escribe un lote; si falla, sus elementos se cuentan como errores"""
+        try:
+            self.escribir(lote)
+            escritos, errores = len(lote), 0
+        except Exception as e:
+            print(f"✗ Error al escribir lote de {self.nombre}: {e}")
+            escritos, errores = 0, len(lote)
+
+        with self._estado:
+            self._procesados += len(lote)
+            self._escritos += escritos
+            self._errores += errores
+            self._estado.notify_all()
@@ -0,0 +1,144 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones a base de datos seguro entre hilos
+
+    Cada hilo toma una conexión en exclusiva mientras la usa. Las
+    peticiones anidadas del mismo hilo reutilizan la conexión que ya tiene,
+    de modo que una consulta dentro de una transacción ve sus propios
+    cambios. Las conexiones se validan antes de entregarse y las caídas se
+    reemplazan por conexiones nuevas.
+    """
+
+    def __init__(self, factory, tamano=10, timeout=30, validar=None):
+        """
+        Inicializa el pool
+
+        Args:
+            factory: Función sin argumentos que abre una conexión nueva
+            tamano: Número máximo de conexiones abiertas
+            timeout: Segundos de espera por una conexión libre
+            validar: Función que indica si una conexión sigue sana
+        """
+        self.factory = factory
+        self.tamano = tamano
+        self.timeout = timeout
+        self.validar = validar or (lambda conexion: conexion.is_connected())
+
+        self._libres = queue.LifoQueue()
+        self._cupos = threading.BoundedSemaphore(tamano)
+        self._local = threading.local()
+
+    @property
+    def profundidad(self):
+        """Número de préstamos anidados de la conexión del hilo actual"""
+        return getattr(self._local, 'profundidad', 0)
+
+    def adquirir(self):
+        """
+        Obtiene una conexión para el hilo actual
+
+        Returns:
+            Conexión validada
+
+        Raises:
+            TimeoutError: Si no hay conexiones libres dentro del timeout
+        """
+        local = self._local
+        if self.profundidad:
+            local.profundidad += 1
+            return local.conexion
+
+        if not self._cupos.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Sin conexiones libres en el pool ({self.tamano})")
+
+        try:
+            conexion = self._tomar_conexion()
+        except Exception:
+            self._cupos.release()
+            raise
+
+        local.conexion = conexion
+        local.profundidad = 1
+        return conexion
+
+    def liberar(self, descartar=False):
+        """
+        Devuelve al pool la conexión del hilo actual
+
+        Args:
+            descartar: Cerrar la conexión en lugar de reutilizarla
+        """
+        local = self._local
+        if not self.profundidad:
+            return
+
+        local.profundidad -= 1
+        if local.profundidad:
+            return
+
+        conexion = local.conexion
+        local.conexion = None
+
+        if descartar:
+            self._cerrar(conexion)
+        else:
+            self._libres.put(conexion)
+        self._cupos.release()
+
+    @contextmanager
+    def conexion(self):
+        """
+        Presta una conexión durante un bloque with
+
+        Yields:
+            Conexión validada
+        """
+        conexion = self.adquirir()
+        descartar = False
+        try:
+            yield conexion
+        except Exception:
+            # Una conexión caída no vuelve al pool
+            descartar = not self._es_valida(conexion)
+            raise
+        finally:
+            self.liberar(descartar)
+
+    def cerrar_todas(self):
+        """Cierra las conexiones libres del pool"""
+        while True:
+            try:
+                conexion = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            self._cerrar(conexion)
+
+    def _tomar_conexion(self):
+        """Toma una conexión libre sana o abre una nueva"""
+        while True:
+            try:
+                conexion = self._libres.get_nowait()
+            except queue.Empty:
+                return self.factory()
+
+            if self._es_valida(conexion):
+                return conexion
+            self._cerrar(conexion)
+
+    def _es_valida(self, conexion):
+        try:
+            return bool(self.validar(conexion))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _cerrar(conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
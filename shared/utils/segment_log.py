@@ -0,0 +1,418 @@
+import atexit
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Cabecera de cada registro: ID (entero de 64 bits) y marca de tiempo (double)
+CABECERA = struct.Struct('<Qd')
+
+# Índice de tiempo de un segmento sellado: primer ID, registros, marca mínima,
+# marca máxima y creación del segmento
+_INDICE = struct.Struct('<QIddd')
+
+_EXTENSION_SEGMENTO = '.seg'
+_EXTENSION_INDICE = '.idx'
+_ARCHIVO_BLOQUEO = '.lock'
+
+
+class _Segmento:
+    """Archivo de registros consecutivos con su índice de tiempo en memoria"""
+
+    def __init__(self, ruta, primer_id, registros=0, ts_min=None, ts_max=None, creado=None):
+        self.ruta = ruta
+        self.primer_id = primer_id
+        self.registros = registros
+        self.ts_min = ts_min
+        self.ts_max = ts_max
+        self.creado = creado if creado is not None else time.time()
+        self.mapa = None  # mmap de lectura de un segmento sellado
+        self.sellado = False
+
+    def anotar(self, marca):
+        """Actualiza el índice de tiempo con un registro nuevo"""
+        self.registros += 1
+        self.ts_min = marca if self.ts_min is None else min(self.ts_min, marca)
+        self.ts_max = marca if self.ts_max is None else max(self.ts_max, marca)
+
+
+class SegmentLog:
+    """
+    Log binario de solo anexado, repartido en segmentos
+
+    Cada registro tiene un tamaño fijo: cabecera (ID, marca de tiempo) más
+    una carga de bytes que arma quien llama. Los registros se anexan al
+    segmento activo, que rota al llegar a su número máximo de registros o
+    a su antigüedad máxima; al rotar, el segmento se sella y se guarda su
+    índice de tiempo (marcas mínima y máxima) en un archivo .idx. Las
+    lecturas recorren los segmentos del más nuevo al más antiguo sobre un
+    mmap, descartan por índice los que quedan fuera del rango de tiempo y
+    filtran los registros sobre los bytes mapeados sin desempaquetarlos.
+    Los segmentos más allá del máximo configurado se borran completos.
+
+    Un directorio admite un único escritor: al abrirlo se toma un bloqueo
+    exclusivo sobre su archivo .lock, y otro proceso que intente abrirlo
+    recibe un error en lugar de anexar a los mismos segmentos.
+    """
+
+    def __init__(self, directorio, tamano_registro=512, registros_por_segmento=65536,
+                 antiguedad_segmento=3600, segmentos_max=64):
+        """
+        Abre (o crea) el log en un directorio
+
+        Args:
+            directorio: Carpeta de los segmentos
+            tamano_registro: Bytes por registro, cabecera incluida
+            registros_por_segmento: Registros por segmento antes de rotar
+            antiguedad_segmento: Segundos de vida del segmento activo antes
+                                 de rotar (None = sin límite)
+            segmentos_max: Segmentos que se conservan (None = sin límite)
+        """
+        if tamano_registro <= CABECERA.size:
+            raise ValueError(f"El registro debe ocupar más de {CABECERA.size} bytes")
+
+        self.directorio = directorio
+        self.tamano_registro = tamano_registro
+        self.tamano_carga = tamano_registro - CABECERA.size
+        self.registros_por_segmento = registros_por_segmento
+        self.antiguedad_segmento = antiguedad_segmento
+        self.segmentos_max = segmentos_max
+
+        self._lock = threading.Lock()
+        self._segmentos = []
+        self._primeros = []  # primer_id de cada segmento, para bisect
+        self._fd = None
+        self._fd_bloqueo = None
+
+        os.makedirs(directorio, exist_ok=True)
+        self._bloquear()
+        self._abrir()
+        atexit.register(self.cerrar)
+
+    # ==================== ESCRITURA ====================
+
+    def agregar(self, carga, marca=None):
+        """
+        Anexa un registro al segmento activo
+
+        Args:
+            carga: Bytes de la carga (se rellenan con ceros hasta su tamaño)
+            marca: Marca de tiempo en segundos (None = ahora)
+
+        Returns:
+            ID del registro
+        """
+        if len(carga) > self.tamano_carga:
+            raise ValueError(f"La carga ocupa {len(carga)} bytes (máximo {self.tamano_carga})")
+        marca = time.time() if marca is None else marca
+
+        with self._lock:
+            if self._fd is None:
+                raise ValueError("El log está cerrado")
+            if self._debe_rotar():
+                self._rotar()
+
+            segmento = self._segmentos[-1]
+            id_registro = segmento.primer_id + segmento.registros
+            registro = CABECERA.pack(id_registro, marca) + carga.ljust(self.tamano_carga, b'\0')
+            os.write(self._fd, registro)
+            segmento.anotar(marca)
+            return id_registro
+
+    def eliminar_anteriores(self, marca):
+        """
+        Borra los segmentos sellados cuyos registros son todos anteriores a una marca
+
+        Returns:
+            Número de registros eliminados
+        """
+        with self._lock:
+            vencidos = [s for s in self._segmentos[:-1] if s.ts_max is None or s.ts_max < marca]
+            return self._borrar(vencidos)
+
+    def cerrar(self):
+        """Sella el índice del segmento activo y cierra el archivo"""
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+                self._guardar_indice(self._segmentos[-1])
+            if self._fd_bloqueo is not None:
+                # Cerrar el archivo libera el bloqueo
+                os.close(self._fd_bloqueo)
+                self._fd_bloqueo = None
+
+    # ==================== LECTURA ====================
+
+    def recorrer(self, filtro=None, desde=None):
+        """
+        Recorre los registros del más nuevo al más antiguo
+
+        Args:
+            filtro: Función (mapa, desplazamiento) -> bool evaluada sobre los
+                    bytes mapeados del registro antes de copiarlo
+            desde: Marca de tiempo mínima (None = todos)
+
+        Yields:
+            Tuplas (id, marca, carga)
+        """
+        tamano = self.tamano_registro
+        for segmento, registros in self._instantanea():
+            if desde is not None and (segmento.ts_max is None or segmento.ts_max < desde):
+                continue
+
+            mapa = self._mapear(segmento, registros)
+            if mapa is None:
+                continue
+
+            for desplazamiento in range((registros - 1) * tamano, -1, -tamano):
+                id_registro, marca = CABECERA.unpack_from(mapa, desplazamiento)
+                if desde is not None and marca < desde:
+                    continue
+                if filtro is not None and not filtro(mapa, desplazamiento):
+                    continue
+                inicio = desplazamiento + CABECERA.size
+                yield id_registro, marca, mapa[inicio:desplazamiento + tamano]
+
+    def obtener(self, id_registro):
+        """
+        Lee un registro por su ID
+
+        Returns:
+            Tupla (id, marca, carga) o None si no existe
+        """
+        with self._lock:
+            posicion = bisect.bisect_right(self._primeros, id_registro) - 1
+            if posicion < 0:
+                return None
+            segmento = self._segmentos[posicion]
+            registros = segmento.registros
+
+        indice = id_registro - segmento.primer_id
+        if indice >= registros:
+            return None
+
+        mapa = self._mapear(segmento, registros)
+        if mapa is None:
+            return None
+        desplazamiento = indice * self.tamano_registro
+        _, marca = CABECERA.unpack_from(mapa, desplazamiento)
+        inicio = desplazamiento + CABECERA.size
+        return id_registro, marca, mapa[inicio:desplazamiento + self.tamano_registro]
+
+    def contar(self):
+        """Número de registros conservados"""
+        with self._lock:
+            return sum(s.registros for s in self._segmentos)
+
+    def estadisticas(self):
+        """
+        Estado del log
+
+        Returns:
+            Diccionario con 'segmentos', 'registros', 'bytes' y los límites
+            de tiempo de los registros conservados
+        """
+        with self._lock:
+            marcas_min = [s.ts_min for s in self._segmentos if s.ts_min is not None]
+            marcas_max = [s.ts_max for s in self._segmentos if s.ts_max is not None]
+            registros = sum(s.registros for s in self._segmentos)
+            return {
+                'segmentos': len(self._segmentos),
+                'registros': registros,
+                'bytes': registros * self.tamano_registro,
+                'desde': min(marcas_min) if marcas_min else None,
+                'hasta': max(marcas_max) if marcas_max else None
+            }
+
+    # ==================== SEGMENTOS ====================
+
+    def _bloquear(self):
+        """
+        Toma el bloqueo exclusivo del directorio sin esperar
+
+        Raises:
+            RuntimeError: Si otro proceso tiene el directorio abierto
+        """
+        fd = os.open(os.path.join(self.directorio, _ARCHIVO_BLOQUEO), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            raise RuntimeError(f"El log {self.directorio} ya está abierto por otro proceso")
+        self._fd_bloqueo = fd
+
+    def _abrir(self):
+        """Carga los segmentos existentes y abre el último para anexar"""
+        primeros = sorted(
+            int(nombre[:-len(_EXTENSION_SEGMENTO)])
+            for nombre in os.listdir(self.directorio)
+            if nombre.endswith(_EXTENSION_SEGMENTO) and nombre[:-len(_EXTENSION_SEGMENTO)].isdigit()
+        )
+
+        for primer_id in primeros:
+            ruta = self._ruta_segmento(primer_id)
+            segmento = self._leer_indice(ruta, primer_id)
+            if segmento is None:
+                segmento = self._reconstruir_indice(ruta, primer_id)
+            self._segmentos.append(segmento)
+            self._primeros.append(primer_id)
+
+        for segmento in self._segmentos[:-1]:
+            segmento.sellado = True
+            if not os.path.exists(self._ruta_indice(segmento.primer_id)):
+                self._guardar_indice(segmento)
+
+        if self._segmentos:
+            self._fd = os.open(self._segmentos[-1].ruta, os.O_WRONLY | os.O_APPEND)
+        else:
+            self._nuevo_segmento(1)
+
+    def _nuevo_segmento(self, primer_id):
+        """Crea el segmento activo que empieza en un ID"""
+        ruta = self._ruta_segmento(primer_id)
+        self._fd = os.open(ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._segmentos.append(_Segmento(ruta, primer_id))
+        self._primeros.append(primer_id)
+
+    def _debe_rotar(self):
+        """Verifica si el segmento activo llegó a su tamaño o antigüedad máximos"""
+        activo = self._segmentos[-1]
+        if activo.registros == 0:
+            return False
+        if activo.registros >= self.registros_por_segmento:
+            return True
+        return (self.antiguedad_segmento is not None
+                and time.time() - activo.creado >= self.antiguedad_segmento)
+
+    def _rotar(self):
+        """Sella el segmento activo, abre uno nuevo y aplica la retención"""
+        activo = self._segmentos[-1]
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._guardar_indice(activo)
+        activo.sellado = True
+
+        self._nuevo_segmento(activo.primer_id + activo.registros)
+
+        if self.segmentos_max is not None and len(self._segmentos) > self.segmentos_max:
+            self._borrar(self._segmentos[:len(self._segmentos) - self.segmentos_max])
+
+    def _borrar(self, segmentos):
+        """Quita segmentos sellados del log y borra sus archivos"""
+        eliminados = 0
+        for segmento in segmentos:
+            posicion = self._segmentos.index(segmento)
+            del self._segmentos[posicion]
+            del self._primeros[posicion]
+            eliminados += segmento.registros
+            # Un lector que aún tenga el mmap abierto sigue leyendo el archivo borrado
+            segmento.mapa = None
+            for ruta in (segmento.ruta, self._ruta_indice(segmento.primer_id)):
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+        return eliminados
+
+    def _instantanea(self):
+        """Segmentos del más nuevo al más antiguo con su número de registros actual"""
+        with self._lock:
+            return [(s, s.registros) for s in reversed(self._segmentos)]
+
+    def _mapear(self, segmento, registros):
+        """
+        mmap de lectura de un segmento
+
+        Los segmentos sellados se mapean una vez, completos, y se reutilizan;
+        el activo se mapea en cada lectura hasta los registros ya escritos.
+        """
+        if registros == 0:
+            return None
+        if segmento.sellado:
+            if segmento.mapa is None:
+                segmento.mapa = self._mapear_archivo(segmento.ruta, segmento.registros * self.tamano_registro)
+            return segmento.mapa
+        return self._mapear_archivo(segmento.ruta, registros * self.tamano_registro)
+
+    @staticmethod
+    def _mapear_archivo(ruta, longitud):
+        try:
+            with open(ruta, 'rb') as archivo:
+                return mmap.mmap(archivo.fileno(), longitud, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Segmento borrado por la retención durante la lectura
+            return None
+
+    # ==================== ÍNDICE DE TIEMPO ====================
+
+    def _ruta_segmento(self, primer_id):
+        return os.path.join(self.directorio, f"{primer_id:020d}{_EXTENSION_SEGMENTO}")
+
+    def _ruta_indice(self, primer_id):
+        return os.path.join(self.directorio, f"{primer_id:020d}{_EXTENSION_INDICE}")
+
+    def _guardar_indice(self, segmento):
+        """Escribe el índice de tiempo de un segmento"""
+        datos = _INDICE.pack(
+            segmento.primer_id, segmento.registros,
+            segmento.ts_min if segmento.ts_min is not None else 0.0,
+            segmento.ts_max if segmento.ts_max is not None else 0.0,
+            segmento.creado
+        )
+        temporal = self._ruta_indice(segmento.primer_id) + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(datos)
+        os.replace(temporal, self._ruta_indice(segmento.primer_id))
+
+    def _leer_indice(self, ruta, primer_id):
+        """
+        Carga el índice de tiempo guardado de un segmento
+
+        Returns:
+            _Segmento o None si falta el índice o no coincide con el archivo
+        """
+        try:
+            with open(self._ruta_indice(primer_id), 'rb') as archivo:
+                datos = archivo.read()
+            guardado, registros, ts_min, ts_max, creado = _INDICE.unpack(datos)
+        except (OSError, struct.error):
+            return None
+
+        if guardado != primer_id or os.path.getsize(ruta) != registros * self.tamano_registro:
+            return None
+        if registros == 0:
+            ts_min = ts_max = None
+        return _Segmento(ruta, primer_id, registros, ts_min, ts_max, creado)
+
+    def _reconstruir_indice(self, ruta, primer_id):
+        """
+        Rearma el índice de tiempo recorriendo el segmento
+
+        Un registro incompleto al final (escritura interrumpida) se recorta.
+        """
+        tamano = os.path.getsize(ruta)
+        registros = tamano // self.tamano_registro
+        if tamano != registros * self.tamano_registro:
+            os.truncate(ruta, registros * self.tamano_registro)
+
+        segmento = _Segmento(ruta, primer_id, creado=os.path.getmtime(ruta))
+        mapa = self._mapear_archivo(ruta, registros * self.tamano_registro) if registros else None
+        for desplazamiento in range(0, registros * self.tamano_registro, self.tamano_registro):
+            _, marca = CABECERA.unpack_from(mapa, desplazamiento)
+            segmento.anotar(marca)
+        if mapa is not None:
+            mapa.close()
+        return segmento
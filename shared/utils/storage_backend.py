@@ -0,0 +1,379 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+# Unidades de intervalo aceptadas por los helpers de dialecto
+_UNIDADES_SQLITE = {
+    'SECOND': 'seconds',
+    'MINUTE': 'minutes',
+    'HOUR': 'hours',
+    'DAY': 'days',
+}
+
+
+def columna_faltante(tabla, columna):
+    """Condición de migración MySQL: la columna no existe en la tabla"""
+    return (
+        "SELECT COUNT(*) = 0 FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{tabla}' AND COLUMN_NAME = '{columna}'"
+    )
+
+
+def tipo_distinto(tabla, columna, tipos):
+    """Condición de migración MySQL: la columna no tiene ninguno de los tipos dados"""
+    lista = ", ".join(f"'{tipo}'" for tipo in tipos)
+    return (
+        "SELECT COUNT(*) > 0 FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{tabla}' AND COLUMN_NAME = '{columna}' "
+        f"AND DATA_TYPE NOT IN ({lista})"
+    )
+
+
+class MySQLBackend:
+    """
+    Backend de almacenamiento sobre un servidor MySQL
+
+    Las consultas de los DAOs ya usan el dialecto de MySQL, por lo que se
+    ejecutan sin traducción. Al abrir la primera conexión se aplican las
+    migraciones pendientes: cada una es un par (condición, sentencia) y la
+    sentencia solo se ejecuta si la consulta de condición devuelve verdadero
+    (None = siempre, para sentencias idempotentes como CREATE TABLE IF NOT
+    EXISTS).
+    """
+
+    nombre = 'mysql'
+
+    def __init__(self, config, etiqueta='mysql', migraciones=None, migrar_datos=None):
+        # Importación diferida: sin MySQL instalado se puede usar SQLite
+        import mysql.connector
+
+        self._connector = mysql.connector
+        self.config = config
+        self.etiqueta = etiqueta
+        self.errores = (mysql.connector.Error,)
+        self.migraciones = migraciones or []
+        self.migrar_datos = migrar_datos
+        self._esquema_actualizado = False
+        self._lock_esquema = threading.Lock()
+
+    def conectar(self):
+        """Abre una conexión en modo autocommit y migra el esquema si falta"""
+        # Autocommit: las lecturas fuera de transacción siempre ven datos actuales
+        connection = self._connector.connect(autocommit=True, **self.config)
+
+        with self._lock_esquema:
+            if not self._esquema_actualizado:
+                self._actualizar_esquema(connection)
+                self._esquema_actualizado = True
+
+        print(f"✓ Conexión exitosa a {self.etiqueta}")
+        return connection
+
+    def _actualizar_esquema(self, connection):
+        """Aplica las migraciones pendientes y la conversión de datos"""
+        cursor = connection.cursor()
+        try:
+            for condicion, sentencia in self.migraciones:
+                if condicion is not None:
+                    cursor.execute(condicion)
+                    if not cursor.fetchone()[0]:
+                        continue
+                cursor.execute(sentencia)
+                if condicion is not None:
+                    print(f"✓ Migración aplicada en {self.etiqueta}: {' '.join(sentencia.split())[:80]}")
+
+            if self.migrar_datos:
+                connection.start_transaction()
+                try:
+                    self.migrar_datos(cursor)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+        finally:
+            cursor.close()
+
+    def es_valida(self, connection):
+        """Comprueba que la conexión sigue abierta (hace ping al servidor)"""
+        return connection.is_connected()
+
+    def iniciar_transaccion(self, connection):
+        connection.start_transaction()
+
+    def cursor(self, connection):
+        return connection.cursor()
+
+    # ---------- Dialecto ----------
+
+    def ahora(self):
+        """Expresión SQL de la fecha y hora actuales"""
+        return "NOW()"
+
+    def hace(self, unidad):
+        """
+        Expresión SQL de 'ahora menos N unidades'; N es un parámetro %s
+
+        Args:
+            unidad: 'SECOND', 'MINUTE', 'HOUR' o 'DAY'
+        """
+        return f"DATE_SUB(NOW(), INTERVAL %s {unidad})"
+
+    def segundos_desde(self, columna):
+        """Expresión SQL con los segundos transcurridos desde una columna"""
+        return f"TIMESTAMPDIFF(SECOND, {columna}, NOW())"
+
+
+class _SQLiteCursor:
+    """Cursor de SQLite que acepta consultas con marcadores %s"""
+
+    def __init__(self, backend, cursor):
+        self._backend = backend
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        return self._cursor.execute(self._backend.traducir(query), params or ())
+
+    def executemany(self, query, seq_params):
+        return self._cursor.executemany(self._backend.traducir(query), seq_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteBackend:
+    """
+    Backend de almacenamiento embebido sobre SQLite
+
+    Pensado para nodos livianos y pruebas en una sola máquina. Usa el
+    journal WAL para que las lecturas no bloqueen a las escrituras, crea
+    el esquema con sus índices al abrir la base y traduce los marcadores
+    %s de los DAOs a '?'. Las traducciones se cachean y sqlite3 reutiliza
+    las sentencias ya compiladas de cada conexión. Una base creada con un
+    esquema anterior se actualiza al abrirla (ver _actualizar_esquema).
+    """
+
+    nombre = 'sqlite'
+
+    def __init__(self, config, esquema=None, etiqueta='sqlite', migrar_datos=None):
+        self.ruta = config['ruta']
+        self.timeout = config.get('timeout', 30)
+        self.sentencias_cacheadas = config.get('sentencias_cacheadas', 256)
+        self.esquema = esquema
+        self.etiqueta = etiqueta
+        self.errores = (sqlite3.Error,)
+        self.migrar_datos = migrar_datos
+        self._esquema_creado = False
+        self._lock_esquema = threading.Lock()
+
+        _registrar_tipos_sqlite()
+
+    def conectar(self):
+        """Abre una conexión configurada y crea el esquema si falta"""
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.ruta,
+            timeout=self.timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # Autocommit; las transacciones usan BEGIN explícito
+            check_same_thread=False,  # La conexión pasa entre hilos a través del pool
+            cached_statements=self.sentencias_cacheadas
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+
+        with self._lock_esquema:
+            if self.esquema and not self._esquema_creado:
+                connection.executescript(self.esquema)
+                if self._actualizar_esquema(connection):
+                    # Los índices de las tablas reconstruidas se vuelven a crear
+                    connection.executescript(self.esquema)
+                if self.migrar_datos:
+                    self._migrar_datos(connection)
+                self._esquema_creado = True
+
+        print(f"✓ Conexión exitosa a {self.etiqueta} (SQLite: {self.ruta})")
+        return connection
+
+    def es_valida(self, connection):
+        """Comprueba que la conexión sigue abierta"""
+        connection.execute("SELECT 1")
+        return True
+
+    def _actualizar_esquema(self, connection):
+        """
+        Lleva una base existente al esquema actual
+
+        Compara cada tabla con la del esquema creado en una base en memoria
+        y agrega las columnas que faltan. SQLite no agrega claves foráneas a
+        una tabla existente, así que las tablas a las que les faltan se
+        reconstruyen.
+
+        Returns:
+            True si se reconstruyó alguna tabla
+        """
+        referencia = sqlite3.connect(':memory:')
+        try:
+            referencia.executescript(self.esquema)
+            tablas = referencia.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+
+            reconstruidas = False
+            for tabla, sql in tablas:
+                existentes = {fila[1] for fila in connection.execute(f"PRAGMA table_info({tabla})")}
+                for _, columna, tipo, no_nulo, defecto, _ in referencia.execute(f"PRAGMA table_info({tabla})"):
+                    if columna in existentes:
+                        continue
+                    definicion = f"{columna} {tipo}"
+                    if defecto is not None:
+                        definicion += f" DEFAULT {defecto}" + (" NOT NULL" if no_nulo else "")
+                    connection.execute(f"ALTER TABLE {tabla} ADD COLUMN {definicion}")
+                    print(f"✓ Columna {tabla}.{columna} agregada en {self.etiqueta}")
+
+                claves = referencia.execute(f"PRAGMA foreign_key_list({tabla})").fetchall()
+                if claves and not connection.execute(f"PRAGMA foreign_key_list({tabla})").fetchall():
+                    self._reconstruir_tabla(connection, tabla, sql)
+                    reconstruidas = True
+            return reconstruidas
+        finally:
+            referencia.close()
+
+    def _reconstruir_tabla(self, connection, tabla, sql):
+        """
+        Recrea una tabla con su definición actual conservando sus filas
+
+        Las filas que no cumplen las nuevas claves foráneas (huérfanas de un
+        borrado sin CASCADE) se eliminan.
+        """
+        nueva = f"{tabla}_nueva"
+        columnas_actuales = {fila[1] for fila in connection.execute(f"PRAGMA table_info({tabla})")}
+
+        # Las claves foráneas se desactivan para que DROP TABLE no borre en cascada
+        connection.execute("PRAGMA foreign_keys=OFF")
+        try:
+            connection.execute("BEGIN")
+            connection.execute(re.sub(
+                r'^(\s*CREATE TABLE (?:IF NOT EXISTS )?)\w+', rf'\g<1>{nueva}', sql, count=1
+            ))
+            columnas = ", ".join(
+                fila[1] for fila in connection.execute(f"PRAGMA table_info({nueva})")
+                if fila[1] in columnas_actuales
+            )
+            connection.execute(f"INSERT INTO {nueva} ({columnas}) SELECT {columnas} FROM {tabla}")
+            connection.execute(f"DROP TABLE {tabla}")
+            connection.execute(f"ALTER TABLE {nueva} RENAME TO {tabla}")
+
+            huerfanas = {fila[1] for fila in connection.execute(f"PRAGMA foreign_key_check({tabla})")}
+            connection.executemany(f"DELETE FROM {tabla} WHERE rowid = ?", [(rowid,) for rowid in huerfanas])
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.execute("PRAGMA foreign_keys=ON")
+
+        print(f"✓ Tabla {tabla} actualizada en {self.etiqueta} ({len(huerfanas)} filas huérfanas eliminadas)")
+
+    def _migrar_datos(self, connection):
+        """Convierte en una transacción los datos guardados con formatos anteriores"""
+        cursor = self.cursor(connection)
+        try:
+            connection.execute("BEGIN")
+            self.migrar_datos(cursor)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+
+    def iniciar_transaccion(self, connection):
+        connection.execute("BEGIN")
+
+    def cursor(self, connection):
+        return _SQLiteCursor(self, connection.cursor())
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def traducir(query):
+        """Convierte los marcadores %s de MySQL en marcadores de SQLite"""
+        return query.replace('%s', '?')
+
+    # ---------- Dialecto ----------
+
+    def ahora(self):
+        """Expresión SQL de la fecha y hora actuales (hora local)"""
+        return "datetime('now', 'localtime')"
+
+    def hace(self, unidad):
+        """
+        Expresión SQL de 'ahora menos N unidades'; N es un parámetro %s
+
+        Args:
+            unidad: 'SECOND', 'MINUTE', 'HOUR' o 'DAY'
+        """
+        return f"datetime('now', 'localtime', '-' || %s || ' {_UNIDADES_SQLITE[unidad]}')"
+
+    def segundos_desde(self, columna):
+        """Expresión SQL con los segundos transcurridos desde una columna"""
+        return f"CAST((julianday('now', 'localtime') - julianday({columna})) * 86400 AS INTEGER)"
+
+
+_tipos_registrados = False
+
+
+def _registrar_tipos_sqlite():
+    """Guarda y lee las columnas DATETIME como objetos datetime"""
+    global _tipos_registrados
+    if _tipos_registrados:
+        return
+
+    # Mismo formato que datetime('now'), para comparar como texto
+    sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(' '))
+    sqlite3.register_converter('DATETIME', lambda valor: datetime.fromisoformat(valor.decode()))
+    _tipos_registrados = True
+
+
+def crear_backend(tipo, config, esquema_sqlite=None, etiqueta=None,
+                  migraciones_mysql=None, migrar_datos=None):
+    """
+    Crea el backend de almacenamiento configurado
+
+    Args:
+        tipo: 'mysql' o 'sqlite'
+        config: Configuración del backend (DB_CONFIG o SQLITE_CONFIG)
+        esquema_sqlite: Script SQL con el esquema para SQLite
+        etiqueta: Nombre de la base para los mensajes
+        migraciones_mysql: Lista de pares (condición, sentencia) para MySQL
+        migrar_datos: Función (cursor) que convierte datos de formatos
+                      anteriores; se ejecuta al abrir la base en ambos backends
+
+    Returns:
+        Instancia de MySQLBackend o SQLiteBackend
+    """
+    if tipo == 'mysql':
+        return MySQLBackend(config, etiqueta or 'mysql', migraciones_mysql, migrar_datos)
+    if tipo == 'sqlite':
+        return SQLiteBackend(config, esquema_sqlite, etiqueta or 'sqlite', migrar_datos)
+    raise ValueError(f"Backend de almacenamiento desconocido: {tipo}")
@@ -0,0 +1,64 @@
+import random
+import unittest
+
+import networkx as nx
+
+from controlador.services.csr_graph import CSRGraph
+from controlador.services.incremental_spf import IncrementalSPF
+from controlador.services.spf_engine import construir_adyacencia, dijkstra_ecmp
+
+
+def _saltos_completos(grafo):
+    """Saltos de igual costo de todos los orígenes con el cálculo completo"""
+    adyacencia = construir_adyacencia(grafo)
+    csr = CSRGraph.desde_networkx(grafo)
+    saltos = {}
+    for origen in adyacencia:
+        saltos[origen] = dijkstra_ecmp(adyacencia, origen)[2]
+        assert csr.dijkstra(origen, ecmp=True)[2] == saltos[origen], origen
+    return saltos
+
+
+class TestSaltosIgualCosto(unittest.TestCase):
+
+    def test_enlace_costo_cero_entre_destinos(self):
+        grafo = nx.Graph()
+        grafo.add_edge(1, 2, weight=1)
+        grafo.add_edge(1, 3, weight=1)
+        grafo.add_edge(2, 3, weight=0)
+
+        saltos = _saltos_completos(grafo)
+
+        self.assertEqual(saltos[1], {2: (2, 3), 3: (2, 3)})
+
+    def test_completo_e_incremental_coinciden(self):
+        aleatorio = random.Random(7)
+        for _ in range(40):
+            n = aleatorio.randint(3, 8)
+            grafo = nx.Graph()
+            grafo.add_nodes_from(range(1, n + 1))
+            for _ in range(2 * n):
+                a, b = aleatorio.sample(range(1, n + 1), 2)
+                grafo.add_edge(a, b, weight=aleatorio.choice([0, 0, 1, 2]))
+
+            adyacencia = construir_adyacencia(grafo)
+            incremental = IncrementalSPF()
+            incremental.cargar(adyacencia, {o: dijkstra_ecmp(adyacencia, o) for o in adyacencia}, 0)
+
+            for version in range(1, 6):
+                a, b = aleatorio.sample(range(1, n + 1), 2)
+                costo = aleatorio.choice([None, 0, 1, 2])
+                if costo is None:
+                    if grafo.has_edge(a, b):
+                        grafo.remove_edge(a, b)
+                else:
+                    grafo.add_edge(a, b, weight=costo)
+                incremental.cambiar_enlace(version, a, b, costo)
+
+                completos = _saltos_completos(grafo)
+                for origen, arbol in incremental.arboles.items():
+                    self.assertEqual(arbol.saltos, completos[origen], (version, origen))
+
+
+if __name__ == '__main__':
+    unittest.main()